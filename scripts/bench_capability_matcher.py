@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+能力匹配（CP-SAT）建模规模基准测试
+
+对比:
+- dense：旧实现，每个 需求×资源 组合建变量，不可行组合加 == 0 约束
+- sparse：SparseMatchModel，能力倒排索引 + 向量化距离过滤，只为可行对建变量
+- resolve：sparse 模型上 1% 需求变化后增量重解（hint / 固定未变化需求）
+
+用法:
+    python scripts/bench_capability_matcher.py --sizes 100 300 1000 --dense-max 300
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.planning.algorithms.base import haversine_matrix  # noqa: E402
+from src.planning.algorithms.matching import CapabilityMatcher  # noqa: E402
+
+CAPABILITIES = [f"cap_{i:02d}" for i in range(20)]
+
+
+def make_problem(n: int, seed: int) -> Dict:
+    """n 个需求 × n 个资源，分布在约 4°×4° 区域，每个资源 3 项能力"""
+    rng = np.random.default_rng(seed)
+    needs = [{
+        "id": f"NEED-{i}",
+        "task_id": f"T{i // 3}",
+        "capability_id": CAPABILITIES[int(rng.integers(len(CAPABILITIES)))],
+        "min_level": float(rng.uniform(0.4, 0.8)),
+        "importance": "required" if rng.random() < 0.3 else "preferred",
+        "location": {"lat": float(rng.uniform(30, 34)), "lng": float(rng.uniform(102, 106))},
+    } for i in range(n)]
+    resources = [{
+        "id": f"RES-{j}",
+        "name": f"队伍{j}",
+        "capabilities": {c: float(rng.uniform(0.5, 1.0)) for c in rng.choice(CAPABILITIES, 3, replace=False)},
+        "location": {"lat": float(rng.uniform(30, 34)), "lng": float(rng.uniform(102, 106))},
+        "status": "available",
+        "max_assignments": int(rng.integers(1, 4)),
+    } for j in range(n)]
+    return {"capability_needs": needs, "resources": resources,
+            "constraints": {"max_distance_km": 100, "time_limit_sec": 30}}
+
+
+def dense_build(matcher: CapabilityMatcher, problem: Dict):
+    """旧实现的建模部分（原样复制自 CapabilityMatcher._solve_with_ortools）"""
+    from ortools.sat.python import cp_model
+
+    needs = matcher._parse_needs(problem["capability_needs"])
+    resources = matcher._parse_resources(problem["resources"])
+    constraints = problem["constraints"]
+    model = cp_model.CpModel()
+    n_needs = len(needs)
+    n_resources = len(resources)
+    max_distance = constraints.get("max_distance_km", matcher.params["max_distance_km"])
+    distances = {}
+    can_satisfy = {}
+    proficiencies = {}
+    dist_matrix = haversine_matrix([need.location or None for need in needs], [res.location for res in resources])
+    for i, need in enumerate(needs):
+        for j, res in enumerate(resources):
+            distances[(i, j)] = float(dist_matrix[i, j])
+            cap_id = need.capability_id
+            if cap_id in res.capabilities and res.capabilities[cap_id] >= need.min_level:
+                can_satisfy[(i, j)] = True
+                proficiencies[(i, j)] = res.capabilities[cap_id]
+            else:
+                can_satisfy[(i, j)] = False
+                proficiencies[(i, j)] = 0
+    assignment = {}
+    for i in range(n_needs):
+        for j in range(n_resources):
+            assignment[(i, j)] = model.NewBoolVar(f"assign_{i}_{j}")
+    for i, need in enumerate(needs):
+        if need.importance == "required":
+            valid_resources = [j for j in range(n_resources)
+                               if can_satisfy.get((i, j), False) and distances[(i, j)] <= max_distance]
+            if valid_resources:
+                model.Add(sum(assignment[(i, j)] for j in valid_resources) >= 1)
+    for i in range(n_needs):
+        for j in range(n_resources):
+            if not can_satisfy.get((i, j), False):
+                model.Add(assignment[(i, j)] == 0)
+    for i in range(n_needs):
+        for j in range(n_resources):
+            if distances[(i, j)] > max_distance:
+                model.Add(assignment[(i, j)] == 0)
+    for j, res in enumerate(resources):
+        model.Add(sum(assignment[(i, j)] for i in range(n_needs)) <= res.max_assignments)
+    total_distance = []
+    for i in range(n_needs):
+        for j in range(n_resources):
+            total_distance.append(assignment[(i, j)] * int(distances[(i, j)] * 100))
+    model.Minimize(sum(total_distance))
+    return model, needs, resources, assignment, distances
+
+
+def dense_solve(matcher: CapabilityMatcher, problem: Dict):
+    from ortools.sat.python import cp_model
+
+    start = time.perf_counter()
+    model, needs, resources, assignment, distances = dense_build(matcher, problem)
+    build = time.perf_counter() - start
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = problem["constraints"]["time_limit_sec"]
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return build, time.perf_counter() - start, len(assignment), float("nan")
+    total = sum(distances[k] for k, v in assignment.items() if solver.Value(v) == 1)
+    return build, time.perf_counter() - start, len(assignment), total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="能力匹配建模规模基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000], help="需求数=资源数")
+    parser.add_argument("--dense-max", type=int, default=300, help="dense 旧实现只跑到该规模（1000×1000 需数GB内存）")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'规模':>6}{'模式':>10}{'变量数':>10}{'建模(s)':>9}{'总耗时(s)':>10}{'总距离(km)':>12}{'覆盖率':>8}")
+    for n in args.sizes:
+        problem = make_problem(n, args.seed)
+        matcher = CapabilityMatcher()
+        if n <= args.dense_max:
+            build, total_s, nvars, dist = dense_solve(matcher, problem)
+            print(f"{n:>6}{'dense':>10}{nvars:>10}{build:>9.2f}{total_s:>10.2f}{dist:>12.1f}{'':>8}")
+
+        start = time.perf_counter()
+        result = matcher.run(problem)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>6}{'sparse':>10}{result.trace['feasible_pairs']:>10}{'':>9}{elapsed:>10.2f}"
+              f"{result.metrics['total_distance']:>12.1f}{result.metrics['required_coverage']:>8.0%}")
+
+        # 1% 需求位置变化后的增量重解
+        rng = np.random.default_rng(args.seed + n)
+        changed: List[Dict] = []
+        for i in rng.choice(n, max(1, n // 100), replace=False):
+            need = dict(problem["capability_needs"][int(i)])
+            need["location"] = {"lat": float(rng.uniform(30, 34)), "lng": float(rng.uniform(102, 106))}
+            changed.append(need)
+        for fix in (False, True):
+            start = time.perf_counter()
+            again = matcher.resolve(changed, fix_unchanged=fix)
+            elapsed = time.perf_counter() - start
+            label = "fixed" if fix else "hint"
+            print(f"{n:>6}{label:>10}{again.trace['feasible_pairs']:>10}{'':>9}{elapsed:>10.2f}"
+                  f"{again.metrics['total_distance']:>12.1f}{again.metrics['required_coverage']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
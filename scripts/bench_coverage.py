@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+侦察覆盖航线基准测试
+
+对比各扫描模式在不同形状目标区域上的总航程、航时、区域外飞行比例与规划耗时：
+- zigzag-bbox：旧实现，外接矩形南北/东西扫描
+- zigzag-clip：多边形裁剪 + 扫描方向搜索 + 凹多边形单元分解
+- spiral / circular：以区域中心、外接圆半径生成（参考）
+- zigzag-clip x3：三机分区，报告最长航时
+
+用法:
+    python scripts/bench_coverage.py --altitude 100 --repeat 5
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.recon_scheduler.algorithms.coverage import (  # noqa: E402
+    generate_circular_waypoints,
+    generate_multi_uav_zigzag_waypoints,
+    generate_spiral_waypoints,
+    generate_zigzag_waypoints,
+)
+from src.agents.recon_scheduler.algorithms.coverage.boustrophedon import LocalFrame  # noqa: E402
+from src.core.geodesy import points_in_polygon  # noqa: E402
+
+LAT0, LNG0 = 31.69, 103.86
+
+
+def _polygon(xy_m: List[Tuple[float, float]], rotate_deg: float = 0.0) -> List[Tuple[float, float]]:
+    """局部平面坐标（米）→ (lat, lng)，可整体旋转"""
+    frame = LocalFrame(LAT0, LNG0)
+    c, s = math.cos(math.radians(rotate_deg)), math.sin(math.radians(rotate_deg))
+    return [frame.to_latlng(x * c - y * s, x * s + y * c) for x, y in xy_m]
+
+
+SHAPES: Dict[str, List[Tuple[float, float]]] = {
+    "矩形": _polygon([(-1500, -600), (1500, -600), (1500, 600), (-1500, 600)]),
+    "旋转35°矩形": _polygon([(-1500, -600), (1500, -600), (1500, 600), (-1500, 600)], 35),
+    "三角形": _polygon([(-1500, -1000), (1500, -1000), (200, 1300)], 10),
+    "L形": _polygon([(-1200, -1200), (1200, -1200), (1200, -400), (-400, -400), (-400, 1200), (-1200, 1200)], 20),
+    "河道带": _polygon([(-2000, -300), (-500, 200), (800, -200), (2000, 300), (2000, 800), (800, 300), (-500, 700), (-2000, 200)]),
+}
+
+
+def _outside_ratio(waypoints, polygon) -> float:
+    """扫描航点之间（含换行衔接段）落在区域外的航程占比，每段采样10个点"""
+    ring = [(p[1], p[0]) for p in polygon]
+    outside = total = 0.0
+    scan = [w for w in waypoints if w["action"] in ("scan", "start_scan")]
+    for a, b in zip(scan[:-1], scan[1:]):
+        ts = np.linspace(0.05, 0.95, 10)
+        lats = a["lat"] + (b["lat"] - a["lat"]) * ts
+        lngs = a["lng"] + (b["lng"] - a["lng"]) * ts
+        seg = math.hypot((b["lat"] - a["lat"]) * 111000, (b["lng"] - a["lng"]) * 111000 * math.cos(math.radians(LAT0)))
+        inside = points_in_polygon(lngs, lats, ring)
+        outside += seg * (1 - inside.mean())
+        total += seg
+    return outside / total if total else 0.0
+
+
+def timeit(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="侦察覆盖航线基准测试")
+    parser.add_argument("--altitude", type=float, default=100, help="飞行高度(米)")
+    parser.add_argument("--speed", type=float, default=10, help="飞行速度(米/秒)")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最快）")
+    args = parser.parse_args()
+
+    print(f"{'区域':<12}{'模式':<16}{'航程(km)':>10}{'航时(min)':>10}{'区域外%':>9}{'航点':>6}{'规划(ms)':>10}")
+    for name, polygon in SHAPES.items():
+        center = (sum(p[0] for p in polygon) / len(polygon), sum(p[1] for p in polygon) / len(polygon))
+        radius = max(
+            math.hypot((p[0] - center[0]) * 111000, (p[1] - center[1]) * 111000 * math.cos(math.radians(LAT0)))
+            for p in polygon
+        )
+        cases = [
+            ("zigzag-bbox", lambda: generate_zigzag_waypoints(
+                polygon, args.altitude, args.speed, clip_to_polygon=False)),
+            ("zigzag-clip", lambda: generate_zigzag_waypoints(polygon, args.altitude, args.speed)),
+            ("spiral", lambda: generate_spiral_waypoints(
+                center, radius, 10, args.altitude, args.speed, ring_spacing_m=144, home_point=polygon[0])),
+            ("circular", lambda: generate_circular_waypoints(
+                center, radius, args.altitude, args.speed, home_point=polygon[0])),
+        ]
+        for mode, func in cases:
+            ms, (waypoints, stats) = timeit(func, args.repeat)
+            outside = _outside_ratio(waypoints, polygon) * 100 if mode.startswith("zigzag") else float("nan")
+            print(
+                f"{name:<12}{mode:<16}{stats['total_distance_m'] / 1000:>10.2f}{stats['total_duration_min']:>10.1f}"
+                f"{outside:>9.1f}{stats['waypoint_count']:>6}{ms:>10.2f}"
+            )
+        ms, results = timeit(
+            lambda: generate_multi_uav_zigzag_waypoints(polygon, args.altitude, [args.speed] * 3), args.repeat
+        )
+        durations = [s["total_duration_min"] for _, s in results]
+        total_km = sum(s["total_distance_m"] for _, s in results) / 1000
+        print(f"{name:<12}{'zigzag-clip x3':<16}{total_km:>10.2f}{max(durations):>10.1f}"
+              f"{'':>9}{sum(s['waypoint_count'] for _, s in results):>6}{ms:>10.2f}"
+              f"  各机航时={[round(d, 1) for d in durations]}")
+
+
+if __name__ == "__main__":
+    main()
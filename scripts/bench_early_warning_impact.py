@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+预警影响分析基准测试
+
+随机生成数千个队伍/车辆位置与规划路线，对比：
+- legacy：旧实现，逐对象计算到灾害中心的距离，逐路线点纯 Python 射线法判断是否落入灾害区域
+- strtree：compute_impacts，投影到局部平面后 STRtree 查询 + 向量化距离/相交
+
+注意两者语义不同：旧实现按到中心点的距离判断缓冲区，且只检查路线顶点（两个顶点之间穿越区域会漏判），
+新实现按到区域边界的距离，并用线段与区域精确求交。
+
+用法:
+    python scripts/bench_early_warning_impact.py --objects 5000 --route-points 50
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.early_warning.impact import ImpactCandidate, compute_impacts, hazard_geometry  # noqa: E402
+from src.core.geodesy import haversine_m  # noqa: E402
+
+CENTER = (104.06, 31.0)
+
+
+def _circle_boundary(radius_m: float, n: int = 64) -> Dict:
+    """近似圆形灾害区域（带不规则起伏）"""
+    angles = np.linspace(0, 2 * math.pi, n, endpoint=False)
+    r = radius_m * (1 + 0.2 * np.sin(5 * angles))
+    lons = CENTER[0] + r * np.cos(angles) / (111320 * math.cos(math.radians(CENTER[1])))
+    lats = CENTER[1] + r * np.sin(angles) / 110540
+    ring = np.column_stack([lons, lats]).tolist()
+    return {"type": "Polygon", "coordinates": [ring + [ring[0]]]}
+
+
+# ---------------------------------------------------------------------------
+# 旧实现（复制自 analyze.py 重构前）
+# ---------------------------------------------------------------------------
+
+def _point_in_polygon(x: float, y: float, polygon: List[List[float]]) -> bool:
+    n = len(polygon)
+    inside = False
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i][0], polygon[i][1]
+        xj, yj = polygon[j][0], polygon[j][1]
+        if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
+            inside = not inside
+        j = i
+    return inside
+
+
+def legacy_analyze(objects: List[Dict], boundary: Dict, buffer_m: float) -> List[Tuple[str, float, bool]]:
+    polygon = boundary["coordinates"][0]
+    result = []
+    for obj in objects:
+        distance = haversine_m(obj["lon"], obj["lat"], CENTER[0], CENTER[1])
+        route_affected = False
+        for lon, lat in obj.get("route") or []:
+            if _point_in_polygon(lon, lat, polygon):
+                route_affected = True
+                break
+        if distance <= buffer_m or route_affected:
+            result.append((obj["id"], distance, route_affected))
+    return result
+
+
+def make_objects(n: int, route_points: int, route_ratio: float, seed: int) -> List[Dict]:
+    rng = np.random.default_rng(seed)
+    objects = []
+    for i in range(n):
+        lon = CENTER[0] + rng.normal(0, 0.08)
+        lat = CENTER[1] + rng.normal(0, 0.08)
+        route = None
+        if rng.random() < route_ratio:
+            # 朝随机目的地的折线路线
+            dest = np.array([CENTER[0] + rng.normal(0, 0.08), CENTER[1] + rng.normal(0, 0.08)])
+            ts = np.linspace(0, 1, route_points)[:, None]
+            jitter = rng.normal(0, 0.002, (route_points, 2))
+            route = (np.array([lon, lat]) * (1 - ts) + dest * ts + jitter).tolist()
+        objects.append({"id": f"obj-{i}", "lon": lon, "lat": lat, "route": route})
+    return objects
+
+
+def timeit(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="预警影响分析基准测试")
+    parser.add_argument("--objects", type=int, default=5000, help="对象数")
+    parser.add_argument("--route-points", type=int, default=50, help="每条路线点数")
+    parser.add_argument("--route-ratio", type=float, default=0.5, help="带路线对象比例")
+    parser.add_argument("--radius", type=float, default=3000, help="灾害区域半径(米)")
+    parser.add_argument("--buffer", type=float, default=3000, help="缓冲距离(米)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    boundary = _circle_boundary(args.radius)
+    hazard = hazard_geometry(boundary, {"lon": CENTER[0], "lat": CENTER[1]})
+
+    print(f"{'对象数':>8}{'模式':>10}{'受影响':>8}{'路线受影响':>10}{'耗时(ms)':>10}")
+    for n in sorted({max(args.objects // 10, 1), args.objects, args.objects * 4}):
+        objects = make_objects(n, args.route_points, args.route_ratio, args.seed)
+        candidates = [
+            ImpactCandidate("team", o["id"], o["id"], o["lon"], o["lat"], route=o["route"]) for o in objects
+        ]
+        ms_legacy, legacy = timeit(lambda: legacy_analyze(objects, boundary, args.buffer), args.repeat)
+        ms_new, hits = timeit(lambda: compute_impacts(candidates, hazard, args.buffer), args.repeat)
+        print(f"{n:>8}{'legacy':>10}{len(legacy):>8}{sum(r[2] for r in legacy):>10}{ms_legacy:>10.1f}")
+        print(f"{n:>8}{'strtree':>10}{len(hits):>8}{sum(h.route_affected for h in hits):>10}{ms_new:>10.1f}"
+              f"  加速 {ms_legacy / ms_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+地理计算内核基准测试
+
+对比各模块原有的逐点 Python 实现与 src.core.geodesy 的 NumPy 批量实现：
+- 一对多距离（最近路网节点查找）
+- 距离矩阵（需求×资源、VRP距离矩阵）
+- 折线长度（轨迹总距离、插值器分段距离）
+- 点在多边形内
+- WGS84 → GCJ02 / GCJ02 → WGS84 批量转换
+- GeoJSON 要素集合坐标系转换（逐点 vs 一次批量）
+
+用法:
+    python scripts/bench_geodesy.py --points 20000 --repeat 5
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import geodesy  # noqa: E402
+from src.core.coord_transform import (  # noqa: E402
+    gcj02_to_wgs84,
+    transform_geometries,
+    wgs84_to_gcj02,
+)
+
+
+def legacy_haversine(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """旧实现：各模块复制的标量 Haversine"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
+    return 6371000 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def legacy_point_in_polygon(lon: float, lat: float, ring: List[Tuple[float, float]]) -> bool:
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def legacy_transform_lines(lines: List[dict]) -> List[dict]:
+    """旧方式：逐条几何、逐点调用标量转换"""
+    return [
+        {"type": "LineString", "coordinates": [list(wgs84_to_gcj02(x, y)) for x, y in g["coordinates"]]}
+        for g in lines
+    ]
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    """返回最快一次耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="地理计算内核基准测试")
+    parser.add_argument("--points", type=int, default=20000, help="点数")
+    parser.add_argument("--matrix", type=int, default=300, help="距离矩阵边长")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最快）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lons = rng.uniform(103.0, 105.0, args.points)
+    lats = rng.uniform(30.0, 32.0, args.points)
+    pts = list(zip(lons.tolist(), lats.tolist()))
+    coords = np.column_stack([lons, lats])
+    angles = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+    ring = list(zip((104.0 + 0.5 * np.cos(angles)).tolist(), (31.0 + 0.5 * np.sin(angles)).tolist()))
+    m = args.matrix
+    m_pts = pts[:m]
+    # 每条线 50 个点的要素集合
+    lines = [
+        {"type": "LineString", "coordinates": [list(p) for p in pts[i:i + 50]]}
+        for i in range(0, len(pts), 50)
+    ]
+
+    cases = [
+        (
+            f"一对多距离 ({args.points}点)",
+            lambda: [legacy_haversine(104.0, 31.0, x, y) for x, y in pts],
+            lambda: geodesy.one_to_many_m(104.0, 31.0, lons, lats),
+            args.points,
+        ),
+        (
+            f"距离矩阵 ({m}x{m})",
+            lambda: [[legacy_haversine(a, b, c, d) for c, d in m_pts] for a, b in m_pts],
+            lambda: geodesy.distance_matrix_m(lons[:m], lats[:m]),
+            m * m,
+        ),
+        (
+            f"折线长度 ({args.points}点)",
+            lambda: sum(legacy_haversine(*pts[i - 1], *pts[i]) for i in range(1, len(pts))),
+            lambda: geodesy.polyline_length_m(coords),
+            args.points - 1,
+        ),
+        (
+            f"点在多边形内 ({args.points}点 x 64边)",
+            lambda: [legacy_point_in_polygon(x, y, ring) for x, y in pts],
+            lambda: geodesy.points_in_polygon(lons, lats, ring),
+            args.points,
+        ),
+        (
+            f"WGS84→GCJ02 ({args.points}点)",
+            lambda: [wgs84_to_gcj02(x, y) for x, y in pts],
+            lambda: geodesy.wgs84_to_gcj02_array(coords),
+            args.points,
+        ),
+        (
+            f"GCJ02→WGS84 ({args.points}点)",
+            lambda: [gcj02_to_wgs84(x, y) for x, y in pts],
+            lambda: geodesy.gcj02_to_wgs84_array(coords),
+            args.points,
+        ),
+        (
+            f"GeoJSON→GCJ02 ({len(lines)}条线)",
+            lambda: legacy_transform_lines(lines),
+            lambda: transform_geometries(lines, "gcj02"),
+            args.points,
+        ),
+    ]
+
+    print(f"{'场景':<32}{'旧实现(ms)':>12}{'批量(ms)':>12}{'旧ns/点':>10}{'新ns/点':>10}{'加速':>8}")
+    for name, legacy, vectorized, n in cases:
+        legacy_ms = timeit(legacy, args.repeat)
+        new_ms = timeit(vectorized, args.repeat)
+        print(
+            f"{name:<32}{legacy_ms:>12.2f}{new_ms:>12.2f}"
+            f"{legacy_ms * 1e6 / n:>10.0f}{new_ms * 1e6 / n:>10.0f}{legacy_ms / new_ms:>7.1f}x"
+        )
+
+    # 正确性抽查
+    expected = np.array([legacy_haversine(104.0, 31.0, x, y) for x, y in pts])
+    assert np.allclose(geodesy.one_to_many_m(104.0, 31.0, lons, lats), expected, rtol=1e-9)
+    expected_inside = np.array([legacy_point_in_polygon(x, y, ring) for x, y in pts])
+    assert (geodesy.points_in_polygon(lons, lats, ring) == expected_inside).all()
+    expected_gcj = np.array([gcj02_to_wgs84(x, y) for x, y in pts[:1000]])
+    assert np.allclose(geodesy.gcj02_to_wgs84_array(coords[:1000]), expected_gcj, atol=1e-9)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+栅格烈度/损失估算基准测试
+
+- 生成国家尺度的合成暴露栅格（人口聚集在若干城市周围，4类建筑）
+- 统计 IntensityGridEngine 在不同评估半径下的冷启动/缓存命中耗时
+- 对照：旧实现逐格调用 LossEstimator._estimate_building_damage（标量烈度 + scipy 逐次计算），
+  抽样测单格耗时后按格子数外推
+
+用法:
+    python scripts/bench_intensity_grid.py --size-deg 20 --cell-deg 0.01
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.planning.algorithms.assessment.intensity_grid import (  # noqa: E402
+    ExposureGrid,
+    IntensityGridEngine,
+)
+from src.planning.algorithms.assessment.loss_estimation import LossEstimator  # noqa: E402
+
+CLASSES = ("masonry", "rc_frame", "wood", "steel")
+
+
+def make_exposure(size_deg: float, cell_deg: float, seed: int) -> ExposureGrid:
+    """以 (lat0, lng0) = (20, 95) 为西南角的合成暴露栅格"""
+    rng = np.random.default_rng(seed)
+    n = int(round(size_deg / cell_deg))
+    lats = 20 + (np.arange(n) + 0.5) * cell_deg
+    lngs = 95 + (np.arange(n) + 0.5) * cell_deg
+    population = np.zeros((n, n), dtype=np.float32)
+    for _ in range(60):
+        clat, clng = rng.uniform(20, 20 + size_deg), rng.uniform(95, 95 + size_deg)
+        scale = rng.uniform(0.1, 0.6)
+        peak = rng.uniform(2000, 20000) * (cell_deg / 0.01) ** 2
+        row = np.exp(-((lats - clat) / scale) ** 2)[:, None]
+        col = np.exp(-((lngs - clng) / scale) ** 2)[None, :]
+        population += (peak * row * col).astype(np.float32)
+    population[population < 1] = 0  # 空白格
+    shares = np.array([0.45, 0.3, 0.15, 0.1], dtype=np.float32)
+    buildings = shares[:, None, None] * (population / 8.0)[None]
+    return ExposureGrid(20.0, 95.0, cell_deg, population, buildings, CLASSES,
+                        np.array([0.5, 2.0, 0.3, 5.0]), source="synthetic")
+
+
+def legacy_per_cell_ms(samples: int = 300) -> float:
+    """旧实现单格耗时：每格一次 _estimate_building_damage（标量烈度）"""
+    estimator = LossEstimator()
+    inventory = [{"type": c, "count": 100, "avg_value_million": 1.0} for c in CLASSES]
+    intensities = np.linspace(5, 10, samples)
+    start = time.perf_counter()
+    for intensity in intensities:
+        estimator._estimate_building_damage("earthquake", float(intensity), inventory)
+    return (time.perf_counter() - start) * 1000 / samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="栅格烈度/损失估算基准测试")
+    parser.add_argument("--size-deg", type=float, default=20.0, help="暴露栅格边长(度)")
+    parser.add_argument("--cell-deg", type=float, default=0.01, help="格子边长(度)")
+    parser.add_argument("--magnitude", type=float, default=7.5)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    exposure = make_exposure(args.size_deg, args.cell_deg, args.seed)
+    h, w = exposure.shape
+    occupied = int((exposure.population > 0).sum())
+    print(f"暴露栅格: {h}x{w}={h * w / 1e6:.1f}M 格, 有人口 {occupied / (h * w):.0%}, "
+          f"总人口 {exposure.population.sum() / 1e6:.1f}M, 生成 {time.perf_counter() - t0:.1f}s")
+
+    per_cell = legacy_per_cell_ms()
+    epicenter = (20 + args.size_deg / 2, 95 + args.size_deg / 2)
+    print(f"{'半径(km)':>9}{'格子数':>10}{'冷启动(s)':>11}{'缓存(ms)':>10}{'旧实现外推(s)':>14}"
+          f"{'死亡':>10}{'烈度>=VI面积(km²)':>18}")
+    for radius in (100, 300, 1000):
+        engine = IntensityGridEngine()
+        start = time.perf_counter()
+        result = engine.estimate(args.magnitude, 10, epicenter, radius_km=radius, exposure=exposure, event_id="bench")
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        engine.estimate(args.magnitude, 10, epicenter, radius_km=radius, exposure=exposure, event_id="bench")
+        cached = (time.perf_counter() - start) * 1000
+        cells = result.aggregates["cell_count"]
+        legacy = per_cell * result.aggregates["occupied_cells"] / 1000
+        print(f"{radius:>9}{cells:>10}{cold:>11.2f}{cached:>10.3f}{legacy:>14.1f}"
+              f"{result.aggregates['deaths']:>10}{result.aggregates['affected_area_km2']:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
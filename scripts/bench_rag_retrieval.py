@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+RAG 多子问题检索基准测试（Qdrant 内存模式 + 模拟 embedding 服务）
+
+--docs 条文档写入内存集合，智能体一次检索 --subquestions 个子问题，重复 --rounds 轮
+（子问题在轮次间有重叠，模拟多个智能体围绕同一灾情反复提问）：
+- legacy：旧 similarity_search，逐个子问题同步 embed_query + query_points，阻塞事件循环
+- batched：asimilarity_search_many，缓存未命中的子问题一次批量 embedding + 一次 query_batch_points
+- batched+bm25：在 batched 基础上与本地 BM25 排名融合
+
+embedding 服务每次请求耗时 --embed-ms（与批大小无关，模拟一次网络往返），
+同时用 1ms 心跳协程统计事件循环卡顿。
+
+用法:
+    python scripts/bench_rag_retrieval.py --docs 2000 --subquestions 8 --rounds 50 --embed-ms 40
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models  # noqa: E402
+
+from src.infra.rag.llama_index_client import LlamaIndexRag  # noqa: E402
+
+DIM = 128
+TOPICS = ["地震", "洪水", "滑坡", "危化品泄漏", "森林火灾", "台风", "泥石流", "堰塞湖"]
+ACTIONS = ["人员疏散", "医疗救护", "物资调拨", "交通管制", "通信保障", "安置点开设", "次生灾害监测", "信息发布"]
+
+
+def _vector(text: str) -> List[float]:
+    vec = [0.0] * DIM
+    for a, b in zip(text, text[1:] + " "):
+        vec[int(hashlib.md5((a + b).encode()).hexdigest()[:4], 16) % DIM] += 1.0
+    return vec
+
+
+class _SimulatedEmbeddings:
+    """本地哈希向量 + 每次请求固定往返耗时"""
+
+    def __init__(self, embed_ms: float) -> None:
+        self.delay = embed_ms / 1000
+        self.requests = 0
+
+    def embed_query(self, text: str) -> List[float]:
+        self.requests += 1
+        time.sleep(self.delay)
+        return _vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        return [_vector(t) for t in texts]
+
+
+def _legacy_similarity_search(embeddings, client, collection: str, top_k: int, query: str) -> List[Tuple[str, float, dict]]:
+    """旧实现（复制自 LlamaIndexRag.similarity_search）"""
+    vector = embeddings.embed_query(query)
+    res = client.query_points(collection_name=collection, query=vector, limit=top_k, with_payload=True)
+    points = res.points
+    if not points:
+        raise RuntimeError("向量检索为空，拒绝继续")
+    return [(dict(pt.payload or {}).get("text", ""), float(pt.score or 0.0), dict(pt.payload or {})) for pt in points]
+
+
+def _corpus(count: int) -> List[str]:
+    rng = random.Random(1)
+    return [
+        f"{rng.choice(TOPICS)}{rng.choice(ACTIONS)}规程第{i}条：依据YJ-{i:04d}号预案，"
+        f"{rng.choice(ACTIONS)}由{rng.choice(['消防', '医疗', '交通', '民政'])}部门负责"
+        for i in range(count)
+    ]
+
+
+def _rounds(args: argparse.Namespace) -> List[List[str]]:
+    rng = random.Random(2)
+    return [
+        [f"{rng.choice(TOPICS)}时如何{rng.choice(ACTIONS)}" for _ in range(args.subquestions)]
+        for _ in range(args.rounds)
+    ]
+
+
+def _points(docs: List[str]) -> List[models.PointStruct]:
+    return [models.PointStruct(id=i, vector=_vector(t), payload={"text": t}) for i, t in enumerate(docs)]
+
+
+async def _heartbeat(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(max(0.0, (time.perf_counter() - t0) * 1000 - 1.0))
+
+
+def _report(mode: str, latencies: List[float], lags: List[float], requests: int) -> None:
+    latencies.sort()
+    lags.sort()
+    print(
+        f"[{mode:>12}] 每轮 p50={statistics.median(latencies):.1f}ms p99={latencies[int(len(latencies) * 0.99)]:.1f}ms "
+        f"embedding请求={requests} 事件循环卡顿 max={lags[-1] if lags else 0.0:.1f}ms"
+    )
+
+
+async def bench(mode: str, args: argparse.Namespace, docs: List[str], rounds: List[List[str]]) -> None:
+    embeddings = _SimulatedEmbeddings(args.embed_ms)
+    settings = SimpleNamespace(
+        embedding_base_url="", embedding_model="bench", embedding_api_key="",
+        qdrant_url="", qdrant_api_key=None, qdrant_collection="bench", rag_top_k=args.top_k,
+    )
+    vectors = models.VectorParams(size=DIM, distance=models.Distance.COSINE)
+    if mode == "legacy":
+        client = QdrantClient(location=":memory:")
+        client.create_collection("bench", vectors_config=vectors)
+        client.upsert("bench", points=_points(docs))
+    else:
+        aclient = AsyncQdrantClient(location=":memory:")
+        await aclient.create_collection("bench", vectors_config=vectors)
+        await aclient.upsert("bench", points=_points(docs))
+        rag = LlamaIndexRag(settings, embeddings=embeddings, client=QdrantClient(location=":memory:"),
+                            aclient=aclient, lexical=(mode == "batched+bm25"))
+        if mode == "batched+bm25":
+            t0 = time.perf_counter()
+            await rag.build_lexical_index()
+            print(f"[{mode:>12}] BM25 索引构建 {len(docs)} 条 {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(0.01)
+    latencies: List[float] = []
+    for questions in rounds:
+        t0 = time.perf_counter()
+        if mode == "legacy":
+            for q in questions:
+                _legacy_similarity_search(embeddings, client, "bench", args.top_k, q)
+        else:
+            await rag.asimilarity_search_many(questions)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        await asyncio.sleep(0.002)
+    stop.set()
+    await beat
+    _report(mode, latencies, lags, embeddings.requests)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RAG 多子问题检索基准测试")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--subquestions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--embed-ms", type=float, default=40.0, help="模拟 embedding 服务单次请求耗时")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    docs = _corpus(args.docs)
+    rounds = _rounds(args)
+    for mode in ("legacy", "batched", "batched+bm25"):
+        asyncio.run(bench(mode, args, docs, rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+侦察设备分配基准测试
+
+随机生成数百个侦察目标与设备，对比：
+- greedy-legacy：旧实现，目标按分数逐个在空闲设备列表中挑选（复制自 score_targets 旧版）
+- greedy：矩阵化贪心（同一适配度规则）
+- optimal：匈牙利算法求总效用最大（含距离衰减）
+- optimal x3：每台设备单次出动最多侦察3个目标
+
+指标：覆盖目标数、加权覆盖（已覆盖目标分数和）、紧急/高优先目标覆盖数、平均出动距离、总效用、耗时。
+
+用法:
+    python scripts/bench_recon_assignment.py --targets 600 --devices 200 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.shared.device_assignment import (  # noqa: E402
+    AssignedPair,
+    greedy_assignment,
+    order_sorties,
+    solve_assignment,
+    utility_matrix,
+)
+from src.core.geodesy import distance_matrix_m  # noqa: E402
+
+# 与 score_targets 中推荐表一致的子集
+AREA_TYPE_DEVICE_PREFERENCE: Dict[str, List[str]] = {
+    "landslide": ["drone", "dog"],
+    "flooded": ["drone", "ship"],
+    "seismic_red": ["drone", "dog"],
+    "seismic_orange": ["drone"],
+    "blocked": ["drone", "dog"],
+    "poi_hospital": ["drone", "dog"],
+    "poi_school": ["drone", "dog"],
+    "poi_reservoir": ["drone", "ship"],
+    "poi_chemical_plant": ["drone", "robot"],
+    "staging_open_ground": ["drone"],
+}
+WATER_TYPES = {"flooded", "poi_reservoir"}
+DEVICE_ENV = {"drone": "air", "dog": "land", "ship": "sea"}
+FALLBACK_ORDER = ["drone", "dog", "ship", "robot", "ugv"]
+
+
+def _compatible(device_env: str, target_env: str) -> bool:
+    return device_env == "air" or device_env == target_env
+
+
+def legacy_greedy(targets: List[Dict[str, Any]], devices: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """旧实现：每个目标重建空闲设备列表，按推荐顺序→通用顺序→任意兼容逐级查找"""
+    used: set = set()
+    result = []
+    for ti, target in sorted(enumerate(targets), key=lambda x: -x[1]["score"]):
+        available = [d for d in devices if d["device_id"] not in used]
+        compatible = [d for d in available if _compatible(d["env_type"], target["env"])]
+        chosen = None
+        for device_type in AREA_TYPE_DEVICE_PREFERENCE.get(target["area_type"], ["drone"]) + FALLBACK_ORDER:
+            chosen = next((d for d in compatible if d["device_type"] == device_type), None)
+            if chosen:
+                break
+        if chosen is None and compatible:
+            chosen = compatible[0]
+        if chosen:
+            used.add(chosen["device_id"])
+            result.append((ti, chosen["index"]))
+    return result
+
+
+def _preference(targets, devices) -> np.ndarray:
+    """与 score_targets._assign_devices 相同：按 (目标类型, 设备类型) 组合去重后展开"""
+    t_keys = [(t["area_type"], t["env"]) for t in targets]
+    d_keys = [(d["device_type"], d["env_type"]) for d in devices]
+    t_profiles, d_profiles = sorted(set(t_keys)), sorted(set(d_keys))
+    table = np.full((len(t_profiles), len(d_profiles)), np.nan)
+    for i, (area_type, target_env) in enumerate(t_profiles):
+        preferred = AREA_TYPE_DEVICE_PREFERENCE.get(area_type, ["drone"])
+        for j, (device_type, device_env) in enumerate(d_profiles):
+            if not _compatible(device_env, target_env):
+                continue
+            if device_type in preferred:
+                table[i, j] = 1.0 - 0.15 * preferred.index(device_type)
+            else:
+                table[i, j] = 0.55 - 0.05 * FALLBACK_ORDER.index(device_type)
+    t_index = {k: i for i, k in enumerate(t_profiles)}
+    d_index = {k: j for j, k in enumerate(d_profiles)}
+    rows = np.array([t_index[k] for k in t_keys])
+    cols = np.array([d_index[k] for k in d_keys])
+    return table[np.ix_(rows, cols)]
+
+
+def make_scenario(n_targets: int, n_devices: int, seed: int):
+    rng = np.random.default_rng(seed)
+    area_types = list(AREA_TYPE_DEVICE_PREFERENCE)
+    targets = []
+    # 目标聚集在若干灾点附近，设备分散在各处
+    hubs = rng.uniform([103.5, 30.5], [104.5, 31.5], size=(6, 2))
+    for i in range(n_targets):
+        hub = hubs[rng.integers(len(hubs))]
+        area_type = area_types[rng.integers(len(area_types))]
+        score = float(rng.beta(2, 3))
+        targets.append({
+            "target_id": f"t{i}",
+            "area_type": area_type,
+            "env": "sea" if area_type in WATER_TYPES else "land",
+            "score": score,
+            "priority": "critical" if score > 0.7 else "high" if score > 0.5 else "medium",
+            "lonlat": hub + rng.normal(0, 0.05, 2),
+        })
+    types = rng.choice(["drone", "dog", "ship"], size=n_devices, p=[0.5, 0.35, 0.15])
+    devices = [{
+        "device_id": f"d{i}",
+        "index": i,
+        "device_type": str(t),
+        "env_type": DEVICE_ENV[str(t)],
+        "lonlat": rng.uniform([103.5, 30.5], [104.5, 31.5]),
+    } for i, t in enumerate(types)]
+    return targets, devices
+
+
+def timeit(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="侦察设备分配基准测试")
+    parser.add_argument("--targets", type=int, default=600, help="目标数")
+    parser.add_argument("--devices", type=int, default=200, help="设备数")
+    parser.add_argument("--distance-scale-km", type=float, default=50.0, help="距离衰减尺度(km)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    targets, devices = make_scenario(args.targets, args.devices, args.seed)
+    benefit = np.array([t["score"] for t in targets])
+    target_lonlat = np.array([t["lonlat"] for t in targets])
+    device_lonlat = np.array([d["lonlat"] for d in devices])
+    distance_km = distance_matrix_m(
+        target_lonlat[:, 0], target_lonlat[:, 1], device_lonlat[:, 0], device_lonlat[:, 1]
+    ) / 1000.0
+
+    def _optimal(k: int) -> List[AssignedPair]:
+        pref = _preference(targets, devices)
+        utility = utility_matrix(benefit, pref, distance_km, args.distance_scale_km)
+        return order_sorties(solve_assignment(utility, k), target_lonlat, device_lonlat)
+
+    cases = [
+        ("greedy-legacy", lambda: legacy_greedy(targets, devices)),
+        ("greedy", lambda: [(p.target_index, p.device_index)
+                                  for p in greedy_assignment(benefit, _preference(targets, devices))]),
+        ("optimal", lambda: [(p.target_index, p.device_index) for p in _optimal(1)]),
+        ("optimal x3", lambda: [(p.target_index, p.device_index) for p in _optimal(3)]),
+    ]
+    utility = utility_matrix(benefit, _preference(targets, devices), distance_km, args.distance_scale_km)
+    urgent = np.array([t["priority"] in ("critical", "high") for t in targets])
+
+    print(f"目标={len(targets)}（紧急/高 {int(urgent.sum())}），设备={len(devices)}")
+    print(f"{'模式':<16}{'覆盖':>6}{'加权覆盖':>10}{'紧急/高':>8}{'平均距离km':>12}{'总效用':>9}{'耗时(ms)':>10}")
+    for name, func in cases:
+        ms, pairs = timeit(func, args.repeat)
+        t_idx = np.array([p[0] for p in pairs], dtype=int)
+        d_idx = np.array([p[1] for p in pairs], dtype=int)
+        print(
+            f"{name:<16}{len(pairs):>6}{benefit[t_idx].sum():>10.2f}{int(urgent[t_idx].sum()):>8}"
+            f"{distance_km[t_idx, d_idx].mean():>12.1f}{np.nansum(utility[t_idx, d_idx]):>9.2f}{ms:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
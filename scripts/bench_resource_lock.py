@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+队伍资源锁争用基准测试（fakeredis 作为本地 Redis 替身，需安装 fakeredis + lupa）
+
+每条命令/管道/脚本调用前注入一次往返延迟 (--rtt-ms)，多个事件并发争抢随机的队伍子集：
+- legacy：旧实现，逐个 GET 检查 → 管道 SET NX → 失败时回滚管道；释放为无条件 DEL 管道
+- lua：ResourceLock，Lua 脚本一次往返原子加锁；释放为一次脚本调用
+
+统计成功加锁吞吐、加锁延迟分位数、每次加锁尝试的往返次数，并检查是否出现同一队伍被两个事件同时持有。
+
+用法:
+    python scripts/bench_resource_lock.py --events 50 --teams 200 --per-lock 8 --rtt-ms 1 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis  # noqa: E402
+
+from src.agents.exceptions import AIResourceLockedError  # noqa: E402
+from src.agents.utils import resource_lock  # noqa: E402
+from src.agents.utils.resource_lock import LOCK_KEY_PREFIX, ResourceLock  # noqa: E402
+
+
+class LatencyRedis(fakeredis.FakeAsyncRedis):
+    """每次往返（单条命令或一次管道执行）前 sleep rtt 秒"""
+
+    rtt = 0.001
+    round_trips = 0
+
+    async def execute_command(self, *args, **kwargs):
+        LatencyRedis.round_trips += 1
+        await asyncio.sleep(self.rtt)
+        return await super().execute_command(*args, **kwargs)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        async def _execute(raise_on_error=True):
+            LatencyRedis.round_trips += 1
+            await asyncio.sleep(self.rtt)
+            return await execute(raise_on_error)
+
+        pipe.execute = _execute
+        return pipe
+
+
+class LegacyLock:
+    """旧实现（原样复制自 ResourceLock._acquire_redis_locks / _rollback_redis_locks / _release_redis_locks）"""
+
+    def __init__(self, client, event_id: str, ttl: int = 300) -> None:
+        self.client = client
+        self._event_id = event_id
+        self._ttl = ttl
+        self._locked_teams = set()
+
+    async def acquire_team_locks(self, team_ids: List[str]) -> bool:
+        client = self.client
+        lock_value = f"{self._event_id}:{time.time()}"
+        locked_by_others = []
+        for team_id in team_ids:
+            existing = await client.get(f"{LOCK_KEY_PREFIX}{team_id}")
+            if existing and not existing.startswith(self._event_id):
+                locked_by_others.append(team_id)
+        if locked_by_others:
+            raise AIResourceLockedError(locked_resources=locked_by_others, retry_after_seconds=30)
+        pipe = client.pipeline()
+        for team_id in team_ids:
+            pipe.set(f"{LOCK_KEY_PREFIX}{team_id}", lock_value, nx=True, ex=self._ttl)
+        results = await pipe.execute()
+        failed_indices = [i for i, r in enumerate(results) if not r]
+        if failed_indices:
+            rollback = [team_ids[i] for i in range(len(team_ids)) if i not in failed_indices]
+            if rollback:
+                pipe = client.pipeline()
+                for team_id in rollback:
+                    pipe.delete(f"{LOCK_KEY_PREFIX}{team_id}")
+                await pipe.execute()
+            raise AIResourceLockedError(locked_resources=[team_ids[i] for i in failed_indices])
+        self._locked_teams = set(team_ids)
+        return True
+
+    async def release_locks(self) -> None:
+        if not self._locked_teams:
+            return
+        pipe = self.client.pipeline()
+        for team_id in self._locked_teams:
+            pipe.delete(f"{LOCK_KEY_PREFIX}{team_id}")
+        await pipe.execute()
+        self._locked_teams.clear()
+
+
+async def run_mode(mode: str, args) -> Dict[str, float]:
+    client = LatencyRedis(decode_responses=True)
+    LatencyRedis.rtt = args.rtt_ms / 1000
+    LatencyRedis.round_trips = 0
+
+    async def _client():
+        return client
+
+    async def _available():
+        return True
+
+    resource_lock.get_redis_client = _client
+    resource_lock.redis_available = _available
+
+    teams = [f"team-{i}" for i in range(args.teams)]
+    holders: Dict[str, str] = {}
+    stats = {"ok": 0, "conflict": 0, "attempts": 0, "violations": 0}
+    latencies: List[float] = []
+    deadline = time.perf_counter() + args.seconds
+    rng = random.Random(args.seed)
+
+    async def worker(k: int) -> None:
+        event_id = f"evt-{k}"
+        while time.perf_counter() < deadline:
+            wanted = rng.sample(teams, args.per_lock)
+            lock = LegacyLock(client, event_id) if mode == "legacy" else ResourceLock(event_id)
+            start = time.perf_counter()
+            stats["attempts"] += 1
+            try:
+                await lock.acquire_team_locks(wanted)
+            except AIResourceLockedError:
+                stats["conflict"] += 1
+                await asyncio.sleep(rng.uniform(0, args.hold_ms / 1000))
+                continue
+            latencies.append(time.perf_counter() - start)
+            stats["ok"] += 1
+            for t in wanted:
+                if holders.get(t):
+                    stats["violations"] += 1
+                holders[t] = event_id
+            await asyncio.sleep(args.hold_ms / 1000)
+            for t in wanted:
+                if holders.get(t) == event_id:
+                    holders[t] = ""
+            await lock.release_locks()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(k) for k in range(args.events)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "throughput": stats["ok"] / elapsed,
+        "success_rate": stats["ok"] / max(stats["attempts"], 1),
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        "rtt_per_attempt": LatencyRedis.round_trips / max(stats["attempts"], 1),
+        "violations": stats["violations"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="队伍资源锁争用基准测试")
+    parser.add_argument("--events", type=int, default=50, help="并发事件数")
+    parser.add_argument("--teams", type=int, default=200, help="队伍总数")
+    parser.add_argument("--per-lock", type=int, default=8, help="每次锁定的队伍数")
+    parser.add_argument("--hold-ms", type=float, default=20, help="持锁时长(毫秒)")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="模拟的 Redis 往返延迟(毫秒)")
+    parser.add_argument("--seconds", type=float, default=5, help="每种模式运行时长")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'模式':<8}{'成功/s':>10}{'成功率':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'往返/次':>9}{'重复持有':>9}")
+    for mode in ("legacy", "lua"):
+        r = asyncio.run(run_mode(mode, args))
+        print(f"{mode:<8}{r['throughput']:>10.1f}{r['success_rate']:>8.0%}{r['p50_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['rtt_per_attempt']:>9.1f}{r['violations']:>9}")
+
+
+if __name__ == "__main__":
+    main()
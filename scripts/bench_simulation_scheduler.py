@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+仿真注入调度基准测试（内存注入器，不访问数据库）
+
+1. 注入时间精度：--simulations 个仿真以 --time-scale 倍速运行 --seconds 秒（真实时间），
+   各仿真起点随机错开，预设注入分布在运行期内，统计注入时刻相对计划的延迟（仿真秒）
+   - legacy：旧 SimulationService._injection_loop，每个仿真一个任务，每5秒扫描整个注入列表
+   - heap：SimulationScheduler，单协程最小堆，按时钟倍率精确睡到下一次注入
+2. 快进回放：--replay-injections 个注入的想定用 fast_forward 一次回放完的耗时
+
+用法:
+    python scripts/bench_simulation_scheduler.py --simulations 50 --time-scale 10 --seconds 15
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domains.simulation.clock import SimulationClock  # noqa: E402
+from src.domains.simulation.scheduler import SimulationScheduler  # noqa: E402
+from src.domains.simulation.schemas import EventTemplate, ScheduledInjection  # noqa: E402
+
+START = datetime(2025, 11, 27, 8, 0)
+
+
+def _plan(rng: random.Random, offset_s: float, horizon_s: float, count: int) -> List[ScheduledInjection]:
+    """运行期内到期的注入（relative_time_min 为整数分钟）"""
+    first = int(offset_s // 60) + 1
+    last = max(first, int((offset_s + horizon_s) // 60))
+    return [
+        ScheduledInjection(
+            id=str(uuid4()),
+            relative_time_min=rng.randint(first, last),
+            event_template=EventTemplate(title=f"inject-{i}", event_type="landslide"),
+        )
+        for i in range(count)
+    ]
+
+
+async def _legacy_injection_loop(clock: SimulationClock, scheduled: List[ScheduledInjection], lags: List[float]) -> None:
+    """旧实现（复制自 SimulationService._injection_loop，事件创建替换为记录延迟）"""
+    try:
+        while True:
+            await asyncio.sleep(5)  # 每5秒检查一次
+            if not clock or clock.is_paused:
+                continue
+            elapsed_min = clock.elapsed_simulation_seconds / 60
+            for injection in scheduled:
+                if injection.injected:
+                    continue
+                if elapsed_min >= injection.relative_time_min:
+                    lags.append(clock.elapsed_simulation_seconds - injection.relative_time_min * 60)
+                    injection.injected = True
+    except asyncio.CancelledError:
+        pass
+
+
+async def bench_timing(mode: str, args: argparse.Namespace) -> None:
+    rng = random.Random(11)
+    horizon_s = args.seconds * args.time_scale
+    lags: List[float] = []
+    clocks: Dict = {}
+
+    async def injector(simulation_id, scenario_id, template):
+        lags.append(clocks[simulation_id].elapsed_simulation_seconds - due[template.title])
+        return uuid4()
+
+    scheduler = SimulationScheduler(injector=injector)
+    tasks = []
+    due: Dict[str, float] = {}
+    total = 0
+    for _ in range(args.simulations):
+        sim_id = uuid4()
+        clock = SimulationClock(START, time_scale=Decimal(str(args.time_scale)))
+        offset = rng.uniform(0, 60)
+        plan = _plan(rng, offset, horizon_s - args.time_scale * 5, args.injections)
+        plan = [p.model_copy(update={"event_template": p.event_template.model_copy(
+            update={"title": f"{sim_id}-{p.id}"})}) for p in plan]
+        due.update({p.event_template.title: p.relative_time_min * 60.0 for p in plan})
+        total += len(plan)
+        clocks[sim_id] = clock
+        clock.start()
+        clock.advance(offset)
+        if mode == "legacy":
+            tasks.append(asyncio.create_task(_legacy_injection_loop(clock, plan, lags)))
+        else:
+            scheduler.load(sim_id, uuid4(), clock, plan)
+            scheduler.start_clock(sim_id)
+
+    await asyncio.sleep(args.seconds)
+    for task in tasks:
+        task.cancel()
+    await scheduler.stop()
+    lags.sort()
+    print(
+        f"[精度/{mode:>6}] 仿真={args.simulations} 倍率={args.time_scale}x 注入={len(lags)}/{total} "
+        f"延迟(仿真秒) p50={statistics.median(lags):.2f} p95={lags[int(len(lags) * 0.95)]:.2f} max={lags[-1]:.2f}"
+    )
+
+
+async def bench_replay(count: int) -> None:
+    rng = random.Random(3)
+    fired = 0
+
+    async def injector(simulation_id, scenario_id, template):
+        nonlocal fired
+        fired += 1
+        return uuid4()
+
+    scheduler = SimulationScheduler(injector=injector)
+    sim_id = uuid4()
+    plan = [
+        ScheduledInjection(
+            id=str(uuid4()), relative_time_min=rng.randint(0, 72 * 60),
+            event_template=EventTemplate(title=f"inject-{i}", event_type="fire"),
+        )
+        for i in range(count)
+    ]
+    clock = SimulationClock(START)
+    scheduler.load(sim_id, uuid4(), clock, plan)
+    t0 = time.perf_counter()
+    await scheduler.fast_forward(sim_id)
+    elapsed = time.perf_counter() - t0
+    await scheduler.stop()
+    print(
+        f"[快进回放] 注入={fired}/{count} 仿真跨度={clock.elapsed_simulation_seconds / 3600:.1f}h "
+        f"耗时={elapsed * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="仿真注入调度基准测试")
+    parser.add_argument("--simulations", type=int, default=50)
+    parser.add_argument("--injections", type=int, default=5, help="每个仿真的预设注入数")
+    parser.add_argument("--time-scale", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=15.0, help="每种模式运行的真实秒数")
+    parser.add_argument("--replay-injections", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    asyncio.run(bench_timing("legacy", args))
+    asyncio.run(bench_timing("heap", args))
+    asyncio.run(bench_replay(args.replay_injections))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+前端实时通道各传输吞吐基准测试
+
+进程内启动 uvicorn 挂载 frontend_ws_router，每种传输各建立 --clients 个客户端订阅同一主题，
+发布端通过 frontend_ws_manager.broadcast_to_topic 连续发布 --messages 条消息（每 --burst 条让出一次事件循环），
+统计全部客户端收齐消息的耗时与投递吞吐（消息数/秒）：
+- websocket：原生 WebSocket（参照基线）
+- xhr_streaming / eventsource：流式响应，队列事件唤醒后整批写出
+- xhr：长轮询，每次请求取走全部积压并合并为一个 a[...]
+
+旧实现的 HTTP 端点只返回 o/h，不投递任何消息，因此 HTTP 传输没有可比的旧数据。
+服务端与客户端共用一个事件循环，绝对值偏低，主要看各传输之间的相对差距。
+
+用法:
+    python scripts/bench_sockjs.py --clients 20 --messages 2000 --burst 50
+    python scripts/bench_sockjs.py --transports xhr,xhr_streaming --payload-bytes 1024
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from typing import AsyncIterator, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from src.domains.frontend_api.websocket.router import (  # noqa: E402
+    frontend_ws_manager,
+    router,
+    sockjs_manager,
+)
+
+TOPIC = "/topic/bench"
+CONNECT = "CONNECT\naccept-version:1.2\nheart-beat:0,0\n\n\x00"
+SUBSCRIBE = f"SUBSCRIBE\nid:sub-0\ndestination:{TOPIC}\nreceipt:ready\n\n\x00"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _count(frame: str) -> tuple[int, bool]:
+    """SockJS 帧 → (MESSAGE 数, 是否含订阅回执)"""
+    if not frame.startswith("a"):
+        return 0, False
+    stomp_frames = json.loads(frame[1:])
+    messages = sum(1 for f in stomp_frames if f.startswith("MESSAGE"))
+    return messages, any(f.startswith("RECEIPT") for f in stomp_frames)
+
+
+async def _http_frames(client: httpx.AsyncClient, base: str, transport: str) -> AsyncIterator[str]:
+    """按传输类型产出服务端 SockJS 帧，流式响应达到字节上限结束后自动重连"""
+    while True:
+        if transport == "xhr":
+            resp = await client.post(f"{base}/xhr")
+            yield resp.text.strip()
+            continue
+        method, suffix = ("POST", "xhr_streaming") if transport == "xhr_streaming" else ("GET", "eventsource")
+        async with client.stream(method, f"{base}/{suffix}") as resp:
+            async for line in resp.aiter_lines():
+                if transport == "eventsource":
+                    if not line.startswith("data: "):
+                        continue
+                    line = line[len("data: "):]
+                if not line or line.startswith("hh"):
+                    continue
+                yield line
+
+
+async def _http_client(
+    client: httpx.AsyncClient, url: str, transport: str, idx: int,
+    ready: asyncio.Event, expected: int, received: Dict[str, float],
+) -> None:
+    base = f"{url}/ws/real-time/000/{transport}-{idx}"
+    got = 0
+    async with contextlib.aclosing(_http_frames(client, base, transport)) as frames:
+        async for frame in frames:
+            if frame == "o":
+                await client.post(f"{base}/xhr_send", content=json.dumps([CONNECT, SUBSCRIBE]))
+            elif frame.startswith("c"):
+                print(f"  [{transport}-{idx}] 会话被关闭: {frame}")
+                break
+            count, receipt = _count(frame)
+            if receipt:
+                ready.set()
+            got += count
+            if got >= expected:
+                received[f"{transport}-{idx}"] = time.perf_counter()
+                break
+
+
+async def _ws_client(url: str, idx: int, ready: asyncio.Event, expected: int, received: Dict[str, float]) -> None:
+    ws_url = url.replace("http://", "ws://") + f"/ws/real-time/000/ws-{idx}/websocket"
+    got = 0
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        assert await ws.recv() == "o"
+        await ws.send(json.dumps([CONNECT, SUBSCRIBE]))
+        while got < expected:
+            count, receipt = _count(await ws.recv())
+            if receipt:
+                ready.set()
+            got += count
+        received[f"ws-{idx}"] = time.perf_counter()
+
+
+async def run_transport(url: str, transport: str, args: argparse.Namespace) -> None:
+    readies = [asyncio.Event() for _ in range(args.clients)]
+    received: Dict[str, float] = {}
+    limits = httpx.Limits(max_connections=args.clients * 2 + 10)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        if transport == "websocket":
+            tasks = [
+                asyncio.create_task(_ws_client(url, i, readies[i], args.messages, received))
+                for i in range(args.clients)
+            ]
+        else:
+            tasks = [
+                asyncio.create_task(_http_client(client, url, transport, i, readies[i], args.messages, received))
+                for i in range(args.clients)
+            ]
+        await asyncio.wait_for(asyncio.gather(*(r.wait() for r in readies)), 30)
+
+        payload = {"payload": {"data": "x" * args.payload_bytes}}
+        t0 = time.perf_counter()
+        for seq in range(args.messages):
+            payload["payload"]["seq"] = seq
+            await frontend_ws_manager.broadcast_to_topic(TOPIC, payload)
+            if (seq + 1) % args.burst == 0:
+                await asyncio.sleep(0)
+        publish_sec = time.perf_counter() - t0
+        _, pending = await asyncio.wait(tasks, timeout=args.timeout)
+        for task in pending:
+            task.cancel()
+
+    finished = sorted(received.values())
+    delivered = len(finished) * args.messages
+    elapsed = (finished[-1] - t0) if finished else float("nan")
+    print(
+        f"[{transport:>13}] 客户端={args.clients} 收齐={len(finished)} 消息/客户端={args.messages} "
+        f"发布耗时={publish_sec * 1000:.0f}ms 全部收齐={elapsed * 1000:.0f}ms "
+        f"吞吐={delivered / elapsed:,.0f} msg/s"
+    )
+    await sockjs_manager.close_all()
+    for client_id in list(frontend_ws_manager.connections):
+        frontend_ws_manager.disconnect(client_id)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    app = FastAPI()
+    app.include_router(router, prefix="/ws")
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error", ws="auto"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    sockjs_manager.queue_limit = args.queue_limit
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for transport in args.transports.split(","):
+            await run_transport(url, transport.strip(), args)
+    finally:
+        server.should_exit = True
+        await serve_task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="前端实时通道各传输吞吐基准测试")
+    parser.add_argument("--transports", default="websocket,xhr_streaming,eventsource,xhr")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--burst", type=int, default=50, help="每发布多少条让出一次事件循环")
+    parser.add_argument("--payload-bytes", type=int, default=200)
+    parser.add_argument("--queue-limit", type=int, default=5000, help="SockJS 会话出站队列上限")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+语音意图分类各阶段延迟基准测试
+
+embedding 服务用本地哈希向量 + time.sleep(--remote-ms) 模拟（同步阻塞，与 OpenAIEncoder 行为一致），
+--sessions 个并发会话从带重复的话术集中按 Zipf 分布取 --queries 条文本分类，统计各阶段 p50/p99：
+
+1. keyword：旧实现（嵌套子串循环） vs Aho-Corasick 自动机；另以 --extra-keywords 个合成关键词
+   观察规则数增长时两者的差距（嵌套循环随关键词数线性增长，自动机只与文本长度相关）
+2. semantic：
+   - legacy：旧 _semantic_classify，在协程内同步调用 encoder，整段远程耗时阻塞事件循环
+   - local：VoiceSemanticRouter，查询向量 LRU + 线程池编码 + 本地最近邻
+   同时用 1ms 心跳协程统计事件循环卡顿（心跳实际间隔 - 1ms）
+3. startup：路由样本句首次编码 vs 从磁盘加载
+
+用法:
+    python scripts/bench_voice_intent.py --sessions 20 --queries 2000 --remote-ms 30
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.voice_commander.intent_index import KeywordAutomaton, UtteranceIndex  # noqa: E402
+from src.agents.voice_commander.semantic_router import (  # noqa: E402
+    KEYWORD_RULES,
+    VoiceSemanticRouter,
+    _create_default_routes,
+    keyword_classify,
+)
+
+QUERIES = [
+    "消防大队在哪里", "离震中最近的救援队是哪支", "任务进度怎么样", "二号队在执行什么任务",
+    "派无人机去东门侦察", "还有哪些队伍可用", "你好", "A区域现在什么情况", "救了多少人",
+    "让机器狗前往B区", "医疗队忙不忙", "收到", "从指挥部到受灾点多远", "资源情况",
+    "茂县那边现在怎么样了", "东门方向有没有人员被困", "无人机电量还够吗", "帮我看一下伤员分布",
+]
+
+
+def _legacy_keyword_classify(text: str) -> Optional[str]:
+    """旧实现（复制自 semantic_router.keyword_classify）"""
+    if "执行什么任务" in text:
+        if "队" in text:
+            return "resource_status"
+        else:
+            return "task_status"
+    for route, keywords in KEYWORD_RULES.items():
+        for kw in keywords:
+            if kw in text:
+                return route
+    return None
+
+
+class _SimulatedEncoder:
+    """字符二元组哈希向量 + 同步睡眠模拟远程 embedding 调用"""
+    name = "bench-hash-256"
+    score_threshold = 0.5
+
+    def __init__(self, remote_ms: float) -> None:
+        self.remote_s = remote_ms / 1000
+        self.calls = 0
+
+    def __call__(self, docs: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.remote_s)
+        out = []
+        for doc in docs:
+            vec = np.zeros(256, dtype=np.float32)
+            for a, b in zip(doc, doc[1:] + " "):
+                vec[int(hashlib.md5((a + b).encode()).hexdigest()[:4], 16) % 256] += 1.0
+            out.append(vec.tolist())
+        return out
+
+
+def _pct(values: List[float]) -> str:
+    values = sorted(values)
+    return f"p50={statistics.median(values):.3f}ms p99={values[int(len(values) * 0.99)]:.3f}ms"
+
+
+def _workload(count: int) -> List[str]:
+    rng = random.Random(5)
+    weights = [1 / (i + 1) for i in range(len(QUERIES))]
+    return rng.choices(QUERIES, weights=weights, k=count)
+
+
+def bench_keyword(texts: List[str], extra_keywords: int) -> None:
+    for name, fn in (("legacy", _legacy_keyword_classify), ("automaton", keyword_classify)):
+        samples = []
+        for text in texts:
+            t0 = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"[keyword/{name:>9}] 规则={sum(len(v) for v in KEYWORD_RULES.values())} {_pct(samples)}")
+
+    rng = random.Random(9)
+    alphabet = "".join(sorted(set("".join(QUERIES))))
+    rules = {f"route_{i}": ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 5))) for _ in range(10)]
+             for i in range(max(1, extra_keywords // 10))}
+    automaton = KeywordAutomaton([kw for kws in rules.values() for kw in kws])
+
+    def nested(text: str) -> Optional[str]:
+        for route, keywords in rules.items():
+            for kw in keywords:
+                if kw in text:
+                    return route
+        return None
+
+    def single_pass(text: str) -> Optional[str]:
+        found = automaton.find(text)
+        return next((r for r, kws in rules.items() if not found.isdisjoint(kws)), None) if found else None
+
+    for name, fn in (("legacy", nested), ("automaton", single_pass)):
+        samples = []
+        for text in texts:
+            t0 = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"[keyword/{name:>9}] 规则={extra_keywords} {_pct(samples)}")
+
+
+async def _heartbeat(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(max(0.0, (time.perf_counter() - t0) * 1000 - 1.0))
+
+
+async def bench_semantic(mode: str, args: argparse.Namespace, path: str) -> None:
+    encoder = _SimulatedEncoder(args.remote_ms)
+    router = VoiceSemanticRouter(encoder=encoder, embeddings_path=path)
+    await router._ensure_initialized()
+    index: UtteranceIndex = router._index
+    thresholds = router._thresholds
+    encoder.calls = 0
+
+    embed_ms: List[float] = []
+    search_ms: List[float] = []
+    total_ms: List[float] = []
+
+    async def legacy_classify(text: str) -> None:
+        # 旧实现：协程内同步调用远程 encoder（SemanticRouter.__call__），无缓存
+        t0 = time.perf_counter()
+        vector = encoder([text])[0]
+        t1 = time.perf_counter()
+        index.classify(vector, thresholds)
+        t2 = time.perf_counter()
+        embed_ms.append((t1 - t0) * 1000)
+        search_ms.append((t2 - t1) * 1000)
+        total_ms.append((t2 - t0) * 1000)
+
+    async def local_classify(text: str) -> None:
+        t0 = time.perf_counter()
+        vector = await router._embed_query(text)
+        t1 = time.perf_counter()
+        index.classify(vector, thresholds)
+        t2 = time.perf_counter()
+        embed_ms.append((t1 - t0) * 1000)
+        search_ms.append((t2 - t1) * 1000)
+        total_ms.append((t2 - t0) * 1000)
+
+    classify = legacy_classify if mode == "legacy" else local_classify
+    texts = _workload(args.queries)
+    per_session = [texts[i::args.sessions] for i in range(args.sessions)]
+
+    async def session(items: List[str]) -> None:
+        for text in items:
+            await classify(text)
+            await asyncio.sleep(0)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(session(items) for items in per_session))
+    wall = time.perf_counter() - t0
+    stop.set()
+    await beat
+
+    print(
+        f"[semantic/{mode:>6}] 会话={args.sessions} 查询={len(texts)} 远程调用={encoder.calls} 总耗时={wall:.2f}s\n"
+        f"    embed  {_pct(embed_ms)}\n"
+        f"    search {_pct(search_ms)}\n"
+        f"    total  {_pct(total_ms)}\n"
+        f"    事件循环卡顿 {_pct(lags or [0.0])} max={max(lags or [0.0]):.1f}ms"
+    )
+
+
+async def bench_startup(args: argparse.Namespace, path: str) -> None:
+    stats: Dict[str, float] = {}
+    for label in ("首次编码", "磁盘加载"):
+        router = VoiceSemanticRouter(encoder=_SimulatedEncoder(args.remote_ms), embeddings_path=path)
+        t0 = time.perf_counter()
+        await router._ensure_initialized()
+        stats[label] = (time.perf_counter() - t0) * 1000
+    utterances = sum(len(r.utterances) for r in _create_default_routes())
+    print(f"[startup] 样本句={utterances} " + " ".join(f"{k}={v:.1f}ms" for k, v in stats.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="语音意图分类各阶段延迟基准测试")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--extra-keywords", type=int, default=1000, help="规则扩展场景的合成关键词数")
+    parser.add_argument("--remote-ms", type=float, default=30.0, help="模拟 embedding 服务单次调用耗时")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    bench_keyword(_workload(args.queries * 10), args.extra_keywords)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "voice_route_embeddings.npz")
+        asyncio.run(bench_startup(args, path))
+        asyncio.run(bench_semantic("legacy", args, path))
+        asyncio.run(bench_semantic("local", args, path))
+
+
+if __name__ == "__main__":
+    main()
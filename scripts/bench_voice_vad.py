@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+语音WebSocket音频路径基准测试
+
+对比旧实现（struct逐样本解包 + 无界bytearray + base64 JSON返回TTS）
+与新实现（NumPy帧视图VAD + PCMRingBuffer + 二进制TTS帧）：
+- 每会话每秒音频的CPU耗时
+- 单帧VAD处理延迟 p50/p99
+- TTS音频下行字节数
+
+用法:
+    python scripts/bench_voice_vad.py --sessions 50 --seconds 10
+"""
+import argparse
+import base64
+import json
+import os
+import struct
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domains.voice.audio import PCMRingBuffer, frame_energies  # noqa: E402
+from src.domains.voice.router import (  # noqa: E402
+    MAX_UTTERANCE_BYTES,
+    VAD_ENERGY_THRESHOLD,
+    VAD_FRAME_BYTES,
+    VAD_SAMPLE_RATE,
+)
+
+
+def legacy_energy(audio_data: bytes) -> float:
+    """旧实现：struct解包 + Python生成器求平方和"""
+    if len(audio_data) < 2:
+        return 0.0
+    num_samples = len(audio_data) // 2
+    samples = struct.unpack(f'<{num_samples}h', audio_data)
+    sum_sq = sum(s * s for s in samples)
+    return (sum_sq / num_samples) ** 0.5
+
+
+def make_frames(seconds: float, seed: int) -> List[bytes]:
+    """生成一段语音/静默交替的合成PCM帧"""
+    rng = np.random.default_rng(seed)
+    num_frames = int(seconds * 1000 / 20)
+    frame_samples = VAD_FRAME_BYTES // 2
+    frames = []
+    for i in range(num_frames):
+        amplitude = 3000 if (i // 50) % 2 == 0 else 50
+        samples = rng.normal(0, amplitude, frame_samples).clip(-32768, 32767).astype("<i2")
+        frames.append(samples.tobytes())
+    return frames
+
+
+def run_legacy_session(frames: List[bytes], latencies: List[float]) -> int:
+    buffer = bytearray()
+    speech = 0
+    for frame in frames:
+        started = time.perf_counter()
+        buffer.extend(frame)
+        if legacy_energy(frame) > VAD_ENERGY_THRESHOLD:
+            speech += 1
+        latencies.append(time.perf_counter() - started)
+    bytes(buffer)
+    return speech
+
+
+def run_new_session(frames: List[bytes], latencies: List[float]) -> int:
+    buffer = PCMRingBuffer(MAX_UTTERANCE_BYTES)
+    speech = 0
+    for frame in frames:
+        started = time.perf_counter()
+        buffer.extend(frame)
+        energies = frame_energies(frame, VAD_FRAME_BYTES)
+        speech += int((energies > VAD_ENERGY_THRESHOLD).sum())
+        latencies.append(time.perf_counter() - started)
+    buffer.getvalue()
+    return speech
+
+
+def bench(name: str, runner: Callable[[List[bytes], List[float]], int],
+          sessions: List[List[bytes]], seconds: float) -> int:
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    speech_total = 0
+    for frames in sessions:
+        speech_total += runner(frames, latencies)
+    cpu = time.process_time() - cpu_start
+
+    ordered = sorted(latencies)
+    p50 = ordered[int(0.50 * (len(ordered) - 1))] * 1e6
+    p99 = ordered[int(0.99 * (len(ordered) - 1))] * 1e6
+    per_session_ms = cpu / len(sessions) / seconds * 1000
+    print(
+        f"{name:<8} CPU {cpu * 1000:8.1f} ms 总计 | 每会话每秒音频 {per_session_ms:6.3f} ms "
+        f"| 单帧 p50 {p50:6.1f} us p99 {p99:6.1f} us | 语音帧 {speech_total}"
+    )
+    return speech_total
+
+
+def bench_tts_payload(audio_seconds: float) -> None:
+    # 16kHz 16-bit 单声道 wav，头部44字节
+    audio = os.urandom(44 + int(audio_seconds * VAD_SAMPLE_RATE * 2))
+    legacy = json.dumps({
+        "type": "tts",
+        "audio": base64.b64encode(audio).decode("utf-8"),
+        "audio_format": "wav",
+        "tts_latency_ms": 0,
+    })
+    header = json.dumps({
+        "type": "tts", "binary": True, "size": len(audio), "audio_format": "wav", "tts_latency_ms": 0,
+    })
+    binary_total = len(header) + len(audio)
+    print(
+        f"TTS {audio_seconds:.0f}s音频下行: base64 JSON {len(legacy):,} B | "
+        f"二进制帧 {binary_total:,} B ({binary_total / len(legacy):.0%})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="语音WebSocket音频路径基准测试")
+    parser.add_argument("--sessions", type=int, default=50, help="并发会话数")
+    parser.add_argument("--seconds", type=float, default=10.0, help="每会话音频秒数")
+    args = parser.parse_args()
+
+    sessions = [make_frames(args.seconds, seed) for seed in range(args.sessions)]
+    print(f"会话数 {args.sessions}，每会话 {args.seconds:.0f}s 音频（20ms/帧）")
+
+    legacy_speech = bench("旧实现", run_legacy_session, sessions, args.seconds)
+    new_speech = bench("新实现", run_new_session, sessions, args.seconds)
+    assert legacy_speech == new_speech, "两种实现的VAD判定不一致"
+
+    bench_tts_payload(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+-- 仿真注入调度器状态持久化
+-- 用途：预设注入与仿真时钟写入数据库，服务重启后恢复运行中的仿真
+
+-- 时钟写回时刻（current_simulation_time 对应的真实时间）
+ALTER TABLE operational_v2.simulation_scenarios_v2
+ADD COLUMN IF NOT EXISTS clock_checkpoint_at TIMESTAMPTZ;
+
+-- 预设注入事件
+CREATE TABLE IF NOT EXISTS operational_v2.injected_events_v2 (
+    id UUID PRIMARY KEY,
+    simulation_id UUID NOT NULL REFERENCES operational_v2.simulation_scenarios_v2(id) ON DELETE CASCADE,
+    event_type VARCHAR(50) NOT NULL,
+    event_data JSONB DEFAULT '{}'::jsonb,
+    inject_time TIMESTAMPTZ,
+    status VARCHAR(20) DEFAULT 'pending',
+    injected_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_injected_events_simulation ON operational_v2.injected_events_v2(simulation_id, status);
+
+COMMENT ON COLUMN operational_v2.simulation_scenarios_v2.clock_checkpoint_at IS '时钟写回时刻，重启后据此推算运行中仿真的当前仿真时间';
+COMMENT ON COLUMN operational_v2.injected_events_v2.inject_time IS '计划注入的仿真时间';
+COMMENT ON COLUMN operational_v2.injected_events_v2.event_data IS '{relative_time_min, seq, event_template, injected_event_id}';
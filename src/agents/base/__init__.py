@@ -6,5 +6,12 @@ Agent基础模块
 
 from .agent import BaseAgent
 from .state import BaseState
+from .checkpoint import PrunedMemorySaver, RedisCheckpointSaver, create_checkpointer
 
-__all__ = ["BaseAgent", "BaseState"]
+__all__ = [
+    "BaseAgent",
+    "BaseState",
+    "PrunedMemorySaver",
+    "RedisCheckpointSaver",
+    "create_checkpointer",
+]
@@ -0,0 +1,555 @@
+"""
+LangGraph检查点存储
+
+替代各Agent直接使用的 MemorySaver/InMemorySaver：
+- PrunedMemorySaver: 内存实现，每个线程只保留最近N个检查点，空闲线程按TTL回收
+- RedisCheckpointSaver: Redis实现，进程重启后可恢复human-review中断
+
+Redis存储布局（按Agent命名空间隔离，均设置TTL）：
+    {prefix}:{thread}:{ns}:idx              ZSET  检查点ID（同分值，按字典序即时间序）
+    {prefix}:{thread}:{ns}:c:{checkpoint}   HASH  checkpoint/metadata/parent（zlib压缩）
+    {prefix}:{thread}:{ns}:w:{checkpoint}   HASH  pending writes
+    {prefix}:{thread}:{ns}:b:{channel}:{v}  STRING 通道值blob
+
+每次put只写入本次变更的通道（new_versions），未变更的大对象（候选方案、
+解集等）不重复存储；恢复时只读取最新检查点及其引用的blob，不反序列化历史。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_LAST = 10
+DEFAULT_CHECKPOINT_TTL = 86400  # 24小时
+
+
+# ============================================================================
+# 内存实现
+# ============================================================================
+
+class PrunedMemorySaver(InMemorySaver):
+    """
+    带裁剪的内存检查点存储
+
+    - 每个(thread, ns)只保留最近 keep_last 个检查点，及其引用的blob和writes
+    - 超过 ttl_seconds 未写入的线程整体回收
+    - 按(thread, ns)索引已写入的blob版本，裁剪时不扫描全部线程的blob
+    """
+
+    def __init__(
+        self,
+        keep_last: int = DEFAULT_KEEP_LAST,
+        ttl_seconds: float = DEFAULT_CHECKPOINT_TTL,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if keep_last <= 0:
+            raise ValueError("keep_last必须大于0")
+        self.keep_last = keep_last
+        self.ttl_seconds = ttl_seconds
+        self._touched: Dict[str, float] = {}
+        # thread_id -> checkpoint_ns -> {(channel, version)}
+        self._blob_index: Dict[str, Dict[str, Set[Tuple[str, Any]]]] = {}
+        self._last_sweep = time.time()
+        self._prune_lock = threading.Lock()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        now = time.time()
+        with self._prune_lock:
+            self._touched[thread_id] = now
+            self._blob_index.setdefault(thread_id, {}).setdefault(checkpoint_ns, set()).update(new_versions.items())
+            self._prune(thread_id, checkpoint_ns)
+            if now - self._last_sweep >= 60:
+                self._sweep_expired(now)
+        return result
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """裁剪单个(thread, ns)的历史检查点"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_last:
+            return
+        ordered = sorted(checkpoints.keys())
+        dropped = ordered[:-self.keep_last]
+        for checkpoint_id in dropped:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        referenced: Set[Tuple[str, Any]] = set()
+        for saved in checkpoints.values():
+            versions = self.serde.loads_typed(saved[0]).get("channel_versions", {})
+            referenced.update(versions.items())
+        stored = self._blob_index.get(thread_id, {}).get(checkpoint_ns, set())
+        for channel, version in stored - referenced:
+            self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+        stored &= referenced
+
+    def _sweep_expired(self, now: float) -> None:
+        """回收空闲超时的线程"""
+        self._last_sweep = now
+        expired = [t for t, ts in self._touched.items() if now - ts > self.ttl_seconds]
+        for thread_id in expired:
+            self._touched.pop(thread_id, None)
+            self._blob_index.pop(thread_id, None)
+            super().delete_thread(thread_id)
+        if expired:
+            logger.info(f"[Checkpoint] 回收空闲线程 {len(expired)} 个")
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._prune_lock:
+            self._touched.pop(thread_id, None)
+            self._blob_index.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+
+# ============================================================================
+# Redis实现
+# ============================================================================
+
+def _pack(typed: Tuple[str, bytes]) -> bytes:
+    """序列化结果打包：类型名 + \\0 + zlib压缩数据"""
+    type_, data = typed
+    return type_.encode("utf-8") + b"\x00" + zlib.compress(data, 3)
+
+
+def _unpack(raw: bytes) -> Tuple[str, bytes]:
+    type_, _, data = raw.partition(b"\x00")
+    return type_.decode("utf-8"), zlib.decompress(data)
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Redis检查点存储
+
+    同步方法使用同步Redis客户端；异步方法在线程池中执行同步实现，
+    与 InMemorySaver 的异步包装方式一致。
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        namespace: str,
+        keep_last: int = DEFAULT_KEEP_LAST,
+        ttl_seconds: int = DEFAULT_CHECKPOINT_TTL,
+        client: Any = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            client: 自定义同步Redis客户端（decode_responses=False，测试可传入 fakeredis），
+                    默认按 redis_url 创建
+        """
+        super().__init__(**kwargs)
+        if keep_last <= 0:
+            raise ValueError("keep_last必须大于0")
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(
+                redis_url, decode_responses=False, socket_connect_timeout=5.0, socket_timeout=5.0,
+            )
+        self._redis = client
+        self.prefix = f"lg_ckpt:{namespace}"
+        self.keep_last = keep_last
+        self.ttl_seconds = ttl_seconds
+
+    # ------------------------------------------------------------------
+    # 键
+    # ------------------------------------------------------------------
+
+    def _base(self, thread_id: str, checkpoint_ns: str) -> str:
+        return f"{self.prefix}:{thread_id}:{checkpoint_ns}"
+
+    def _idx_key(self, thread_id: str, checkpoint_ns: str) -> str:
+        return f"{self._base(thread_id, checkpoint_ns)}:idx"
+
+    def _ckpt_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{self._base(thread_id, checkpoint_ns)}:c:{checkpoint_id}"
+
+    def _writes_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{self._base(thread_id, checkpoint_ns)}:w:{checkpoint_id}"
+
+    def _blob_key(self, thread_id: str, checkpoint_ns: str, channel: str, version: Any) -> str:
+        return f"{self._base(thread_id, checkpoint_ns)}:b:{channel}:{version}"
+
+    def _ns_set_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:{thread_id}:__ns__"
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def _load_tuple(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+    ) -> Optional[CheckpointTuple]:
+        """加载单个检查点（仅其引用的blob与writes）"""
+        saved = self._redis.hgetall(self._ckpt_key(thread_id, checkpoint_ns, checkpoint_id))
+        if not saved:
+            return None
+        checkpoint: Checkpoint = self.serde.loads_typed(_unpack(saved[b"checkpoint"]))
+        metadata = self.serde.loads_typed(_unpack(saved[b"metadata"]))
+        parent_id = saved.get(b"parent", b"").decode("utf-8") or None
+
+        versions: Dict[str, Any] = checkpoint.get("channel_versions", {})
+        channels = list(versions.keys())
+        channel_values: Dict[str, Any] = {}
+        if channels:
+            raws = self._redis.mget([
+                self._blob_key(thread_id, checkpoint_ns, ch, versions[ch]) for ch in channels
+            ])
+            for ch, raw in zip(channels, raws):
+                if raw is None:
+                    continue
+                typed = _unpack(raw)
+                if typed[0] == "empty":
+                    continue
+                channel_values[ch] = self.serde.loads_typed(typed)
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=metadata,
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+    ) -> List[Tuple[str, str, Any]]:
+        stored = self._redis.hgetall(self._writes_key(thread_id, checkpoint_ns, checkpoint_id))
+        entries = []
+        for field_, raw in stored.items():
+            header, _, payload = raw.partition(b"\n")
+            meta = json.loads(header)
+            task_id, idx = field_.decode("utf-8").rsplit(":", 1)
+            entries.append((meta["path"], task_id, int(idx), meta["channel"], payload))
+        entries.sort(key=lambda e: writes_sort_key(e[0], e[1], e[2]))
+        return [
+            (task_id, channel, self.serde.loads_typed(_unpack(payload)))
+            for _, task_id, _, channel, payload in entries
+        ]
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = self._redis.zrevrange(self._idx_key(thread_id, checkpoint_ns), 0, 0)
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode("utf-8")
+        return self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """按时间倒序惰性列出检查点（需指定thread_id）"""
+        if config is None:
+            raise ValueError("RedisCheckpointSaver.list 需要指定 thread_id")
+        thread_id: str = config["configurable"]["thread_id"]
+        namespaces: List[str]
+        if "checkpoint_ns" in config["configurable"]:
+            namespaces = [config["configurable"]["checkpoint_ns"]]
+        else:
+            namespaces = sorted(
+                ns.decode("utf-8") for ns in self._redis.smembers(self._ns_set_key(thread_id))
+            )
+        config_checkpoint_id = get_checkpoint_id(config)
+        before_id = get_checkpoint_id(before) if before else None
+
+        remaining = limit
+        for checkpoint_ns in namespaces:
+            ids = [
+                raw.decode("utf-8")
+                for raw in self._redis.zrevrange(self._idx_key(thread_id, checkpoint_ns), 0, -1)
+            ]
+            for checkpoint_id in ids:
+                if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                    continue
+                if before_id and checkpoint_id >= before_id:
+                    continue
+                tup = self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+                if tup is None:
+                    continue
+                if filter and not all(tup.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield tup
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        parent_id = config["configurable"].get("checkpoint_id") or ""
+
+        pipe = self._redis.pipeline(transaction=False)
+        # 仅写入本次变更的通道
+        for ch, version in new_versions.items():
+            typed = self.serde.dumps_typed(values[ch]) if ch in values else ("empty", b"")
+            pipe.set(
+                self._blob_key(thread_id, checkpoint_ns, ch, version), _pack(typed), ex=self.ttl_seconds,
+            )
+        # 未变更但仍被引用的blob续期，避免先于检查点过期
+        for ch, version in checkpoint.get("channel_versions", {}).items():
+            if ch not in new_versions:
+                pipe.expire(self._blob_key(thread_id, checkpoint_ns, ch, version), self.ttl_seconds)
+
+        ckpt_key = self._ckpt_key(thread_id, checkpoint_ns, checkpoint["id"])
+        pipe.hset(ckpt_key, mapping={
+            "checkpoint": _pack(self.serde.dumps_typed(c)),
+            "metadata": _pack(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+            "parent": parent_id,
+        })
+        pipe.expire(ckpt_key, self.ttl_seconds)
+        idx_key = self._idx_key(thread_id, checkpoint_ns)
+        pipe.zadd(idx_key, {checkpoint["id"]: 0})
+        pipe.expire(idx_key, self.ttl_seconds)
+        pipe.sadd(self._ns_set_key(thread_id), checkpoint_ns)
+        pipe.expire(self._ns_set_key(thread_id), self.ttl_seconds)
+        pipe.zcard(idx_key)
+        count = pipe.execute()[-1]
+
+        if count > self.keep_last:
+            self._prune(thread_id, checkpoint_ns)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = self._writes_key(thread_id, checkpoint_ns, checkpoint_id)
+
+        pipe = self._redis.pipeline(transaction=False)
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            field_ = f"{task_id}:{write_idx}"
+            payload = json.dumps({"channel": channel, "path": task_path}).encode("utf-8") + b"\n" + _pack(
+                self.serde.dumps_typed(value)
+            )
+            if write_idx >= 0:
+                # 特殊通道写入（错误/中断等）不覆盖已有记录，与InMemorySaver语义一致
+                pipe.hsetnx(key, field_, payload)
+            else:
+                pipe.hset(key, field_, payload)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """只保留最近 keep_last 个检查点，删除其余检查点、writes及不再被引用的blob"""
+        idx_key = self._idx_key(thread_id, checkpoint_ns)
+        dropped = [
+            raw.decode("utf-8")
+            for raw in self._redis.zrange(idx_key, 0, -(self.keep_last + 1))
+        ]
+        if not dropped:
+            return
+        kept = [
+            raw.decode("utf-8")
+            for raw in self._redis.zrange(idx_key, -self.keep_last, -1)
+        ]
+
+        referenced: Set[str] = set()
+        for checkpoint_id in kept:
+            raw = self._redis.hget(self._ckpt_key(thread_id, checkpoint_ns, checkpoint_id), "checkpoint")
+            if raw is None:
+                continue
+            versions = self.serde.loads_typed(_unpack(raw)).get("channel_versions", {})
+            referenced.update(
+                self._blob_key(thread_id, checkpoint_ns, ch, v) for ch, v in versions.items()
+            )
+
+        stale_blobs: Set[str] = set()
+        for checkpoint_id in dropped:
+            raw = self._redis.hget(self._ckpt_key(thread_id, checkpoint_ns, checkpoint_id), "checkpoint")
+            if raw is None:
+                continue
+            versions = self.serde.loads_typed(_unpack(raw)).get("channel_versions", {})
+            stale_blobs.update(
+                key for key in (
+                    self._blob_key(thread_id, checkpoint_ns, ch, v) for ch, v in versions.items()
+                )
+                if key not in referenced
+            )
+
+        pipe = self._redis.pipeline(transaction=False)
+        for checkpoint_id in dropped:
+            pipe.delete(
+                self._ckpt_key(thread_id, checkpoint_ns, checkpoint_id),
+                self._writes_key(thread_id, checkpoint_ns, checkpoint_id),
+            )
+        if stale_blobs:
+            pipe.delete(*stale_blobs)
+        pipe.zrem(idx_key, *dropped)
+        pipe.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        pattern = f"{self.prefix}:{thread_id}:*"
+        keys = list(self._redis.scan_iter(match=pattern, count=500))
+        if keys:
+            self._redis.delete(*keys)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ------------------------------------------------------------------
+    # 异步包装
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        iterator = self.list(config, filter=filter, before=before, limit=limit)
+        sentinel = object()
+        while True:
+            item = await asyncio.to_thread(next, iterator, sentinel)
+            if item is sentinel:
+                return
+            yield item  # type: ignore[misc]
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+# ============================================================================
+# 工厂
+# ============================================================================
+
+def create_checkpointer(namespace: str) -> BaseCheckpointSaver:
+    """
+    按配置创建检查点存储
+
+    Args:
+        namespace: Agent命名空间（如 task_dispatch），用于隔离Redis键
+
+    配置项（src.core.config.Settings）:
+        agent_checkpoint_backend: memory | redis
+        agent_checkpoint_keep_last: 每个线程保留的检查点数
+        agent_checkpoint_ttl_seconds: 线程空闲过期时间
+    """
+    from src.core.config import settings
+
+    backend = settings.agent_checkpoint_backend.lower()
+    if backend == "redis":
+        logger.info(f"[Checkpoint] {namespace} 使用Redis检查点存储")
+        return RedisCheckpointSaver(
+            settings.redis_url,
+            namespace,
+            keep_last=settings.agent_checkpoint_keep_last,
+            ttl_seconds=settings.agent_checkpoint_ttl_seconds,
+        )
+    if backend == "memory":
+        return PrunedMemorySaver(
+            keep_last=settings.agent_checkpoint_keep_last,
+            ttl_seconds=settings.agent_checkpoint_ttl_seconds,
+        )
+    raise ValueError(f"未知的检查点存储后端: {settings.agent_checkpoint_backend}")
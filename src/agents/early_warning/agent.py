@@ -3,6 +3,7 @@
 
 提供预警处理的高级API。
 """
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 from uuid import uuid4
@@ -33,6 +34,15 @@ class EarlyWarningAgent:
         disaster_data: Dict[str, Any],
         scenario_id: Optional[str] = None,
         request_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """同步入口（无运行中的事件循环时使用），参数与返回见 aprocess_disaster_update"""
+        return asyncio.run(self.aprocess_disaster_update(disaster_data, scenario_id, request_id))
+    
+    async def aprocess_disaster_update(
+        self,
+        disaster_data: Dict[str, Any],
+        scenario_id: Optional[str] = None,
+        request_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         处理灾害数据更新
@@ -66,7 +76,7 @@ class EarlyWarningAgent:
         
         try:
             # 执行图
-            final_state = self.graph.invoke(initial_state)
+            final_state = await self.graph.ainvoke(initial_state)
             
             # 计算执行时间
             execution_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
@@ -0,0 +1,381 @@
+"""
+影响分析引擎
+
+按想定批量加载队伍、车辆、规划路线和移动会话，一次性计算与灾害区域的关系：
+
+- 数据加载：每类对象一条 SQL，用 ST_DWithin 在库内按缓冲距离预筛
+- 空间计算：对象与灾害区域投影到以灾害为中心的局部平面（米），
+  点位用 STRtree dwithin 查询 + 向量化距离，路线用 STRtree intersects 查询，
+  再求首个进入灾害区域的位置
+- 距离为到灾害区域边界的距离（区域内为 0）；无边界时为到灾害中心的距离
+
+用法::
+
+    hazard = hazard_geometry(disaster.get("boundary"), disaster.get("center_point"))
+    async with AsyncSessionLocal() as session:
+        candidates = await load_impact_candidates(session, scenario_id, hazard, buffer_m)
+    hits = compute_impacts(candidates, hazard, buffer_m)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Point as ShapelyPoint
+from shapely.geometry import shape
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.geodesy import EARTH_RADIUS_M
+
+logger = logging.getLogger(__name__)
+
+_M_PER_DEG = EARTH_RADIUS_M * math.pi / 180.0
+
+# 地图实体中代表车辆/队伍位置的类型
+_VEHICLE_ENTITY_TYPES = ("command_vehicle", "realTime_command_vhicle")
+_TEAM_ENTITY_TYPES = ("rescue_team",)
+
+
+@dataclass
+class ImpactCandidate:
+    """待分析对象（一个对象可能因位置、规划路线、移动会话出现多次）"""
+    object_type: str                    # vehicle/team
+    object_id: str
+    object_name: str
+    lon: float
+    lat: float
+    route: Optional[Sequence[Sequence[float]]] = None  # 剩余/规划路线 [[lon, lat], ...]
+    notify_target_type: str = "commander"
+    notify_target_id: Optional[str] = None
+    notify_target_name: Optional[str] = None
+    source: str = "position"            # position/planned_route/movement
+
+
+@dataclass
+class ImpactHit:
+    """受影响对象的计算结果"""
+    candidate: ImpactCandidate
+    distance_m: float
+    route_affected: bool
+    route_intersection: Optional[Tuple[float, float]]
+
+
+def hazard_geometry(
+    boundary: Optional[Dict[str, Any]],
+    center: Optional[Dict[str, Any]],
+) -> Optional[BaseGeometry]:
+    """灾害区域几何（经纬度）：优先边界多边形，无边界时退化为中心点"""
+    if boundary and boundary.get("coordinates"):
+        try:
+            geom = shape({"type": boundary.get("type", "Polygon"), "coordinates": boundary["coordinates"]})
+            if not geom.is_empty:
+                return geom if geom.is_valid else shapely.make_valid(geom)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"[impact] 灾害边界解析失败，改用中心点: {e}")
+    if center and center.get("lon") is not None and center.get("lat") is not None:
+        return ShapelyPoint(float(center["lon"]), float(center["lat"]))
+    return None
+
+
+class _LocalProjection:
+    """以灾害中心为原点的等距圆柱投影（几十公里范围内误差 <0.5%）"""
+
+    def __init__(self, lon0: float, lat0: float) -> None:
+        self.lon0 = lon0
+        self.lat0 = lat0
+        self.kx = _M_PER_DEG * math.cos(math.radians(lat0))
+        self.ky = _M_PER_DEG
+
+    def forward(self, lonlat: np.ndarray) -> np.ndarray:
+        xy = np.empty_like(lonlat, dtype=np.float64)
+        xy[:, 0] = (lonlat[:, 0] - self.lon0) * self.kx
+        xy[:, 1] = (lonlat[:, 1] - self.lat0) * self.ky
+        return xy
+
+    def inverse(self, xy: np.ndarray) -> np.ndarray:
+        lonlat = np.empty_like(xy, dtype=np.float64)
+        lonlat[:, 0] = xy[:, 0] / self.kx + self.lon0
+        lonlat[:, 1] = xy[:, 1] / self.ky + self.lat0
+        return lonlat
+
+
+def compute_impacts(
+    candidates: Sequence[ImpactCandidate],
+    hazard: Optional[BaseGeometry],
+    buffer_distance_m: float,
+) -> List[ImpactHit]:
+    """
+    计算受影响对象
+
+    对象位置在缓冲距离内，或路线穿过灾害区域，即为受影响。
+
+    Args:
+        candidates: 待分析对象
+        hazard: 灾害区域几何（经纬度），见 hazard_geometry
+        buffer_distance_m: 缓冲距离（米）
+
+    Returns:
+        受影响对象列表，顺序与输入一致
+    """
+    if not candidates or hazard is None:
+        return []
+
+    centroid = hazard.centroid
+    proj = _LocalProjection(centroid.x, centroid.y)
+    hazard_xy = shapely.transform(hazard, proj.forward)
+    shapely.prepare(hazard_xy)
+
+    # 点位：STRtree 取缓冲距离内的候选，再向量化求精确距离
+    positions = np.array([(c.lon, c.lat) for c in candidates], dtype=np.float64)
+    points = shapely.points(proj.forward(positions))
+    near = _query(points, hazard_xy, "dwithin", buffer_distance_m)
+    distances = np.full(len(candidates), np.nan)
+    if near.size:
+        distances[near] = shapely.distance(points[near], hazard_xy)
+
+    # 路线：STRtree 取与灾害区域相交的路线，再求首个进入点
+    route_owner = [i for i, c in enumerate(candidates) if c.route is not None and len(c.route) >= 2]
+    entries: Dict[int, Tuple[float, float]] = {}
+    if route_owner:
+        coords = [np.asarray(candidates[i].route, dtype=np.float64)[:, :2] for i in route_owner]
+        lines = shapely.linestrings(
+            proj.forward(np.concatenate(coords)),
+            indices=np.repeat(np.arange(len(coords)), [len(c) for c in coords]),
+        )
+        crossing = _query(lines, hazard_xy, "intersects")
+        if crossing.size:
+            entry_xy = _entry_points(lines[crossing], hazard_xy)
+            entry_lonlat = proj.inverse(entry_xy)
+            for line_idx, (lon, lat) in zip(crossing.tolist(), entry_lonlat.tolist()):
+                entries[route_owner[line_idx]] = (lon, lat)
+
+    # 仅路线受影响、位置在缓冲区外的对象补算距离
+    far = np.array([i for i in entries if np.isnan(distances[i])], dtype=int)
+    if far.size:
+        distances[far] = shapely.distance(points[far], hazard_xy)
+
+    hits: List[ImpactHit] = []
+    for i in np.flatnonzero(~np.isnan(distances)).tolist():
+        entry = entries.get(i)
+        if distances[i] > buffer_distance_m and entry is None:
+            continue
+        hits.append(ImpactHit(
+            candidate=candidates[i],
+            distance_m=float(distances[i]),
+            route_affected=entry is not None,
+            route_intersection=entry,
+        ))
+    return hits
+
+
+def _query(geoms: np.ndarray, hazard: BaseGeometry, predicate: str, distance: Optional[float] = None) -> np.ndarray:
+    """STRtree 查询与灾害几何满足谓词的几何下标（升序）"""
+    tree = shapely.STRtree(geoms)
+    return np.sort(tree.query(hazard, predicate=predicate, distance=distance))
+
+
+def _entry_points(lines: np.ndarray, hazard: BaseGeometry) -> np.ndarray:
+    """每条路线沿行进方向首个落入灾害区域的位置（局部平面坐标）"""
+    parts, owner = shapely.get_parts(shapely.intersection(lines, hazard), return_index=True)
+    # 每段相交部分的起点即一次进入位置（线段取首点，切点本身即点）
+    starts = shapely.get_point(parts, 0)
+    starts = np.where(shapely.is_missing(starts), parts, starts)
+    along = shapely.line_locate_point(lines[owner], starts)
+    # 按 (路线, 沿线距离) 排序后取每条路线的第一个
+    order = np.lexsort((along, owner))
+    first = order[np.r_[True, owner[order][1:] != owner[order][:-1]]]
+    result = np.empty((len(lines), 2))
+    result[owner[first]] = shapely.get_coordinates(starts[first])
+    return result
+
+
+def merge_hits(hits: Sequence[ImpactHit]) -> List[ImpactHit]:
+    """同一对象的多条结果合并：保留先出现的对象信息，取最近距离，任一路线受影响即受影响"""
+    merged: Dict[Tuple[str, str], ImpactHit] = {}
+    for hit in hits:
+        key = (hit.candidate.object_type, hit.candidate.object_id)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = ImpactHit(hit.candidate, hit.distance_m, hit.route_affected, hit.route_intersection)
+            continue
+        current.distance_m = min(current.distance_m, hit.distance_m)
+        if hit.route_affected and not current.route_affected:
+            current.route_affected = True
+            current.route_intersection = hit.route_intersection
+    return list(merged.values())
+
+
+# ============================================================================
+# 数据加载
+# ============================================================================
+
+async def load_impact_candidates(
+    session: AsyncSession,
+    scenario_id: Optional[str],
+    hazard: BaseGeometry,
+    buffer_distance_m: float,
+) -> List[ImpactCandidate]:
+    """
+    批量加载想定内可能受影响的对象
+
+    点位对象在库内按缓冲距离预筛；规划路线与移动会话的路线可能远距离穿越灾害区域，
+    规划路线按路线几何预筛，移动会话全部交给 compute_impacts。
+    """
+    params = {
+        "hazard": json.dumps(shapely.geometry.mapping(hazard)),
+        "buffer_m": float(buffer_distance_m),
+        "scenario_id": scenario_id,
+    }
+    candidates: List[ImpactCandidate] = []
+    candidates.extend(await _load_teams(session, params))
+    candidates.extend(await _load_entities(session, params))
+    candidates.extend(await _load_planned_routes(session, params))
+    candidates.extend(await _load_moving_sessions())
+    return candidates
+
+
+async def _load_teams(session: AsyncSession, params: Dict[str, Any]) -> List[ImpactCandidate]:
+    """救援队伍当前位置（无遥测时用驻地）"""
+    result = await session.execute(text("""
+        WITH hazard AS (
+            SELECT ST_SetSRID(ST_GeomFromGeoJSON(:hazard), 4326)::geography AS geog
+        )
+        SELECT t.id::text AS id, COALESCE(t.name, t.code) AS name, t.contact_person,
+               ST_X(loc::geometry) AS lon, ST_Y(loc::geometry) AS lat
+        FROM operational_v2.rescue_teams_v2 t
+        CROSS JOIN hazard h
+        CROSS JOIN LATERAL (SELECT COALESCE(t.current_location, t.base_location) AS loc) l
+        WHERE loc IS NOT NULL
+          AND ST_DWithin(loc, h.geog, :buffer_m)
+    """), params)
+    return [
+        ImpactCandidate(
+            object_type="team",
+            object_id=row.id,
+            object_name=row.name,
+            lon=float(row.lon),
+            lat=float(row.lat),
+            notify_target_type="team_leader",
+            notify_target_name=row.contact_person or "负责人",
+        )
+        for row in result.fetchall()
+    ]
+
+
+async def _load_entities(session: AsyncSession, params: Dict[str, Any]) -> List[ImpactCandidate]:
+    """想定内车辆/队伍地图实体的实时位置"""
+    if not params["scenario_id"]:
+        return []
+    result = await session.execute(text("""
+        WITH hazard AS (
+            SELECT ST_SetSRID(ST_GeomFromGeoJSON(:hazard), 4326)::geography AS geog
+        )
+        SELECT e.id::text AS id, e.type, e.properties,
+               ST_X(ST_Centroid(e.geometry::geometry)) AS lon,
+               ST_Y(ST_Centroid(e.geometry::geometry)) AS lat
+        FROM operational_v2.entities_v2 e
+        CROSS JOIN hazard h
+        WHERE e.scenario_id = CAST(:scenario_id AS uuid)
+          AND e.deleted_at IS NULL
+          AND e.type = ANY(:entity_types)
+          AND ST_DWithin(e.geometry::geography, h.geog, :buffer_m)
+    """), {**params, "entity_types": list(_VEHICLE_ENTITY_TYPES + _TEAM_ENTITY_TYPES)})
+    candidates = []
+    for row in result.fetchall():
+        props = row.properties or {}
+        is_vehicle = row.type in _VEHICLE_ENTITY_TYPES
+        object_id = props.get("vehicle_id" if is_vehicle else "team_id") or row.id
+        candidates.append(ImpactCandidate(
+            object_type="vehicle" if is_vehicle else "team",
+            object_id=str(object_id),
+            object_name=props.get("name") or str(object_id),
+            lon=float(row.lon),
+            lat=float(row.lat),
+            notify_target_type="commander" if is_vehicle else "team_leader",
+            notify_target_name=props.get("commander") or props.get("contact") or None,
+        ))
+    return candidates
+
+
+async def _load_planned_routes(session: AsyncSession, params: Dict[str, Any]) -> List[ImpactCandidate]:
+    """想定内活动规划路线（按车辆优先，无车辆时归属队伍）"""
+    result = await session.execute(text("""
+        WITH hazard AS (
+            SELECT ST_SetSRID(ST_GeomFromGeoJSON(:hazard), 4326)::geography AS geog
+        )
+        SELECT pr.id::text AS route_id,
+               pr.vehicle_id::text AS vehicle_id, pr.team_id::text AS team_id,
+               v.name AS vehicle_name, tm.name AS team_name, tm.contact_person,
+               ST_AsGeoJSON(pr.route_geometry::geometry) AS route_geojson
+        FROM operational_v2.planned_routes_v2 pr
+        LEFT JOIN operational_v2.tasks_v2 t ON pr.task_id = t.id
+        LEFT JOIN operational_v2.vehicles_v2 v ON pr.vehicle_id = v.id
+        LEFT JOIN operational_v2.rescue_teams_v2 tm ON pr.team_id = tm.id
+        CROSS JOIN hazard h
+        WHERE pr.status = 'active'
+          AND (pr.vehicle_id IS NOT NULL OR pr.team_id IS NOT NULL)
+          AND (CAST(:scenario_id AS uuid) IS NULL OR t.scenario_id = CAST(:scenario_id AS uuid)
+               OR pr.task_id IS NULL)
+          AND ST_DWithin(pr.route_geometry::geography, h.geog, :buffer_m)
+    """), params)
+    candidates = []
+    for row in result.fetchall():
+        coords = json.loads(row.route_geojson).get("coordinates") or []
+        if len(coords) < 2:
+            continue
+        is_vehicle = row.vehicle_id is not None
+        candidates.append(ImpactCandidate(
+            object_type="vehicle" if is_vehicle else "team",
+            object_id=row.vehicle_id if is_vehicle else row.team_id,
+            object_name=(row.vehicle_name if is_vehicle else row.team_name) or row.route_id,
+            lon=float(coords[0][0]),
+            lat=float(coords[0][1]),
+            route=coords,
+            notify_target_type="commander" if is_vehicle else "team_leader",
+            notify_target_name=None if is_vehicle else row.contact_person,
+            source="planned_route",
+        ))
+    return candidates
+
+
+async def _load_moving_sessions() -> List[ImpactCandidate]:
+    """移动仿真中的会话：当前位置 + 剩余路线"""
+    from src.domains.movement_simulation.persistence import get_persistence
+    from src.domains.movement_simulation.schemas import EntityType, MovementState
+
+    try:
+        persistence = await get_persistence()
+        sessions = await persistence.get_active_sessions()
+    except Exception as e:  # noqa: BLE001 - Redis 不可用时仅跳过移动会话
+        logger.warning(f"[impact] 获取移动会话失败: {e}")
+        return []
+
+    candidates = []
+    for s in sessions:
+        if s.state not in (MovementState.MOVING, MovementState.PAUSED):
+            continue
+        idx = min(s.current_segment_index, len(s.route) - 1)
+        a = s.route[idx]
+        b = s.route[idx + 1] if idx + 1 < len(s.route) else a
+        lon = a.lon + (b.lon - a.lon) * s.segment_progress
+        lat = a.lat + (b.lat - a.lat) * s.segment_progress
+        is_team = s.entity_type == EntityType.TEAM
+        object_id = str(s.resource_id or s.entity_id)
+        candidates.append(ImpactCandidate(
+            object_type="team" if is_team else "vehicle",
+            object_id=object_id,
+            object_name=object_id,
+            lon=lon,
+            lat=lat,
+            route=[(lon, lat)] + [(p.lon, p.lat) for p in s.route[idx + 1:]],
+            notify_target_type="team_leader" if is_team else "commander",
+            source="movement",
+        ))
+    return candidates
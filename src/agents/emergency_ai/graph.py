@@ -2,15 +2,21 @@
 EmergencyAI LangGraph流程定义
 
 基于LangGraph 1.0构建4阶段AI+规则混合流程。
+
+互不依赖的阶段并行执行（fan-out/fan-in）：
+- enhance_with_cases(RAG) ∥ query_rules(KG)
+- check_transport ∥ check_safety_rules
+- generate_reports ∥ run_simulation
 """
 from __future__ import annotations
 
 import logging
-from typing import Literal
+from typing import List, Literal, Union
 
 from langgraph.graph import StateGraph, START, END
 
 from .state import EmergencyAIState
+from .utils.stage_timing import instrument_node
 from .nodes import (
     # 阶段1
     understand_disaster,
@@ -46,16 +52,18 @@ from .nodes import (
 logger = logging.getLogger(__name__)
 
 
-def should_continue_after_understanding(state: EmergencyAIState) -> Literal["query_rules", "generate_output"]:
+def should_continue_after_understanding(
+    state: EmergencyAIState,
+) -> Union[Literal["generate_output"], List[str]]:
     """
     判断灾情理解后是否继续
     
-    如果灾情解析失败，直接生成输出；否则继续规则推理。
+    如果灾情解析失败，直接生成输出；否则并行执行案例检索(RAG)和规则查询(KG)。
     """
     if state.get("parsed_disaster") is None:
         logger.warning("灾情解析失败，跳转到输出")
         return "generate_output"
-    return "query_rules"
+    return ["enhance_with_cases", "query_rules"]
 
 
 def should_continue_after_rules(state: EmergencyAIState) -> Literal["htn_decompose", "generate_output"]:
@@ -97,6 +105,17 @@ def should_continue_after_strategic_module(state: EmergencyAIState) -> Literal["
     return "match_resources"
 
 
+def should_check_safety_after_allocation(state: EmergencyAIState) -> Union[Literal["check_transport"], List[str]]:
+    """
+    资源优化后的分支
+    
+    运力检查总是执行；有候选方案时安全规则检查与其并行执行。
+    """
+    if not state.get("allocation_solutions", []):
+        return "check_transport"
+    return ["check_transport", "check_safety_rules"]
+
+
 def should_continue_after_matching(state: EmergencyAIState) -> Literal["filter_hard_rules", "generate_output"]:
     """
     判断资源匹配后是否继续
@@ -133,13 +152,14 @@ def build_emergency_ai_graph() -> StateGraph:
       ▼
     ┌─────────────────────────────────────┐
     │ Phase 1: 灾情理解                   │
-    │ understand_disaster → enhance_cases │
+    │ understand_disaster                 │
     └─────────────────────────────────────┘
       │
       ▼ (conditional: 解析成功?)
     ┌─────────────────────────────────────┐
-    │ Phase 2: 规则推理                   │
-    │ query_rules → apply_rules           │
+    │ Phase 1/2: 并行                     │
+    │ enhance_cases ∥ query_rules         │
+    │           → apply_rules             │
     └─────────────────────────────────────┘
       │
       ▼ (conditional: 有匹配规则?)
@@ -152,12 +172,14 @@ def build_emergency_ai_graph() -> StateGraph:
     ┌─────────────────────────────────────┐
     │ Phase 3: 资源匹配                   │
     │ match_resources → optimize_alloc    │
+    │ → check_transport ∥ check_safety    │
     └─────────────────────────────────────┘
       │
       ▼ (conditional: 有候选方案?)
     ┌─────────────────────────────────────┐
     │ Phase 4: 方案优化                   │
     │ filter_hard → score_soft → explain  │
+    │ → generate_reports ∥ run_simulation │
     └─────────────────────────────────────┘
       │
       ▼
@@ -167,6 +189,9 @@ def build_emergency_ai_graph() -> StateGraph:
     END
     ```
     
+    每个节点经 instrument_node 包装：耗时写入trace["node_timings_ms"]，
+    可选阶段（案例增强、方案解释、报告、仿真）在延迟预算不足时跳过。
+    
     Returns:
         编译后的StateGraph
     """
@@ -175,67 +200,66 @@ def build_emergency_ai_graph() -> StateGraph:
     # 创建状态图
     workflow = StateGraph(EmergencyAIState)
     
+    def add_node(name: str, func, optional: bool = False) -> None:
+        workflow.add_node(name, instrument_node(name, func, optional=optional))
+    
     # ========== 添加节点 ==========
     
     # 阶段1: 灾情理解
-    workflow.add_node("understand_disaster", understand_disaster)
-    workflow.add_node("enhance_with_cases", enhance_with_cases)
+    add_node("understand_disaster", understand_disaster)
+    add_node("enhance_with_cases", enhance_with_cases, optional=True)
     
     # 阶段2: 规则推理
-    workflow.add_node("query_rules", query_rules)
-    workflow.add_node("apply_rules", apply_rules)
+    add_node("query_rules", query_rules)
+    add_node("apply_rules", apply_rules)
     
     # 阶段2.5: HTN任务分解
-    workflow.add_node("htn_decompose", htn_decompose)
+    add_node("htn_decompose", htn_decompose)
     
     # 阶段2.6: 战略层 - 任务域/阶段/模块
-    workflow.add_node("classify_domains", classify_domains)
-    workflow.add_node("apply_phase_priority", apply_phase_priority)
-    workflow.add_node("assemble_modules", assemble_modules)
+    add_node("classify_domains", classify_domains)
+    add_node("apply_phase_priority", apply_phase_priority)
+    add_node("assemble_modules", assemble_modules)
     
     # 阶段3: 资源匹配
-    workflow.add_node("match_resources", match_resources)
-    workflow.add_node("optimize_allocation", optimize_allocation)
+    add_node("match_resources", match_resources)
+    add_node("optimize_allocation", optimize_allocation)
     
     # 阶段3.5: 战略层 - 运力
-    workflow.add_node("check_transport", check_transport)
+    add_node("check_transport", check_transport)
     
     # 阶段4: 方案优化
-    workflow.add_node("filter_hard_rules", filter_hard_rules)
+    add_node("filter_hard_rules", filter_hard_rules)
     
     # 阶段4.1: 战略层 - 安全规则
-    workflow.add_node("check_safety_rules", check_safety_rules)
+    add_node("check_safety_rules", check_safety_rules)
     
-    workflow.add_node("score_soft_rules", score_soft_rules)
-    workflow.add_node("explain_scheme", explain_scheme)
+    add_node("score_soft_rules", score_soft_rules)
+    add_node("explain_scheme", explain_scheme, optional=True)
     
     # 阶段4.5: 战略层 - 报告
-    workflow.add_node("generate_reports", generate_reports)
+    add_node("generate_reports", generate_reports, optional=True)
     
     # 阶段5: 仿真闭环
-    workflow.add_node("run_simulation", run_simulation)
+    add_node("run_simulation", run_simulation, optional=True)
     
     # 输出
-    workflow.add_node("generate_output", generate_output)
+    add_node("generate_output", generate_output)
     
     # ========== 定义边 ==========
     
     # START → Phase 1
     workflow.add_edge(START, "understand_disaster")
-    workflow.add_edge("understand_disaster", "enhance_with_cases")
     
-    # Phase 1 → Phase 2 (conditional)
+    # Phase 1 → 案例增强 ∥ 规则查询 (conditional fan-out)
     workflow.add_conditional_edges(
-        "enhance_with_cases",
+        "understand_disaster",
         should_continue_after_understanding,
-        {
-            "query_rules": "query_rules",
-            "generate_output": "generate_output",
-        }
+        ["enhance_with_cases", "query_rules", "generate_output"],
     )
     
-    # Phase 2 内部
-    workflow.add_edge("query_rules", "apply_rules")
+    # fan-in: 两个分支都完成后应用规则
+    workflow.add_edge(["enhance_with_cases", "query_rules"], "apply_rules")
     
     # Phase 2 → HTN分解 (conditional)
     workflow.add_conditional_edges(
@@ -274,10 +298,15 @@ def build_emergency_ai_graph() -> StateGraph:
     # Phase 3 内部
     workflow.add_edge("match_resources", "optimize_allocation")
     
-    # Phase 3 → 运力检查
-    workflow.add_edge("optimize_allocation", "check_transport")
+    # Phase 3 → 运力检查 ∥ 安全规则检查 (conditional fan-out)
+    workflow.add_conditional_edges(
+        "optimize_allocation",
+        should_check_safety_after_allocation,
+        ["check_transport", "check_safety_rules"],
+    )
     
     # 运力检查 → Phase 4 (conditional)
+    # 安全检查与运力检查处于同一超步，filter_hard_rules 在两者都完成后执行一次
     workflow.add_conditional_edges(
         "check_transport",
         should_continue_after_matching,
@@ -286,10 +315,10 @@ def build_emergency_ai_graph() -> StateGraph:
             "generate_output": "generate_output",
         }
     )
+    workflow.add_edge("check_safety_rules", "filter_hard_rules")
     
     # Phase 4 内部
-    workflow.add_edge("filter_hard_rules", "check_safety_rules")
-    workflow.add_edge("check_safety_rules", "score_soft_rules")
+    workflow.add_edge("filter_hard_rules", "score_soft_rules")
     
     # Phase 4 → explain (conditional)
     workflow.add_conditional_edges(
@@ -301,9 +330,10 @@ def build_emergency_ai_graph() -> StateGraph:
         }
     )
     
-    # explain_scheme → 战略层报告生成 → 输出
+    # explain_scheme → 报告生成 ∥ 仿真闭环 → 输出
     workflow.add_edge("explain_scheme", "generate_reports")
-    workflow.add_edge("generate_reports", "generate_output")
+    workflow.add_edge("explain_scheme", "run_simulation")
+    workflow.add_edge(["generate_reports", "run_simulation"], "generate_output")
     
     # 输出 → END
     workflow.add_edge("generate_output", END)
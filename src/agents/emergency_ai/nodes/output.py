@@ -440,6 +440,9 @@ async def generate_output(state: EmergencyAIState) -> Dict[str, Any]:
         # 推荐方案
         "recommended_scheme": recommended_scheme,
         
+        # 仿真闭环结果（run_simulation写入，未执行或被跳过时为None）
+        "simulation_result": (state.get("final_output") or {}).get("simulation_result"),
+        
         # 方案解释（过滤队伍类型标识、转换灾情级别和T+时间为中文，让指挥员更易读）
         "scheme_explanation": _filter_for_commander(
             state.get("scheme_explanation", ""),
@@ -6,6 +6,7 @@
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Dict, Any, List
@@ -55,9 +56,9 @@ async def run_simulation(state: EmergencyAIState) -> Dict[str, Any]:
             "monte_carlo_runs": 30      # 30次蒙特卡洛
         }
         
-        # 2. 执行仿真
+        # 2. 执行仿真（CPU密集，放到线程池，不阻塞与之并行的报告生成分支）
         simulator = DiscreteEventSimulator()
-        result = simulator.run(problem)
+        result = await asyncio.to_thread(simulator.run, problem)
         
         if result.status == AlgorithmStatus.SUCCESS:
             solution = result.solution
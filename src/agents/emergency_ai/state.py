@@ -5,12 +5,16 @@ EmergencyAI状态定义
 """
 from __future__ import annotations
 
+import operator
+import time
 from typing import TypedDict, Annotated, List, Dict, Any, Optional
 from uuid import UUID
 
 from langgraph.graph import add_messages
 from langchain_core.messages import BaseMessage
 
+from .utils.stage_timing import keep_last, merge_trace
+
 
 class ParsedDisasterInfo(TypedDict):
     """LLM解析的灾情结构化信息"""
@@ -314,10 +318,12 @@ class EmergencyAIState(TypedDict):
     final_output: Dict[str, Any]                            # 最终输出结果
     
     # ========== 追踪信息 ==========
-    trace: Dict[str, Any]                                   # 执行追踪
-    errors: List[str]                                       # 错误列表
-    current_phase: str                                      # 当前阶段
+    # 并行分支会在同一步写入以下字段，需要reducer合并
+    trace: Annotated[Dict[str, Any], merge_trace]           # 执行追踪（含node_timings_ms）
+    errors: Annotated[List[str], operator.add]              # 错误列表（节点只返回新增错误）
+    current_phase: Annotated[str, keep_last]                # 当前阶段
     execution_time_ms: int                                  # 执行耗时
+    deadline_at: Optional[float]                            # 延迟预算截止时间（epoch秒），None表示不限
 
 
 def create_initial_state(
@@ -336,12 +342,17 @@ def create_initial_state(
         scenario_id: 想定ID
         disaster_description: 灾情描述
         structured_input: 结构化输入
-        constraints: 约束条件
+        constraints: 约束条件（含latency_budget_ms时启用延迟预算模式）
         optimization_weights: 优化权重
         
     Returns:
         初始化的EmergencyAIState
     """
+    constraints = constraints or {}
+    # 延迟预算模式：constraints["latency_budget_ms"]
+    latency_budget_ms = constraints.get("latency_budget_ms")
+    deadline_at = time.time() + latency_budget_ms / 1000 if latency_budget_ms else None
+    
     # 默认优化权重（5维评估，严格对齐军事版）
     default_weights: Dict[str, float] = {
         "success_rate": 0.35,     # 人命关天，最高权重
@@ -356,7 +367,7 @@ def create_initial_state(
         scenario_id=scenario_id,
         disaster_description=disaster_description,
         structured_input=structured_input or {},
-        constraints=constraints or {},
+        constraints=constraints,
         optimization_weights=optimization_weights or default_weights,
         messages=[],
         parsed_disaster=None,
@@ -395,8 +406,11 @@ def create_initial_state(
             "rag_calls": 0,
             "kg_calls": 0,
             "algorithms_used": [],
+            "node_timings_ms": {},
+            "skipped_stages": [],
         },
         errors=[],
         current_phase="init",
         execution_time_ms=0,
+        deadline_at=deadline_at,
     )
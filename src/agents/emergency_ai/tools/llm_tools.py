@@ -5,17 +5,24 @@ LLM工具封装
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
 
+import httpx
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from ..utils.llm_cache import LLMCacheConfig, LLMResponseCache, get_llm_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,25 +74,103 @@ class SchemeExplanation(BaseModel):
 # LLM客户端获取
 # ============================================================================
 
+def _llm_params(max_tokens: int) -> Dict[str, Any]:
+    """读取LLM连接参数（环境变量）"""
+    return {
+        "model": os.environ.get('LLM_MODEL', '/models/openai/gpt-oss-120b'),
+        "base_url": os.environ.get('OPENAI_BASE_URL', 'http://192.168.31.50:8000/v1'),
+        "api_key": os.environ.get('OPENAI_API_KEY', 'dummy_key'),
+        "timeout": int(os.environ.get('REQUEST_TIMEOUT', '180')),
+        "max_tokens": max_tokens,
+    }
+
+
+# 客户端复用：按事件循环隔离（httpx异步连接池绑定事件循环），循环销毁后自动回收
+_llm_clients: "weakref.WeakKeyDictionary[Any, Dict[Tuple[Any, ...], ChatOpenAI]]" = weakref.WeakKeyDictionary()
+_sync_llm_clients: Dict[Tuple[Any, ...], ChatOpenAI] = {}
+_llm_clients_lock = threading.Lock()
+
+
+def _build_llm(params: Dict[str, Any]) -> ChatOpenAI:
+    """构建共享HTTP连接池的ChatOpenAI实例"""
+    max_connections = int(os.environ.get('LLM_HTTP_MAX_CONNECTIONS', '20'))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=60.0,
+    )
+    return ChatOpenAI(
+        model=params["model"],
+        base_url=params["base_url"],
+        api_key=params["api_key"],
+        timeout=params["timeout"],
+        max_tokens=params["max_tokens"],
+        max_retries=0,  # 禁止内部重试，失败直接抛错
+        http_client=httpx.Client(limits=limits, timeout=params["timeout"]),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=params["timeout"]),
+    )
+
+
 def _get_llm(max_tokens: int = 4096) -> ChatOpenAI:
     """
     获取LLM客户端实例
     
+    相同参数的实例在同一事件循环内复用，共享keep-alive连接池，
+    避免每次调用重新建立TCP/TLS连接。
+    
     Args:
         max_tokens: 最大输出token数，默认4096，方案解释建议使用8192
     """
-    llm_model = os.environ.get('LLM_MODEL', '/models/openai/gpt-oss-120b')
-    openai_base_url = os.environ.get('OPENAI_BASE_URL', 'http://192.168.31.50:8000/v1')
-    openai_api_key = os.environ.get('OPENAI_API_KEY', 'dummy_key')
-    request_timeout = int(os.environ.get('REQUEST_TIMEOUT', '180'))
-    return ChatOpenAI(
-        model=llm_model,
-        base_url=openai_base_url,
-        api_key=openai_api_key,
-        timeout=request_timeout,
-        max_tokens=max_tokens,
-        max_retries=0,  # 禁止内部重试，失败直接抛错
+    params = _llm_params(max_tokens)
+    key = tuple(sorted(params.items()))
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _llm_clients_lock:
+        clients = _sync_llm_clients if loop is None else _llm_clients.setdefault(loop, {})
+        llm = clients.get(key)
+        if llm is None:
+            llm = _build_llm(params)
+            clients[key] = llm
+        return llm
+
+
+# ============================================================================
+# 响应缓存
+# ============================================================================
+
+_cache_embeddings: Optional[Any] = None
+
+
+async def _embed_for_cache(text: str) -> List[float]:
+    """语义缓存使用的embedding（复用RAG的embedding服务）"""
+    global _cache_embeddings
+    if _cache_embeddings is None:
+        from langchain_openai import OpenAIEmbeddings
+        _cache_embeddings = OpenAIEmbeddings(
+            model=os.environ.get('EMBEDDING_MODEL', 'text-embedding-3-small'),
+            base_url=os.environ.get('EMBEDDING_BASE_URL', 'http://localhost:8001/v1'),
+            api_key=os.environ.get('RAG_OPENAI_API_KEY', os.environ.get('OPENAI_API_KEY', 'dummy_key')),
+        )
+    return await _cache_embeddings.aembed_query(text)
+
+
+def _get_response_cache() -> LLMResponseCache:
+    """获取应急AI的LLM响应缓存（配置来自环境变量）"""
+    config = LLMCacheConfig(
+        enabled=os.environ.get('LLM_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes'),
+        max_entries=int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '256')),
+        ttl_seconds=float(os.environ.get('LLM_CACHE_TTL_SECONDS', '1800')),
+        semantic_enabled=os.environ.get('LLM_CACHE_SEMANTIC_ENABLED', 'false').lower() in ('true', '1', 'yes'),
+        semantic_threshold=float(os.environ.get('LLM_CACHE_SEMANTIC_THRESHOLD', '0.97')),
     )
+    return get_llm_cache("emergency_ai", config, embed_func=_embed_for_cache)
+
+
+def _cache_params(llm: ChatOpenAI) -> Dict[str, Any]:
+    """参与缓存键计算的模型参数"""
+    return {"model": llm.model_name, "base_url": str(llm.openai_api_base), "max_tokens": llm.max_tokens}
 
 
 # ============================================================================
@@ -305,10 +390,7 @@ async def parse_disaster_description_async(
     description: str,
     context: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """异步版本的灾情解析"""
-    import asyncio
-    import time
-    
+    """异步版本的灾情解析（带响应缓存与并发合并）"""
     logger.info("异步调用LLM解析灾情描述", extra={"description_length": len(description)})
     start_time = time.time()
     
@@ -342,16 +424,29 @@ async def parse_disaster_description_async(
     
     chain = prompt | llm | parser
     
-    try:
+    prompt_vars = {
+        "description": description,
+        "context_info": context_info,
+    }
+    
+    async def _call() -> Dict[str, Any]:
         logger.info("[LLM] 开始调用 chain.ainvoke...")
-        result = await asyncio.wait_for(
+        return await asyncio.wait_for(
             chain.ainvoke({
-                "description": description,
-                "context_info": context_info,
+                **prompt_vars,
                 "format_instructions": parser.get_format_instructions(),
             }),
             timeout=180.0  # 3分钟超时
         )
+    
+    try:
+        result = await _get_response_cache().get_or_call(
+            namespace="parse_disaster",
+            model_params=_cache_params(llm),
+            prompt_vars=prompt_vars,
+            call=_call,
+            semantic_field="description",
+        )
         elapsed = int((time.time() - start_time) * 1000)
         logger.info(f"异步LLM灾情解析完成 ({elapsed}ms)", extra={"disaster_type": result.get("disaster_type")})
         return result
@@ -457,13 +552,25 @@ async def explain_scheme_async(
     chain = prompt | llm | parser
     
     try:
-        result = await chain.ainvoke({
+        prompt_vars = {
             "disaster_info": json.dumps(disaster_info, ensure_ascii=False, indent=2),
             "scheme": json.dumps(scheme, ensure_ascii=False, indent=2),
             "alternatives_info": alternatives_info,
             "task_sequence_info": task_sequence_info,
-            "format_instructions": parser.get_format_instructions(),
-        })
+        }
+        
+        async def _call() -> Dict[str, Any]:
+            return await chain.ainvoke({
+                **prompt_vars,
+                "format_instructions": parser.get_format_instructions(),
+            })
+        
+        result = await _get_response_cache().get_or_call(
+            namespace="explain_scheme",
+            model_params=_cache_params(llm),
+            prompt_vars=prompt_vars,
+            call=_call,
+        )
         logger.info("异步LLM方案解释生成完成")
         return result
     except Exception as e:
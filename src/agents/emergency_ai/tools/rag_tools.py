@@ -13,6 +13,7 @@ from langchain_openai import OpenAIEmbeddings
 from qdrant_client import QdrantClient
 from qdrant_client.models import Filter, FieldCondition, MatchValue
 
+from src.infra.rag.llama_index_client import POINT_ID_KEY, get_rag
 from src.infra.settings import load_settings
 
 logger = logging.getLogger(__name__)
@@ -49,6 +50,9 @@ def _get_embeddings() -> OpenAIEmbeddings:
 # 应急救灾案例集合名称
 EMERGENCY_CASES_COLLECTION = "emergency_cases"
 
+# 异步检索时解析出的案例集合（首次检索后缓存）
+_cases_collection: Optional[str] = None
+
 
 # ============================================================================
 # 工具函数定义
@@ -155,19 +159,7 @@ def search_similar_cases(
         raise RuntimeError(f"向量检索失败: {e}") from e
     
     # 格式化结果
-    cases: List[Dict[str, Any]] = []
-    for hit in results.points:
-        payload = hit.payload or {}
-        case = {
-            "case_id": payload.get("case_id", str(hit.id)),
-            "title": payload.get("title", "未知案例"),
-            "disaster_type": payload.get("disaster_type", "unknown"),
-            "description": payload.get("description", payload.get("content", "")),
-            "lessons_learned": payload.get("lessons_learned", []),
-            "best_practices": payload.get("best_practices", []),
-            "similarity_score": float(hit.score) if hit.score else 0.0,
-        }
-        cases.append(case)
+    cases = [_format_case(hit.payload or {}, hit.score, hit.id) for hit in results.points]
     
     logger.info("RAG检索完成", extra={"results_count": len(cases)})
     return cases
@@ -185,14 +177,76 @@ async def search_similar_cases_async(
     """
     异步版本的相似案例检索
     
-    由于qdrant_client同步API，这里使用同步调用包装
+    经共享 RAG 实例的异步客户端检索（查询向量走缓存），不阻塞事件循环；
+    集合选择、过滤条件与返回格式同 search_similar_cases
     """
-    # Qdrant Python客户端的search是同步的，直接调用
-    return search_similar_cases.invoke({
-        "query": query,
-        "disaster_type": disaster_type,
-        "top_k": top_k,
-    })
+    logger.info(
+        "调用RAG异步检索相似案例",
+        extra={"query_length": len(query), "disaster_type": disaster_type, "top_k": top_k}
+    )
+    collection_name = await _resolve_cases_collection()
+    search_filter = None
+    if disaster_type:
+        search_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="disaster_type",
+                    match=MatchValue(value=disaster_type),
+                )
+            ]
+        )
+    
+    try:
+        hits = (await get_rag(collection_name).asimilarity_search_many(
+            [query], top_k=top_k, query_filter=search_filter, allow_empty=True,
+        ))[0]
+    except Exception as e:
+        logger.error("Qdrant检索失败", extra={"error": str(e)})
+        raise RuntimeError(f"向量检索失败: {e}") from e
+    
+    cases = [_format_case(payload, score, payload.get(POINT_ID_KEY, "")) for _, score, payload in hits]
+    logger.info("RAG检索完成", extra={"results_count": len(cases)})
+    return cases
+
+
+async def _resolve_cases_collection() -> str:
+    """选择案例集合（emergency_cases 优先，其次 rag_案例），集合缺失直接报错"""
+    global _cases_collection
+    if _cases_collection is not None:
+        return _cases_collection
+    try:
+        collection_names = await get_rag().collection_names()
+    except Exception as e:
+        logger.error(
+            "Qdrant连接失败",
+            extra={"error": str(e), "qdrant_url": _settings.qdrant_url}
+        )
+        raise RuntimeError(f"Qdrant连接失败: {e}") from e
+    
+    if EMERGENCY_CASES_COLLECTION in collection_names:
+        _cases_collection = EMERGENCY_CASES_COLLECTION
+    elif "rag_案例" in collection_names:
+        _cases_collection = "rag_案例"
+        logger.info("使用已有集合rag_案例进行检索")
+    else:
+        raise RuntimeError(
+            f"案例集合不存在，可用集合: {collection_names}，"
+            f"需要: {EMERGENCY_CASES_COLLECTION} 或 rag_案例"
+        )
+    return _cases_collection
+
+
+def _format_case(payload: Dict[str, Any], score: Optional[float], point_id: Any) -> Dict[str, Any]:
+    """检索结果 payload -> 案例字典（payload 缺少 case_id 时回退为 Qdrant 点 ID）"""
+    return {
+        "case_id": payload.get("case_id", str(point_id)),
+        "title": payload.get("title", "未知案例"),
+        "disaster_type": payload.get("disaster_type", "unknown"),
+        "description": payload.get("description", payload.get("content", "")),
+        "lessons_learned": payload.get("lessons_learned", []),
+        "best_practices": payload.get("best_practices", []),
+        "similarity_score": float(score) if score else 0.0,
+    }
 
 
 # ============================================================================
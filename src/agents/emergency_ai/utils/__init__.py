@@ -6,9 +6,22 @@ from .mt_library import (
     TaskChainConfig,
     MetaTaskDict,
 )
+from .llm_cache import (
+    LLMCacheConfig,
+    LLMResponseCache,
+    get_llm_cache,
+    get_all_llm_cache_stats,
+    normalize_prompt_text,
+)
 
 __all__ = [
     "get_meta_task",
     "TaskChainConfig",
     "MetaTaskDict",
+    # LLM缓存
+    "LLMCacheConfig",
+    "LLMResponseCache",
+    "get_llm_cache",
+    "get_all_llm_cache_stats",
+    "normalize_prompt_text",
 ]
@@ -0,0 +1,413 @@
+"""
+LLM响应缓存
+
+为应急AI的LLM调用提供两级缓存与并发合并：
+- 精确匹配层：按 规范化提示词 + 模型参数 计算SHA256键，LRU + TTL淘汰
+- 语义相似层：对主文本（如灾情描述）做embedding，同一作用域内余弦相似度超过阈值即命中
+- 请求合并：相同键的并发请求只发起一次LLM调用，其余等待同一结果
+
+LLM调用失败不缓存，异常原样传递给所有等待者；LLM调用在独立任务中执行，
+首个请求方被取消不影响其他等待者。
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+EmbedFunc = Callable[[str], Awaitable[List[float]]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class LLMCacheConfig:
+    """LLM缓存配置"""
+    enabled: bool = True                 # 是否启用缓存
+    max_entries: int = 256               # 精确层最大条目数
+    ttl_seconds: float = 1800.0          # 条目存活时间(秒)
+    semantic_enabled: bool = False       # 是否启用语义相似层
+    semantic_threshold: float = 0.97     # 语义命中的余弦相似度阈值
+    semantic_max_entries: int = 128      # 语义层最大条目数
+
+
+@dataclass
+class _CacheEntry:
+    """缓存条目"""
+    value: Any
+    expires_at: float
+
+
+@dataclass
+class _SemanticEntry:
+    """语义层条目：作用域内的归一化向量及对应精确键"""
+    scope: str
+    vector: List[float]
+    key: str
+    expires_at: float
+
+
+@dataclass
+class _NamespaceStats:
+    """单个命名空间的命中与延迟统计"""
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    errors: int = 0
+    llm_calls: int = 0
+    llm_total_ms: float = 0.0
+    llm_max_ms: float = 0.0
+    lookup_total_ms: float = 0.0
+    requests: int = 0
+    last_latency_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        hits = self.exact_hits + self.semantic_hits + self.coalesced
+        return {
+            "requests": self.requests,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(hits / self.requests, 4) if self.requests else 0.0,
+            "llm_calls": self.llm_calls,
+            "llm_avg_ms": round(self.llm_total_ms / self.llm_calls, 1) if self.llm_calls else 0.0,
+            "llm_max_ms": round(self.llm_max_ms, 1),
+            "avg_latency_ms": round(self.lookup_total_ms / self.requests, 1) if self.requests else 0.0,
+            "last_latency_ms": round(self.last_latency_ms, 1),
+        }
+
+
+def normalize_prompt_text(text: str) -> str:
+    """
+    规范化提示词文本
+
+    全角转半角(NFKC)、合并连续空白、去除首尾空白、英文小写，
+    使仅有格式差异的重复提交落到同一缓存键。
+    """
+    normalized = unicodedata.normalize("NFKC", text)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    return normalized.lower()
+
+
+def _normalize_value(value: Any) -> Any:
+    """递归规范化提示词变量"""
+    if isinstance(value, str):
+        return normalize_prompt_text(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    return value
+
+
+def _hash_payload(payload: Any) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _unit_vector(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return list(vector)
+    return [v / norm for v in vector]
+
+
+class LLMResponseCache:
+    """
+    LLM响应缓存
+
+    用法:
+        cache = LLMResponseCache("emergency_ai", LLMCacheConfig(), embed_func=embed)
+        result = await cache.get_or_call(
+            namespace="parse_disaster",
+            model_params={"model": "...", "max_tokens": 4096},
+            prompt_vars={"description": desc, "context_info": ctx},
+            call=lambda: chain.ainvoke(...),
+            semantic_field="description",
+        )
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[LLMCacheConfig] = None,
+        embed_func: Optional[EmbedFunc] = None,
+    ) -> None:
+        self.name = name
+        self.config = config or LLMCacheConfig()
+        self._embed_func = embed_func
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._semantic: "OrderedDict[str, _SemanticEntry]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._stats: Dict[str, _NamespaceStats] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 键计算
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build_key(
+        namespace: str,
+        model_params: Dict[str, Any],
+        prompt_vars: Dict[str, Any],
+    ) -> str:
+        """计算精确匹配键"""
+        return _hash_payload({
+            "ns": namespace,
+            "params": model_params,
+            "vars": _normalize_value(prompt_vars),
+        })
+
+    # ------------------------------------------------------------------
+    # 存取
+    # ------------------------------------------------------------------
+
+    def _get_exact(self, key: str, now: float) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self._semantic.pop(key, None)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    def _put(
+        self,
+        key: str,
+        value: Any,
+        now: float,
+        scope: Optional[str] = None,
+        vector: Optional[List[float]] = None,
+    ) -> None:
+        expires_at = now + self.config.ttl_seconds
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=copy.deepcopy(value), expires_at=expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._semantic.pop(evicted, None)
+            if scope is not None and vector is not None:
+                self._semantic[key] = _SemanticEntry(
+                    scope=scope, vector=vector, key=key, expires_at=expires_at,
+                )
+                self._semantic.move_to_end(key)
+                while len(self._semantic) > self.config.semantic_max_entries:
+                    self._semantic.popitem(last=False)
+
+    def _find_similar(self, scope: str, vector: List[float], now: float) -> Optional[str]:
+        """在同一作用域内查找相似度最高且超过阈值的条目"""
+        best_key: Optional[str] = None
+        best_score = self.config.semantic_threshold
+        with self._lock:
+            for key, entry in list(self._semantic.items()):
+                if entry.expires_at <= now:
+                    del self._semantic[key]
+                    continue
+                if entry.scope != scope or len(entry.vector) != len(vector):
+                    continue
+                score = sum(a * b for a, b in zip(entry.vector, vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return best_key
+
+    def _ns_stats(self, namespace: str) -> _NamespaceStats:
+        with self._lock:
+            stats = self._stats.get(namespace)
+            if stats is None:
+                stats = _NamespaceStats()
+                self._stats[namespace] = stats
+            return stats
+
+    def _record(self, namespace: str, outcome: str, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self._ns_stats(namespace)
+        with self._lock:
+            stats.requests += 1
+            stats.lookup_total_ms += elapsed_ms
+            stats.last_latency_ms = elapsed_ms
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+        logger.info(
+            f"[LLM缓存] {namespace} {outcome} ({elapsed_ms:.0f}ms)",
+            extra={"cache": self.name, "namespace": namespace, "outcome": outcome},
+        )
+
+    # ------------------------------------------------------------------
+    # 主入口
+    # ------------------------------------------------------------------
+
+    async def get_or_call(
+        self,
+        *,
+        namespace: str,
+        model_params: Dict[str, Any],
+        prompt_vars: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        semantic_field: Optional[str] = None,
+    ) -> Any:
+        """
+        读取缓存或调用LLM
+
+        Args:
+            namespace: 调用类别（如 parse_disaster / explain_scheme）
+            model_params: 影响输出的模型参数（模型名、max_tokens等）
+            prompt_vars: 提示词模板变量
+            call: 缓存未命中时执行的LLM调用
+            semantic_field: 参与语义相似匹配的变量名，其余变量须精确一致
+
+        Returns:
+            LLM结果（深拷贝，调用方可自由修改）
+        """
+        started = time.perf_counter()
+        if not self.config.enabled:
+            value = await self._timed_call(namespace, call)
+            self._record(namespace, "misses", started)
+            return value
+
+        key = self.build_key(namespace, model_params, prompt_vars)
+        hit, value = self._get_exact(key, time.time())
+        if hit:
+            self._record(namespace, "exact_hits", started)
+            return copy.deepcopy(value)
+
+        coalesced = self._inflight.pending(key)
+        try:
+            value, outcome = await self._inflight.run(key, lambda: self._resolve(
+                key, namespace, model_params, prompt_vars, call, semantic_field,
+            ))
+        except Exception:
+            if not coalesced:
+                self._record(namespace, "errors", started)
+            raise
+
+        self._record(namespace, "coalesced" if coalesced else outcome, started)
+        return copy.deepcopy(value)
+
+    async def _resolve(
+        self,
+        key: str,
+        namespace: str,
+        model_params: Dict[str, Any],
+        prompt_vars: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        semantic_field: Optional[str],
+    ) -> Tuple[Any, str]:
+        """语义层查找，未命中则调用LLM并写入缓存"""
+        scope: Optional[str] = None
+        vector: Optional[List[float]] = None
+        semantic_text = prompt_vars.get(semantic_field) if semantic_field else None
+
+        if (
+            self.config.semantic_enabled
+            and self._embed_func is not None
+            and isinstance(semantic_text, str)
+            and semantic_text.strip()
+        ):
+            scope_vars = {k: v for k, v in prompt_vars.items() if k != semantic_field}
+            scope = self.build_key(namespace, model_params, scope_vars)
+            try:
+                vector = _unit_vector(await self._embed_func(normalize_prompt_text(semantic_text)))
+            except Exception as e:
+                logger.warning(f"[LLM缓存] embedding失败，跳过语义层: {e}")
+                vector = None
+            if vector is not None:
+                now = time.time()
+                similar_key = self._find_similar(scope, vector, now)
+                if similar_key is not None:
+                    hit, value = self._get_exact(similar_key, now)
+                    if hit:
+                        self._put(key, value, now)
+                        return value, "semantic_hits"
+
+        value = await self._timed_call(namespace, call)
+        self._put(key, value, time.time(), scope=scope, vector=vector)
+        return value, "misses"
+
+    async def _timed_call(self, namespace: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await call()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats = self._ns_stats(namespace)
+            with self._lock:
+                stats.llm_calls += 1
+                stats.llm_total_ms += elapsed_ms
+                stats.llm_max_ms = max(stats.llm_max_ms, elapsed_ms)
+
+    # ------------------------------------------------------------------
+    # 统计与维护
+    # ------------------------------------------------------------------
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "enabled": self.config.enabled,
+                "semantic_enabled": self.config.semantic_enabled and self._embed_func is not None,
+                "entries": len(self._entries),
+                "semantic_entries": len(self._semantic),
+                "inflight": len(self._inflight),
+                "namespaces": {ns: s.to_dict() for ns, s in self._stats.items()},
+            }
+
+    def clear(self) -> None:
+        """清空缓存条目（保留统计）"""
+        with self._lock:
+            self._entries.clear()
+            self._semantic.clear()
+            logger.info(f"LLM缓存[{self.name}]已清空")
+
+
+# 全局缓存注册表
+_llm_caches: Dict[str, LLMResponseCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_llm_cache(
+    name: str,
+    config: Optional[LLMCacheConfig] = None,
+    embed_func: Optional[EmbedFunc] = None,
+) -> LLMResponseCache:
+    """
+    获取或创建LLM缓存
+
+    Args:
+        name: 缓存名称（唯一标识）
+        config: 首次创建时使用的配置
+        embed_func: 首次创建时使用的异步embedding函数
+
+    Returns:
+        LLM缓存实例
+    """
+    with _registry_lock:
+        if name not in _llm_caches:
+            _llm_caches[name] = LLMResponseCache(name, config, embed_func)
+        return _llm_caches[name]
+
+
+def get_all_llm_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有LLM缓存统计"""
+    with _registry_lock:
+        return {name: cache.stats for name, cache in _llm_caches.items()}
@@ -0,0 +1,150 @@
+"""
+EmergencyAI节点计时与延迟预算
+
+并行分支下多个节点会在同一步写入trace/errors，因此：
+- 节点包装器把节点返回的完整trace换算成增量(delta)，由 merge_trace reducer 合并，
+  计数器相加、列表追加、其余字段覆盖，并行分支的修改不会互相丢失
+- errors 只返回新增部分，由 operator.add 追加
+- 每个节点的耗时写入 trace["node_timings_ms"]
+
+延迟预算模式：
+    constraints["latency_budget_ms"] 给出端到端预算，create_initial_state 据此设置 deadline_at。
+    可选阶段（方案解释、仿真等）执行前若剩余预算不足其预估耗时，直接跳过，
+    跳过的阶段记录在 trace["skipped_stages"]。
+"""
+from __future__ import annotations
+
+import copy
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# trace增量标记
+TRACE_DELTA_MARK = "__trace_delta__"
+
+# 可选阶段的预估耗时（毫秒），剩余预算低于该值时跳过
+OPTIONAL_STAGE_COST_MS: Dict[str, int] = {
+    "enhance_with_cases": 1500,
+    "explain_scheme": 15000,
+    "generate_reports": 1000,
+    "run_simulation": 5000,
+}
+
+NodeFunc = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compute_trace_delta(before: Mapping[str, Any], after: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    计算节点对trace的修改
+
+    - 数值字段增大：记为增量（并行节点的llm_calls等计数可相加）
+    - 列表字段以原列表为前缀：记为追加
+    - 其余新增或变化的字段：记为覆盖
+    """
+    incr: Dict[str, float] = {}
+    extend: Dict[str, List[Any]] = {}
+    overwrite: Dict[str, Any] = {}
+    for key, value in after.items():
+        if key not in before:
+            overwrite[key] = value
+            continue
+        old = before[key]
+        if value == old:
+            continue
+        if _is_number(value) and _is_number(old):
+            incr[key] = value - old
+        elif isinstance(value, list) and isinstance(old, list) and value[:len(old)] == old:
+            extend[key] = value[len(old):]
+        else:
+            overwrite[key] = value
+    return {TRACE_DELTA_MARK: True, "incr": incr, "extend": extend, "set": overwrite, "merge": {}}
+
+
+def merge_trace(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    trace字段的reducer
+
+    right为增量时合并到left的副本上；否则视为整体替换（初始状态等）。
+    """
+    if right is None:
+        return left or {}
+    if not right.get(TRACE_DELTA_MARK):
+        return right
+    merged = dict(left or {})
+    for key, value in right.get("incr", {}).items():
+        merged[key] = merged.get(key, 0) + value
+    for key, items in right.get("extend", {}).items():
+        merged[key] = list(merged.get(key, [])) + list(items)
+    merged.update(right.get("set", {}))
+    for key, items in right.get("merge", {}).items():
+        merged[key] = {**merged.get(key, {}), **items}
+    return merged
+
+
+def keep_last(left: Any, right: Any) -> Any:
+    """并行分支同一步写入时取最后一个值（用于current_phase）"""
+    return right
+
+
+def remaining_budget_ms(state: Mapping[str, Any]) -> Optional[float]:
+    """剩余延迟预算（毫秒），未设置预算时返回None"""
+    deadline_at = state.get("deadline_at")
+    if not deadline_at:
+        return None
+    return (deadline_at - time.time()) * 1000
+
+
+def instrument_node(name: str, func: NodeFunc, optional: bool = False) -> NodeFunc:
+    """
+    包装图节点：计时、trace增量化、errors增量化，可选阶段受延迟预算控制
+
+    Args:
+        name: 节点名
+        func: 原节点函数
+        optional: 是否为可选阶段（预算不足时跳过）
+    """
+
+    @functools.wraps(func)
+    async def _wrapped(state: Dict[str, Any]) -> Dict[str, Any]:
+        trace_before = state.get("trace") or {}
+        errors_before = list(state.get("errors") or [])
+
+        if optional:
+            remaining = remaining_budget_ms(state)
+            cost = OPTIONAL_STAGE_COST_MS.get(name, 0)
+            if remaining is not None and remaining < cost:
+                logger.warning(
+                    f"延迟预算不足，跳过可选阶段: {name}",
+                    extra={"remaining_ms": int(remaining), "estimated_ms": cost},
+                )
+                delta = compute_trace_delta(trace_before, trace_before)
+                delta["extend"]["skipped_stages"] = [name]
+                return {"trace": delta}
+
+        # 节点会原地修改trace，传入副本以免并行分支共享同一对象
+        node_state = {**state, "trace": copy.deepcopy(trace_before), "errors": list(errors_before)}
+        started = time.perf_counter()
+        update = await func(node_state) or {}
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        update = dict(update)
+        trace_after = update.get("trace", node_state["trace"])
+        delta = compute_trace_delta(trace_before, trace_after)
+        delta["merge"]["node_timings_ms"] = {name: elapsed_ms}
+        update["trace"] = delta
+
+        if "errors" in update:
+            new_errors = list(update["errors"] or [])
+            if new_errors[:len(errors_before)] == errors_before:
+                new_errors = new_errors[len(errors_before):]
+            update["errors"] = new_errors
+        return update
+
+    return _wrapped
@@ -13,8 +13,8 @@ import uuid
 from typing import Any
 
 from langgraph.checkpoint.base import BaseCheckpointSaver
-from langgraph.checkpoint.memory import MemorySaver
 
+from src.agents.base.checkpoint import create_checkpointer
 from src.agents.frontline_rescue.graph import build_frontline_rescue_graph
 from src.agents.frontline_rescue.state import FrontlineRescueState
 
@@ -31,7 +31,7 @@ class FrontlineRescueAgent:
     """
 
     def __init__(self, checkpointer: BaseCheckpointSaver | None = None) -> None:
-        self.checkpointer = checkpointer or MemorySaver()
+        self.checkpointer = checkpointer or create_checkpointer("frontline_rescue")
         self.graph = build_frontline_rescue_graph(self.checkpointer)
         logger.info("FrontlineRescueAgent initialized")
 
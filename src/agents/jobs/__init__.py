@@ -0,0 +1,22 @@
+"""
+Agent作业子系统
+
+将耗时的Agent流水线（应急分析、路径规划等）从API请求处理中剥离：
+- queue: 本地/Redis Stream作业队列（含去重）
+- manager: 按类型配置并发的worker池与延迟统计
+- result_store: 有界LRU/TTL结果缓存
+- worker: 独立worker进程入口
+"""
+from .manager import AgentJobManager, get_job_manager
+from .queue import JobMessage, JobQueueFullError, LocalJobQueue, RedisStreamJobQueue
+from .result_store import BoundedResultStore
+
+__all__ = [
+    "AgentJobManager",
+    "get_job_manager",
+    "JobMessage",
+    "JobQueueFullError",
+    "LocalJobQueue",
+    "RedisStreamJobQueue",
+    "BoundedResultStore",
+]
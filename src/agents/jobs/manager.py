@@ -0,0 +1,282 @@
+"""
+Agent作业管理器
+
+负责作业提交（去重）、按Agent类型分配并发的worker池、作业超时与延迟统计。
+
+部署方式：
+- local后端：API进程内启动worker（默认，无需额外进程）
+- redis后端：API进程只入队；由独立进程 `python -m src.agents.jobs.worker` 消费，
+  也可通过 agent_job_inprocess_workers 让API进程同时消费
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .queue import (
+    JobMessage,
+    JobQueue,
+    JobQueueFullError,
+    LocalJobQueue,
+    RedisStreamJobQueue,
+    default_consumer_name,
+)
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+JobFailureHandler = Callable[[str, Dict[str, Any], str], Awaitable[None]]
+
+# 延迟采样窗口大小
+_LATENCY_WINDOW = 200
+
+
+@dataclass
+class _AgentJobType:
+    """已注册的作业类型"""
+    name: str
+    handler: JobHandler
+    concurrency: int
+    on_failure: Optional[JobFailureHandler] = None
+
+
+@dataclass
+class _JobTypeStats:
+    """单个作业类型的统计"""
+    submitted: int = 0
+    deduplicated: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    running: int = 0
+    wait_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    run_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+
+    @staticmethod
+    def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+        if not samples:
+            return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(samples)
+        n = len(ordered)
+        return {
+            "avg": round(sum(ordered) / n, 1),
+            "p50": round(ordered[int(0.5 * (n - 1))], 1),
+            "p95": round(ordered[int(0.95 * (n - 1))], 1),
+            "max": round(ordered[-1], 1),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "running": self.running,
+            "queue_wait_ms": self._percentiles(self.wait_ms),
+            "run_ms": self._percentiles(self.run_ms),
+        }
+
+
+class AgentJobManager:
+    """
+    Agent作业管理器
+
+    用法:
+        manager = get_job_manager()
+        manager.register("emergency_analyze", handler, concurrency=2)
+        accepted = await manager.submit("emergency_analyze", task_id, payload)
+        await manager.start()   # 启动worker
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency_overrides: Optional[Dict[str, int]] = None,
+        job_timeout: float = 600.0,
+        poll_timeout: float = 5.0,
+    ) -> None:
+        self._queue = queue
+        self._concurrency_overrides = concurrency_overrides or {}
+        self._job_timeout = job_timeout
+        self._poll_timeout = poll_timeout
+        self._types: Dict[str, _AgentJobType] = {}
+        self._stats: Dict[str, _JobTypeStats] = {}
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+
+    @property
+    def queue(self) -> JobQueue:
+        return self._queue
+
+    def register(
+        self,
+        agent_type: str,
+        handler: JobHandler,
+        concurrency: int = 1,
+        on_failure: Optional[JobFailureHandler] = None,
+    ) -> None:
+        """
+        注册作业类型
+
+        Args:
+            agent_type: 作业类型名
+            handler: 作业处理函数 (job_id, payload)
+            concurrency: 默认并发数，可被 agent_job_concurrency 配置覆盖
+            on_failure: 超时或未捕获异常时的回调 (job_id, payload, error)，用于落盘失败结果
+        """
+        concurrency = self._concurrency_overrides.get(agent_type, concurrency)
+        if concurrency <= 0:
+            raise ValueError(f"作业类型[{agent_type}]并发数必须大于0")
+        self._types[agent_type] = _AgentJobType(agent_type, handler, concurrency, on_failure)
+        self._stats.setdefault(agent_type, _JobTypeStats())
+
+    async def submit(self, agent_type: str, job_id: str, payload: Dict[str, Any]) -> bool:
+        """
+        提交作业
+
+        Returns:
+            True表示已入队；False表示相同job_id正在排队或执行（已去重）
+
+        Raises:
+            JobQueueFullError: 队列已满
+        """
+        if agent_type not in self._types:
+            raise ValueError(f"未注册的作业类型: {agent_type}")
+        stats = self._stats[agent_type]
+        message = JobMessage(agent_type=agent_type, job_id=job_id, payload=payload)
+        try:
+            accepted = await self._queue.enqueue(message, dedup_ttl=int(self._job_timeout) + 60)
+        except JobQueueFullError:
+            stats.rejected += 1
+            logger.warning(f"[Jobs] 作业队列已满，拒绝提交 type={agent_type} job_id={job_id}")
+            raise
+        if accepted:
+            stats.submitted += 1
+            logger.info(f"[Jobs] 作业已入队 type={agent_type} job_id={job_id}")
+        else:
+            stats.deduplicated += 1
+            logger.info(f"[Jobs] 作业正在处理，忽略重复提交 type={agent_type} job_id={job_id}")
+        return accepted
+
+    async def start(self) -> None:
+        """为每个作业类型启动worker协程"""
+        if self._running:
+            return
+        self._running = True
+        index = 0
+        for job_type in self._types.values():
+            for _ in range(job_type.concurrency):
+                consumer = default_consumer_name(index)
+                index += 1
+                self._workers.append(asyncio.create_task(
+                    self._worker_loop(job_type, consumer),
+                    name=f"agent-job-{job_type.name}-{consumer}",
+                ))
+        logger.info(f"[Jobs] worker已启动: {len(self._workers)}个")
+
+    async def stop(self) -> None:
+        """停止全部worker（执行中的作业被取消）"""
+        self._running = False
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        logger.info("[Jobs] worker已停止")
+
+    async def _worker_loop(self, job_type: _AgentJobType, consumer: str) -> None:
+        while self._running:
+            try:
+                message = await self._queue.dequeue(job_type.name, consumer, self._poll_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[Jobs] 拉取作业失败 type={job_type.name}: {e}")
+                await asyncio.sleep(self._poll_timeout)
+                continue
+            if message is None:
+                continue
+            await self._execute(job_type, message)
+
+    async def _execute(self, job_type: _AgentJobType, message: JobMessage) -> None:
+        stats = self._stats[job_type.name]
+        started = time.time()
+        stats.wait_ms.append(max(0.0, (started - message.enqueued_at) * 1000))
+        stats.running += 1
+        error: Optional[str] = None
+        try:
+            await asyncio.wait_for(
+                job_type.handler(message.job_id, message.payload), timeout=self._job_timeout,
+            )
+            stats.completed += 1
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            error = f"作业执行超时({self._job_timeout:.0f}s)"
+            logger.error(f"[Jobs] 作业超时 type={job_type.name} job_id={message.job_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.failed += 1
+            error = str(e)
+            logger.exception(f"[Jobs] 作业失败 type={job_type.name} job_id={message.job_id}: {e}")
+        finally:
+            stats.running -= 1
+            stats.run_ms.append((time.time() - started) * 1000)
+        if error is not None and job_type.on_failure is not None:
+            try:
+                await job_type.on_failure(message.job_id, message.payload, error)
+            except Exception as e:
+                logger.warning(f"[Jobs] 失败回调异常 job_id={message.job_id}: {e}")
+        try:
+            await self._queue.ack(message)
+        except Exception as e:
+            logger.warning(f"[Jobs] 作业确认失败 job_id={message.job_id}: {e}")
+
+    async def stats(self) -> Dict[str, Any]:
+        """作业统计：队列长度、执行中数量、排队/执行延迟"""
+        result: Dict[str, Any] = {
+            "backend": type(self._queue).__name__,
+            "workers_running": self._running,
+            "types": {},
+        }
+        for name, job_type in self._types.items():
+            try:
+                queue_length: Optional[int] = await self._queue.length(name)
+            except Exception as e:
+                logger.warning(f"[Jobs] 获取队列长度失败 type={name}: {e}")
+                queue_length = None
+            result["types"][name] = {
+                "concurrency": job_type.concurrency,
+                "queue_length": queue_length,
+                **self._stats[name].to_dict(),
+            }
+        return result
+
+
+_job_manager: Optional[AgentJobManager] = None
+
+
+def get_job_manager() -> AgentJobManager:
+    """获取全局作业管理器（按配置选择队列后端）"""
+    global _job_manager
+    if _job_manager is None:
+        from src.core.config import settings
+        backend = settings.agent_job_backend.lower()
+        if backend == "redis":
+            queue: JobQueue = RedisStreamJobQueue(max_length=settings.agent_job_max_queue_length)
+        elif backend == "local":
+            queue = LocalJobQueue(max_length=settings.agent_job_max_queue_length)
+        else:
+            raise ValueError(f"未知的作业队列后端: {settings.agent_job_backend}")
+        _job_manager = AgentJobManager(
+            queue,
+            concurrency_overrides=settings.agent_job_concurrency,
+            job_timeout=settings.agent_job_timeout_seconds,
+        )
+    return _job_manager
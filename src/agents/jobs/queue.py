@@ -0,0 +1,231 @@
+"""
+Agent作业队列
+
+两种实现，接口一致：
+- LocalJobQueue: 进程内asyncio队列（开发/单进程部署的替身）
+- RedisStreamJobQueue: Redis Stream + 消费者组，支持独立worker进程消费、
+  ack确认与崩溃worker遗留消息的认领(XAUTOCLAIM)
+
+去重：同一job_id在排队或执行期间重复提交会被拒绝。
+有界：max_length>0 时，队列内未完成作业达到上限后拒绝入队（JobQueueFullError，HTTP 503）。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol
+
+from src.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+JOB_STREAM_PREFIX = "agent_jobs:"
+JOB_INFLIGHT_PREFIX = "agent_job_inflight:"
+JOB_CONSUMER_GROUP = "agent_workers"
+
+# XREADGROUP 单次阻塞上限：必须小于共享Redis客户端的 socket_timeout(5s)，
+# 否则空闲阻塞读会先触发读超时，被当作拉取失败
+_MAX_BLOCK_MS = 2000
+
+
+class JobQueueFullError(AppException):
+    """作业队列已满"""
+    def __init__(self, agent_type: str, max_length: int):
+        super().__init__(
+            status_code=503,
+            error_code="JOB_QUEUE_FULL",
+            message=f"作业队列已满({max_length})，请稍后重试: {agent_type}",
+        )
+
+
+@dataclass
+class JobMessage:
+    """作业消息"""
+    agent_type: str
+    job_id: str
+    payload: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.time)
+    delivery_id: Optional[str] = None  # 队列内部投递ID（Redis消息ID）
+
+    def to_fields(self) -> Dict[str, str]:
+        return {
+            "job_id": self.job_id,
+            "payload": json.dumps(self.payload, ensure_ascii=False, default=str),
+            "enqueued_at": str(self.enqueued_at),
+        }
+
+    @classmethod
+    def from_fields(cls, agent_type: str, delivery_id: str, fields: Dict[str, str]) -> "JobMessage":
+        return cls(
+            agent_type=agent_type,
+            job_id=fields["job_id"],
+            payload=json.loads(fields["payload"]),
+            enqueued_at=float(fields.get("enqueued_at", time.time())),
+            delivery_id=delivery_id,
+        )
+
+
+class JobQueue(Protocol):
+    """作业队列接口"""
+
+    async def enqueue(self, message: JobMessage, dedup_ttl: int) -> bool:
+        """入队，job_id正在排队或执行时返回False；队列已满抛 JobQueueFullError"""
+        ...
+
+    async def dequeue(self, agent_type: str, consumer: str, timeout: float) -> Optional[JobMessage]:
+        """取出一条作业，超时返回None"""
+        ...
+
+    async def ack(self, message: JobMessage) -> None:
+        """确认作业完成并释放去重标记"""
+        ...
+
+    async def length(self, agent_type: str) -> int:
+        """排队中的作业数"""
+        ...
+
+
+class LocalJobQueue:
+    """进程内作业队列"""
+
+    def __init__(self, max_length: int = 0) -> None:
+        self._max_length = max_length
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._inflight: set[str] = set()
+
+    def _queue(self, agent_type: str) -> asyncio.Queue:
+        queue = self._queues.get(agent_type)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[agent_type] = queue
+        return queue
+
+    async def enqueue(self, message: JobMessage, dedup_ttl: int) -> bool:
+        if message.job_id in self._inflight:
+            return False
+        if self._max_length > 0 and self._queue(message.agent_type).qsize() >= self._max_length:
+            raise JobQueueFullError(message.agent_type, self._max_length)
+        self._inflight.add(message.job_id)
+        await self._queue(message.agent_type).put(message)
+        return True
+
+    async def dequeue(self, agent_type: str, consumer: str, timeout: float) -> Optional[JobMessage]:
+        try:
+            return await asyncio.wait_for(self._queue(agent_type).get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, message: JobMessage) -> None:
+        self._inflight.discard(message.job_id)
+
+    async def length(self, agent_type: str) -> int:
+        return self._queue(agent_type).qsize()
+
+
+class RedisStreamJobQueue:
+    """基于Redis Stream的持久化作业队列"""
+
+    def __init__(self, claim_idle_ms: int = 600_000, max_length: int = 0, client: Any = None) -> None:
+        """
+        Args:
+            claim_idle_ms: 未确认消息空闲多久后可被其他worker认领
+            max_length: 单个作业类型的未完成作业上限（含执行中），0 表示不限
+            client: 自定义Redis客户端（测试可传入 fakeredis），默认全局客户端
+        """
+        self._claim_idle_ms = claim_idle_ms
+        self._max_length = max_length
+        self._redis = client
+        self._groups_ready: set[str] = set()
+
+    async def _client(self) -> Any:
+        if self._redis is not None:
+            return self._redis
+        from src.core.redis import get_redis_client
+        return await get_redis_client()
+
+    async def _ensure_group(self, client: Any, stream: str) -> None:
+        if stream in self._groups_ready:
+            return
+        try:
+            await client.xgroup_create(stream, JOB_CONSUMER_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_ready.add(stream)
+
+    async def enqueue(self, message: JobMessage, dedup_ttl: int) -> bool:
+        client = await self._client()
+        stream = f"{JOB_STREAM_PREFIX}{message.agent_type}"
+        # 已确认的消息会被 XDEL，流长度即未完成作业数
+        if self._max_length > 0 and int(await client.xlen(stream)) >= self._max_length:
+            if await client.exists(f"{JOB_INFLIGHT_PREFIX}{message.job_id}"):
+                return False
+            raise JobQueueFullError(message.agent_type, self._max_length)
+        acquired = await client.set(
+            f"{JOB_INFLIGHT_PREFIX}{message.job_id}", message.agent_type, nx=True, ex=dedup_ttl,
+        )
+        if not acquired:
+            return False
+        await self._ensure_group(client, stream)
+        message.delivery_id = await client.xadd(stream, message.to_fields())
+        return True
+
+    async def dequeue(self, agent_type: str, consumer: str, timeout: float) -> Optional[JobMessage]:
+        """阻塞读取 min(timeout, 2s)，空闲返回None由调用方继续轮询"""
+        client = await self._client()
+        stream = f"{JOB_STREAM_PREFIX}{agent_type}"
+        await self._ensure_group(client, stream)
+
+        response = await client.xreadgroup(
+            JOB_CONSUMER_GROUP, consumer, {stream: ">"}, count=1,
+            block=max(1, min(int(timeout * 1000), _MAX_BLOCK_MS)),
+        )
+        if response:
+            _, entries = response[0]
+            if entries:
+                delivery_id, fields = entries[0]
+                return JobMessage.from_fields(agent_type, delivery_id, fields)
+
+        # 空闲时认领崩溃worker遗留的未确认消息
+        claimed = await client.xautoclaim(
+            stream, JOB_CONSUMER_GROUP, consumer, min_idle_time=self._claim_idle_ms, count=1,
+        )
+        entries = claimed[1] if claimed and len(claimed) > 1 else []
+        if entries:
+            delivery_id, fields = entries[0]
+            if fields:
+                logger.warning(f"[JobQueue] 认领超时未确认作业 stream={stream} id={delivery_id}")
+                return JobMessage.from_fields(agent_type, delivery_id, fields)
+        return None
+
+    async def ack(self, message: JobMessage) -> None:
+        client = await self._client()
+        stream = f"{JOB_STREAM_PREFIX}{message.agent_type}"
+        if message.delivery_id:
+            await client.xack(stream, JOB_CONSUMER_GROUP, message.delivery_id)
+            await client.xdel(stream, message.delivery_id)
+        await client.delete(f"{JOB_INFLIGHT_PREFIX}{message.job_id}")
+
+    async def length(self, agent_type: str) -> int:
+        client = await self._client()
+        stream = f"{JOB_STREAM_PREFIX}{agent_type}"
+        try:
+            groups: List[Dict[str, Any]] = await client.xinfo_groups(stream)
+        except Exception:
+            return 0
+        for group in groups:
+            if group.get("name") == JOB_CONSUMER_GROUP:
+                lag = group.get("lag")
+                if lag is not None:
+                    return int(lag)
+        return int(await client.xlen(stream))
+
+
+def default_consumer_name(index: int) -> str:
+    """worker消费者名称：主机名-进程号-序号"""
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
@@ -0,0 +1,108 @@
+"""
+有界任务结果存储
+
+替代模块级无界字典：内存层按LRU + TTL淘汰，超出容量或过期的结果
+仍可通过Redis镜像取回（由调用方负责写入Redis）。
+
+保持dict风格接口（get / [] / in），可直接替换原 _task_results。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class BoundedResultStore:
+    """
+    LRU + TTL 的有界结果存储
+
+    用法:
+        store = BoundedResultStore(max_entries=500, ttl_seconds=36000)
+        store[task_id] = result
+        result = store.get(task_id)
+    """
+
+    def __init__(self, max_entries: int = 500, ttl_seconds: float = 36000.0) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries必须大于0")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def _purge_expired(self, now: float) -> None:
+        """清理过期条目（调用方持有锁）"""
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                # 仅清理LRU端的过期条目；其余过期条目在get时惰性删除
+                break
+            del self._data[key]
+            self._expirations += 1
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """读取结果，过期视为不存在"""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self._expirations += 1
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            self._purge_expired(now)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._data.keys()))
+
+    def pop(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """获取存储统计"""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
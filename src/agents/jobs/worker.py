@@ -0,0 +1,46 @@
+"""
+独立Agent作业worker进程
+
+用法（需配置 AGENT_JOB_BACKEND=redis）:
+    python -m src.agents.jobs.worker
+
+导入 src.agents.router 以注册全部作业类型，然后持续消费Redis Stream。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+
+from .manager import get_job_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    """运行worker直到收到SIGINT/SIGTERM"""
+    from src.core.config import settings
+    from src.agents import router as _router  # noqa: F401  注册作业类型
+
+    if settings.agent_job_backend.lower() != "redis":
+        raise RuntimeError("独立worker需要 AGENT_JOB_BACKEND=redis")
+
+    manager = get_job_manager()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await manager.start()
+    logger.info("Agent作业worker已启动")
+    await stop_event.wait()
+    await manager.stop()
+
+    from src.core.redis import close_redis_client
+    await close_redis_client()
+    logger.info("Agent作业worker已退出")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
@@ -14,8 +14,8 @@ from datetime import datetime
 from typing import Any
 
 from langgraph.checkpoint.base import BaseCheckpointSaver
-from langgraph.checkpoint.memory import MemorySaver
 
+from src.agents.base.checkpoint import create_checkpointer
 from src.agents.overall_plan.graph import build_overall_plan_graph
 from src.agents.overall_plan.schemas import (
     MODULE_TITLES,
@@ -48,9 +48,9 @@ class OverallPlanAgent:
 
         Args:
             checkpointer: Optional checkpoint saver for persistence.
-                         Uses MemorySaver if not provided.
+                         Uses the configured pruned memory/Redis saver if not provided.
         """
-        self.checkpointer = checkpointer or MemorySaver()
+        self.checkpointer = checkpointer or create_checkpointer("overall_plan")
         self.graph = build_overall_plan_graph(self.checkpointer)
         logger.info("OverallPlanAgent initialized")
 
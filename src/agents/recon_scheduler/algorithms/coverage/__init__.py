@@ -1,12 +1,13 @@
 """覆盖扫描算法模块"""
 from __future__ import annotations
 
-from .zigzag import generate_zigzag_waypoints
+from .zigzag import generate_zigzag_waypoints, generate_multi_uav_zigzag_waypoints
 from .spiral import generate_spiral_waypoints
 from .circular import generate_circular_waypoints
 
 __all__ = [
     "generate_zigzag_waypoints",
+    "generate_multi_uav_zigzag_waypoints",
     "generate_spiral_waypoints",
     "generate_circular_waypoints",
 ]
@@ -0,0 +1,424 @@
+"""
+多边形裁剪的往返扫描覆盖规划
+
+Z字形航线的几何内核，在以多边形中心为原点的局部平面坐标（米）中计算：
+
+- 扫描线按多边形实际边界（含内洞）裁剪，不再飞出目标区域外接矩形
+- 扫描方向搜索：候选方向取凸包各边方向（旋转卡壳，最小宽度方向必在其中）、
+  多边形各边方向及每15°的粗网格，按 航程 + 转弯惩罚 择优
+- 凹多边形按扫描线段数变化（分裂/合并事件）切分为单调单元，单元内往返扫描，
+  单元之间最近邻衔接
+- 多机分区：沿扫描推进方向把扫描线切成连续条带，按各机速度均衡航时
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 与 zigzag 统计口径一致的经纬度换算系数
+METERS_PER_DEG = 111000.0
+
+Interval = Tuple[float, float]
+Segment = Tuple[Tuple[float, float], Tuple[float, float]]
+
+
+@dataclass(frozen=True)
+class LocalFrame:
+    """(lat, lng) 与局部平面坐标 (x=东, y=北，单位米) 的换算"""
+    lat0: float
+    lng0: float
+
+    @classmethod
+    def around(cls, polygon: Sequence[Tuple[float, float]]) -> "LocalFrame":
+        lats = [p[0] for p in polygon]
+        lngs = [p[1] for p in polygon]
+        return cls((min(lats) + max(lats)) / 2, (min(lngs) + max(lngs)) / 2)
+
+    @property
+    def _kx(self) -> float:
+        return METERS_PER_DEG * math.cos(math.radians(self.lat0))
+
+    def to_xy(self, points: Sequence[Tuple[float, float]]) -> np.ndarray:
+        arr = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return np.column_stack([(arr[:, 1] - self.lng0) * self._kx, (arr[:, 0] - self.lat0) * METERS_PER_DEG])
+
+    def to_latlng(self, x: float, y: float) -> Tuple[float, float]:
+        return self.lat0 + y / METERS_PER_DEG, self.lng0 + x / self._kx
+
+
+@dataclass
+class CoveragePath:
+    """一条覆盖路径（局部平面坐标）"""
+    heading_deg: float
+    segments: List[Segment] = field(default_factory=list)
+    scan_length_m: float = 0.0
+    transit_length_m: float = 0.0
+    cells: int = 0
+
+    @property
+    def turns(self) -> int:
+        return max(0, len(self.segments) - 1)
+
+    @property
+    def length_m(self) -> float:
+        return self.scan_length_m + self.transit_length_m
+
+    @property
+    def start(self) -> Optional[Tuple[float, float]]:
+        return self.segments[0][0] if self.segments else None
+
+
+# ============ 几何工具 ============
+
+def polygon_area_m2(rings: Sequence[np.ndarray]) -> float:
+    """多边形面积（外环减内洞），rings 为局部平面坐标"""
+    def _ring_area(ring: np.ndarray) -> float:
+        x, y = ring[:, 0], ring[:, 1]
+        return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))) / 2
+    if not rings:
+        return 0.0
+    return max(0.0, _ring_area(rings[0]) - sum(_ring_area(r) for r in rings[1:]))
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Andrew 单调链凸包，逆时针"""
+    pts = sorted(set(map(tuple, points.tolist())))
+    if len(pts) <= 2:
+        return np.asarray(pts, dtype=np.float64)
+
+    def _cross(o, a, b) -> float:
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: list = []
+    for p in pts:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper: list = []
+    for p in reversed(pts):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.asarray(lower[:-1] + upper[:-1], dtype=np.float64)
+
+
+def _edge_angles(ring: np.ndarray) -> np.ndarray:
+    """环各边方向角（弧度，模 π）"""
+    d = np.roll(ring, -1, axis=0) - ring
+    d = d[np.hypot(d[:, 0], d[:, 1]) > 1e-6]
+    return np.mod(np.arctan2(d[:, 1], d[:, 0]), math.pi)
+
+
+def candidate_angles(rings: Sequence[np.ndarray], coarse_step_deg: float = 15.0) -> List[float]:
+    """扫描方向候选（弧度，x 轴逆时针，模 π），按 0.5° 去重"""
+    angles = [_edge_angles(convex_hull(rings[0])), _edge_angles(rings[0])]
+    if coarse_step_deg > 0:
+        angles.append(np.radians(np.arange(0.0, 180.0, coarse_step_deg)))
+    merged = np.concatenate(angles)
+    _, idx = np.unique(np.round(np.degrees(merged) * 2) / 2 % 180, return_index=True)
+    return merged[np.sort(idx)].tolist()
+
+
+def _rotate(xy: np.ndarray, theta: float) -> np.ndarray:
+    """旋转 -theta，使方向 theta 对齐 x 轴"""
+    c, s = math.cos(theta), math.sin(theta)
+    return np.column_stack([xy[:, 0] * c + xy[:, 1] * s, -xy[:, 0] * s + xy[:, 1] * c])
+
+
+def _unrotate(x: float, y: float, theta: float) -> Tuple[float, float]:
+    c, s = math.cos(theta), math.sin(theta)
+    return x * c - y * s, x * s + y * c
+
+
+def heading_from_theta(theta: float) -> float:
+    """平面方向角（x 轴逆时针）→ 航向角（0=北，顺时针）"""
+    return (90.0 - math.degrees(theta)) % 360
+
+
+def theta_from_heading(heading_deg: float) -> float:
+    return math.radians(90.0 - heading_deg) % math.pi
+
+
+# ============ 扫描线 ============
+
+def sweep_intervals(
+    rings: Sequence[np.ndarray],
+    theta: float,
+    spacing_m: float,
+) -> Tuple[np.ndarray, List[List[Interval]]]:
+    """
+    计算方向 theta 的扫描线与多边形的交线段（旋转坐标系）
+
+    Returns:
+        (ys, intervals)：各扫描线的 y' 坐标，及每条线上按 x' 排序的 [(x_start, x_end), ...]
+    """
+    rotated = [_rotate(r, theta) for r in rings]
+    edges = np.vstack([np.hstack([r, np.roll(r, -1, axis=0)]) for r in rotated])
+    y_min = float(min(r[:, 1].min() for r in rotated))
+    y_max = float(max(r[:, 1].max() for r in rotated))
+    height = y_max - y_min
+    n_lines = max(1, math.ceil(height / spacing_m - 1e-9))
+    # 扫描线居中分布，两侧各留半个间距
+    offset = (height - (n_lines - 1) * spacing_m) / 2
+    ys = y_min + offset + np.arange(n_lines) * spacing_m
+
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    yy = ys[:, None]
+    crosses = (y1 <= yy) != (y2 <= yy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = np.where(crosses, x1 + (yy - y1) * (x2 - x1) / (y2 - y1), np.inf)
+    xs.sort(axis=1)
+    counts = crosses.sum(axis=1)
+
+    intervals: List[List[Interval]] = []
+    for row, count in zip(xs.tolist(), counts.tolist()):
+        count -= count % 2
+        intervals.append([
+            (row[k], row[k + 1]) for k in range(0, count, 2) if row[k + 1] - row[k] > 1e-6
+        ])
+    return ys, intervals
+
+
+def decompose_cells(ys: np.ndarray, intervals: List[List[Interval]]) -> List[List[Tuple[float, float, float]]]:
+    """
+    按扫描线段数变化切分单调单元（牛耕式分解）
+
+    相邻两条扫描线段数相同且逐段重叠时归入同一组单元，否则在此处关闭旧单元、开启新单元。
+
+    Returns:
+        单元列表，每个单元是 [(y, x_start, x_end), ...]（每条扫描线一段）
+    """
+    cells: List[List[Tuple[float, float, float]]] = []
+    active: List[int] = []
+    prev: List[Interval] = []
+    for y, row in zip(ys.tolist(), intervals):
+        continues = (
+            len(row) == len(prev) and row
+            and all(a[0] < b[1] and b[0] < a[1] for a, b in zip(prev, row))
+        )
+        if not continues:
+            active = []
+            for _ in row:
+                cells.append([])
+                active.append(len(cells) - 1)
+        for cell_idx, (xa, xb) in zip(active, row):
+            cells[cell_idx].append((y, xa, xb))
+        prev = row
+    return [c for c in cells if c]
+
+
+def _cell_variants(cell: List[Tuple[float, float, float]]) -> List[List[Segment]]:
+    """单元内往返扫描的4种进入方式（首/末线进入 × 左/右起飞）"""
+    variants = []
+    for lines in (cell, cell[::-1]):
+        for left_first in (True, False):
+            segs = []
+            for i, (y, xa, xb) in enumerate(lines):
+                if (i % 2 == 0) == left_first:
+                    segs.append(((xa, y), (xb, y)))
+                else:
+                    segs.append(((xb, y), (xa, y)))
+            variants.append(segs)
+    return variants
+
+
+def _dist(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def route_cells(
+    cells: List[List[Tuple[float, float, float]]],
+    start: Optional[Tuple[float, float]] = None,
+) -> List[Segment]:
+    """最近邻顺序串联各单元，start 为旋转坐标系中的起点"""
+    remaining = list(range(len(cells)))
+    variants = [_cell_variants(c) for c in cells]
+    ordered: List[Segment] = []
+    pos = start
+    while remaining:
+        if pos is None:
+            best_cell, best_var = remaining[0], 0
+        else:
+            best_cell, best_var = min(
+                ((ci, vi) for ci in remaining for vi in range(4)),
+                key=lambda cv: _dist(pos, variants[cv[0]][cv[1]][0][0]),
+            )
+        segs = variants[best_cell][best_var]
+        ordered.extend(segs)
+        pos = segs[-1][1]
+        remaining.remove(best_cell)
+    return ordered
+
+
+def _path_cost(segments: List[Segment], start: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+    scan = sum(_dist(a, b) for a, b in segments)
+    transit = sum(_dist(segments[i - 1][1], segments[i][0]) for i in range(1, len(segments)))
+    if start is not None and segments:
+        transit += _dist(start, segments[0][0]) + _dist(segments[-1][1], start)
+    return scan, transit
+
+
+def _build_path(
+    rings: Sequence[np.ndarray],
+    theta: float,
+    spacing_m: float,
+    home_xy: Optional[Tuple[float, float]],
+    line_range: Optional[Tuple[int, int]] = None,
+) -> CoveragePath:
+    ys, intervals = sweep_intervals(rings, theta, spacing_m)
+    if line_range is not None:
+        ys, intervals = ys[line_range[0]:line_range[1]], intervals[line_range[0]:line_range[1]]
+    cells = decompose_cells(ys, intervals)
+    home_rot = None
+    if home_xy is not None:
+        home_rot = tuple(_rotate(np.asarray([home_xy], dtype=np.float64), theta)[0])
+    rotated_segments = route_cells(cells, home_rot)
+    scan, transit = _path_cost(rotated_segments, home_rot)
+    segments = [(_unrotate(*a, theta), _unrotate(*b, theta)) for a, b in rotated_segments]
+    return CoveragePath(
+        heading_deg=heading_from_theta(theta),
+        segments=segments,
+        scan_length_m=scan,
+        transit_length_m=transit,
+        cells=len(cells),
+    )
+
+
+def plan_coverage(
+    rings: Sequence[np.ndarray],
+    spacing_m: float,
+    heading_deg: Optional[float] = None,
+    home_xy: Optional[Tuple[float, float]] = None,
+    turn_penalty_m: float = 30.0,
+) -> CoveragePath:
+    """
+    规划单机覆盖路径
+
+    Args:
+        rings: 局部平面坐标的外环与内洞
+        spacing_m: 扫描线间距
+        heading_deg: 指定扫描航向；None 时搜索候选方向
+        home_xy: 起降点（计入首尾进出航程）
+        turn_penalty_m: 每次掉头折算的等效航程（减速、转弯、再加速）
+    """
+    if heading_deg is not None:
+        return _build_path(rings, theta_from_heading(heading_deg), spacing_m, home_xy)
+    best: Optional[CoveragePath] = None
+    best_cost = math.inf
+    for theta in candidate_angles(rings):
+        path = _build_path(rings, theta, spacing_m, home_xy)
+        cost = path.length_m + turn_penalty_m * path.turns
+        if cost < best_cost:
+            best, best_cost = path, cost
+    return best
+
+
+def _split_lines(
+    rings: Sequence[np.ndarray],
+    theta: float,
+    spacing_m: float,
+    speeds_ms: Sequence[float],
+    homes_xy: Sequence[Optional[Tuple[float, float]]],
+    turn_penalty_m: float,
+) -> Tuple[float, List[Tuple[int, int]]]:
+    """
+    在方向 theta 上把扫描线切成连续条带
+
+    二分最大航时 T：依次为各机取尽可能多的扫描线，使其实际航时（含进出航程）不超过 T。
+    各机按起降点在扫描推进方向上的投影排序，使相邻条带分给相邻的飞机。
+
+    Returns:
+        (最大航时秒, 与 speeds_ms 对应的扫描线区间 [(start, end), ...])
+    """
+    n = len(speeds_ms)
+    ys, intervals = sweep_intervals(rings, theta, spacing_m)
+    n_lines = len(ys)
+
+    homes_rot: List[Optional[Tuple[float, float]]] = [
+        tuple(_rotate(np.asarray([h], dtype=np.float64), theta)[0]) if h is not None else None
+        for h in homes_xy
+    ]
+    order = sorted(range(n), key=lambda i: homes_rot[i][1] if homes_rot[i] is not None else float(i))
+    speeds = [max(1e-6, float(speeds_ms[i])) for i in order]
+
+    durations: dict = {}
+
+    def _duration(k: int, a: int, b: int) -> float:
+        """第 k 架（排序后）飞扫描线 [a, b) 的航时（秒）"""
+        if b <= a:
+            return 0.0
+        if (k, a, b) not in durations:
+            segments = route_cells(decompose_cells(ys[a:b], intervals[a:b]), homes_rot[order[k]])
+            scan, transit = _path_cost(segments, homes_rot[order[k]])
+            durations[(k, a, b)] = (scan + transit + turn_penalty_m * max(0, len(segments) - 1)) / speeds[k]
+        return durations[(k, a, b)]
+
+    def _split(limit: float) -> Optional[List[int]]:
+        bounds = [0]
+        for k in range(n):
+            a = bounds[-1]
+            if k == n - 1:
+                if _duration(k, a, n_lines) > limit:
+                    return None
+                bounds.append(n_lines)
+                break
+            # 二分：航时不超过 limit 的最远终点
+            lo, hi = a, n_lines
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if _duration(k, a, mid) <= limit:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            bounds.append(lo)
+        return bounds
+
+    lo, hi = 0.0, max(_duration(k, 0, n_lines) for k in range(n))
+    best = _split(hi)
+    for _ in range(30):
+        mid = (lo + hi) / 2
+        bounds = _split(mid)
+        if bounds is None:
+            lo = mid
+        else:
+            hi, best = mid, bounds
+        if hi - lo < 1.0:
+            break
+
+    ranges: List[Tuple[int, int]] = [(0, 0)] * n
+    for k, uav in enumerate(order):
+        ranges[uav] = (best[k], best[k + 1])
+    return max(_duration(k, best[k], best[k + 1]) for k in range(n)), ranges
+
+
+def plan_multi_coverage(
+    rings: Sequence[np.ndarray],
+    spacing_m: float,
+    speeds_ms: Sequence[float],
+    homes_xy: Sequence[Optional[Tuple[float, float]]],
+    heading_deg: Optional[float] = None,
+    turn_penalty_m: float = 30.0,
+) -> List[CoveragePath]:
+    """
+    多机分区覆盖
+
+    沿扫描推进方向把扫描线切成连续条带分给各机，各机在自己的条带内单独规划。
+    未指定航向时对每个候选方向做一次切分，取最长航时最短的方向
+    （单机最优方向的扫描线往往又长又少，切分粒度太粗）。
+    """
+    n = len(speeds_ms)
+    if n == 0:
+        return []
+    thetas = [theta_from_heading(heading_deg)] if heading_deg is not None else candidate_angles(rings)
+    best_theta, best_ranges, best_makespan = thetas[0], None, math.inf
+    for theta in thetas:
+        makespan, ranges = _split_lines(rings, theta, spacing_m, speeds_ms, homes_xy, turn_penalty_m)
+        if makespan < best_makespan - 1e-6:
+            best_theta, best_ranges, best_makespan = theta, ranges, makespan
+    return [
+        _build_path(rings, best_theta, spacing_m, homes_xy[i], best_ranges[i])
+        for i in range(n)
+    ]
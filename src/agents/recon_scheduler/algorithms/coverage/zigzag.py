@@ -2,13 +2,17 @@
 Z字形扫描航线生成算法
 
 适用于大面积均匀覆盖的侦察任务。
+
+默认按目标多边形实际边界裁剪扫描线并搜索最优扫描方向（见 boustrophedon 模块）；
+clip_to_polygon=False 时沿用外接矩形南北/东西扫描。
 """
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ...state import Waypoint, FlightStatistics
+from .boustrophedon import CoveragePath, LocalFrame, plan_coverage, plan_multi_coverage, polygon_area_m2
 
 
 def generate_zigzag_waypoints(
@@ -19,6 +23,8 @@ def generate_zigzag_waypoints(
     overlap_percent: float = 20,
     heading_deg: Optional[float] = None,
     home_point: Optional[Tuple[float, float]] = None,
+    clip_to_polygon: bool = True,
+    holes: Optional[List[List[Tuple[float, float]]]] = None,
 ) -> Tuple[List[Waypoint], FlightStatistics]:
     """
     生成Z字形扫描航线
@@ -31,6 +37,8 @@ def generate_zigzag_waypoints(
         overlap_percent: 重叠率（%）
         heading_deg: 航线方向（度，0=北，None=自动优化）
         home_point: 起降点坐标 (lat, lng)
+        clip_to_polygon: 扫描线按多边形边界裁剪（False 为旧的外接矩形扫描）
+        holes: 多边形内洞（禁飞/无需侦察区域） [[(lat, lng), ...], ...]
     
     Returns:
         (waypoints, statistics)
@@ -38,16 +46,20 @@ def generate_zigzag_waypoints(
     if not polygon or len(polygon) < 3:
         return [], _empty_statistics()
     
-    # 计算传感器覆盖宽度
-    swath_width_m = 2 * altitude_m * math.tan(math.radians(sensor_fov_deg / 2))
-    
-    # 计算航线间距
-    line_spacing_m = swath_width_m * (1 - overlap_percent / 100)
+    line_spacing_m = _line_spacing(altitude_m, sensor_fov_deg, overlap_percent)
     
     # 确定起降点
     if home_point is None:
         home_point = polygon[0]
     
+    if clip_to_polygon:
+        frame = LocalFrame.around(polygon)
+        rings = [frame.to_xy(polygon)] + [frame.to_xy(h) for h in holes or [] if len(h) >= 3]
+        path = plan_coverage(
+            rings, line_spacing_m, heading_deg=heading_deg, home_xy=tuple(frame.to_xy([home_point])[0])
+        )
+        return _path_to_waypoints(path, frame, home_point, altitude_m, speed_ms, polygon_area_m2(rings))
+    
     # 计算边界框
     min_lat = min(p[0] for p in polygon)
     max_lat = max(p[0] for p in polygon)
@@ -142,6 +154,109 @@ def generate_zigzag_waypoints(
     return waypoints, statistics
 
 
+def generate_multi_uav_zigzag_waypoints(
+    polygon: List[Tuple[float, float]],
+    altitude_m: float,
+    speeds_ms: Sequence[float],
+    sensor_fov_deg: float = 84,
+    overlap_percent: float = 20,
+    heading_deg: Optional[float] = None,
+    home_points: Optional[Sequence[Optional[Tuple[float, float]]]] = None,
+    holes: Optional[List[List[Tuple[float, float]]]] = None,
+) -> List[Tuple[List[Waypoint], FlightStatistics]]:
+    """
+    多机协同Z字形扫描：同一区域沿扫描推进方向切分为连续条带，按各机速度均衡航时
+    
+    Args:
+        polygon: 目标区域多边形坐标列表 [(lat, lng), ...]
+        altitude_m: 飞行高度（米）
+        speeds_ms: 各无人机飞行速度（米/秒），长度即无人机数量
+        home_points: 各无人机起降点 (lat, lng)，缺省为多边形第一个顶点
+    
+    Returns:
+        与 speeds_ms 一一对应的 [(waypoints, statistics), ...]
+    """
+    n = len(speeds_ms)
+    if not polygon or len(polygon) < 3 or n == 0:
+        return [([], _empty_statistics()) for _ in range(n)]
+    
+    homes = [
+        (home_points[i] if home_points and i < len(home_points) and home_points[i] else polygon[0])
+        for i in range(n)
+    ]
+    line_spacing_m = _line_spacing(altitude_m, sensor_fov_deg, overlap_percent)
+    frame = LocalFrame.around(polygon)
+    rings = [frame.to_xy(polygon)] + [frame.to_xy(h) for h in holes or [] if len(h) >= 3]
+    paths = plan_multi_coverage(
+        rings,
+        line_spacing_m,
+        speeds_ms,
+        [tuple(frame.to_xy([h])[0]) for h in homes],
+        heading_deg=heading_deg,
+    )
+    
+    results = []
+    for path, home, speed in zip(paths, homes, speeds_ms):
+        area = polygon_area_m2(rings) * path.scan_length_m / max(1e-6, sum(p.scan_length_m for p in paths))
+        results.append(_path_to_waypoints(path, frame, home, altitude_m, speed, area))
+    return results
+
+
+def _line_spacing(altitude_m: float, sensor_fov_deg: float, overlap_percent: float) -> float:
+    """航线间距 = 传感器覆盖宽度 ×（1 - 重叠率）"""
+    swath_width_m = 2 * altitude_m * math.tan(math.radians(sensor_fov_deg / 2))
+    return max(1.0, swath_width_m * (1 - overlap_percent / 100))
+
+
+def _path_to_waypoints(
+    path: CoveragePath,
+    frame: LocalFrame,
+    home_point: Tuple[float, float],
+    altitude_m: float,
+    speed_ms: float,
+    coverage_area_m2: float,
+) -> Tuple[List[Waypoint], FlightStatistics]:
+    """覆盖路径转航点序列：起飞、爬升、逐段扫描、返航、降落"""
+    waypoints: List[Waypoint] = [
+        _create_waypoint(seq=1, lat=home_point[0], lng=home_point[1], alt_m=0, speed_ms=0, action="takeoff"),
+        _create_waypoint(
+            seq=2, lat=home_point[0], lng=home_point[1], alt_m=altitude_m, speed_ms=speed_ms / 2, action="climb",
+        ),
+    ]
+    for i, (start, end) in enumerate(path.segments):
+        heading = (90.0 - math.degrees(math.atan2(end[1] - start[1], end[0] - start[0]))) % 360
+        for j, point in enumerate((start, end)):
+            lat, lng = frame.to_latlng(*point)
+            waypoints.append(_create_waypoint(
+                seq=len(waypoints) + 1,
+                lat=lat,
+                lng=lng,
+                alt_m=altitude_m,
+                speed_ms=speed_ms,
+                action="start_scan" if i == 0 and j == 0 else "scan",
+                heading_deg=round(heading, 1),
+            ))
+    if path.segments:
+        waypoints.append(_create_waypoint(
+            seq=len(waypoints) + 1, lat=home_point[0], lng=home_point[1],
+            alt_m=altitude_m, speed_ms=speed_ms, action="return",
+        ))
+    waypoints.append(_create_waypoint(
+        seq=len(waypoints) + 1, lat=home_point[0], lng=home_point[1],
+        alt_m=0, speed_ms=speed_ms / 3, action="land",
+    ))
+    
+    total_distance = _calculate_total_distance(waypoints)
+    statistics: FlightStatistics = {
+        "total_distance_m": total_distance,
+        "total_duration_min": total_distance / speed_ms / 60 if speed_ms > 0 else 0,
+        "coverage_area_m2": coverage_area_m2,
+        "waypoint_count": len(waypoints),
+        "battery_consumption_percent": _estimate_battery(total_distance, altitude_m),
+    }
+    return waypoints, statistics
+
+
 def _generate_ns_lines(
     min_lat: float, max_lat: float,
     min_lng: float, max_lng: float,
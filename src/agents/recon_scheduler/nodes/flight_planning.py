@@ -21,6 +21,7 @@ from ..state import (
 )
 from ..algorithms.coverage import (
     generate_zigzag_waypoints,
+    generate_multi_uav_zigzag_waypoints,
     generate_spiral_waypoints,
     generate_circular_waypoints,
 )
@@ -55,6 +56,9 @@ async def flight_planning_node(state: ReconSchedulerState) -> Dict[str, Any]:
     flight_plans = []
     warnings = state.get("warnings", [])
     
+    # 同一区域任务分配了多架无人机时，按条带切分区域并均衡各机航时
+    shared_routes = _plan_shared_coverage(allocations, all_tasks, target_area)
+    
     for allocation in allocations:
         if allocation.get("is_backup"):
             continue  # 跳过备份分配
@@ -77,6 +81,7 @@ async def flight_planning_node(state: ReconSchedulerState) -> Dict[str, Any]:
                 target_area=target_area,
                 weather=weather,
                 disaster_analysis=disaster_analysis,
+                shared_route=shared_routes.get((task_id, device_id)),
             )
             
             if flight_plan:
@@ -111,9 +116,12 @@ def _generate_flight_plan(
     target_area: Optional[Dict[str, Any]],
     weather: Dict[str, Any],
     disaster_analysis: Dict[str, Any],
+    shared_route: Optional[Tuple[List[Waypoint], FlightStatistics]] = None,
 ) -> Optional[FlightPlan]:
     """
     为单个任务生成航线计划
+    
+    shared_route: 多机分区后本机的航点与统计（仅zigzag模式使用）
     """
     task_id = task.get("task_id", "")
     task_type = task.get("task_type", "area_survey")
@@ -140,7 +148,10 @@ def _generate_flight_plan(
     waypoints = []
     statistics = {}
     
-    if pattern == "zigzag":
+    if pattern == "zigzag" and shared_route is not None:
+        waypoints, statistics = shared_route
+        
+    elif pattern == "zigzag":
         waypoints, statistics = generate_zigzag_waypoints(
             polygon=polygon,
             altitude_m=altitude_m,
@@ -264,6 +275,53 @@ def _generate_flight_plan(
     return flight_plan
 
 
+def _plan_shared_coverage(
+    allocations: List[TaskAllocation],
+    all_tasks: List[ReconTask],
+    target_area: Optional[Dict[str, Any]],
+) -> Dict[Tuple[str, str], Tuple[List[Waypoint], FlightStatistics]]:
+    """
+    为分配了多架主用无人机的zigzag任务做多机分区
+    
+    Returns:
+        {(task_id, device_id): (waypoints, statistics)}
+    """
+    by_task: Dict[str, List[TaskAllocation]] = {}
+    for allocation in allocations:
+        if not allocation.get("is_backup"):
+            by_task.setdefault(allocation.get("task_id", ""), []).append(allocation)
+    
+    routes: Dict[Tuple[str, str], Tuple[List[Waypoint], FlightStatistics]] = {}
+    for task_id, task_allocations in by_task.items():
+        if len(task_allocations) < 2:
+            continue
+        task = next((t for t in all_tasks if t.get("task_id") == task_id), None)
+        if not task:
+            continue
+        scan_config = task.get("scan_config", {})
+        if scan_config.get("pattern", "zigzag") != "zigzag":
+            continue
+        polygon = _parse_target_area(target_area, task.get("target_area"))
+        if len(polygon) < 3:
+            continue
+        
+        results = generate_multi_uav_zigzag_waypoints(
+            polygon=polygon,
+            altitude_m=scan_config.get("altitude_m", 100),
+            speeds_ms=[scan_config.get("speed_ms", 10)] * len(task_allocations),
+            sensor_fov_deg=scan_config.get("sensor_fov_deg", 84),
+            overlap_percent=scan_config.get("overlap_percent", 20),
+            heading_deg=scan_config.get("heading_deg"),
+            home_points=[polygon[0]] * len(task_allocations),
+        )
+        for allocation, result in zip(task_allocations, results):
+            routes[(task_id, allocation.get("device_id", ""))] = result
+        logger.info(f"任务 {task_id} 多机分区: {len(task_allocations)}架, "
+                    f"航时(分钟)={[round(r[1]['total_duration_min'], 1) for r in results]}")
+    
+    return routes
+
+
 def _parse_target_area(
     global_area: Optional[Dict[str, Any]],
     task_area: Optional[Dict[str, Any]]
@@ -5,7 +5,7 @@
 - 将各类实体适配为 ScoringContext 列表
 - 调用 PriorityScoringEngine 执行打分
 - 生成按优先级排序的侦察目标列表
-- 按优先级对设备做智能匹配分配（支持规则模式和 CrewAI 专家模式）
+- 按目标价值、环境兼容性和距离求解全局最优设备分配（支持规则模式和 CrewAI 专家模式）
 """
 from __future__ import annotations
 
@@ -15,8 +15,17 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple
 from uuid import UUID
 
+import numpy as np
 from sqlalchemy import text
 
+from src.agents.shared.device_assignment import (
+    AssignedPair,
+    AssignmentConfig,
+    greedy_assignment,
+    order_sorties,
+    solve_assignment,
+    utility_matrix,
+)
 from src.agents.shared.priority_scoring import (
     EntityType,
     PriorityScoringEngine,
@@ -34,6 +43,7 @@ from src.domains.resources.devices.service import DeviceService
 from src.domains.resources.devices.schemas import DeviceResponse
 from src.infra.config.algorithm_config_service import AlgorithmConfigService
 from src.core.database import AsyncSessionLocal
+from src.core.geodesy import distance_matrix_m
 
 
 logger = logging.getLogger(__name__)
@@ -141,6 +151,7 @@ async def score_targets(state: ReconState) -> Dict[str, Any]:
                 
                 # 基于 base_capabilities 筛选侦察设备
                 if _is_recon_device_by_capabilities(device_data):
+                    telemetry = (d.properties or {}).get("last_telemetry") or {}
                     device_list.append(
                         DeviceInfo(
                             device_id=str(d.id),
@@ -150,6 +161,8 @@ async def score_targets(state: ReconState) -> Dict[str, Any]:
                             env_type=d.env_type.value if d.env_type else "land",
                             in_vehicle_id=str(d.in_vehicle_id) if d.in_vehicle_id else None,
                             status=d.status.value,
+                            longitude=telemetry.get("longitude"),
+                            latitude=telemetry.get("latitude"),
                         )
                     )
             
@@ -408,29 +421,8 @@ async def score_targets(state: ReconState) -> Dict[str, Any]:
     # 按分数排序
     targets.sort(key=lambda t: t.get("score", 0.0), reverse=True)
 
-    # 智能设备分配：根据目标特征匹配最适合的设备类型
-    assignments: List[DeviceAssignment] = []
-    used_device_ids: set = set()
-    
-    for target in targets:
-        best_device, reason = _match_device_for_target(
-            target=target,
-            available_devices=[d for d in device_list if d["device_id"] not in used_device_ids],
-            risk_info=all_targets_meta.get(target["target_id"], {}),
-        )
-        if best_device:
-            used_device_ids.add(best_device["device_id"])
-            assignments.append(
-                DeviceAssignment(
-                    device_id=best_device["device_id"],
-                    device_name=best_device["name"],
-                    device_type=best_device["device_type"],
-                    target_id=target["target_id"],
-                    target_name=target["name"],
-                    priority=target["priority"],
-                    reason=reason,
-                )
-            )
+    # 设备分配：按目标价值、设备适配度和距离全局求解
+    assignments = _assign_devices(targets, device_list, all_targets_meta, AssignmentConfig.from_env())
 
     explanation = _build_explanation(targets, assignments)
 
@@ -588,71 +580,146 @@ def _is_device_env_compatible(device_env: str, target_env: str) -> bool:
     return device_env == target_env
 
 
-def _match_device_for_target(
-    target: ReconTarget,
-    available_devices: List[DeviceInfo],
-    risk_info: Dict[str, Any],
-) -> tuple[DeviceInfo | None, str]:
-    """为目标匹配最合适的设备，返回设备和选择理由。
-    
-    匹配逻辑：
-    1. 首先根据目标环境类型过滤兼容的设备
-    2. 根据灾害类型确定推荐设备类型顺序
-    3. 优先选择推荐类型中可用的设备
-    4. 无推荐类型可用时，默认选择无人机（最通用）
-    5. 生成人类可读的选择理由
+# 无推荐类型可用时的通用优先级：drone > dog > ship > robot > ugv
+FALLBACK_DEVICE_ORDER: List[str] = ["drone", "dog", "ship", "robot", "ugv"]
+
+
+def _target_area_type(meta: Dict[str, Any]) -> str:
+    """目标的细分类型（风险区 area_type / poi_{poi_type} / staging_{site_type}）"""
+    if meta.get("area_type"):
+        return meta["area_type"]
+    if meta.get("poi_type"):
+        return f"poi_{meta['poi_type']}"
+    if meta.get("site_type"):
+        return f"staging_{meta['site_type']}"
+    return ""
+
+
+def _device_preference(area_type: str, device_type: str) -> Tuple[float, str]:
+    """设备类型对目标的适配度 (0, 1] 及理由类别
+
+    推荐类型按顺序 1.0、0.85、…；通用优先级 0.55、0.50、…；其他兼容设备 0.3。
+    单设备时与"先推荐、再通用、最后任意兼容"的逐级挑选顺序一致。
     """
-    if not available_devices:
-        return None, ""
-    
-    area_type = risk_info.get("area_type", "")
-    target_type = risk_info.get("target_type", "risk_area")
-    severity = risk_info.get("severity", "")
-    priority = target.get("priority", "medium")
-    
-    # 推断目标环境类型
-    target_env = _get_target_env_type(area_type, target_type)
-    
-    # 过滤出环境兼容的设备
-    compatible_devices = [
-        d for d in available_devices
-        if _is_device_env_compatible(d.get("env_type", "land"), target_env)
-    ]
-    
-    if not compatible_devices:
-        # 没有兼容设备，记录日志并返回空
-        logger.debug(
-            f"[Recon] 目标 {target.get('name')} (env={target_env}) 无兼容设备"
-        )
-        return None, ""
-    
-    # 获取推荐设备类型顺序
     preferred_types = AREA_TYPE_DEVICE_PREFERENCE.get(area_type, ["drone"])
-    
-    # 按推荐顺序查找可用设备（只从兼容设备中选）
-    for device_type in preferred_types:
-        for device in compatible_devices:
-            if device.get("device_type") == device_type:
-                reason = _generate_assignment_reason(
-                    device=device,
-                    area_type=area_type,
-                    severity=severity,
-                    priority=priority,
-                )
-                return device, reason
-    
-    # 无推荐类型可用，按通用优先级选择：drone > dog > ship > robot
-    # 注意：只从兼容设备中选
-    fallback_order = ["drone", "dog", "ship", "robot", "ugv"]
-    for device_type in fallback_order:
-        for device in compatible_devices:
-            if device.get("device_type") == device_type:
-                reason = "作为通用侦察力量执行任务"
-                return device, reason
-    
-    # 最后兜底：返回第一个兼容设备
-    device = compatible_devices[0]
-    return device, "执行侦察任务"
+    if device_type in preferred_types:
+        return 1.0 - 0.15 * preferred_types.index(device_type), "preferred"
+    if device_type in FALLBACK_DEVICE_ORDER:
+        return 0.55 - 0.05 * FALLBACK_DEVICE_ORDER.index(device_type), "fallback"
+    return 0.3, "other"
+
+
+def _geometry_lonlat(geometry: Dict[str, Any]) -> Tuple[float, float]:
+    """目标代表点：Point 取坐标，面取外环顶点平均，无法解析为 NaN"""
+    try:
+        coords = geometry.get("coordinates")
+        gtype = geometry.get("type")
+        if gtype == "Point":
+            return float(coords[0]), float(coords[1])
+        if gtype == "MultiPolygon":
+            coords = coords[0]
+        ring = np.asarray(coords[0] if gtype in ("Polygon", "MultiPolygon") else coords, dtype=np.float64)
+        return float(ring[:, 0].mean()), float(ring[:, 1].mean())
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return float("nan"), float("nan")
+
+
+def _assign_devices(
+    targets: List[ReconTarget],
+    devices: List[DeviceInfo],
+    targets_meta: Dict[str, Dict[str, Any]],
+    config: AssignmentConfig,
+) -> List[DeviceAssignment]:
+    """为目标分配设备，返回按出动顺序排列的分配结果。
+
+    目标价值取打分分数，设备适配度由目标类型推荐表给出，环境不兼容的配对不可行，
+    设备到目标距离越远效用越低。optimal 模式一次性求总效用最大的分配
+    （每台设备可串行侦察 max_targets_per_device 个目标）；greedy 模式按分数
+    逐个挑选适配度最高的空闲设备。
+    """
+    if not targets or not devices:
+        return []
+
+    # 适配度只取决于 (目标类型, 目标环境) × (设备类型, 设备环境)，按组合去重后再展开成矩阵
+    target_keys: List[Tuple[str, str]] = []
+    for target in targets:
+        meta = targets_meta.get(target["target_id"], {})
+        area_type = _target_area_type(meta)
+        target_keys.append((area_type, _get_target_env_type(area_type, meta.get("target_type", "risk_area"))))
+    device_keys = [(d.get("device_type", ""), d.get("env_type", "land")) for d in devices]
+    t_profiles = sorted(set(target_keys))
+    d_profiles = sorted(set(device_keys))
+    profile_pref = np.full((len(t_profiles), len(d_profiles)), np.nan)
+    profile_kind: Dict[Tuple[int, int], str] = {}
+    for i, (area_type, target_env) in enumerate(t_profiles):
+        for j, (device_type, device_env) in enumerate(d_profiles):
+            if _is_device_env_compatible(device_env, target_env):
+                profile_pref[i, j], profile_kind[(i, j)] = _device_preference(area_type, device_type)
+    t_index = {k: i for i, k in enumerate(t_profiles)}
+    d_index = {k: j for j, k in enumerate(d_profiles)}
+    t_rows = np.array([t_index[k] for k in target_keys])
+    d_cols = np.array([d_index[k] for k in device_keys])
+    preference = profile_pref[np.ix_(t_rows, d_cols)]
+
+    benefit = np.array([max(float(t.get("score", 0.0)), 1e-3) for t in targets])
+    target_lonlat = np.array([_geometry_lonlat(t.get("geometry") or {}) for t in targets], dtype=np.float64)
+    device_lonlat = np.array(
+        [
+            (float(d["longitude"]), float(d["latitude"]))
+            if d.get("longitude") is not None and d.get("latitude") is not None
+            else (np.nan, np.nan)
+            for d in devices
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    distance_km = distance_matrix_m(
+        target_lonlat[:, 0], target_lonlat[:, 1], device_lonlat[:, 0], device_lonlat[:, 1]
+    ) / 1000.0
+
+    pairs: List[AssignedPair]
+    if config.mode == "greedy":
+        pairs = greedy_assignment(benefit, preference)
+    else:
+        utility = utility_matrix(benefit, preference, distance_km, config.distance_scale_km)
+        pairs = solve_assignment(utility, config.max_targets_per_device, config.sortie_decay)
+        order_sorties(pairs, target_lonlat, device_lonlat)
+
+    unassigned = len(targets) - len(pairs)
+    if unassigned:
+        logger.debug(f"[Recon] {unassigned}个目标无兼容空闲设备")
+
+    assignments: List[DeviceAssignment] = []
+    for pair in sorted(pairs, key=lambda p: (p.sortie_order, -benefit[p.target_index])):
+        target = targets[pair.target_index]
+        device = devices[pair.device_index]
+        meta = targets_meta.get(target["target_id"], {})
+        kind = profile_kind[(t_rows[pair.target_index], d_cols[pair.device_index])]
+        if kind == "preferred":
+            reason = _generate_assignment_reason(
+                device=device,
+                area_type=target_keys[pair.target_index][0],
+                severity=meta.get("severity", ""),
+                priority=target.get("priority", "medium"),
+            )
+        elif kind == "fallback":
+            reason = "作为通用侦察力量执行任务"
+        else:
+            reason = "执行侦察任务"
+        distance = distance_km[pair.target_index, pair.device_index]
+        assignments.append(
+            DeviceAssignment(
+                device_id=device["device_id"],
+                device_name=device["name"],
+                device_type=device["device_type"],
+                target_id=target["target_id"],
+                target_name=target["name"],
+                priority=target["priority"],
+                reason=reason,
+                sortie_order=pair.sortie_order,
+                distance_km=None if np.isnan(distance) else round(float(distance), 2),
+            )
+        )
+    return assignments
 
 
 def _generate_assignment_reason(
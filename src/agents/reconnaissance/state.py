@@ -33,6 +33,8 @@ class DeviceInfo(TypedDict, total=False):
     env_type: str  # air/land/sea - 设备作业环境
     in_vehicle_id: Optional[str]
     status: str
+    longitude: Optional[float]  # 最近遥测位置，未上报为 None
+    latitude: Optional[float]
 
 
 class DeviceAssignment(TypedDict, total=False):
@@ -45,6 +47,8 @@ class DeviceAssignment(TypedDict, total=False):
     target_name: str
     priority: str
     reason: str  # 分配理由
+    sortie_order: int  # 同一设备单次出动中的侦察顺序（从0开始）
+    distance_km: Optional[float]  # 设备到目标距离，位置未知为 None
 
 
 class ReconMissionStep(TypedDict, total=False):
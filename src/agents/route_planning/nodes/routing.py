@@ -361,7 +361,7 @@ def _compute_multi_route(
         "vehicles": vrp_vehicles,
         "constraints": {
             "use_time_windows": any(tp.get("time_window_start") for tp in task_points),
-            "time_limit_sec": params.get("time_limit_sec", 30),
+            "time_limit_sec": params.get("time_limit_sec"),  # 未配置时按规模自适应
         },
     })
     
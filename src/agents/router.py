@@ -13,10 +13,11 @@ from decimal import Decimal
 from typing import Dict, Any, Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 import redis.asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings
 from src.core.database import AsyncSessionLocal
 from src.core.websocket import broadcast_event_update
 from src.domains.ai_decisions import AIDecisionLogRepository, CreateAIDecisionLogRequest
@@ -32,18 +33,22 @@ from .schemas import (
 )
 from .emergency_ai import EmergencyAIAgent, get_emergency_ai_agent
 from .route_planning import invoke as route_planning_invoke
+from .jobs import BoundedResultStore, get_job_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
-# 任务结果缓存（内存备份）
-_task_results: Dict[str, Dict[str, Any]] = {}
-
 # Redis配置
 EMERGENCY_RESULT_PREFIX = "emergency_ai_result:"
 EMERGENCY_RESULT_TTL = 36000  # 结果保存10小时
 
+# 任务结果缓存（内存有界LRU，Redis为完整备份）
+_task_results = BoundedResultStore(
+    max_entries=settings.agent_job_result_max_entries,
+    ttl_seconds=EMERGENCY_RESULT_TTL,
+)
+
 
 
 
@@ -193,6 +198,7 @@ async def health_check() -> Dict[str, Any]:
     from pathlib import Path
     from .rules import get_cache_stats
     from .utils.circuit_breaker import get_all_circuit_breakers_stats
+    from .emergency_ai.utils.llm_cache import get_all_llm_cache_stats
     from src.core.redis import check_redis_health
     
     checks = {
@@ -218,6 +224,7 @@ async def health_check() -> Dict[str, Any]:
     
     # 缓存统计
     checks["cache_stats"] = get_cache_stats()
+    checks["llm_cache_stats"] = get_all_llm_cache_stats()
     
     # 熔断器状态
     breaker_stats = get_all_circuit_breakers_stats()
@@ -279,6 +286,22 @@ async def reset_circuit_breakers() -> Dict[str, Any]:
     }
 
 
+@router.get("/jobs/stats")
+async def get_job_stats() -> Dict[str, Any]:
+    """
+    Agent作业队列统计
+    
+    包含各作业类型的队列长度、执行中数量、排队/执行延迟分位数，
+    以及内存结果缓存占用。
+    """
+    stats = await get_job_manager().stats()
+    stats["result_store"] = {
+        "emergency_analyze": _task_results.stats,
+        "route_planning": _route_planning_results.stats,
+    }
+    return stats
+
+
 # ============================================================================
 # 应急AI混合分析接口
 # ============================================================================
@@ -437,10 +460,37 @@ async def _broadcast_emergency_result(
         logger.warning("应急AI分析结果推送失败", extra={"error": str(e)})
 
 
+async def _emergency_analysis_job(task_id: str, payload: Dict[str, Any]) -> None:
+    """作业队列入口：还原请求并执行分析"""
+    await _run_emergency_analysis(task_id, EmergencyAnalyzeRequest.model_validate(payload))
+
+
+async def _emergency_analysis_job_failed(task_id: str, payload: Dict[str, Any], error: str) -> None:
+    """作业超时或异常退出时写入失败结果，避免前端无限轮询"""
+    error_result = {
+        "success": False,
+        "task_id": task_id,
+        "event_id": str(payload.get("event_id", "")),
+        "scenario_id": str(payload.get("scenario_id", "")),
+        "status": "failed",
+        "errors": [error],
+        "completed_at": datetime.utcnow().isoformat() + "Z",
+    }
+    _task_results[task_id] = error_result
+    await _save_result_to_redis(task_id, error_result)
+
+
+get_job_manager().register(
+    "emergency_analyze",
+    _emergency_analysis_job,
+    concurrency=2,
+    on_failure=_emergency_analysis_job_failed,
+)
+
+
 @router.post("/emergency-analyze", response_model=EmergencyAnalyzeTaskResponse, status_code=202)
 async def emergency_analyze(
     request: EmergencyAnalyzeRequest,
-    background_tasks: BackgroundTasks,
 ) -> EmergencyAnalyzeTaskResponse:
     """
     提交应急AI分析任务
@@ -468,15 +518,20 @@ async def emergency_analyze(
         },
     )
     
-    # 提交后台任务
-    background_tasks.add_task(_run_emergency_analysis, task_id, request)
+    # 提交到作业队列，同一事件正在分析时不重复入队
+    accepted = await get_job_manager().submit(
+        "emergency_analyze", task_id, request.model_dump(mode="json"),
+    )
     
     return EmergencyAnalyzeTaskResponse(
         success=True,
         task_id=task_id,
         event_id=str(request.event_id),
         status="processing",
-        message="应急AI分析任务已提交，预计完成时间5-15秒",
+        message=(
+            "应急AI分析任务已提交，预计完成时间5-15秒"
+            if accepted else "该事件的应急AI分析任务正在进行中，请使用task_id查询结果"
+        ),
         created_at=datetime.utcnow(),
     )
 
@@ -1150,7 +1205,10 @@ async def _generate_team_route(
 # ============================================================================
 
 # 路径规划结果缓存
-_route_planning_results: Dict[str, Dict[str, Any]] = {}
+_route_planning_results = BoundedResultStore(
+    max_entries=settings.agent_job_result_max_entries,
+    ttl_seconds=EMERGENCY_RESULT_TTL,
+)
 ROUTE_PLANNING_PREFIX = "route_planning_result:"
 
 
@@ -1275,10 +1333,34 @@ async def _run_route_planning(
         await _save_route_result_to_redis(task_id, error_result)
 
 
+async def _route_planning_job(task_id: str, payload: Dict[str, Any]) -> None:
+    """作业队列入口：还原请求并执行路径规划"""
+    await _run_route_planning(task_id, RoutePlanningRequest.model_validate(payload))
+
+
+async def _route_planning_job_failed(task_id: str, payload: Dict[str, Any], error: str) -> None:
+    """作业超时或异常退出时写入失败结果"""
+    error_result = {
+        "request_id": task_id,
+        "request_type": payload.get("request_type", "unknown"),
+        "success": False,
+        "errors": [error],
+    }
+    _route_planning_results[task_id] = error_result
+    await _save_route_result_to_redis(task_id, error_result)
+
+
+get_job_manager().register(
+    "route_planning",
+    _route_planning_job,
+    concurrency=4,
+    on_failure=_route_planning_job_failed,
+)
+
+
 @router.post("/route-planning", response_model=RoutePlanningTaskResponse, status_code=202)
 async def route_planning(
     request: RoutePlanningRequest,
-    background_tasks: BackgroundTasks,
 ) -> RoutePlanningTaskResponse:
     """
     提交路径规划任务
@@ -1303,8 +1385,8 @@ async def route_planning(
     
     logger.info(f"[RoutePlanning] 收到请求 task_id={task_id} type={request.request_type}")
     
-    # 提交后台任务
-    background_tasks.add_task(_run_route_planning, task_id, request)
+    # 提交到作业队列
+    await get_job_manager().submit("route_planning", task_id, request.model_dump(mode="json"))
     
     return RoutePlanningTaskResponse(
         success=True,
@@ -1372,7 +1454,8 @@ from src.domains.plotting.service import PlottingService
 from src.domains.plotting.schemas import (
     PlotPointRequest, PlotCircleRequest, PlotPolygonRequest,
     PlotRouteRequest, PlottingResponse,
-    PlotEventRangeRequest, PlotWeatherAreaRequest
+    PlotEventRangeRequest, PlotWeatherAreaRequest,
+    PlotBatchRequest, PlotBatchResponse,
 )
 from .situation_plot import get_situation_plot_agent
 from .situation_plot.schemas import SituationPlotRequest, SituationPlotResponse
@@ -1444,6 +1527,18 @@ async def plot_weather_area_api(request: PlotWeatherAreaRequest) -> PlottingResp
     return await PlottingService.plot_weather_area(request)
 
 
+@router.post("/plotting/batch", response_model=PlotBatchResponse)
+async def plot_batch_api(request: PlotBatchRequest) -> PlotBatchResponse:
+    """
+    批量标绘
+    
+    items 中每个条目以 kind 区分类型: point/circle/polygon/route/event_range/weather_area，
+    字段与对应单个标绘接口一致。整批同一事务写入，提交后合并为一条 /topic/map.entity.batch 推送；
+    replace_layers 指定时先删除这些图层中系统生成的旧标绘（指定 group 时只删同组）。
+    """
+    return await PlottingService.plot_batch(request)
+
+
 @router.post("/situation-plot", response_model=SituationPlotResponse)
 async def situation_plot_dialog(request: SituationPlotRequest) -> SituationPlotResponse:
     """
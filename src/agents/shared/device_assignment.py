@@ -0,0 +1,167 @@
+"""目标-设备全局最优分配
+
+把"目标按分数逐个挑设备"的贪心分配改为一次性求解的指派问题：
+
+- 效用矩阵 U[t, d] = 目标分数 × 设备类型适配度 × 距离衰减，环境不兼容为 NaN
+- 单目标出动：匈牙利算法（scipy.optimize.linear_sum_assignment）求总效用最大的一一匹配
+- 多目标出动：每台设备复制为 k 个出动槽位，第 s 个槽位效用乘以 decay^s，
+  等价于容量为 k、边际收益递减的最小费用流；求解后按最近邻顺序排列各设备的目标
+- 贪心基线保留用于对比与回退
+
+环境变量（前缀由调用方指定，侦察分配为 RECON）::
+
+    RECON_ASSIGNMENT_MODE=optimal       # optimal / greedy
+    RECON_MAX_TARGETS_PER_DEVICE=1      # 每台设备单次出动最多侦察目标数
+    RECON_DISTANCE_SCALE_KM=50          # 距离衰减尺度：效用 × 1/(1 + 距离/尺度)
+    RECON_SORTIE_DECAY=0.85             # 同一设备后续目标的效用折减
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from src.core.geodesy import haversine_km
+
+
+@dataclass(frozen=True)
+class AssignmentConfig:
+    """分配参数"""
+    mode: str = "optimal"
+    max_targets_per_device: int = 1
+    distance_scale_km: float = 50.0
+    sortie_decay: float = 0.85
+
+    @classmethod
+    def from_env(cls, prefix: str = "RECON") -> "AssignmentConfig":
+        return cls(
+            mode=os.getenv(f"{prefix}_ASSIGNMENT_MODE", "optimal").lower(),
+            max_targets_per_device=max(1, int(os.getenv(f"{prefix}_MAX_TARGETS_PER_DEVICE", "1"))),
+            distance_scale_km=float(os.getenv(f"{prefix}_DISTANCE_SCALE_KM", "50")),
+            sortie_decay=float(os.getenv(f"{prefix}_SORTIE_DECAY", "0.85")),
+        )
+
+
+@dataclass
+class AssignedPair:
+    """一条分配结果（下标指向输入的目标/设备序列）"""
+    target_index: int
+    device_index: int
+    sortie_order: int
+    utility: float
+
+
+def utility_matrix(
+    benefit: Sequence[float],
+    preference: np.ndarray,
+    distance_km: Optional[np.ndarray] = None,
+    distance_scale_km: float = 50.0,
+) -> np.ndarray:
+    """
+    构建效用矩阵
+
+    Args:
+        benefit: 各目标价值（打分结果），shape=(T,)
+        preference: 设备类型适配度 (0, 1]，环境不兼容为 NaN，shape=(T, D)
+        distance_km: 设备到目标距离，位置未知为 NaN（不衰减），shape=(T, D)
+        distance_scale_km: 距离衰减尺度，<=0 时不考虑距离
+
+    Returns:
+        shape=(T, D)，不可行为 NaN
+    """
+    utility = np.asarray(benefit, dtype=np.float64)[:, None] * preference
+    if distance_km is not None and distance_scale_km > 0:
+        decay = 1.0 / (1.0 + np.nan_to_num(distance_km, nan=0.0) / distance_scale_km)
+        utility = utility * decay
+    return utility
+
+
+def solve_assignment(
+    utility: np.ndarray,
+    max_targets_per_device: int = 1,
+    sortie_decay: float = 0.85,
+) -> List[AssignedPair]:
+    """
+    求总效用最大的分配
+
+    每台设备展开为 max_targets_per_device 个槽位后做一次矩形指派，
+    槽位 s 的效用为 U × decay^s；不可行的配对不会出现在结果中。
+    """
+    n_targets, n_devices = utility.shape
+    if n_targets == 0 or n_devices == 0:
+        return []
+    k = max(1, max_targets_per_device)
+    feasible = ~np.isnan(utility)
+    base = np.where(feasible, utility, 0.0)
+    # 列顺序: (slot0: d0..dn), (slot1: d0..dn), ...
+    slot_factor = sortie_decay ** np.arange(k)
+    expanded = np.concatenate([base * f for f in slot_factor], axis=1)
+    rows, cols = linear_sum_assignment(expanded, maximize=True)
+
+    pairs = []
+    for t, col in zip(rows.tolist(), cols.tolist()):
+        slot, d = divmod(col, n_devices)
+        if feasible[t, d]:
+            pairs.append(AssignedPair(t, d, slot, float(utility[t, d])))
+    return pairs
+
+
+def greedy_assignment(
+    benefit: Sequence[float],
+    preference: np.ndarray,
+) -> List[AssignedPair]:
+    """
+    贪心基线：目标按价值从高到低，依次选适配度最高的空闲兼容设备（每台设备一个目标）
+    """
+    order = np.argsort(-np.asarray(benefit, dtype=np.float64), kind="stable")
+    pref = np.where(np.isnan(preference), -np.inf, preference)
+    used = np.zeros(preference.shape[1], dtype=bool)
+    pairs = []
+    for t in order.tolist():
+        row = np.where(used, -np.inf, pref[t])
+        if row.size == 0:
+            break
+        d = int(np.argmax(row))
+        if not np.isfinite(row[d]):
+            continue
+        used[d] = True
+        pairs.append(AssignedPair(t, d, 0, float(benefit[t] * preference[t, d])))
+    return pairs
+
+
+def order_sorties(
+    pairs: List[AssignedPair],
+    target_lonlat: np.ndarray,
+    device_lonlat: np.ndarray,
+) -> List[AssignedPair]:
+    """
+    同一设备的多个目标按最近邻顺序重排出动次序
+
+    设备位置未知时从效用最高的目标出发。坐标为 (lon, lat)，缺失为 NaN。
+    """
+    by_device: dict = {}
+    for pair in pairs:
+        by_device.setdefault(pair.device_index, []).append(pair)
+
+    def _km(a: np.ndarray, b: np.ndarray) -> float:
+        if np.isnan(a).any() or np.isnan(b).any():
+            return 0.0
+        return haversine_km(a[0], a[1], b[0], b[1])
+
+    for device_index, group in by_device.items():
+        if len(group) == 1:
+            group[0].sortie_order = 0
+            continue
+        remaining = sorted(group, key=lambda p: -p.utility)
+        pos = device_lonlat[device_index]
+        if np.isnan(pos).any():
+            pos = target_lonlat[remaining[0].target_index]
+        for order in range(len(group)):
+            nxt = min(remaining, key=lambda p: _km(pos, target_lonlat[p.target_index]))
+            nxt.sortie_order = order
+            pos = target_lonlat[nxt.target_index]
+            remaining.remove(nxt)
+    return pairs
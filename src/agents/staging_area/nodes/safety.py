@@ -22,6 +22,7 @@ from langchain_openai import ChatOpenAI
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.geodesy import haversine_m
 from src.agents.staging_area.state import (
     StagingAreaAgentState,
     SafetyAssessment,
@@ -281,20 +282,6 @@ def _calc_epicenter_distance(
     lat2: float | None,
 ) -> float | None:
     """计算到震中的距离（米）- Haversine公式"""
-    import math
-    
     if None in (lon1, lat1, lon2, lat2):
         return None
-    
-    EARTH_RADIUS_M = 6371000
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lon = math.radians(lon2 - lon1)
-    
-    a = (math.sin(delta_lat / 2) ** 2 +
-         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    return EARTH_RADIUS_M * c
+    return haversine_m(lon1, lat1, lon2, lat2)
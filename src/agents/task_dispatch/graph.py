@@ -12,7 +12,8 @@ from typing import Literal, Optional
 from functools import lru_cache
 
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+
+from src.agents.base.checkpoint import create_checkpointer
 
 from .state import TaskDispatchState
 from .nodes import (
@@ -308,8 +309,8 @@ def get_task_dispatch_graph(use_checkpointer: bool = True) -> StateGraph:
     graph = build_task_dispatch_graph()
     
     if use_checkpointer:
-        # 使用内存检查点器（生产环境应使用PostgresSaver）
-        checkpointer = InMemorySaver()
+        # 按配置使用裁剪的内存或Redis检查点器
+        checkpointer = create_checkpointer("task_dispatch")
         # 在human_review节点前设置中断点，支持human-in-the-loop
         compiled = graph.compile(
             checkpointer=checkpointer,
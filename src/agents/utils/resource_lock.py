@@ -3,12 +3,21 @@
 
 防止多个事件同时分配同一资源（队伍/装备等）
 使用Redis实现分布式锁，支持降级到数据库锁
+
+Redis锁由Lua脚本实现，每个操作一次往返:
+- 加锁: 全部键的检查与写入原子完成，有冲突则一个都不写并返回冲突持有者
+- 栅栏令牌: 每次加锁从计数器取单调递增令牌，写入受保护资源时可据此拒绝过期持有者
+- 续租: 长时间分析期间后台按 TTL/3 续租，只续仍由本持有者持有的键
+- 释放: 批量删除，只删除值仍为本持有者令牌的键
+
+锁键与令牌计数器共用 hash tag {team_lock}，Redis Cluster 下落在同一槽位，
+脚本可同时访问全部键。
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-import time
-from typing import List, Optional, Set
+from typing import Any, Iterable, List, Optional, Set, Tuple
 
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
@@ -20,16 +29,97 @@ from src.agents.exceptions import AIResourceLockedError, AIRedisUnavailableError
 
 logger = logging.getLogger(__name__)
 
-# 锁配置
-LOCK_KEY_PREFIX = "ai:team_lock:"
+# 锁配置（hash tag 保证脚本访问的键同槽）
+LOCK_KEY_PREFIX = "ai:{team_lock}:"
+FENCING_COUNTER_KEY = "ai:{team_lock}_fence"
 DEFAULT_LOCK_TTL = 300  # 5分钟
 
+# KEYS[1]=令牌计数器, KEYS[2..]=锁键; ARGV[1]=持有者(事件ID), ARGV[2]=TTL毫秒
+# 返回 {1, 令牌} 或 {0, 冲突键1, 持有值1, ...}；同一事件已持有的键视为可重入
+_ACQUIRE_SCRIPT = """
+local prefix = ARGV[1] .. ':'
+local conflicts = {0}
+for i = 2, #KEYS do
+    local holder = redis.call('GET', KEYS[i])
+    if holder and string.sub(holder, 1, #prefix) ~= prefix then
+        table.insert(conflicts, KEYS[i])
+        table.insert(conflicts, holder)
+    end
+end
+if #conflicts > 1 then
+    return conflicts
+end
+local token = redis.call('INCR', KEYS[1])
+local value = prefix .. token
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], value, 'PX', ARGV[2])
+end
+return {1, token}
+"""
+
+# ARGV[1]=持有值, ARGV[2]=TTL毫秒；返回续租成功的键数
+_RENEW_SCRIPT = """
+local renewed = 0
+for i = 1, #KEYS do
+    if redis.call('GET', KEYS[i]) == ARGV[1] then
+        redis.call('PEXPIRE', KEYS[i], ARGV[2])
+        renewed = renewed + 1
+    end
+end
+return renewed
+"""
+
+# ARGV[1]=持有值；返回删除的键数
+_RELEASE_SCRIPT = """
+local released = 0
+for i = 1, #KEYS do
+    if redis.call('GET', KEYS[i]) == ARGV[1] then
+        redis.call('DEL', KEYS[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+# 已注册的脚本挂在客户端实例上（EVALSHA，服务端缺失时自动回退EVAL），随客户端一起回收；
+# 脚本对象强引用客户端，不能用以客户端为键的弱引用字典缓存
+_SCRIPTS_ATTR = "_resource_lock_scripts"
+
+
+def _lock_scripts(client: Redis) -> Tuple[Any, Any, Any]:
+    """(加锁, 续租, 释放) 脚本"""
+    scripts = getattr(client, _SCRIPTS_ATTR, None)
+    if scripts is None:
+        scripts = (
+            client.register_script(_ACQUIRE_SCRIPT),
+            client.register_script(_RENEW_SCRIPT),
+            client.register_script(_RELEASE_SCRIPT),
+        )
+        setattr(client, _SCRIPTS_ATTR, scripts)
+    return scripts
+
+
+def _holder_event(value: str) -> str:
+    """锁值 "事件ID:令牌" → 事件ID"""
+    return value.rsplit(":", 1)[0]
+
 
 class ResourceLock:
     """
     资源锁管理器
     
     支持Redis分布式锁，Redis不可用时降级到数据库锁
+    
+    使用示例:
+    ```python
+    lock = ResourceLock(event_id)
+    await lock.acquire_team_locks(team_ids, db)
+    lock.start_lease_renewal()          # 分析可能超过TTL时
+    try:
+        ...                             # 写库时携带 lock.fencing_token
+    finally:
+        await lock.release_locks()
+    ```
     """
     
     def __init__(
@@ -46,6 +136,9 @@ class ResourceLock:
         self._ttl = ttl_seconds
         self._locked_teams: Set[str] = set()
         self._use_redis = True
+        self._fencing_token: Optional[int] = None
+        self._lease_lost = False
+        self._renew_task: Optional[asyncio.Task] = None
     
     async def acquire_team_locks(
         self,
@@ -60,10 +153,10 @@ class ResourceLock:
         Args:
             team_ids: 队伍ID列表
             db: 数据库session（用于降级）
-            
+        
         Returns:
             True如果锁定成功
-            
+        
         Raises:
             AIResourceLockedError: 资源已被其他事件锁定
         """
@@ -87,68 +180,40 @@ class ResourceLock:
         """
         使用Redis批量锁定
         
-        使用Pipeline保证原子性
+        Lua脚本一次往返原子完成检查与写入；同一事件重复加锁视为续期，
+        已持有的键统一换成新令牌
         """
         client = await get_redis_client()
-        lock_value = f"{self._event_id}:{time.time()}"
-        
-        # 检查是否有已被锁定的资源
-        locked_by_others: List[str] = []
-        
-        for team_id in team_ids:
-            key = f"{LOCK_KEY_PREFIX}{team_id}"
-            existing = await client.get(key)
-            if existing and not existing.startswith(self._event_id):
-                locked_by_others.append(team_id)
-        
-        if locked_by_others:
-            logger.warning(f"资源已被锁定: {locked_by_others}")
-            raise AIResourceLockedError(
-                locked_resources=locked_by_others,
-                retry_after_seconds=30,
-            )
+        acquire, _, _ = _lock_scripts(client)
+        team_ids = list(dict.fromkeys(team_ids))
+        held = [t for t in self._locked_teams if t not in team_ids]
+        keys = [f"{LOCK_KEY_PREFIX}{team_id}" for team_id in team_ids + held]
         
-        # 原子性批量锁定
-        pipe = client.pipeline()
-        for team_id in team_ids:
-            key = f"{LOCK_KEY_PREFIX}{team_id}"
-            pipe.set(key, lock_value, nx=True, ex=self._ttl)
-        
-        results = await pipe.execute()
-        
-        # 检查结果
-        failed_indices = [i for i, r in enumerate(results) if not r]
+        result = await acquire(
+            keys=[FENCING_COUNTER_KEY] + keys,
+            args=[self._event_id, self._ttl * 1000],
+        )
         
-        if failed_indices:
-            # 部分失败，回滚已锁定的
-            await self._rollback_redis_locks(
-                [team_ids[i] for i in range(len(team_ids)) if i not in failed_indices]
-            )
-            failed_teams = [team_ids[i] for i in failed_indices]
-            logger.warning(f"部分资源锁定失败: {failed_teams}")
+        if int(result[0]) != 1:
+            conflicts = {
+                key[len(LOCK_KEY_PREFIX):]: _holder_event(holder)
+                for key, holder in zip(result[1::2], result[2::2])
+            }
+            logger.warning(f"资源已被锁定: {conflicts}")
             raise AIResourceLockedError(
-                locked_resources=failed_teams,
+                locked_resources=list(conflicts),
+                locked_by=",".join(sorted(set(conflicts.values()))),
                 retry_after_seconds=30,
             )
         
-        self._locked_teams = set(team_ids)
-        logger.info(f"Redis锁定成功: {len(team_ids)}个队伍, event={self._event_id}")
+        self._fencing_token = int(result[1])
+        self._lease_lost = False
+        self._locked_teams |= set(team_ids)
+        logger.info(
+            f"Redis锁定成功: {len(team_ids)}个队伍, event={self._event_id}, token={self._fencing_token}"
+        )
         return True
     
-    async def _rollback_redis_locks(self, team_ids: List[str]) -> None:
-        """回滚Redis锁"""
-        if not team_ids:
-            return
-        
-        try:
-            client = await get_redis_client()
-            pipe = client.pipeline()
-            for team_id in team_ids:
-                pipe.delete(f"{LOCK_KEY_PREFIX}{team_id}")
-            await pipe.execute()
-        except RedisError as e:
-            logger.error(f"回滚Redis锁失败: {e}")
-    
     async def _acquire_db_locks(
         self,
         team_ids: List[str],
@@ -185,7 +250,7 @@ class ResourceLock:
             self._locked_teams = set(team_ids)
             logger.info(f"数据库锁定成功: {len(team_ids)}个队伍, event={self._event_id}")
             return True
-            
+        
         except Exception as e:
             if "could not obtain lock" in str(e).lower():
                 raise AIResourceLockedError(
@@ -194,9 +259,9 @@ class ResourceLock:
                 )
             raise
     
-    async def release_locks(self) -> None:
+    async def release_locks(self, team_ids: Optional[Iterable[str]] = None) -> None:
         """
-        释放所有锁
+        释放锁（默认全部）
         
         Redis锁会自动过期，但主动释放可以更快释放资源
         数据库锁在事务提交/回滚时自动释放
@@ -204,32 +269,95 @@ class ResourceLock:
         if not self._locked_teams:
             return
         
-        if self._use_redis:
-            await self._release_redis_locks()
+        targets = set(self._locked_teams) if team_ids is None else self._locked_teams & set(team_ids)
+        if self._use_redis and targets:
+            await self._release_redis_locks(targets)
         
-        self._locked_teams.clear()
+        self._locked_teams -= targets
+        if not self._locked_teams:
+            await self.stop_lease_renewal()
     
-    async def _release_redis_locks(self) -> None:
-        """释放Redis锁"""
+    async def _release_redis_locks(self, team_ids: Set[str]) -> None:
+        """批量释放Redis锁，只删除仍由本持有者持有的键"""
         try:
             client = await get_redis_client()
-            pipe = client.pipeline()
-            
-            for team_id in self._locked_teams:
-                key = f"{LOCK_KEY_PREFIX}{team_id}"
-                # 只删除自己持有的锁
-                pipe.delete(key)
-            
-            await pipe.execute()
-            logger.info(f"Redis锁已释放: {len(self._locked_teams)}个队伍")
-            
+            _, _, release = _lock_scripts(client)
+            released = await release(
+                keys=[f"{LOCK_KEY_PREFIX}{team_id}" for team_id in team_ids],
+                args=[self._lock_value],
+            )
+            logger.info(f"Redis锁已释放: {released}/{len(team_ids)}个队伍")
+        
         except RedisError as e:
             logger.error(f"释放Redis锁失败: {e}")
     
+    async def renew_locks(self) -> int:
+        """
+        续租所有锁，返回续租成功的队伍数
+        
+        少于已锁定数说明部分锁已过期或被其他事件抢占，置 lease_lost
+        """
+        if not self._locked_teams or not self._use_redis:
+            return len(self._locked_teams)
+        
+        client = await get_redis_client()
+        _, renew, _ = _lock_scripts(client)
+        renewed = int(await renew(
+            keys=[f"{LOCK_KEY_PREFIX}{team_id}" for team_id in self._locked_teams],
+            args=[self._lock_value, self._ttl * 1000],
+        ))
+        if renewed < len(self._locked_teams):
+            self._lease_lost = True
+            logger.warning(
+                f"锁续租不完整: {renewed}/{len(self._locked_teams)}, "
+                f"event={self._event_id}, token={self._fencing_token}"
+            )
+        return renewed
+    
+    def start_lease_renewal(self, interval_seconds: Optional[float] = None) -> None:
+        """启动后台续租（默认每 TTL/3 一次），用于可能超过TTL的长时间分析"""
+        if self._renew_task is not None and not self._renew_task.done():
+            return
+        interval = interval_seconds or max(self._ttl / 3, 1.0)
+        self._renew_task = asyncio.create_task(self._renew_loop(interval))
+    
+    async def stop_lease_renewal(self) -> None:
+        """停止后台续租"""
+        task, self._renew_task = self._renew_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    async def _renew_loop(self, interval: float) -> None:
+        while self._locked_teams and not self._lease_lost:
+            await asyncio.sleep(interval)
+            try:
+                await self.renew_locks()
+            except RedisError as e:
+                logger.error(f"锁续租失败: {e}")
+    
     @property
     def locked_teams(self) -> Set[str]:
         """获取已锁定的队伍ID"""
         return self._locked_teams.copy()
+    
+    @property
+    def fencing_token(self) -> Optional[int]:
+        """最近一次加锁取得的栅栏令牌，写入受保护资源时携带以拒绝过期持有者"""
+        return self._fencing_token
+    
+    @property
+    def lease_lost(self) -> bool:
+        """续租时发现部分锁已不再由本持有者持有"""
+        return self._lease_lost
+    
+    @property
+    def _lock_value(self) -> str:
+        return f"{self._event_id}:{self._fencing_token}"
 
 
 async def get_locked_teams() -> dict[str, str]:
@@ -244,21 +372,18 @@ async def get_locked_teams() -> dict[str, str]:
     
     try:
         client = await get_redis_client()
-        keys = await client.keys(f"{LOCK_KEY_PREFIX}*")
+        keys = [key async for key in client.scan_iter(match=f"{LOCK_KEY_PREFIX}*", count=500)]
         
         if not keys:
             return {}
         
-        result = {}
-        for key in keys:
-            team_id = key.replace(LOCK_KEY_PREFIX, "")
-            value = await client.get(key)
-            if value:
-                event_id = value.split(":")[0]
-                result[team_id] = event_id
-        
-        return result
-        
+        values = await client.mget(keys)
+        return {
+            key[len(LOCK_KEY_PREFIX):]: _holder_event(value)
+            for key, value in zip(keys, values)
+            if value
+        }
+    
     except RedisError as e:
         logger.error(f"获取锁定队伍失败: {e}")
         return {}
@@ -268,5 +393,6 @@ __all__ = [
     "ResourceLock",
     "get_locked_teams",
     "LOCK_KEY_PREFIX",
+    "FENCING_COUNTER_KEY",
     "DEFAULT_LOCK_TTL",
 ]
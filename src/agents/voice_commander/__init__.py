@@ -5,6 +5,7 @@
 
 模块结构:
 - semantic_router.py - 语义路由层（毫秒级意图分流）
+- intent_index.py - 意图分类本地组件（关键词自动机、路由向量索引、查询向量缓存）
 - spatial_graph.py - 空间查询Agent（位置、距离、区域状态）
 - task_agent.py - 任务查询Agent（任务进度、状态统计）
 - resource_agent.py - 资源查询Agent（队伍状态、可用资源）
@@ -9,7 +9,8 @@ import logging
 from typing import Literal
 
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+
+from src.agents.base.checkpoint import create_checkpointer
 
 from .state import CommanderAgentState
 
@@ -334,14 +335,14 @@ def get_commander_agent_graph():
     获取编译后的战术控制Agent图
     
     配置:
-    - checkpointer: MemorySaver (支持状态持久化)
+    - checkpointer: create_checkpointer (裁剪的内存/Redis状态持久化)
     - interrupt_before: ["execute_command"] (强制人工确认)
     """
     global _compiled_graph
     if _compiled_graph is None:
         workflow = build_commander_agent_graph()
         _compiled_graph = workflow.compile(
-            checkpointer=MemorySaver(),
+            checkpointer=create_checkpointer("voice_commander"),
             interrupt_before=["execute_command"],
         )
         logger.info("战术控制Agent图编译完成 (带中断)")
@@ -0,0 +1,168 @@
+"""
+语音意图本地分类组件
+
+语义路由热路径上的进程内组件，不依赖 semantic-router：
+- KeywordAutomaton: Aho-Corasick 多模式自动机，一次扫描找出文本中出现的全部关键词
+- UtteranceIndex: 路由样本句向量的本地最近邻索引（归一化矩阵点积），可持久化为 .npz，
+  启动时按指纹加载，不再每次启动远程编码全部样本句
+
+环境变量::
+
+    VOICE_ROUTE_EMBEDDINGS_PATH=data/voice_route_embeddings.npz
+    VOICE_QUERY_EMBEDDING_CACHE_SIZE=1024
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDINGS_PATH = os.environ.get("VOICE_ROUTE_EMBEDDINGS_PATH", "data/voice_route_embeddings.npz")
+DEFAULT_QUERY_CACHE_SIZE = int(os.environ.get("VOICE_QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 多关键词自动机
+
+    使用示例:
+    ```python
+    automaton = KeywordAutomaton(["在哪", "任务", "最近的"])
+    automaton.find("最近的救援队在哪")  # {"最近的", "在哪"}
+    ```
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        # 状态 0 为根；_goto[s][ch] -> 下一状态，_out[s] 为在状态 s 结束的全部关键词
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if pattern not in self._out[state]:
+            self._out[state] = self._out[state] + (pattern,)
+
+    def _build(self) -> None:
+        """BFS 计算失败指针，并把失败链上的输出并入当前状态"""
+        # 深度1的状态失败指针为根，无需计算
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set[str]:
+        """文本中出现过的全部关键词"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+def routes_fingerprint(encoder_name: str, utterances: Sequence[Tuple[str, str]]) -> str:
+    """编码器名 + (路由, 样本句) 列表的指纹，任一变化都需要重新编码"""
+    digest = hashlib.sha256(encoder_name.encode("utf-8"))
+    for route, utterance in utterances:
+        digest.update(b"\x00" + route.encode("utf-8") + b"\x01" + utterance.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class UtteranceIndex:
+    """
+    路由样本句向量的最近邻索引
+
+    打分与 semantic-router 默认行为一致：取余弦相似度最高的 top_k 个样本句，
+    按路由分组取均值选出最优路由，该路由样本的最高相似度需超过路由阈值才算命中。
+    """
+
+    def __init__(self, routes: Sequence[str], vectors: np.ndarray, fingerprint: str = "") -> None:
+        self.routes = list(routes)
+        self.vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        self.fingerprint = fingerprint
+        self._labels = np.asarray(self.routes)
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def classify(
+        self,
+        vector: Sequence[float],
+        thresholds: Dict[str, float],
+        top_k: int = 5,
+    ) -> Tuple[Optional[str], float]:
+        """
+        Returns:
+            (route_name, similarity)；未过路由阈值时 route_name 为 None
+        """
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = self.vectors @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+
+        grouped: Dict[str, List[float]] = {}
+        for i in top:
+            grouped.setdefault(self.routes[i], []).append(float(scores[i]))
+        best = max(grouped, key=lambda r: sum(grouped[r]) / len(grouped[r]))
+        similarity = max(grouped[best])
+        if similarity < thresholds.get(best, 0.0):
+            return None, similarity
+        return best, similarity
+
+    def save(self, path: str) -> None:
+        """写入 .npz（先写临时文件再替换，避免并发进程读到半个文件）"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, vectors=self.vectors, routes=self._labels, fingerprint=np.asarray(self.fingerprint))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional["UtteranceIndex"]:
+        """读取 .npz；文件不存在、损坏或指纹不一致返回 None"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    logger.info(f"路由向量文件已过期（路由或编码器变化）: {path}")
+                    return None
+                return cls([str(r) for r in data["routes"]], data["vectors"], fingerprint)
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"路由向量文件读取失败，重新编码: {path}, {e}")
+            return None
@@ -1,21 +1,36 @@
 """
 语义路由层 (Hybrid)
 
-基于 semantic-router 库的毫秒级意图分流 + LLM fallback。
+基于 semantic-router 路由定义的毫秒级意图分流 + LLM fallback。
 高置信度时直接路由，低置信度时用 LLM 兜底。
 
+热路径全部在进程内完成（见 intent_index.py）：
+- 关键词规则由 Aho-Corasick 自动机一次扫描匹配
+- 路由样本句向量持久化到磁盘，启动时按指纹加载，本地最近邻打分
+- 查询向量 LRU 缓存；仍需请求 embedding 服务时在线程池执行，不阻塞事件循环
+
 参考: vLLM Semantic Router, RouteLLM, EMNLP 2024 Intent Detection
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Optional, Dict, Tuple
 
-from semantic_router import Route, SemanticRouter
+from semantic_router import Route
 from semantic_router.encoders import OpenAIEncoder
 
+from src.core.embedding_cache import EmbeddingLRU
+from src.core.singleflight import SingleFlight
 from src.infra.settings import load_settings
+from .intent_index import (
+    DEFAULT_EMBEDDINGS_PATH,
+    DEFAULT_QUERY_CACHE_SIZE,
+    KeywordAutomaton,
+    UtteranceIndex,
+    routes_fingerprint,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +55,15 @@ KEYWORD_RULES: Dict[str, list[str]] = {
     "task_status": ["任务"],
 }
 
+# 特殊规则关键词："X队在执行什么任务" 与 "正在执行什么任务" 靠是否含"队"区分
+_TASK_QUERY_KEYWORD = "执行什么任务"
+_TEAM_KEYWORD = "队"
+
+_KEYWORD_AUTOMATON = KeywordAutomaton(
+    [kw for keywords in KEYWORD_RULES.values() for kw in keywords]
+    + [_TASK_QUERY_KEYWORD, _TEAM_KEYWORD]
+)
+
 
 def keyword_classify(text: str) -> Optional[str]:
     """
@@ -50,18 +74,22 @@ def keyword_classify(text: str) -> Optional[str]:
     - "X队在执行什么任务" → resource_status（询问队伍状态）
     - "正在执行什么任务" → task_status（询问任务状态）
     """
+    # 自动机一次扫描找出全部命中关键词，再按规则优先级决定路由
+    found = _KEYWORD_AUTOMATON.find(text)
+    if not found:
+        return None
+    
     # 特殊规则：队伍执行任务查询
-    if "执行什么任务" in text:
-        if "队" in text:
+    if _TASK_QUERY_KEYWORD in found:
+        if _TEAM_KEYWORD in found:
             return "resource_status"
         else:
             return "task_status"
     
     # 通用关键词匹配
     for route, keywords in KEYWORD_RULES.items():
-        for kw in keywords:
-            if kw in text:
-                return route
+        if not found.isdisjoint(keywords):
+            return route
     return None
 
 
@@ -257,8 +285,8 @@ class VoiceSemanticRouter:
     """
     语音意图语义路由器
     
-    基于 semantic-router 库进行快速意图分类，支持：
-    - OpenAI兼容的embedding服务
+    基于 semantic-router 路由定义进行快速意图分类，支持：
+    - OpenAI兼容的embedding服务（仅在缓存未命中时调用，且不占用事件循环）
     - 自定义路由配置和阈值
     - 降级到全量LLM
     - 路由准确率监控
@@ -268,6 +296,8 @@ class VoiceSemanticRouter:
         self,
         routes: Optional[list[Route]] = None,
         encoder: Optional[OpenAIEncoder] = None,
+        embeddings_path: Optional[str] = None,
+        query_cache: Optional[EmbeddingLRU] = None,
     ) -> None:
         """
         初始化语义路由器
@@ -275,10 +305,17 @@ class VoiceSemanticRouter:
         Args:
             routes: 路由配置列表，默认使用_create_default_routes()
             encoder: 自定义encoder，默认从settings加载
+            embeddings_path: 路由样本句向量文件，默认 VOICE_ROUTE_EMBEDDINGS_PATH
+            query_cache: 查询向量缓存，默认按 VOICE_QUERY_EMBEDDING_CACHE_SIZE 创建
         """
         self._routes = routes or _create_default_routes()
         self._encoder = encoder
-        self._semantic_router: Optional[SemanticRouter] = None
+        self._embeddings_path = embeddings_path or DEFAULT_EMBEDDINGS_PATH
+        self._query_cache = query_cache or EmbeddingLRU(DEFAULT_QUERY_CACHE_SIZE)
+        self._index: Optional[UtteranceIndex] = None
+        self._thresholds: Dict[str, float] = {}
+        self._inflight = SingleFlight()
+        self._init_lock = asyncio.Lock()
         self._initialized = False
         
         logger.info(
@@ -287,10 +324,14 @@ class VoiceSemanticRouter:
         )
     
     async def _ensure_initialized(self) -> None:
-        """确保路由器已初始化（懒加载）"""
+        """确保路由器已初始化（懒加载，并发请求只初始化一次）"""
         if self._initialized:
             return
-        
+        async with self._init_lock:
+            if not self._initialized:
+                await self._initialize()
+    
+    async def _initialize(self) -> None:
         # 初始化encoder
         if self._encoder is None:
             settings = load_settings()
@@ -327,45 +368,73 @@ class VoiceSemanticRouter:
                 f"base_url={settings.semantic_router_embedding_base_url}"
             )
         
-        # 创建SemanticRouter
-        # auto_sync="local" 会在初始化时同步路由embeddings到本地索引
-        try:
-            self._semantic_router = SemanticRouter(
-                encoder=self._encoder,
-                routes=self._routes,
-                auto_sync="local",  # 启用本地同步
-            )
-        except (TypeError, Exception) as e:
-            logger.warning(f"使用auto_sync='local'失败: {e}, 尝试不带该参数")
-            self._semantic_router = SemanticRouter(
-                encoder=self._encoder,
-                routes=self._routes,
-            )
+        # 路由阈值未配置时沿用encoder的默认阈值
+        default_threshold = getattr(self._encoder, "score_threshold", None) or 0.5
+        self._thresholds = {
+            r.name: r.score_threshold if r.score_threshold is not None else default_threshold
+            for r in self._routes
+        }
+        self._index = await self._load_index()
         
         self._initialized = True
-        logger.info("语义路由器初始化完成")
+        logger.info(f"语义路由器初始化完成: utterances={len(self._index)}")
+    
+    async def _load_index(self) -> UtteranceIndex:
+        """
+        加载路由样本句向量索引
+        
+        磁盘文件指纹（编码器名 + 全部路由样本句）一致时直接加载；
+        否则在线程池中批量编码一次并写回磁盘，下次启动不再重复编码
+        """
+        pairs = [(r.name, u) for r in self._routes for u in r.utterances]
+        fingerprint = routes_fingerprint(getattr(self._encoder, "name", ""), pairs)
+        
+        index = await asyncio.to_thread(UtteranceIndex.load, self._embeddings_path, fingerprint)
+        if index is not None:
+            logger.info(f"路由向量从磁盘加载: {self._embeddings_path}")
+            return index
+        
+        vectors = await asyncio.to_thread(self._encoder, [u for _, u in pairs])
+        index = UtteranceIndex([r for r, _ in pairs], vectors, fingerprint)
+        try:
+            await asyncio.to_thread(index.save, self._embeddings_path)
+            logger.info(f"路由向量已编码并保存: {self._embeddings_path}, count={len(index)}")
+        except OSError as e:
+            logger.warning(f"路由向量保存失败，仅本进程内使用: {e}")
+        return index
+    
+    async def _embed_query(self, text: str) -> list[float]:
+        """
+        查询文本向量：先查LRU，未命中再在线程池中请求encoder
+        
+        相同文本的并发未命中只请求一次，其余等待同一结果（首个请求方取消不影响其他等待者）
+        """
+        vector = self._query_cache.get(text)
+        if vector is not None:
+            return vector
+        
+        async def _encode() -> list[float]:
+            vector = list((await asyncio.to_thread(self._encoder, [text]))[0])
+            self._query_cache.put(text, vector)
+            return vector
+        
+        return await self._inflight.run(EmbeddingLRU.key(text), _encode)
     
     async def _semantic_classify(self, text: str) -> Tuple[str, float]:
         """
         执行快速语义分类（内部方法）
         
         Returns:
-            (route_name, confidence)
+            (route_name, confidence)；未过路由阈值时为 ("chitchat", 0.0)，交由LLM兜底
         """
         await self._ensure_initialized()
         
-        result = self._semantic_router(text)
-        
-        route_name = result.name if result.name else "chitchat"
-        
-        # 获取相似度分数
-        confidence = 0.0
-        if hasattr(result, 'similarity_score') and result.similarity_score is not None:
-            confidence = result.similarity_score
-        elif result.name is not None:
-            confidence = 0.85
+        vector = await self._embed_query(text)
+        route_name, similarity = self._index.classify(vector, self._thresholds)
+        if route_name is None:
+            return "chitchat", 0.0
         
-        return route_name, confidence
+        return route_name, similarity
     
     async def _llm_classify(self, text: str) -> str:
         """
@@ -12,6 +12,19 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379/0"
 
+    # Agent作业队列
+    agent_job_backend: str = "local"  # local | redis
+    agent_job_inprocess_workers: bool = True  # API进程内是否启动worker
+    agent_job_concurrency: dict[str, int] = {}  # 按作业类型覆盖并发数，如 {"emergency_analyze": 2}
+    agent_job_timeout_seconds: float = 600.0
+    agent_job_max_queue_length: int = 1000  # 单个作业类型未完成作业上限，0表示不限
+    agent_job_result_max_entries: int = 500  # 内存结果缓存上限（超出由Redis兜底）
+
+    # LangGraph检查点
+    agent_checkpoint_backend: str = "memory"  # memory | redis
+    agent_checkpoint_keep_last: int = 10  # 每个线程保留的检查点数
+    agent_checkpoint_ttl_seconds: int = 86400  # 线程空闲过期时间
+
     # API
     api_prefix: str = "/api/v2"
     debug: bool = False
@@ -5,11 +5,21 @@ WGS84 (地球坐标系) ↔ GCJ02 (火星坐标系/高德坐标系) 互转
 
 - 数据库路网使用 WGS84 坐标系
 - 前端高德地图使用 GCJ02 坐标系
+
+批量接口：
+- *_array：基于 NumPy 一次转换整列坐标（逆向迭代按点收敛）
+- transform_geometries / transform_feature_collection：GeoJSON 几何批量转换
+- StaticGeometryCache：静态图层转换结果缓存
 """
 from __future__ import annotations
 
 import math
-from typing import Tuple, List
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
 
 # 椭球参数
 _A = 6378245.0  # 长半轴
@@ -100,11 +110,325 @@ def gcj02_to_wgs84(lng: float, lat: float) -> Tuple[float, float]:
     return mglng, mglat
 
 
+def _out_of_china_array(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    return ~((lng >= 72.004) & (lng <= 137.8347) & (lat >= 0.8293) & (lat <= 55.8271))
+
+
+def _offsets_array(lng: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """WGS84 → GCJ02 的经纬度偏移量（度），与 wgs84_to_gcj02 公式一致"""
+    x = lng - 105.0
+    y = lat - 35.0
+    sqrt_abs_x = np.sqrt(np.abs(x))
+    # 两个方向共用的项
+    common = (20.0 * np.sin(6.0 * x * math.pi) + 20.0 * np.sin(2.0 * x * math.pi)) * 2.0 / 3.0
+
+    dlat = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * sqrt_abs_x + common
+    dlat += (20.0 * np.sin(y * math.pi) + 40.0 * np.sin(y / 3.0 * math.pi)) * 2.0 / 3.0
+    dlat += (160.0 * np.sin(y / 12.0 * math.pi) + 320 * np.sin(y * math.pi / 30.0)) * 2.0 / 3.0
+
+    dlng = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * x * y + 0.1 * sqrt_abs_x + common
+    dlng += (20.0 * np.sin(x * math.pi) + 40.0 * np.sin(x / 3.0 * math.pi)) * 2.0 / 3.0
+    dlng += (150.0 * np.sin(x / 12.0 * math.pi) + 300.0 * np.sin(x / 30.0 * math.pi)) * 2.0 / 3.0
+
+    radlat = lat / 180.0 * math.pi
+    magic = 1 - _EE * np.sin(radlat) ** 2
+    sqrtmagic = np.sqrt(magic)
+    dlat = (dlat * 180.0) / ((_A * (1 - _EE)) / (magic * sqrtmagic) * math.pi)
+    dlng = (dlng * 180.0) / (_A / sqrtmagic * np.cos(radlat) * math.pi)
+    outside = _out_of_china_array(lng, lat)
+    dlat[outside] = 0.0
+    dlng[outside] = 0.0
+    return dlng, dlat
+
+
+def _coords_array(points: ArrayLike, copy: bool = True) -> np.ndarray:
+    if not copy and isinstance(points, np.ndarray) and points.dtype == np.float64:
+        arr = points
+    else:
+        arr = np.array(points, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 2)
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        raise ValueError("坐标数组须为 shape=(N, 2) 的 [lng, lat] 序列")
+    return arr
+
+
+def wgs84_to_gcj02_array(points: ArrayLike, copy: bool = True) -> np.ndarray:
+    """
+    批量转换 WGS84 → GCJ02（NumPy 一次计算整列坐标）
+
+    Args:
+        points: [[lng, lat], ...] 或 shape=(N, 2+) 数组，第3列起（如高程）原样保留
+        copy: False 且输入为 float64 数组时原地转换并返回同一数组（零拷贝）
+
+    Returns:
+        shape=(N, 2+) 的 GCJ02 坐标数组
+    """
+    arr = _coords_array(points, copy)
+    dlng, dlat = _offsets_array(arr[:, 0], arr[:, 1])
+    arr[:, 0] += dlng
+    arr[:, 1] += dlat
+    return arr
+
+
+def gcj02_to_wgs84_array(
+    points: ArrayLike,
+    copy: bool = True,
+    tol: float = 1e-10,
+    max_iter: int = 30,
+) -> np.ndarray:
+    """
+    批量转换 GCJ02 → WGS84（NumPy 迭代逆向计算）
+
+    每轮只对尚未收敛的点计算，残差小于 tol（度，1e-10≈0.01毫米）的点退出迭代，
+    通常 3~5 轮全部收敛。
+
+    Args:
+        points: [[lng, lat], ...] 或 shape=(N, 2+) 数组
+        copy: False 且输入为 float64 数组时原地转换（零拷贝）
+        tol: 收敛阈值（度）
+        max_iter: 最大迭代轮数
+
+    Returns:
+        shape=(N, 2+) 的 WGS84 坐标数组
+    """
+    arr = _coords_array(points, copy)
+    target_lng = arr[:, 0].copy()
+    target_lat = arr[:, 1].copy()
+    active = np.flatnonzero(~_out_of_china_array(target_lng, target_lat))
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        lng = arr[active, 0]
+        lat = arr[active, 1]
+        dlng, dlat = _offsets_array(lng, lat)
+        err_lng = target_lng[active] - (lng + dlng)
+        err_lat = target_lat[active] - (lat + dlat)
+        arr[active, 0] = lng + err_lng
+        arr[active, 1] = lat + err_lat
+        active = active[(np.abs(err_lng) > tol) | (np.abs(err_lat) > tol)]
+    return arr
+
+
 def wgs84_to_gcj02_list(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
     """批量转换 WGS84 → GCJ02"""
-    return [wgs84_to_gcj02(lng, lat) for lng, lat in points]
+    if len(points) < 4:
+        return [wgs84_to_gcj02(lng, lat) for lng, lat in points]
+    return [(lng, lat) for lng, lat in wgs84_to_gcj02_array(points)[:, :2].tolist()]
 
 
 def gcj02_to_wgs84_list(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
     """批量转换 GCJ02 → WGS84"""
-    return [gcj02_to_wgs84(lng, lat) for lng, lat in points]
+    if len(points) < 4:
+        return [gcj02_to_wgs84(lng, lat) for lng, lat in points]
+    return [(lng, lat) for lng, lat in gcj02_to_wgs84_array(points)[:, :2].tolist()]
+
+
+# ============ GeoJSON ============
+
+# 各几何类型 coordinates 的嵌套深度（0 表示单个坐标 [lng, lat]）
+_GEOMETRY_DEPTH = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+
+_TRANSFORMS = {
+    "gcj02": wgs84_to_gcj02_array,
+    "wgs84": gcj02_to_wgs84_array,
+}
+
+
+def _transform_func(target: str):
+    try:
+        return _TRANSFORMS[target]
+    except KeyError:
+        raise ValueError(f"不支持的目标坐标系: {target}（可选 gcj02 / wgs84）") from None
+
+
+def _collect_positions(coords, depth: int, out: list) -> None:
+    if depth == 0:
+        out.append(coords)
+    elif depth == 1:
+        out.extend(coords)
+    else:
+        for child in coords:
+            _collect_positions(child, depth - 1, out)
+
+
+def _collect_geometry(geometry: dict, out: list) -> None:
+    geom_type = geometry.get("type")
+    if geom_type == "GeometryCollection":
+        for child in geometry.get("geometries") or []:
+            _collect_geometry(child, out)
+    elif geom_type in _GEOMETRY_DEPTH and not isinstance(geometry.get("coordinates"), np.ndarray):
+        _collect_positions(geometry.get("coordinates") or [], _GEOMETRY_DEPTH[geom_type], out)
+
+
+class _Cursor:
+    """按收集顺序依次取出转换后的坐标"""
+
+    __slots__ = ("rows", "pos")
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.pos = 0
+
+
+def _rebuild_positions(coords, depth: int, cursor: _Cursor):
+    if depth == 0:
+        new = cursor.rows[cursor.pos]
+        cursor.pos += 1
+        if len(coords) > 2:
+            new.extend(coords[2:])
+        return new
+    if depth == 1:
+        block = cursor.rows[cursor.pos:cursor.pos + len(coords)]
+        cursor.pos += len(coords)
+        for new, old in zip(block, coords):
+            if len(old) > 2:
+                new.extend(old[2:])
+        return block
+    return [_rebuild_positions(child, depth - 1, cursor) for child in coords]
+
+
+def _rebuild_geometry(geometry: dict, cursor: _Cursor, transform) -> dict:
+    geom_type = geometry.get("type")
+    if geom_type == "GeometryCollection":
+        return {
+            **geometry,
+            "geometries": [_rebuild_geometry(g, cursor, transform) for g in geometry.get("geometries") or []],
+        }
+    if geom_type not in _GEOMETRY_DEPTH:
+        return geometry
+    coords = geometry.get("coordinates")
+    if isinstance(coords, np.ndarray):
+        # 坐标本身是 float64 数组时原地转换，不经过 Python 列表
+        return {**geometry, "coordinates": transform(coords.reshape(-1, coords.shape[-1]), copy=False).reshape(coords.shape)}
+    return {**geometry, "coordinates": _rebuild_positions(coords or [], _GEOMETRY_DEPTH[geom_type], cursor)}
+
+
+def transform_geometries(geometries: Sequence[dict], target: str) -> List[dict]:
+    """
+    批量转换 GeoJSON 几何对象的坐标系
+
+    所有几何的全部坐标汇总后一次 NumPy 计算，再按原结构写回（返回新对象，不修改入参）。
+    coordinates 为 float64 ndarray 时原地转换（零拷贝）。
+
+    Args:
+        geometries: GeoJSON geometry 字典列表（支持 Point/LineString/Polygon 及 Multi*、GeometryCollection）
+        target: 目标坐标系，"gcj02"（WGS84→GCJ02）或 "wgs84"（GCJ02→WGS84）
+    """
+    transform = _transform_func(target)
+    positions: list = []
+    for geometry in geometries:
+        if geometry:
+            _collect_geometry(geometry, positions)
+    if positions:
+        try:
+            xy = np.array(positions, dtype=np.float64)[:, :2]
+        except ValueError:
+            # 坐标维度不一致（部分带高程）
+            xy = np.array([p[:2] for p in positions], dtype=np.float64)
+        rows = transform(xy, copy=False).tolist()
+    else:
+        rows = []
+    cursor = _Cursor(rows)
+    return [_rebuild_geometry(g, cursor, transform) if g else g for g in geometries]
+
+
+def transform_geometry(geometry: dict, target: str) -> dict:
+    """转换单个 GeoJSON 几何对象的坐标系"""
+    return transform_geometries([geometry], target)[0]
+
+
+def transform_feature_collection(collection: dict, target: str) -> dict:
+    """转换 GeoJSON FeatureCollection 中全部要素的坐标系（一次计算）"""
+    features = collection.get("features") or []
+    converted = transform_geometries([f.get("geometry") for f in features], target)
+    return {
+        **collection,
+        "features": [{**f, "geometry": g} for f, g in zip(features, converted)],
+    }
+
+
+# ============ 静态图层缓存 ============
+
+class StaticGeometryCache:
+    """
+    静态几何转换结果缓存（LRU）
+
+    行政区划、路网、固定设施等静态图层的几何不会变化，转换一次即可复用。
+    键为 (key, version, target)：version 传实体的 updated_at 等版本号，几何更新后自动失效。
+    返回的几何对象在多个响应间共享，调用方不得原地修改。
+    """
+
+    def __init__(self, max_entries: int = 20000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable, str], dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_transform(
+        self,
+        items: Sequence[Tuple[Hashable, Hashable, dict]],
+        target: str,
+    ) -> List[dict]:
+        """
+        批量获取转换后的几何，未命中的一次性转换后写入缓存
+
+        Args:
+            items: [(key, version, geometry), ...]
+            target: 目标坐标系
+        """
+        results: List[Optional[dict]] = [None] * len(items)
+        missing: List[int] = []
+        with self._lock:
+            for i, (key, version, _) in enumerate(items):
+                cached = self._entries.get((key, version, target))
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end((key, version, target))
+                    results[i] = cached
+            self.hits += len(items) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            converted = transform_geometries([items[i][2] for i in missing], target)
+            with self._lock:
+                for i, geometry in zip(missing, converted):
+                    results[i] = geometry
+                    self._entries[(items[i][0], items[i][1], target)] = geometry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return results
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """清除指定 key 的全部版本，key 为 None 时清空"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                return
+            for cache_key in [k for k in self._entries if k[0] == key]:
+                del self._entries[cache_key]
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_static_geometry_cache: Optional[StaticGeometryCache] = None
+
+
+def get_static_geometry_cache() -> StaticGeometryCache:
+    """获取静态几何缓存单例"""
+    global _static_geometry_cache
+    if _static_geometry_cache is None:
+        _static_geometry_cache = StaticGeometryCache()
+    return _static_geometry_cache
@@ -0,0 +1,63 @@
+"""
+文本向量 LRU 缓存
+
+语音意图路由的查询向量与 RAG 检索的查询向量共用此实现：
+- 键为空白规范化后的文本，可选 namespace 前缀区分同一缓存中的不同编码方式
+  （如 embed_query 与 embed_documents 对部分模型会产出不同向量）
+- 线程安全，编码在线程池执行时也可直接写入
+
+用法::
+
+    cache = EmbeddingLRU(max_entries=1024)
+    vector = cache.get(text, "query")
+    if vector is None:
+        vector = encode(text)
+        cache.put(text, vector, "query")
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+__all__ = ["EmbeddingLRU"]
+
+
+class EmbeddingLRU:
+    """查询文本 -> 向量 的 LRU 缓存（线程安全，编码在线程池执行时也可直接写入）"""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, namespace: str = "") -> str:
+        normalized = " ".join(text.split())
+        return f"{namespace}\x00{normalized}" if namespace else normalized
+
+    def get(self, text: str, namespace: str = "") -> Optional[List[float]]:
+        key = self.key(text, namespace)
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: List[float], namespace: str = "") -> None:
+        if self.max_entries <= 0:
+            return
+        key = self.key(text, namespace)
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,209 @@
+"""
+地理计算内核
+
+球面距离、方位角、目的点、折线长度、点在多边形内等计算的统一实现。
+
+- 标量函数（haversine_m 等）用 math 实现，单次调用开销最小
+- 批量函数基于 NumPy，一次处理整列坐标，替代 Python 循环逐点计算
+- 坐标约定：经度在前（lon, lat），单位为度；距离单位为米（*_km 变体为公里）
+
+用法::
+
+    from src.core.geodesy import haversine_m, one_to_many_m, nearest_index
+
+    d = haversine_m(116.40, 39.90, 121.47, 31.23)
+    dists = one_to_many_m(lon, lat, team_lons, team_lats)
+    idx, dist = nearest_index(lon, lat, node_lons, node_lats)
+"""
+from __future__ import annotations
+
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .coord_transform import gcj02_to_wgs84_array, wgs84_to_gcj02_array
+
+__all__ = [
+    "EARTH_RADIUS_M",
+    "EARTH_RADIUS_KM",
+    "haversine_m",
+    "haversine_km",
+    "bearing_deg",
+    "distances_m",
+    "one_to_many_m",
+    "distance_matrix_m",
+    "nearest_index",
+    "bearings_deg",
+    "destination_points",
+    "segment_lengths_m",
+    "polyline_length_m",
+    "points_in_polygon",
+    "wgs84_to_gcj02_array",
+    "gcj02_to_wgs84_array",
+]
+
+# 地球平均半径
+EARTH_RADIUS_M = 6371000.0
+EARTH_RADIUS_KM = EARTH_RADIUS_M / 1000.0
+
+
+def _as_float(values: ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+# ============ 标量 ============
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """两点间球面距离（米），Haversine 公式"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    sin_dlat = math.sin(math.radians(lat2 - lat1) / 2)
+    sin_dlon = math.sin(math.radians(lon2 - lon1) / 2)
+    a = sin_dlat * sin_dlat + math.cos(lat1_rad) * math.cos(lat2_rad) * sin_dlon * sin_dlon
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def haversine_km(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """两点间球面距离（公里）"""
+    return haversine_m(lon1, lat1, lon2, lat2) / 1000.0
+
+
+def bearing_deg(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """点1到点2的初始方位角（度），0-360，正北为0，顺时针增加"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lon = math.radians(lon2 - lon1)
+    x = math.sin(delta_lon) * math.cos(lat2_rad)
+    y = math.cos(lat1_rad) * math.sin(lat2_rad) - math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(delta_lon)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+# ============ 批量距离 ============
+
+def distances_m(lon1: ArrayLike, lat1: ArrayLike, lon2: ArrayLike, lat2: ArrayLike) -> np.ndarray:
+    """逐元素球面距离（米），参数按 NumPy 广播规则对齐"""
+    lon1, lat1, lon2, lat2 = map(_as_float, (lon1, lat1, lon2, lat2))
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    sin_dlat = np.sin((lat2_rad - lat1_rad) / 2)
+    sin_dlon = np.sin(np.radians(lon2 - lon1) / 2)
+    a = sin_dlat * sin_dlat + np.cos(lat1_rad) * np.cos(lat2_rad) * sin_dlon * sin_dlon
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def one_to_many_m(lon: float, lat: float, lons: ArrayLike, lats: ArrayLike) -> np.ndarray:
+    """一个点到一组点的距离（米）"""
+    return distances_m(lon, lat, lons, lats)
+
+
+def distance_matrix_m(
+    lons_a: ArrayLike,
+    lats_a: ArrayLike,
+    lons_b: ArrayLike | None = None,
+    lats_b: ArrayLike | None = None,
+) -> np.ndarray:
+    """两组点的两两距离矩阵（米），shape=(len(a), len(b))；b 省略时为 a 自身"""
+    lons_a, lats_a = _as_float(lons_a), _as_float(lats_a)
+    if lons_b is None or lats_b is None:
+        lons_b, lats_b = lons_a, lats_a
+    else:
+        lons_b, lats_b = _as_float(lons_b), _as_float(lats_b)
+    return distances_m(lons_a[:, None], lats_a[:, None], lons_b[None, :], lats_b[None, :])
+
+
+def nearest_index(lon: float, lat: float, lons: ArrayLike, lats: ArrayLike) -> Tuple[int, float]:
+    """一组点中距离给定点最近的下标与距离（米），空集合返回 (-1, inf)"""
+    dists = one_to_many_m(lon, lat, lons, lats)
+    if dists.size == 0:
+        return -1, math.inf
+    idx = int(np.argmin(dists))
+    return idx, float(dists[idx])
+
+
+# ============ 方位与目的点 ============
+
+def bearings_deg(lon1: ArrayLike, lat1: ArrayLike, lon2: ArrayLike, lat2: ArrayLike) -> np.ndarray:
+    """逐元素初始方位角（度），0-360，正北为0"""
+    lon1, lat1, lon2, lat2 = map(_as_float, (lon1, lat1, lon2, lat2))
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lon = np.radians(lon2 - lon1)
+    x = np.sin(delta_lon) * np.cos(lat2_rad)
+    y = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(delta_lon)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+def destination_points(
+    lon: ArrayLike,
+    lat: ArrayLike,
+    bearing: ArrayLike,
+    distance_m: ArrayLike,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """从起点沿方位角行进给定距离后的目的点（大圆），返回 (lons, lats)"""
+    lon, lat, bearing, distance_m = map(_as_float, (lon, lat, bearing, distance_m))
+    lat_rad = np.radians(lat)
+    brg = np.radians(bearing)
+    ang = distance_m / EARTH_RADIUS_M
+    sin_lat2 = np.sin(lat_rad) * np.cos(ang) + np.cos(lat_rad) * np.sin(ang) * np.cos(brg)
+    lat2 = np.arcsin(np.clip(sin_lat2, -1.0, 1.0))
+    lon2 = np.radians(lon) + np.arctan2(
+        np.sin(brg) * np.sin(ang) * np.cos(lat_rad),
+        np.cos(ang) - np.sin(lat_rad) * sin_lat2,
+    )
+    return (np.degrees(lon2) + 540) % 360 - 180, np.degrees(lat2)
+
+
+# ============ 折线与多边形 ============
+
+def _coords_array(coords: ArrayLike | Sequence[Sequence[float]]) -> np.ndarray:
+    arr = _as_float(coords)
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        raise ValueError("坐标数组须为 shape=(N, 2) 的 [lon, lat] 序列")
+    return arr
+
+
+def segment_lengths_m(coords: ArrayLike | Sequence[Sequence[float]]) -> np.ndarray:
+    """折线各段长度（米），coords 为 [[lon, lat], ...]，返回 shape=(N-1,)"""
+    arr = _coords_array(coords)
+    if len(arr) < 2:
+        return np.zeros(0, dtype=np.float64)
+    return distances_m(arr[:-1, 0], arr[:-1, 1], arr[1:, 0], arr[1:, 1])
+
+
+def polyline_length_m(coords: ArrayLike | Sequence[Sequence[float]]) -> float:
+    """折线总长度（米）"""
+    return float(segment_lengths_m(coords).sum())
+
+
+def points_in_polygon(
+    lons: ArrayLike,
+    lats: ArrayLike,
+    ring: ArrayLike | Sequence[Sequence[float]],
+) -> np.ndarray:
+    """批量判断点是否在多边形内（射线法，经纬度平面）
+
+    Args:
+        lons, lats: 待判断点的经纬度
+        ring: 多边形外环 [[lon, lat], ...]，首尾是否闭合均可
+
+    Returns:
+        bool 数组，与 lons 同 shape
+    """
+    px, py = _as_float(lons), _as_float(lats)
+    poly = _coords_array(ring)
+    if len(poly) > 1 and np.array_equal(poly[0], poly[-1]):
+        poly = poly[:-1]
+    inside = np.zeros(np.broadcast(px, py).shape, dtype=bool)
+    if len(poly) < 3:
+        return inside
+    # 逐边（边数通常远小于点数）对全部点做向量化的交点判断
+    x1, y1 = poly[:, 0], poly[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for ax, ay, bx, by in zip(x1, y1, x2, y2):
+            crosses = (ay > py) != (by > py)
+            x_cross = (bx - ax) * (py - ay) / (by - ay) + ax
+            inside ^= crosses & (px < x_cross)
+    return inside
@@ -0,0 +1,59 @@
+"""
+并发请求合并（single-flight）
+
+相同键的并发调用只执行一次 fetch，其余调用等待同一结果：
+
+- fetch 在独立任务中执行，任一调用方（包括首个发起者）被取消都不会取消 fetch，
+  其他等待者照常拿到结果
+- fetch 抛出的异常原样传递给当时所有等待者，不缓存
+- 任务绑定创建时的事件循环，循环切换（如测试中多次 asyncio.run）时不跨循环合并
+
+缓存写入应放在 fetch 内部，发起者被取消时结果仍会写入缓存。
+
+用法::
+
+    flight = SingleFlight()
+    value = await flight.run(key, lambda: fetch_and_cache(key))
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def _current(self, key: Hashable) -> Optional[asyncio.Task]:
+        task = self._tasks.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def pending(self, key: Hashable) -> bool:
+        """当前事件循环中该键是否有执行中的 fetch（调用 run 将等待它）"""
+        return self._current(key) is not None
+
+    async def run(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """执行或加入该键的 fetch，返回其结果"""
+        task = self._current(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待者都已取消时取出异常，避免 "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
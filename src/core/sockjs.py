@@ -0,0 +1,371 @@
+"""
+SockJS 会话层（HTTP 降级传输）
+
+WebSocket 被代理拦截时，SockJS 客户端退化为 HTTP 传输：
+- 接收: xhr / jsonp（长轮询），xhr_streaming / eventsource / htmlfile（流式）
+- 发送: xhr_send / jsonp_send
+
+会话对上层表现为一个"虚拟WebSocket"：上层照常 send_text() 发送 SockJS 帧（a[...] / c[...]），
+会话把 a[...] 中的消息放入有界出站队列，当前挂起的接收请求被队列事件唤醒后一次取走全部积压，
+合并成一个 a[...] 响应；无消息时按心跳间隔返回 h。
+
+- 出站队列超过 queue_limit 时关闭会话（慢消费者，客户端重连后重新拉取），不无限堆积
+- 同一会话同时只允许一个接收请求（SockJS 规范：第二个返回 c[2010,...]）
+- 无接收请求超过 disconnect_delay 的会话由后台任务回收，并回调 on_close 通知上层
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SEC = float(os.environ.get("SOCKJS_HEARTBEAT_SEC", "25"))
+DISCONNECT_DELAY_SEC = float(os.environ.get("SOCKJS_DISCONNECT_DELAY_SEC", "5"))
+QUEUE_LIMIT = int(os.environ.get("SOCKJS_QUEUE_LIMIT", "1000"))
+BATCH_LIMIT = int(os.environ.get("SOCKJS_BATCH_LIMIT", "500"))
+# 流式响应累计字节数达到上限后结束本次响应，客户端自动发起下一次（避免浏览器无限缓存响应体）
+STREAM_LIMIT_BYTES = int(os.environ.get("SOCKJS_STREAM_LIMIT_BYTES", str(128 * 1024)))
+MAX_SESSIONS = int(os.environ.get("SOCKJS_MAX_SESSIONS", "10000"))
+
+OPEN_FRAME = "o"
+HEARTBEAT_FRAME = "h"
+# xhr_streaming 需先发送2KB前导，绕过部分代理/浏览器的缓冲
+STREAMING_PRELUDE = "h" * 2048 + "\n"
+
+CloseCallback = Callable[["SockJSSession"], Union[None, Awaitable[None]]]
+
+
+def message_frame(messages: Iterable[str]) -> str:
+    """消息批次 → a[...] 帧（ensure_ascii 保证 U+2028 等字符被转义，满足 SockJS 对 JSON 的要求）"""
+    return "a" + json.dumps(list(messages))
+
+
+def close_frame(code: int, reason: str) -> str:
+    return "c" + json.dumps([code, reason])
+
+
+def parse_send_body(body: Union[str, bytes]) -> List[str]:
+    """
+    解析 xhr_send 请求体（JSON 字符串数组）
+
+    Raises:
+        ValueError: 请求体为空或不是字符串数组
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if not body:
+        raise ValueError("Payload expected.")
+    messages = json.loads(body)
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+        raise ValueError("Broken JSON encoding.")
+    return messages
+
+
+class SockJSSessionClosed(Exception):
+    """会话已关闭"""
+
+
+class SockJSQueueOverflow(SockJSSessionClosed):
+    """出站队列溢出，会话已被关闭"""
+
+
+class SockJSReceiverBusy(Exception):
+    """已有其他接收请求挂在该会话上"""
+
+
+class SockJSCapacityError(Exception):
+    """会话数达到上限"""
+
+
+class SockJSSession:
+    """
+    单个 SockJS 会话
+
+    上层（STOMP 处理）把它当作 WebSocket 使用：send_text("a[...]") 入队、send_text("c[...]") 关闭；
+    传输端点通过 receive() 取走积压消息。
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        queue_limit: int = QUEUE_LIMIT,
+        batch_limit: int = BATCH_LIMIT,
+        on_close: Optional[CloseCallback] = None,
+    ) -> None:
+        self.session_id = session_id
+        self.queue_limit = queue_limit
+        self.batch_limit = batch_limit
+        self.on_close = on_close
+        self.opened = False
+        self.closed = False
+        self.close_frame: Optional[str] = None
+        self.last_seen = time.monotonic()
+        self.sent_messages = 0
+        self._queue: Deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._receiving = False
+
+    # ------------------------------------------------------------------
+    # 上层（虚拟WebSocket）接口
+    # ------------------------------------------------------------------
+
+    async def accept(self) -> None:
+        """兼容 WebSocket 接口，打开帧由接收请求发出"""
+
+    async def send_text(self, data: str) -> None:
+        """
+        发送一个 SockJS 帧
+
+        a[...] 中的消息入队；c[...] 关闭会话；o / h 由传输层自行产生，忽略。
+
+        Raises:
+            SockJSSessionClosed: 会话已关闭
+            SockJSQueueOverflow: 出站队列溢出（会话随即关闭）
+        """
+        if data.startswith("a"):
+            self.enqueue(json.loads(data[1:]))
+        elif data.startswith("c"):
+            code, reason = json.loads(data[1:])
+            self.close(code, reason)
+
+    def enqueue(self, messages: List[str]) -> None:
+        if self.closed:
+            raise SockJSSessionClosed(self.session_id)
+        if len(self._queue) + len(messages) > self.queue_limit:
+            logger.warning(
+                f"[SockJS {self.session_id}] 出站队列溢出({len(self._queue)}/{self.queue_limit})，关闭会话"
+            )
+            self.close(1013, "Outbound queue overflow")
+            raise SockJSQueueOverflow(self.session_id)
+        self._queue.extend(messages)
+        self._ready.set()
+
+    def close(self, code: int = 3000, reason: str = "Go away!") -> None:
+        """关闭会话：已排队的消息仍会先发出，之后发送关闭帧"""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_frame = close_frame(code, reason)
+        self._ready.set()
+
+    # ------------------------------------------------------------------
+    # 传输层接口
+    # ------------------------------------------------------------------
+
+    @property
+    def receiving(self) -> bool:
+        return self._receiving
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def idle_for(self, now: Optional[float] = None) -> float:
+        """无接收请求的时长（有接收请求挂起时为0）"""
+        if self._receiving:
+            return 0.0
+        return (now if now is not None else time.monotonic()) - self.last_seen
+
+    def attach(self) -> None:
+        if self._receiving:
+            raise SockJSReceiverBusy(self.session_id)
+        self._receiving = True
+        self.last_seen = time.monotonic()
+
+    def detach(self) -> None:
+        self._receiving = False
+        self.last_seen = time.monotonic()
+
+    async def receive(self, timeout: float) -> Optional[str]:
+        """
+        等待下一帧：有消息时返回合并后的 a[...]，会话关闭返回 c[...]，超时返回 None
+
+        调用方需先 attach()。
+        """
+        if not self._queue and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._queue:
+            count = min(len(self._queue), self.batch_limit)
+            batch = [self._queue.popleft() for _ in range(count)]
+            if not self._queue and not self.closed:
+                self._ready.clear()
+            self.sent_messages += count
+            return message_frame(batch)
+        return self.close_frame
+
+
+class SockJSSessionManager:
+    """
+    SockJS 会话注册表与传输实现
+
+    使用示例:
+    ```python
+    sessions = SockJSSessionManager()
+    session, created = sessions.open(session_id, on_close=lambda s: manager.disconnect(s.session_id))
+    body = await sessions.poll(session, created)                       # xhr / jsonp
+    stream = sessions.stream(session, created, lambda f: f + "\\n")     # xhr_streaming 等
+    ```
+    """
+
+    def __init__(
+        self,
+        heartbeat_sec: float = HEARTBEAT_SEC,
+        disconnect_delay_sec: float = DISCONNECT_DELAY_SEC,
+        queue_limit: int = QUEUE_LIMIT,
+        batch_limit: int = BATCH_LIMIT,
+        stream_limit_bytes: int = STREAM_LIMIT_BYTES,
+        max_sessions: int = MAX_SESSIONS,
+    ) -> None:
+        self.heartbeat_sec = heartbeat_sec
+        self.disconnect_delay_sec = disconnect_delay_sec
+        self.queue_limit = queue_limit
+        self.batch_limit = batch_limit
+        self.stream_limit_bytes = stream_limit_bytes
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, SockJSSession] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    def get(self, session_id: str) -> Optional[SockJSSession]:
+        return self.sessions.get(session_id)
+
+    def open(self, session_id: str, on_close: Optional[CloseCallback] = None) -> tuple[SockJSSession, bool]:
+        """
+        获取或创建会话，返回 (会话, 是否新建)
+
+        Raises:
+            SockJSCapacityError: 会话数达到上限
+        """
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session, False
+        if len(self.sessions) >= self.max_sessions:
+            raise SockJSCapacityError(f"SockJS会话数已达上限 {self.max_sessions}")
+        session = SockJSSession(session_id, self.queue_limit, self.batch_limit, on_close)
+        self.sessions[session_id] = session
+        self._ensure_reaper()
+        logger.info(f"[SockJS] 新会话 {session_id}，当前 {len(self.sessions)} 个")
+        return session, True
+
+    async def remove(self, session_id: str) -> None:
+        """移除会话并回调 on_close"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        session.close()
+        if session.on_close is not None:
+            try:
+                result = session.on_close(session)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"[SockJS {session_id}] on_close 回调失败: {e}")
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """回收无接收请求超过 disconnect_delay 的会话，返回回收数量"""
+        now = now if now is not None else time.monotonic()
+        expired = [
+            sid for sid, s in self.sessions.items()
+            if s.idle_for(now) > self.disconnect_delay_sec
+        ]
+        for sid in expired:
+            await self.remove(sid)
+        if expired:
+            logger.info(f"[SockJS] 回收空闲会话 {len(expired)} 个，剩余 {len(self.sessions)} 个")
+        return len(expired)
+
+    async def close_all(self) -> None:
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        for sid in list(self.sessions):
+            await self.remove(sid)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(self.disconnect_delay_sec / 2, 0.05)
+        try:
+            while self.sessions:
+                await asyncio.sleep(interval)
+                await self.reap()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"[SockJS] 会话回收任务异常: {e}")
+
+    # ------------------------------------------------------------------
+    # 传输
+    # ------------------------------------------------------------------
+
+    async def poll(self, session: SockJSSession, created: bool) -> str:
+        """
+        长轮询（xhr / jsonp）：返回一帧（不含换行）
+
+        新会话立即返回打开帧；否则等待消息、关闭或心跳超时。
+        """
+        if created or not session.opened:
+            session.opened = True
+            session.last_seen = time.monotonic()
+            return OPEN_FRAME
+        if session.receiving:
+            return close_frame(2010, "Another connection still open")
+        session.attach()
+        try:
+            frame = await session.receive(self.heartbeat_sec)
+        finally:
+            session.detach()
+        if session.closed and not session.pending:
+            # 关闭帧已送达，不再等待回收周期
+            await self.remove(session.session_id)
+        return frame or HEARTBEAT_FRAME
+
+    async def stream(
+        self,
+        session: SockJSSession,
+        created: bool,
+        wrap: Callable[[str], str],
+        prelude: str = "",
+    ) -> AsyncIterator[str]:
+        """
+        流式传输（xhr_streaming / eventsource / htmlfile）
+
+        Args:
+            wrap: 帧 → 传输格式（如 xhr_streaming 为 frame + "\\n"）
+            prelude: 响应开头的前导内容
+        """
+        if prelude:
+            yield prelude
+        if created or not session.opened:
+            session.opened = True
+            yield wrap(OPEN_FRAME)
+        if session.receiving:
+            yield wrap(close_frame(2010, "Another connection still open"))
+            return
+        session.attach()
+        written = 0
+        try:
+            while True:
+                frame = await session.receive(self.heartbeat_sec)
+                chunk = wrap(frame or HEARTBEAT_FRAME)
+                yield chunk
+                if frame is not None and frame.startswith("c"):
+                    break
+                written += len(chunk)
+                if written >= self.stream_limit_bytes:
+                    break
+        finally:
+            session.detach()
+        if session.closed and not session.pending:
+            await self.remove(session.session_id)
@@ -328,6 +328,10 @@ class StompBroker:
         """广播实体删除（包含完整信息：id, type, layerCode）"""
         await self.send_to_destination("/topic/map.entity.delete", {"payload": entity_data}, scenario_id)
     
+    async def broadcast_entity_batch(self, batch_data: dict, scenario_id: Optional[UUID] = None):
+        """广播实体批量变更（created: 完整实体列表, deleted: id/type/layerCode 列表, replacedLayers）"""
+        await self.send_to_destination("/topic/map.entity.batch", {"payload": batch_data}, scenario_id)
+    
     async def broadcast_location(self, location_data: dict, scenario_id: Optional[UUID] = None):
         """广播实时位置"""
         await self.send_to_destination("/topic/realtime.location", {"payload": location_data}, scenario_id)
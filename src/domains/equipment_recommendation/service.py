@@ -98,6 +98,7 @@ class EquipmentRecommendationService:
         
         # 清理该事件的旧装备分配记录
         await self._clear_event_assignments(event_id)
+        await self._refresh_loadout_view(event_id)
         
         logger.info(f"触发装备分析: event_id={event_id}")
         
@@ -161,6 +162,9 @@ class EquipmentRecommendationService:
                 ready_at=event_info.get("ready_at") or event_info.get("created_at"),
             )
             
+            # 车辆装备读模型重新加载AI推荐（新的loading_plan），差异推送给前端
+            await self._refresh_loadout_view(event_id)
+            
             # 通过WebSocket广播
             await self._broadcast_equipment_ready(brief, scenario_id)
             
@@ -187,6 +191,17 @@ class EquipmentRecommendationService:
         if result.rowcount > 0:
             logger.info(f"已清理事件 {event_id} 的旧装备分配记录，共 {result.rowcount} 条")
     
+    async def _refresh_loadout_view(self, event_id: UUID) -> None:
+        """AI推荐或分配记录变化并提交后更新车辆装备读模型"""
+        from src.domains.frontend_api.car.loadout_view import (
+            SOURCE_ASSIGNMENTS,
+            SOURCE_RECOMMENDATION,
+            get_loadout_view,
+        )
+        
+        await self.db.commit()
+        await get_loadout_view().refresh(self.db, event_id, {SOURCE_RECOMMENDATION, SOURCE_ASSIGNMENTS})
+    
     async def _get_event_info(self, event_id: UUID) -> Dict[str, Any]:
         """获取事件信息"""
         from sqlalchemy import text
@@ -4,8 +4,16 @@
 为前端提供兼容原Java后端的接口格式，内部调用v2 API服务层。
 短期方案：快速对接前端
 长期方案：前端逐步迁移到v2 API后废弃此模块
-"""
 
-from .router import frontend_router
+frontend_router 在首次访问时才导入，子模块中的纯构建逻辑（如 car.loadout_builder）
+可单独导入，不拉起全部路由及其智能体依赖。
+"""
 
 __all__ = ["frontend_router"]
+
+
+def __getattr__(name: str):
+    if name == "frontend_router":
+        from .router import frontend_router
+        return frontend_router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,11 @@
 """车辆装备模块"""
 
-from .router import router as car_router
-
 __all__ = ["car_router"]
+
+
+def __getattr__(name: str):
+    # 路由延迟导入，loadout_builder 可单独导入
+    if name == "car_router":
+        from .router import router as car_router
+        return car_router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
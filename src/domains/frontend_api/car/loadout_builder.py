@@ -0,0 +1,361 @@
+"""
+车辆装备载荷读模型的纯构建逻辑（不访问数据库/Redis，可单独导入测试）
+
+输入为 LoadoutSources（车辆/设备/模块/AI推荐/用户分配/任务状态），输出 CarListData：
+- build_context: 与车辆无关的预计算（设备可适配模块、AI推荐、装载方案映射）
+- build_car_list: 构建车辆列表，可只重建部分车辆
+- diff_car_list: 两个版本之间按车辆/设备的差异
+
+加载、缓存与推送见 loadout_view.CarLoadoutView。
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from .schemas import CarItem, CarListData, ItemData, ModuleData, ShortageAlertData
+
+logger = logging.getLogger(__name__)
+
+_STATUS_MAP = {
+    'available': 'available',
+    'deployed': 'ready',
+    'maintenance': 'preparing',
+}
+
+
+@dataclass
+class LoadoutSources:
+    """读模型的原始输入"""
+    vehicles: List[Any] = field(default_factory=list)
+    devices: List[Any] = field(default_factory=list)
+    modules: List[Dict[str, Any]] = field(default_factory=list)
+    recommendation: Optional[Dict[str, Any]] = None
+    assignments: Dict[Tuple[str, str], bool] = field(default_factory=dict)
+    quest_status: str = "pending"
+
+
+@dataclass
+class _DeviceEntry:
+    """设备在所有车辆上共用的部分"""
+    device: Any
+    device_id: str
+    compatible_modules: List[Dict[str, Any]]
+    has_modules: bool
+    rec_info: Optional[Dict[str, Any]]
+    ai_module_ids: Set[str]
+    ai_module_reasons: Dict[str, str]
+    exclusive_vehicle_id: Optional[str]
+    exclusive_vehicle_name: Optional[str]
+    assigned_to_vid: Optional[str]
+    assigned_to_vname: Optional[str]
+
+
+@dataclass
+class LoadoutContext:
+    """与车辆无关的预计算结果（车辆/设备/模块/AI推荐不变时复用）"""
+    devices: List[_DeviceEntry]
+    vehicle_device_map: Dict[str, Set[str]]
+    has_loading_plan: bool
+
+
+def build_recommended_device_map(
+    ai_recommendation: Optional[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """构建AI推荐设备映射表 {device_id -> {reason, priority, modules}}"""
+    if not ai_recommendation:
+        return {}
+
+    device_map: Dict[str, Dict[str, Any]] = {}
+    for rec in ai_recommendation.get("recommended_devices", []):
+        device_id = rec.get("device_id", "")
+        if device_id:
+            device_map[device_id] = {
+                "reason": rec.get("reason", ""),
+                "priority": rec.get("priority", "medium"),
+                "modules": rec.get("modules", []),
+            }
+    return device_map
+
+
+def build_shortage_alerts(
+    ai_recommendation: Optional[Dict[str, Any]]
+) -> Optional[List[ShortageAlertData]]:
+    """构建缺口告警列表"""
+    if not ai_recommendation:
+        return None
+
+    alerts = ai_recommendation.get("shortage_alerts", [])
+    if not alerts:
+        return None
+
+    return [
+        ShortageAlertData(
+            itemType=a.get("item_type", ""),
+            itemName=a.get("item_name", ""),
+            required=a.get("required", 0),
+            available=a.get("available", 0),
+            shortage=a.get("shortage", 0),
+            severity=a.get("severity", "warning"),
+            suggestion=a.get("suggestion", ""),
+        )
+        for a in alerts
+    ]
+
+
+def _normalized_loading_plan(ai_recommendation: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """仅保留车辆ID为有效UUID的装载方案（兼容旧数据）"""
+    loading_plan = (ai_recommendation or {}).get("loading_plan") or {}
+    normalized: Dict[str, Any] = {}
+    for vid, plan in loading_plan.items():
+        try:
+            UUID(vid)
+        except Exception:
+            logger.warning("忽略loading_plan中的非UUID车辆ID: %s", vid)
+            continue
+        normalized[vid] = plan
+    return normalized
+
+
+def build_context(sources: LoadoutSources) -> LoadoutContext:
+    """预计算设备可适配模块、AI推荐与装载方案映射"""
+    rec_device_map = build_recommended_device_map(sources.recommendation)
+    loading_plan = _normalized_loading_plan(sources.recommendation)
+
+    # 按设备类型分组模块
+    modules_by_device_type: Dict[str, List[Dict[str, Any]]] = {}
+    for mod in sources.modules:
+        for dtype in mod.get("compatible_device_types", []):
+            modules_by_device_type.setdefault(dtype, []).append(mod)
+
+    vehicle_id_to_name: Dict[str, str] = {str(v.id): v.name for v in sources.vehicles}
+
+    # 设备→分配车辆 {device_id -> (vehicle_id, vehicle_name)}，直接使用loading_plan中的真实车辆ID
+    device_to_vehicle_map: Dict[str, Tuple[str, str]] = {}
+    vehicle_device_map: Dict[str, Set[str]] = {}
+    for vid, plan in loading_plan.items():
+        vname = plan.get("vehicle_name", vehicle_id_to_name.get(vid, ""))
+        devices_in_plan = plan.get("devices", []) or []
+        if not devices_in_plan:
+            continue
+        vehicle_device_map.setdefault(vid, set()).update(devices_in_plan)
+        for dev_id in devices_in_plan:
+            device_to_vehicle_map[dev_id] = (vid, vname)
+
+    entries: List[_DeviceEntry] = []
+    for device in sources.devices:
+        device_id_str = str(device.id)
+
+        rec_info = rec_device_map.get(device_id_str)
+        ai_module_ids: Set[str] = set()
+        ai_module_reasons: Dict[str, str] = {}
+        if rec_info:
+            for m in rec_info.get("modules", []):
+                mid = m.get("module_id", "")
+                ai_module_ids.add(mid)
+                ai_module_reasons[mid] = m.get("reason", "")
+
+        # 双向匹配：设备类型在模块的compatible_device_types中，模块类型在设备的compatible_module_types中
+        device_type = device.device_type.value if device.device_type else ""
+        allowed_module_types = set(device.compatible_module_types or [])
+        compatible_modules = [
+            m for m in modules_by_device_type.get(device_type, [])
+            if m.get("module_type") in allowed_module_types
+        ]
+        has_modules = bool(device.module_slots and device.module_slots > 0 and compatible_modules)
+        if has_modules:
+            # 专有模块只保留属于当前设备的
+            compatible_modules = [
+                m for m in compatible_modules
+                if not m.get("exclusive_to_device_id") or m.get("exclusive_to_device_id") == device_id_str
+            ]
+        else:
+            compatible_modules = []
+
+        exclusive_vehicle_id = str(device.exclusive_to_vehicle_id) if device.exclusive_to_vehicle_id else None
+        assigned_vehicle = device_to_vehicle_map.get(device_id_str)
+        entries.append(_DeviceEntry(
+            device=device,
+            device_id=device_id_str,
+            compatible_modules=compatible_modules,
+            has_modules=has_modules,
+            rec_info=rec_info,
+            ai_module_ids=ai_module_ids,
+            ai_module_reasons=ai_module_reasons,
+            exclusive_vehicle_id=exclusive_vehicle_id,
+            exclusive_vehicle_name=vehicle_id_to_name.get(exclusive_vehicle_id) if exclusive_vehicle_id else None,
+            assigned_to_vid=assigned_vehicle[0] if assigned_vehicle else None,
+            assigned_to_vname=assigned_vehicle[1] if assigned_vehicle else None,
+        ))
+
+    return LoadoutContext(
+        devices=entries,
+        vehicle_device_map=vehicle_device_map,
+        has_loading_plan=bool(loading_plan),
+    )
+
+
+def build_item_list(
+    context: LoadoutContext,
+    current_vehicle_id: str,
+    user_assignment_map: Dict[Tuple[str, str], bool],
+) -> List[ItemData]:
+    """构建某辆车的设备列表（含模块），用户分配优先于AI推荐"""
+    items = []
+    for entry in context.devices:
+        device = entry.device
+
+        module_list = []
+        for mod in entry.compatible_modules:
+            mod_id = mod["id"]
+            # 模块 isSelected：用户分配 > AI推荐
+            module_user_selected = user_assignment_map.get((current_vehicle_id, mod_id))
+            if module_user_selected is not None:
+                module_is_selected = 1 if module_user_selected else 0
+            else:
+                module_is_selected = 1 if mod_id in entry.ai_module_ids else 0
+
+            module_list.append(ModuleData(
+                id=mod_id,
+                name=mod["name"],
+                moduleType=mod.get("module_type", ""),
+                isSelected=module_is_selected,
+                aiReason=entry.ai_module_reasons.get(mod_id),
+                exclusiveToDeviceId=mod.get("exclusive_to_device_id"),
+            ))
+
+        # 判断设备是否被AI分配到当前车辆
+        is_assigned_to_current = entry.assigned_to_vid == current_vehicle_id
+
+        # 设备 isSelected：用户分配 > 专属装备 > AI推荐
+        user_selected = user_assignment_map.get((current_vehicle_id, entry.device_id))
+        if user_selected is not None:
+            is_selected_flag = 1 if user_selected else 0
+        elif entry.exclusive_vehicle_id == current_vehicle_id:
+            is_selected_flag = 1
+        else:
+            is_ai_recommended = entry.rec_info is not None
+            is_selected_flag = 1 if (
+                is_assigned_to_current or (not context.has_loading_plan and is_ai_recommended)
+            ) else 0
+
+        props = device.properties or {}
+        # aiReason 只在设备被分配到当前车辆时才设置，避免前端重复显示
+        rec_info = entry.rec_info if is_assigned_to_current else None
+        items.append(ItemData(
+            id=entry.device_id,
+            name=device.name,
+            model=device.model or props.get('model', device.code),
+            type="device",
+            isSelected=is_selected_flag,
+            aiReason=rec_info["reason"] if rec_info else None,
+            priority=rec_info["priority"] if rec_info else None,
+            assignedToVehicle=entry.assigned_to_vid,
+            assignedToVehicleName=entry.assigned_to_vname,
+            exclusiveToVehicleId=entry.exclusive_vehicle_id,
+            exclusiveToVehicleName=entry.exclusive_vehicle_name,
+            hasModules=entry.has_modules,
+            modules=module_list,
+            image=props.get('image'),
+            description=props.get('description'),
+            manufacturer=device.manufacturer,
+            specifications=props.get('specifications'),
+        ))
+    return items
+
+
+def build_car(context: LoadoutContext, vehicle: Any, sources: LoadoutSources) -> CarItem:
+    """构建单辆车"""
+    vehicle_id_str = str(vehicle.id)
+    return CarItem(
+        id=vehicle_id_str,
+        code=vehicle.code,
+        name=vehicle.name,
+        status=_STATUS_MAP.get(vehicle.status.value, 'available'),
+        isSelected=vehicle_id_str in context.vehicle_device_map,
+        isBelongsToThisCar=0,
+        itemDataList=build_item_list(context, vehicle_id_str, sources.assignments),
+    )
+
+
+def build_car_list(
+    sources: LoadoutSources,
+    context: Optional[LoadoutContext] = None,
+    previous: Optional[CarListData] = None,
+    car_ids: Optional[Set[str]] = None,
+) -> CarListData:
+    """
+    构建车辆列表
+
+    previous + car_ids 给定时，只重建 car_ids 中的车辆，其余车辆沿用 previous
+    （仅用户分配变化时使用，context 必须与 previous 来自同一批输入）。
+    """
+    context = context or build_context(sources)
+    reuse: Dict[str, CarItem] = {}
+    if previous is not None and car_ids is not None:
+        reuse = {car.id: car for car in previous.carItemDataList if car.id not in car_ids}
+
+    cars = [
+        reuse.get(str(vehicle.id)) or build_car(context, vehicle, sources)
+        for vehicle in sources.vehicles
+    ]
+
+    # 如果没有车辆数据，创建一个虚拟车辆来展示设备
+    if not cars and sources.devices:
+        cars.append(CarItem(
+            id="default-vehicle",
+            name="装备仓库",
+            status="available",
+            isSelected=False,
+            isBelongsToThisCar=0,
+            itemDataList=build_item_list(context, "default-vehicle", sources.assignments),
+        ))
+
+    rec = sources.recommendation
+    return CarListData(
+        carItemDataList=cars,
+        carQuestStatus=sources.quest_status,
+        recommendationId=str(rec["id"]) if rec else None,
+        recommendationStatus=rec.get("status") if rec else None,
+        shortageAlerts=build_shortage_alerts(rec),
+    )
+
+
+def diff_car_list(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    两个版本（CarListData.model_dump 结果）之间的差异
+
+    Returns:
+        {顶层变化字段..., "cars": {"added": [车辆], "updated": [{id, fields, items, removedItemIds}], "removed": [车辆ID]}}
+        无变化时返回空字典
+    """
+    changes: Dict[str, Any] = {
+        key: new.get(key)
+        for key in ("carQuestStatus", "recommendationId", "recommendationStatus", "shortageAlerts")
+        if old.get(key) != new.get(key)
+    }
+
+    old_cars = {car["id"]: car for car in old.get("carItemDataList", [])}
+    added: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    for car in new.get("carItemDataList", []):
+        prev = old_cars.pop(car["id"], None)
+        if prev is None:
+            added.append(car)
+            continue
+        if prev == car:
+            continue
+        prev_items = {item["id"]: item for item in prev.get("itemDataList", [])}
+        items = [item for item in car["itemDataList"] if prev_items.pop(item["id"], None) != item]
+        updated.append({
+            "id": car["id"],
+            "fields": {k: v for k, v in car.items() if k != "itemDataList" and prev.get(k) != v},
+            "items": items,
+            "removedItemIds": list(prev_items),
+        })
+
+    if added or updated or old_cars:
+        changes["cars"] = {"added": added, "updated": updated, "removed": list(old_cars)}
+    return changes
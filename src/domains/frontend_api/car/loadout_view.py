@@ -0,0 +1,419 @@
+"""
+车辆装备载荷读模型
+
+/car/car-item-select-list 每次请求都要串行执行事件解析、任务状态、AI推荐、用户分配、
+车辆/设备/模块共7次查询，再在Python里做 车辆×设备×模块 的适配过滤；前端各终端持续轮询。
+
+本模块按事件预先构建好完整的 CarListData（纯构建逻辑见 loadout_builder）：
+- 构建输入按来源（车辆/设备/模块/AI推荐/用户分配/任务状态）分开缓存，
+  变化时只重新加载变化的来源；仅用户分配变化时只重建涉及的车辆
+- 设备可适配模块（双向类型匹配 + 专有模块过滤）每次构建只算一次，与车辆数无关
+- 结果连同序列化后的响应体、ETag、版本号保存在内存，并写入Redis供其他实例复用
+- 变更后计算与上一版本的差异，通过STOMP推送到 /topic/car.loadout，前端按版本号增量合并
+
+一致性:
+- 本实例内的写接口提交事务后调用 refresh() 立即更新（未提交的数据不写入Redis、不推送）
+- 其他实例/脚本直接改库时，由指纹查询（各来源 行数+最大updated_at，一条SQL）发现，
+  指纹最多每 CAR_LOADOUT_CHECK_INTERVAL_SEC 秒检查一次
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.redis import get_redis_client
+from src.core.stomp.broker import stomp_broker
+from src.domains.equipment_recommendation.repository import EquipmentRecommendationRepository
+from src.domains.frontend_api.common import ApiResponse
+from src.domains.resources.devices.service import DeviceService
+from src.domains.resources.vehicles.service import VehicleService
+from .loadout_builder import LoadoutContext, LoadoutSources, build_car_list, build_context, diff_car_list
+from .repository import CarItemAssignmentRepository, ModuleRepository, PreparationDispatchRepository
+from .schemas import CarListData
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL_SEC = float(os.environ.get("CAR_LOADOUT_CHECK_INTERVAL_SEC", "5"))
+REDIS_KEY_PREFIX = "car:loadout"
+REDIS_TTL_SECONDS = 86400
+# Redis 出错后暂停使用的时长，避免无Redis环境下每次构建都等待连接超时
+REDIS_RETRY_AFTER_SEC = 60.0
+DELTA_DESTINATION = "/topic/car.loadout"
+
+# 读模型的输入来源
+SOURCE_VEHICLES = "vehicles"
+SOURCE_DEVICES = "devices"
+SOURCE_MODULES = "modules"
+SOURCE_RECOMMENDATION = "recommendation"
+SOURCE_ASSIGNMENTS = "assignments"
+SOURCE_QUEST_STATUS = "quest_status"
+ALL_SOURCES = (
+    SOURCE_VEHICLES, SOURCE_DEVICES, SOURCE_MODULES,
+    SOURCE_RECOMMENDATION, SOURCE_ASSIGNMENTS, SOURCE_QUEST_STATUS,
+)
+# 影响设备/模块上下文的来源（仅分配和任务状态变化时上下文可复用）
+_CONTEXT_SOURCES = {SOURCE_VEHICLES, SOURCE_DEVICES, SOURCE_MODULES, SOURCE_RECOMMENDATION}
+
+# 活动主事件 + 各来源指纹，一条SQL
+_FINGERPRINT_SQL = text("""
+    WITH ev AS (
+        SELECT e.id FROM operational_v2.events_v2 e
+        JOIN operational_v2.scenarios_v2 s ON e.scenario_id = s.id
+        WHERE s.status = 'active' AND e.is_main_event = TRUE
+        LIMIT 1
+    )
+    SELECT
+        (SELECT id FROM ev) AS event_id,
+        (SELECT COUNT(*) || ':' || COALESCE(MAX(updated_at)::text, '')
+           FROM operational_v2.vehicles_v2) AS vehicles,
+        (SELECT COUNT(*) || ':' || COALESCE(MAX(updated_at)::text, '')
+           FROM operational_v2.devices_v2) AS devices,
+        (SELECT COUNT(*) || ':' || COALESCE(MAX(updated_at)::text, '')
+           FROM operational_v2.modules_v2) AS modules,
+        (SELECT r.id || ':' || COALESCE(r.updated_at::text, '')
+           FROM operational_v2.equipment_recommendations_v2 r
+           WHERE r.status = 'ready'
+           ORDER BY r.created_at DESC LIMIT 1) AS recommendation,
+        (SELECT COUNT(*) || ':' || COALESCE(MAX(updated_at)::text, '')
+           FROM operational_v2.car_item_assignment
+           WHERE event_id = (SELECT id FROM ev)) AS assignments,
+        (SELECT COUNT(*) || ':' || COALESCE(MAX(updated_at)::text, '')
+           FROM operational_v2.equipment_preparation_dispatch_v2
+           WHERE event_id = (SELECT id FROM ev)) AS quest_status
+""")
+
+
+# =============================================================================
+# 读模型
+# =============================================================================
+
+@dataclass
+class LoadoutSnapshot:
+    """某一版本的读模型"""
+    event_id: Optional[str]
+    version: int
+    etag: str
+    body: bytes                  # 序列化后的 ApiResponse[CarListData]
+    data: Dict[str, Any]         # CarListData.model_dump()
+    fingerprint: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class _Entry:
+    snapshot: LoadoutSnapshot
+    sources: Optional[LoadoutSources] = None
+    context: Optional[LoadoutContext] = None
+    model: Optional[CarListData] = None
+
+
+def _event_key(event_id: Optional[Any]) -> str:
+    return str(event_id) if event_id else "none"
+
+
+def _render(event_id: Optional[str], version: int, model: CarListData, fingerprint: Dict[str, str]) -> LoadoutSnapshot:
+    body = ApiResponse.success(model).model_dump_json().encode("utf-8")
+    data = model.model_dump(mode="json")
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return LoadoutSnapshot(
+        event_id=event_id,
+        version=version,
+        etag=f'"{_event_key(event_id)}-{version}-{digest[:16]}"',
+        body=body,
+        data=data,
+        fingerprint=fingerprint,
+    )
+
+
+class CarLoadoutView:
+    """
+    车辆装备载荷读模型（进程内单例，见 get_loadout_view）
+
+    使用示例:
+    ```python
+    view = get_loadout_view()
+    snapshot = await view.get(db)              # 活动主事件的当前版本
+    # 写接口修改用户分配并提交后
+    await db.commit()
+    await view.refresh(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={car_id})
+    ```
+    """
+
+    def __init__(self, check_interval_sec: float = CHECK_INTERVAL_SEC) -> None:
+        self.check_interval_sec = check_interval_sec
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._active_key: Optional[str] = None
+        self._checked_at = 0.0
+        self._redis_down_until = 0.0
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def invalidate(self, event_id: Optional[Any] = None) -> None:
+        """丢弃内存中的读模型（event_id 为空时全部丢弃），下次读取时按指纹重建"""
+        if event_id is None:
+            self._entries.clear()
+            self._active_key = None
+        else:
+            self._entries.pop(_event_key(event_id), None)
+        self._checked_at = 0.0
+
+    async def get(self, db: AsyncSession) -> LoadoutSnapshot:
+        """
+        获取活动主事件的读模型
+
+        检查间隔内直接返回内存版本（不查库）；否则执行一次指纹查询，
+        指纹未变化则沿用，变化则只重新加载变化的来源。
+        """
+        if self._active_key is not None and time.monotonic() - self._checked_at < self.check_interval_sec:
+            entry = self._entries.get(self._active_key)
+            if entry is not None:
+                return entry.snapshot
+
+        fingerprint = await self._fingerprint(db)
+        key = _event_key(fingerprint.get("event_id"))
+        async with self._lock(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = await self._load_from_redis(key, fingerprint)
+            if entry is None or entry.snapshot.fingerprint != fingerprint:
+                changed = self._changed_sources(entry, fingerprint)
+                entry = await self._rebuild(db, key, entry, changed, None, fingerprint)
+            self._active_key = key
+            self._checked_at = time.monotonic()
+            return entry.snapshot
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        event_id: Optional[Any],
+        sources: Iterable[str] = ALL_SOURCES,
+        car_ids: Optional[Iterable[str]] = None,
+    ) -> Optional[LoadoutSnapshot]:
+        """
+        写操作提交后更新读模型并推送差异
+
+        调用方须先提交写事务：快照写入Redis、差异推送给前端后，
+        写事务若再回滚，其他实例和前端会看到不存在的数据。
+
+        Args:
+            event_id: 事件ID
+            sources: 发生变化的来源
+            car_ids: 仅 SOURCE_ASSIGNMENTS 变化时，涉及的车辆ID（缺省重建全部车辆）
+
+        失败只记录日志，不影响写操作本身；下次读取时由指纹兜底。
+        """
+        key = _event_key(event_id)
+        try:
+            async with self._lock(key):
+                entry = self._entries.get(key)
+                fingerprint = await self._fingerprint(db)
+                if _event_key(fingerprint.get("event_id")) != key:
+                    # 非活动主事件：不维护读模型
+                    self._entries.pop(key, None)
+                    return None
+                # 调用方之外（其他实例/直接改库）的变化也一并重载，否则写入新指纹后不会再被发现
+                changed = set(sources) | self._changed_sources(entry, fingerprint)
+                entry = await self._rebuild(
+                    db, key, entry, changed,
+                    {str(c) for c in car_ids} if car_ids is not None else None,
+                    fingerprint,
+                )
+                return entry.snapshot
+        except Exception as e:
+            logger.warning(f"[装备读模型] 更新失败 event={key}: {e}")
+            self.invalidate(event_id)
+            return None
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+
+    async def _fingerprint(self, db: AsyncSession) -> Dict[str, str]:
+        row = (await db.execute(_FINGERPRINT_SQL)).mappings().one()
+        return {k: str(v) if v is not None else "" for k, v in row.items()}
+
+    @staticmethod
+    def _changed_sources(entry: Optional[_Entry], fingerprint: Dict[str, str]) -> Set[str]:
+        if entry is None or entry.sources is None:
+            return set(ALL_SOURCES)
+        old = entry.snapshot.fingerprint
+        return {s for s in ALL_SOURCES if old.get(s) != fingerprint.get(s)}
+
+    async def _rebuild(
+        self,
+        db: AsyncSession,
+        key: str,
+        entry: Optional[_Entry],
+        changed: Set[str],
+        car_ids: Optional[Set[str]],
+        fingerprint: Dict[str, str],
+    ) -> _Entry:
+        event_id = fingerprint.get("event_id") or None
+        if entry is None or entry.sources is None:
+            changed = set(ALL_SOURCES)
+        sources = entry.sources if entry is not None and entry.sources is not None else LoadoutSources()
+        await self._load_sources(db, event_id, sources, changed)
+
+        start = time.perf_counter()
+        if changed & _CONTEXT_SOURCES or entry is None or entry.context is None:
+            context = build_context(sources)
+            car_ids = None
+        else:
+            context = entry.context
+            if not changed & {SOURCE_ASSIGNMENTS}:
+                car_ids = set()
+        model = build_car_list(sources, context, entry.model if entry else None, car_ids)
+
+        previous = entry.snapshot if entry is not None else None
+        version = await self._next_version(key, previous.version if previous else 0)
+        snapshot = _render(event_id, version, model, fingerprint)
+        new_entry = _Entry(snapshot=snapshot, sources=sources, context=context, model=model)
+        self._entries[key] = new_entry
+        logger.info(
+            f"[装备读模型] event={key} v{version} 重载来源={sorted(changed)} "
+            f"车辆={len(model.carItemDataList)} 构建耗时={(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+        await self._save_to_redis(key, snapshot)
+        if previous is not None:
+            await self._publish_delta(previous, snapshot)
+        return new_entry
+
+    async def _load_sources(
+        self,
+        db: AsyncSession,
+        event_id: Optional[str],
+        sources: LoadoutSources,
+        changed: Set[str],
+    ) -> None:
+        """只重新加载变化的来源（同一会话内顺序执行）"""
+        if SOURCE_VEHICLES in changed:
+            sources.vehicles = (await VehicleService(db).list(page=1, page_size=100)).items
+        if SOURCE_DEVICES in changed:
+            sources.devices = (await DeviceService(db).list(page=1, page_size=200)).items
+        if SOURCE_MODULES in changed:
+            sources.modules = await ModuleRepository(db).list_all(limit=200)
+        if SOURCE_RECOMMENDATION in changed:
+            try:
+                ready_list = await EquipmentRecommendationRepository(db).list_by_status("ready", limit=1)
+                sources.recommendation = ready_list[0] if ready_list else None
+            except Exception as e:
+                logger.warning(f"获取AI推荐失败: {e}")
+                sources.recommendation = None
+        if SOURCE_ASSIGNMENTS in changed:
+            sources.assignments = {}
+            if event_id:
+                try:
+                    rows = await CarItemAssignmentRepository(db).get_all_by_event(UUID(event_id))
+                    sources.assignments = {(a['car_id'], a['item_id']): a['is_selected'] for a in rows}
+                except Exception as e:
+                    logger.warning(f"获取用户分配数据失败: {e}")
+        if SOURCE_QUEST_STATUS in changed:
+            sources.quest_status = (
+                await PreparationDispatchRepository(db).get_quest_status(UUID(event_id)) if event_id else "pending"
+            )
+
+    async def _redis(self) -> Optional[Redis]:
+        if time.monotonic() < self._redis_down_until:
+            return None
+        return await get_redis_client()
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.debug(f"[装备读模型] Redis不可用，{REDIS_RETRY_AFTER_SEC:.0f}s内仅使用内存: {e}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SEC
+
+    async def _next_version(self, key: str, current: int) -> int:
+        """版本号：Redis可用时跨实例单调递增，否则本地递增"""
+        try:
+            client = await self._redis()
+            if client is not None:
+                return max(current + 1, int(await client.incr(f"{REDIS_KEY_PREFIX}:{key}:version")))
+        except Exception as e:
+            self._redis_failed(e)
+        return current + 1
+
+    async def _save_to_redis(self, key: str, snapshot: LoadoutSnapshot) -> None:
+        try:
+            client = await self._redis()
+            if client is None:
+                return
+            await client.set(
+                f"{REDIS_KEY_PREFIX}:{key}",
+                json.dumps({
+                    "event_id": snapshot.event_id,
+                    "version": snapshot.version,
+                    "etag": snapshot.etag,
+                    "body": snapshot.body.decode("utf-8"),
+                    "data": snapshot.data,
+                    "fingerprint": snapshot.fingerprint,
+                }, ensure_ascii=False),
+                ex=REDIS_TTL_SECONDS,
+            )
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def _load_from_redis(self, key: str, fingerprint: Dict[str, str]) -> Optional[_Entry]:
+        """其他实例已构建且指纹一致的版本可直接使用（不含构建输入，下次变化时全量加载）"""
+        try:
+            client = await self._redis()
+            raw = await client.get(f"{REDIS_KEY_PREFIX}:{key}") if client is not None else None
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if not raw:
+            return None
+        cached = json.loads(raw)
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        entry = _Entry(snapshot=LoadoutSnapshot(
+            event_id=cached["event_id"],
+            version=cached["version"],
+            etag=cached["etag"],
+            body=cached["body"].encode("utf-8"),
+            data=cached["data"],
+            fingerprint=cached["fingerprint"],
+        ))
+        self._entries[key] = entry
+        return entry
+
+    async def _publish_delta(self, previous: LoadoutSnapshot, current: LoadoutSnapshot) -> None:
+        changes = diff_car_list(previous.data, current.data)
+        if not changes:
+            return
+        try:
+            await stomp_broker.send_to_destination(DELTA_DESTINATION, {"payload": {
+                "type": "car_loadout_delta",
+                "eventId": current.event_id,
+                "baseVersion": previous.version,
+                "version": current.version,
+                "etag": current.etag,
+                "changes": changes,
+            }})
+        except Exception as e:
+            logger.warning(f"[装备读模型] 差异推送失败: {e}")
+
+
+_loadout_view: Optional[CarLoadoutView] = None
+
+
+def get_loadout_view() -> CarLoadoutView:
+    """获取车辆装备读模型单例"""
+    global _loadout_view
+    if _loadout_view is None:
+        _loadout_view = CarLoadoutView()
+    return _loadout_view
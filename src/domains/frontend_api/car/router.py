@@ -9,10 +9,10 @@
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import UUID
 
-from fastapi import APIRouter, Query, Depends, Form
+from fastapi import APIRouter, Query, Depends, Form, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
@@ -23,8 +23,9 @@ from src.domains.equipment_recommendation.repository import EquipmentRecommendat
 from src.domains.scenarios.repository import ScenarioRepository
 from src.domains.frontend_api.common import ApiResponse
 from .repository import PreparationDispatchRepository, ModuleRepository, CarItemAssignmentRepository, MyEquipmentRepository
+from .loadout_view import get_loadout_view, SOURCE_ASSIGNMENTS, SOURCE_QUEST_STATUS, SOURCE_VEHICLES
 from .schemas import (
-    CarListData, CarItem, ItemData, ModuleData, ShortageAlertData,
+    CarListData, CarItem, ItemData,
     ItemDetailResponse, ItemProperty,
     CarItemSelect, EventIdForm,
     EquipmentDispatchRequest, UserPreparingRequest, CarReadyRequest,
@@ -49,6 +50,17 @@ def get_device_service(db: AsyncSession = Depends(get_db)) -> DeviceService:
     return DeviceService(db)
 
 
+async def _refresh_loadout(
+    db: AsyncSession,
+    event_id: UUID,
+    sources: Set[str],
+    car_ids: Optional[Set[str]] = None,
+) -> None:
+    """提交本次写入后再更新车辆装备读模型（Redis快照与差异推送只包含已提交的数据）"""
+    await db.commit()
+    await get_loadout_view().refresh(db, event_id, sources, car_ids)
+
+
 async def _resolve_event_id(db: AsyncSession, event_id: Optional[str] = None) -> Optional[UUID]:
     """
     解析事件ID：
@@ -115,316 +127,29 @@ def _get_mock_cars(user_id: str, quest_status: str = "pending") -> CarListData:
     )
 
 
-def _build_recommended_device_map(
-    ai_recommendation: Optional[Dict[str, Any]]
-) -> Dict[str, Dict[str, Any]]:
-    """构建AI推荐设备映射表 {device_id -> {reason, priority, modules}}"""
-    if not ai_recommendation:
-        return {}
-    
-    device_map: Dict[str, Dict[str, Any]] = {}
-    recommended_devices = ai_recommendation.get("recommended_devices", [])
-    
-    for rec in recommended_devices:
-        device_id = rec.get("device_id", "")
-        if device_id:
-            device_map[device_id] = {
-                "reason": rec.get("reason", ""),
-                "priority": rec.get("priority", "medium"),
-                "modules": rec.get("modules", []),
-            }
-    
-    return device_map
-
-
-def _build_shortage_alerts(
-    ai_recommendation: Optional[Dict[str, Any]]
-) -> Optional[List[ShortageAlertData]]:
-    """构建缺口告警列表"""
-    if not ai_recommendation:
-        return None
-    
-    alerts = ai_recommendation.get("shortage_alerts", [])
-    if not alerts:
-        return None
-    
-    return [
-        ShortageAlertData(
-            itemType=a.get("item_type", ""),
-            itemName=a.get("item_name", ""),
-            required=a.get("required", 0),
-            available=a.get("available", 0),
-            shortage=a.get("shortage", 0),
-            severity=a.get("severity", "warning"),
-            suggestion=a.get("suggestion", ""),
-        )
-        for a in alerts
-    ]
-
-
 @router.get("/car/car-item-select-list", response_model=ApiResponse[CarListData])
 async def get_car_list(
+    request: Request,
     userId: str = Query(..., description="用户ID"),
     db: AsyncSession = Depends(get_db),
-    vehicle_service: VehicleService = Depends(get_vehicle_service),
-    device_service: DeviceService = Depends(get_device_service),
-) -> ApiResponse[CarListData]:
+) -> Response:
     """
     获取车辆和装备载荷列表（三级结构：车辆→设备→模块）
     
     - 对接v2真实数据
     - 自动集成最近一次就绪(ready)的AI装备推荐结果
     - AI推荐的车辆/设备/模块自动标记为选中
+    - 从预构建的读模型返回，支持 ETag / If-None-Match（未变化返回304）；
+      变更以差异形式推送到 STOMP /topic/car.loadout
     """
-    logger.info(f"获取车辆列表, userId={userId}")
-    
-    # 获取活动想定的主事件ID和任务状态
-    main_event_id = await _resolve_event_id(db)
-    logger.info(f"解析到 main_event_id={main_event_id}")
-    quest_status = await _get_quest_status(db, main_event_id)
+    logger.debug(f"获取车辆列表, userId={userId}")
     
-    # 获取最近一次就绪(ready)的AI推荐（无需前端传eventId）
-    ai_recommendation: Optional[Dict[str, Any]] = None
-    loading_plan: Dict[str, Any] = {}
-    try:
-        rec_repo = EquipmentRecommendationRepository(db)
-        ready_list = await rec_repo.list_by_status("ready", limit=1)
-        if ready_list:
-            ai_recommendation = ready_list[0]
-            loading_plan = ai_recommendation.get("loading_plan") or {}
-            logger.info(
-                f"获取到AI推荐: status={ai_recommendation.get('status')}, "
-                f"devices={len(ai_recommendation.get('recommended_devices', []))}, "
-                f"vehicles_in_plan={len(loading_plan)}"
-            )
-    except Exception as e:
-        logger.warning(f"获取AI推荐失败: {e}")
-    
-    # 构建推荐设备映射 {device_id -> {reason, priority, modules}}
-    rec_device_map = _build_recommended_device_map(ai_recommendation)
-    
-    # 获取指挥员手动分配数据（优先级高于AI推荐）
-    user_assignment_map: Dict[tuple, bool] = {}
-    if main_event_id:
-        try:
-            assignment_repo = CarItemAssignmentRepository(db)
-            user_assignments = await assignment_repo.get_all_by_event(main_event_id)
-            user_assignment_map = {
-                (a['car_id'], a['item_id']): a['is_selected']
-                for a in user_assignments
-            }
-            if user_assignment_map:
-                logger.info(f"获取到用户分配数据: {len(user_assignment_map)} 条")
-        except Exception as e:
-            logger.warning(f"获取用户分配数据失败: {e}")
-    
-    # 仅保留车辆ID为有效UUID的装载方案（兼容旧数据）
-    if loading_plan:
-        normalized_loading_plan: Dict[str, Any] = {}
-        for vid, plan in loading_plan.items():
-            try:
-                UUID(vid)
-            except Exception:
-                logger.warning("忽略loading_plan中的非UUID车辆ID: %s", vid)
-                continue
-            normalized_loading_plan[vid] = plan
-        loading_plan = normalized_loading_plan
-    
-    try:
-        # 获取所有车辆
-        vehicle_result = await vehicle_service.list(page=1, page_size=100)
-        
-        # 获取所有可用设备
-        all_devices_result = await device_service.list(page=1, page_size=200)
-        all_devices = all_devices_result.items
-        
-        # 获取所有模块
-        module_repo = ModuleRepository(db)
-        all_modules = await module_repo.list_all(limit=200)
-        
-        # 按设备类型分组模块
-        modules_by_device_type: Dict[str, List[Dict]] = {}
-        for mod in all_modules:
-            for dtype in mod.get("compatible_device_types", []):
-                if dtype not in modules_by_device_type:
-                    modules_by_device_type[dtype] = []
-                modules_by_device_type[dtype].append(mod)
-        
-        # 构建车辆ID→名称映射（用于专属车辆名称查找）
-        vehicle_id_to_name: Dict[str, str] = {
-            str(v.id): v.name for v in vehicle_result.items
-        }
-
-        # 构建设备→分配车辆的映射 {device_id -> (vehicle_id, vehicle_name)}，直接使用loading_plan中的真实车辆ID
-        device_to_vehicle_map: Dict[str, tuple] = {}
-        vehicle_device_map: Dict[str, set] = {}
-        for vid, plan in (loading_plan or {}).items():
-            vname = plan.get("vehicle_name", vehicle_id_to_name.get(vid, ""))
-            devices_in_plan = plan.get("devices", []) or []
-            if not devices_in_plan:
-                continue
-            vehicle_device_map.setdefault(vid, set()).update(devices_in_plan)
-            for dev_id in devices_in_plan:
-                device_to_vehicle_map[dev_id] = (vid, vname)
-        
-        def build_item_list(
-            devices, 
-            current_vehicle_id: str,
-            user_assignment_map: Dict[tuple, bool],
-        ) -> List[ItemData]:
-            """构建设备列表（含模块），用户分配优先于AI推荐"""
-            items = []
-            for device in devices:
-                device_id_str = str(device.id)
-                
-                # 获取设备的AI推荐信息（含推荐模块）
-                rec_info = rec_device_map.get(device_id_str)
-                ai_module_ids = set()
-                ai_module_reasons: Dict[str, str] = {}
-                if rec_info:
-                    for m in rec_info.get("modules", []):
-                        mid = m.get("module_id", "")
-                        ai_module_ids.add(mid)
-                        ai_module_reasons[mid] = m.get("reason", "")
-                
-                # 获取该设备可适配的模块（双向匹配）
-                # 1. 设备类型匹配模块的compatible_device_types
-                # 2. 模块类型匹配设备的compatible_module_types
-                device_type = device.device_type.value if device.device_type else ""
-                device_compatible_module_types = device.compatible_module_types or []
-                
-                # 从按设备类型分组的模块中筛选
-                candidate_modules = modules_by_device_type.get(device_type, [])
-                # 再过滤：模块类型必须在设备允许的模块类型中
-                compatible_modules = [
-                    m for m in candidate_modules 
-                    if m.get("module_type") in device_compatible_module_types
-                ]
-                
-                # 构建模块列表（含专有模块过滤）
-                module_list = []
-                has_modules = device.module_slots and device.module_slots > 0 and compatible_modules
-                
-                if has_modules:
-                    for mod in compatible_modules:
-                        mod_id = mod["id"]
-                        exclusive_device_id = mod.get("exclusive_to_device_id")
-                        
-                        # 如果是专有模块且不属于当前设备，跳过
-                        if exclusive_device_id and exclusive_device_id != device_id_str:
-                            continue
-                        
-                        # 模块 isSelected：用户分配 > AI推荐
-                        module_user_selected = user_assignment_map.get((current_vehicle_id, mod_id))
-                        if module_user_selected is not None:
-                            module_is_selected = 1 if module_user_selected else 0
-                        else:
-                            module_is_selected = 1 if mod_id in ai_module_ids else 0
-                        
-                        module_list.append(ModuleData(
-                            id=mod_id,
-                            name=mod["name"],
-                            moduleType=mod.get("module_type", ""),
-                            isSelected=module_is_selected,
-                            aiReason=ai_module_reasons.get(mod_id),
-                            exclusiveToDeviceId=exclusive_device_id,
-                        ))
-                
-                # 获取设备的专属车辆信息
-                exclusive_vehicle_id = str(device.exclusive_to_vehicle_id) if device.exclusive_to_vehicle_id else None
-                exclusive_vehicle_name = vehicle_id_to_name.get(exclusive_vehicle_id) if exclusive_vehicle_id else None
-                
-                # 查找该设备被AI分配到哪辆车（如果有装载方案）
-                assigned_vehicle = device_to_vehicle_map.get(device_id_str)
-                assigned_to_vid = assigned_vehicle[0] if assigned_vehicle else None
-                assigned_to_vname = assigned_vehicle[1] if assigned_vehicle else None
-
-                # 判断设备是否被AI分配到当前车辆
-                is_assigned_to_current = assigned_to_vid == current_vehicle_id
-                
-                # 设备 isSelected：用户分配 > 专属装备 > AI推荐
-                user_selected = user_assignment_map.get((current_vehicle_id, device_id_str))
-                if user_selected is not None:
-                    # 指挥员已手动设置，以指挥员选择为准
-                    is_selected_flag = 1 if user_selected else 0
-                elif exclusive_vehicle_id == current_vehicle_id:
-                    # 专属装备在其专属车辆上默认选中
-                    is_selected_flag = 1
-                else:
-                    # 无用户操作，使用AI推荐作为初始值
-                    is_ai_recommended = rec_info is not None
-                    is_selected_flag = 1 if (is_assigned_to_current or (not loading_plan and is_ai_recommended)) else 0
-
-                props = device.properties or {}
-                # aiReason 只在设备被分配到当前车辆时才设置，避免前端重复显示
-                device_ai_reason = rec_info["reason"] if rec_info and is_assigned_to_current else None
-                device_priority = rec_info["priority"] if rec_info and is_assigned_to_current else None
-                items.append(ItemData(
-                    id=device_id_str,
-                    name=device.name,
-                    model=device.model or props.get('model', device.code),
-                    type="device",
-                    isSelected=is_selected_flag,
-                    aiReason=device_ai_reason,
-                    priority=device_priority,
-                    assignedToVehicle=assigned_to_vid,
-                    assignedToVehicleName=assigned_to_vname,
-                    exclusiveToVehicleId=exclusive_vehicle_id,
-                    exclusiveToVehicleName=exclusive_vehicle_name,
-                    hasModules=bool(has_modules),
-                    modules=module_list,
-                    image=props.get('image'),
-                    description=props.get('description'),
-                    manufacturer=device.manufacturer,
-                    specifications=props.get('specifications'),
-                ))
-            return items
-        
-        status_map = {
-            'available': 'available',
-            'deployed': 'ready',
-            'maintenance': 'preparing',
-        }
-        
-        cars = []
-        for vehicle in vehicle_result.items:
-            vehicle_id_str = str(vehicle.id)
-            
-            # 判断车辆是否在AI装载方案中
-            is_vehicle_selected = vehicle_id_str in vehicle_device_map
-            
-            cars.append(CarItem(
-                id=vehicle_id_str,
-                code=vehicle.code,
-                name=vehicle.name,
-                status=status_map.get(vehicle.status.value, 'available'),
-                isSelected=is_vehicle_selected,
-                isBelongsToThisCar=0,
-                itemDataList=build_item_list(all_devices, vehicle_id_str, user_assignment_map),
-            ))
-        
-        # 如果没有车辆数据，创建一个虚拟车辆来展示设备
-        if not cars and all_devices:
-            cars.append(CarItem(
-                id="default-vehicle",
-                name="装备仓库",
-                status="available",
-                isSelected=False,
-                isBelongsToThisCar=0,
-                itemDataList=build_item_list(all_devices, "default-vehicle", user_assignment_map),
-            ))
-        
-        return ApiResponse.success(CarListData(
-            carItemDataList=cars,
-            carQuestStatus=quest_status,
-            recommendationId=str(ai_recommendation["id"]) if ai_recommendation else None,
-            recommendationStatus=ai_recommendation.get("status") if ai_recommendation else None,
-            shortageAlerts=_build_shortage_alerts(ai_recommendation),
-        ))
-        
-    except Exception as e:
-        logger.exception(f"获取车辆列表失败: {e}")
-        raise e
+    snapshot = await get_loadout_view().get(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if snapshot.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 
 @router.get("/item/get-item-detail", response_model=ApiResponse[ItemDetailResponse])
@@ -600,6 +325,7 @@ async def car_equipment_check(
                     logger.warning(f"通知用户失败: {e}")
         
         # 状态现在从数据库dispatch记录推断，无需设置内存变量
+        await _refresh_loadout(db, event_id, {SOURCE_QUEST_STATUS})
         
         return ApiResponse.success(None, f"装备清单已下发给 {len(request.assignments)} 辆车")
         
@@ -640,6 +366,8 @@ async def equipment_ready(
         if not updated:
             return ApiResponse.error(404, "未找到调度记录")
         
+        await _refresh_loadout(db, event_id, {SOURCE_QUEST_STATUS})
+        
         # 检查是否全部完成
         summary = await dispatch_repo.get_dispatch_summary(event_id)
         all_ready = await dispatch_repo.check_all_ready(event_id)
@@ -698,6 +426,8 @@ async def equipment_user_preparing(
         if not updated:
             return ApiResponse.error(404, "未找到调度记录")
         
+        await _refresh_loadout(db, event_id, {SOURCE_QUEST_STATUS})
+        
         # 获取进度并通知指挥员
         summary = await dispatch_repo.get_dispatch_summary(event_id)
         
@@ -841,6 +571,8 @@ async def car_start(
         
         # 标记已出发到数据库
         await dispatch_repo.mark_departed(event_id)
+        # 出发会同时更新车辆状态
+        await _refresh_loadout(db, event_id, {SOURCE_QUEST_STATUS, SOURCE_VEHICLES})
         
         # 广播出发消息
         await stomp_broker.broadcast_event(
@@ -974,6 +706,8 @@ async def add_item_to_car(
             assigned_by=None,  # TODO: 从认证获取
         )
         
+        await _refresh_loadout(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={request.carId})
+        
         return ApiResponse.success(CarItemAddResponse(
             carId=request.carId,
             itemId=request.itemId,
@@ -1019,6 +753,7 @@ async def remove_item_from_car(
         
         # 标记装备为未选中（覆盖AI推荐的默认选中状态）
         await assignment_repo.mark_deselected(event_id, car_id, item_id)
+        await _refresh_loadout(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={request.carId})
         
         return ApiResponse.success(CarItemRemoveResponse(
             carId=request.carId,
@@ -1099,6 +834,8 @@ async def toggle_car_item(
                     isSelected=new_selected,
                 ))
         
+        await _refresh_loadout(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={request.carId})
+        
         return ApiResponse.success(CarItemToggleResponse(
             carId=request.carId,
             itemId=request.itemId,
@@ -1148,6 +885,8 @@ async def update_car_modules(
             event_id, car_id, device_id, request.moduleIds
         )
         
+        await _refresh_loadout(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={request.carId})
+        
         return ApiResponse.success(CarModuleUpdateResponse(
             deviceId=request.deviceId,
             modules=[ModuleToggleItem(id=m["id"], isSelected=m["isSelected"]) for m in updated_modules],
@@ -1296,6 +1035,7 @@ async def toggle_my_equipment(
         
         if not success:
             return ApiResponse.error(404, "装备不存在或未分配给您的车辆")
+        await _refresh_loadout(db, event_id, {SOURCE_ASSIGNMENTS}, car_ids={str(vehicle_id)})
         
         return ApiResponse.success(MyEquipmentToggleResponse(
             vehicleId=str(vehicle_id),
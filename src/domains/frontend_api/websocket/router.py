@@ -10,7 +10,8 @@
 由于Python没有成熟的STOMP服务端库，这里实现一个简化版本：
 - 支持STOMP帧格式的订阅/发送
 - 通过原生WebSocket传输
-- 前端可通过SockJS降级到XHR-polling
+- WebSocket 不可用时前端 SockJS 降级到 xhr_streaming / xhr 等HTTP传输，
+  HTTP 会话由 src.core.sockjs 管理，入站帧与 WebSocket 走同一套STOMP处理
 
 主题映射:
 - /topic/map.entity.create -> entities/entity_created
@@ -31,7 +32,16 @@ from uuid import UUID, uuid4
 from dataclasses import dataclass, field
 from collections import defaultdict
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
+
+from src.core.sockjs import (
+    STREAMING_PRELUDE,
+    SockJSCapacityError,
+    SockJSSession,
+    SockJSSessionManager,
+    parse_send_body,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +50,8 @@ router = APIRouter(tags=["前端-WebSocket"])
 
 @dataclass
 class FrontendWSConnection:
-    """前端WebSocket连接"""
-    websocket: WebSocket
+    """前端WebSocket连接（websocket 为 SockJSSession 时即HTTP降级传输）"""
+    websocket: WebSocket | SockJSSession
     client_id: str
     subscriptions: set = field(default_factory=set)
     connected_at: datetime = field(default_factory=datetime.utcnow)
@@ -69,7 +79,15 @@ class FrontendWebSocketManager:
     async def connect(self, websocket: WebSocket, client_id: str) -> FrontendWSConnection:
         """建立连接"""
         await websocket.accept()
+        conn = self.register(websocket, client_id)
+        
+        # 发送SockJS open帧
+        await websocket.send_text("o")
         
+        return conn
+    
+    def register(self, websocket: WebSocket | SockJSSession, client_id: str) -> FrontendWSConnection:
+        """登记连接（SockJS HTTP会话无需accept/open帧，由传输端点处理）"""
         conn = FrontendWSConnection(
             websocket=websocket,
             client_id=client_id,
@@ -78,9 +96,6 @@ class FrontendWebSocketManager:
         
         logger.info(f"Frontend WS connected: {client_id}")
         
-        # 发送SockJS open帧
-        await websocket.send_text("o")
-        
         return conn
     
     def disconnect(self, client_id: str):
@@ -129,7 +144,7 @@ class FrontendWebSocketManager:
             if conn:
                 try:
                     await self._send_message(conn.websocket, topic, payload)
-                    logger.info(f"Sent to {client_id} on {topic}")
+                    logger.debug(f"Sent to {client_id} on {topic}")
                 except Exception as e:
                     logger.error(f"Failed to send to {client_id}: {e}")
                     self.disconnect(client_id)
@@ -264,76 +279,82 @@ async def sockjs_iframe():
     return HTMLResponse(content=html)
 
 
-# SockJS XHR传输端点
-from fastapi import Response
-from fastapi.responses import StreamingResponse
-import asyncio
+# ==================== SockJS HTTP传输 ====================
+
+# SockJS HTTP会话（有界出站队列 + 空闲回收）
+sockjs_manager = SockJSSessionManager()
 
-# 存储SockJS会话
-sockjs_sessions: dict[str, dict] = {}
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Credentials": "true",
+}
+_NO_CACHE = "no-store, no-cache, no-transform, must-revalidate, max-age=0"
+_JS_MEDIA_TYPE = "application/javascript;charset=UTF-8"
+
+
+def _open_sockjs_session(session_id: str) -> tuple[SockJSSession, bool]:
+    """获取或创建会话；新会话登记到 frontend_ws_manager，回收时随之断开"""
+    session, created = sockjs_manager.open(
+        session_id,
+        on_close=lambda s: frontend_ws_manager.disconnect(s.session_id),
+    )
+    if created:
+        frontend_ws_manager.register(session, session_id)
+    return session, created
+
+
+def _capacity_response() -> Response:
+    return Response(content="SockJS session limit reached", status_code=503, headers=_CORS_HEADERS)
 
 
 @router.post("/real-time/{server_id}/{session_id}/xhr_streaming")
 async def sockjs_xhr_streaming(server_id: str, session_id: str):
-    """SockJS XHR Streaming传输"""
-    session_key = f"{server_id}_{session_id}"
-    
-    async def generate():
-        # 发送2KB prelude（用于绕过某些代理的缓冲）
-        yield "h" * 2048 + "\n"
-        # 发送open帧
-        yield "o\n"
-        
-        # 保持连接并发送心跳
-        for _ in range(30):  # 30秒超时
-            await asyncio.sleep(1)
-            yield "h\n"  # 心跳帧
+    """SockJS XHR Streaming传输：出站消息到达即推送，累计达到上限后结束本次响应"""
+    try:
+        session, created = _open_sockjs_session(session_id)
+    except SockJSCapacityError:
+        return _capacity_response()
     
     return StreamingResponse(
-        generate(),
-        media_type="application/javascript;charset=UTF-8",
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true",
-            "Cache-Control": "no-store, no-cache, no-transform",
-        }
+        sockjs_manager.stream(session, created, lambda frame: frame + "\n", prelude=STREAMING_PRELUDE),
+        media_type=_JS_MEDIA_TYPE,
+        headers={**_CORS_HEADERS, "Cache-Control": _NO_CACHE},
     )
 
 
 @router.post("/real-time/{server_id}/{session_id}/xhr")
 async def sockjs_xhr(server_id: str, session_id: str):
-    """SockJS XHR轮询传输"""
-    session_key = f"{server_id}_{session_id}"
-    
-    if session_key not in sockjs_sessions:
-        sockjs_sessions[session_key] = {"opened": False, "messages": []}
-    
-    session = sockjs_sessions[session_key]
-    
-    if not session["opened"]:
-        session["opened"] = True
-        return Response(
-            content="o\n",
-            media_type="application/javascript;charset=UTF-8",
-            headers={"Access-Control-Allow-Origin": "*"}
-        )
+    """SockJS XHR长轮询传输：有积压消息时合并为一个 a[...] 立即返回，否则等待至心跳超时"""
+    try:
+        session, created = _open_sockjs_session(session_id)
+    except SockJSCapacityError:
+        return _capacity_response()
     
-    # 返回心跳或等待消息
-    await asyncio.sleep(0.1)
+    frame = await sockjs_manager.poll(session, created)
     return Response(
-        content="h\n",
-        media_type="application/javascript;charset=UTF-8",
-        headers={"Access-Control-Allow-Origin": "*"}
+        content=frame + "\n",
+        media_type=_JS_MEDIA_TYPE,
+        headers={**_CORS_HEADERS, "Cache-Control": _NO_CACHE},
     )
 
 
 @router.post("/real-time/{server_id}/{session_id}/xhr_send")
-async def sockjs_xhr_send(server_id: str, session_id: str):
-    """SockJS XHR发送端点"""
+async def sockjs_xhr_send(server_id: str, session_id: str, request: Request):
+    """SockJS XHR发送端点：消息交给与WebSocket相同的STOMP处理"""
+    session = sockjs_manager.get(session_id)
+    if session is None or session.closed:
+        return Response(content="", status_code=404, headers=_CORS_HEADERS)
+    
+    try:
+        messages = parse_send_body(await request.body())
+    except ValueError as e:
+        return Response(content=str(e), status_code=500, headers=_CORS_HEADERS)
+    
+    await _handle_sockjs_messages(session, session_id, messages)
     return Response(
         content="",
         status_code=204,
-        headers={"Access-Control-Allow-Origin": "*"}
+        headers={**_CORS_HEADERS, "Content-Type": "text/plain;charset=UTF-8"},
     )
 
 
@@ -357,46 +378,140 @@ async def sockjs_xhr_options(server_id: str, session_id: str):
 @router.get("/real-time/{server_id}/{session_id}/eventsource")
 async def sockjs_eventsource(server_id: str, session_id: str):
     """SockJS EventSource传输"""
-    async def generate():
-        yield "data: o\r\n\r\n"
-        for _ in range(30):
-            await asyncio.sleep(1)
-            yield "data: h\r\n\r\n"
+    try:
+        session, created = _open_sockjs_session(session_id)
+    except SockJSCapacityError:
+        return _capacity_response()
     
     return StreamingResponse(
-        generate(),
+        sockjs_manager.stream(session, created, lambda frame: f"data: {frame}\r\n\r\n", prelude="\r\n"),
         media_type="text/event-stream",
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Cache-Control": "no-cache",
-        }
+        headers={**_CORS_HEADERS, "Cache-Control": _NO_CACHE},
     )
 
 
 @router.get("/real-time/{server_id}/{session_id}/htmlfile")
 async def sockjs_htmlfile(server_id: str, session_id: str, c: str = ""):
     """SockJS HTMLFile传输"""
-    from fastapi.responses import HTMLResponse
-    html = f"""<!doctype html>
+    if not c.replace("_", "").replace(".", "").isalnum():
+        return HTMLResponse(content='"callback" parameter required', status_code=500)
+    try:
+        session, created = _open_sockjs_session(session_id)
+    except SockJSCapacityError:
+        return _capacity_response()
+    
+    prelude = f"""<!doctype html>
 <html><head>
   <meta http-equiv="X-UA-Compatible" content="IE=edge" />
   <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
 </head><body><h2>Don't panic!</h2>
-  <script>document.domain = document.domain;var c = parent.{c};c.start();c.message('o');c.message('h');</script>
-</body></html>"""
-    return HTMLResponse(content=html)
+  <script>document.domain = document.domain;var c = parent.{c};c.start();function p(d) {{c.message(d);}};window.onload = function() {{c.stop();}};</script>
+""" + " " * 1024 + "\r\n"
+    return StreamingResponse(
+        sockjs_manager.stream(
+            session, created, lambda frame: f"<script>\np({json.dumps(frame)});\n</script>\r\n", prelude=prelude,
+        ),
+        media_type="text/html;charset=UTF-8",
+        headers={"Cache-Control": _NO_CACHE},
+    )
 
 
 @router.get("/real-time/{server_id}/{session_id}/jsonp")
 async def sockjs_jsonp(server_id: str, session_id: str, c: str = ""):
-    """SockJS JSONP传输"""
+    """SockJS JSONP长轮询传输"""
+    if not c.replace("_", "").replace(".", "").isalnum():
+        return Response(content='"callback" parameter required', status_code=500)
+    try:
+        session, created = _open_sockjs_session(session_id)
+    except SockJSCapacityError:
+        return _capacity_response()
+    
+    frame = await sockjs_manager.poll(session, created)
     return Response(
-        content=f'{c}("o");\n',
-        media_type="application/javascript;charset=UTF-8",
-        headers={"Access-Control-Allow-Origin": "*"}
+        content=f"/**/{c}({json.dumps(frame)});\r\n",
+        media_type=_JS_MEDIA_TYPE,
+        headers={**_CORS_HEADERS, "Cache-Control": _NO_CACHE},
     )
 
 
+@router.post("/real-time/{server_id}/{session_id}/jsonp_send")
+async def sockjs_jsonp_send(server_id: str, session_id: str, request: Request):
+    """SockJS JSONP发送端点（表单字段 d 或原始请求体）"""
+    session = sockjs_manager.get(session_id)
+    if session is None or session.closed:
+        return Response(content="", status_code=404)
+    
+    raw = await request.body()
+    if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+        from urllib.parse import parse_qs
+        raw = parse_qs(raw.decode("utf-8")).get("d", [""])[0].encode("utf-8")
+    try:
+        messages = parse_send_body(raw)
+    except ValueError as e:
+        return Response(content=str(e), status_code=500)
+    
+    await _handle_sockjs_messages(session, session_id, messages)
+    return Response(content="ok", media_type="text/plain;charset=UTF-8")
+
+
+async def _handle_sockjs_messages(session: SockJSSession, session_id: str, messages: list[str]) -> None:
+    """处理HTTP发送端点收到的一批SockJS消息"""
+    for message in messages:
+        if not await _handle_inbound(session, session_id, message):
+            session.close()
+            break
+
+
+async def _handle_inbound(websocket: WebSocket | SockJSSession, client_id: str, raw_data: str) -> bool:
+    """
+    处理一条入站消息（已去除SockJS数组包装），WebSocket 与 SockJS HTTP传输共用
+    
+    Returns:
+        False 表示客户端请求断开
+    """
+    if not raw_data or raw_data.strip() in ("", "\n", "\r\n"):
+        await frontend_ws_manager.heartbeat(client_id)
+        return True
+    
+    try:
+        data = json.loads(raw_data)
+    except json.JSONDecodeError:
+        data = _parse_stomp_frame(raw_data)
+    
+    command = data.get("command", "").upper()
+    headers = data.get("headers", {})
+    body = data.get("body", "")
+    logger.info(f"[WS {client_id}] Command: {command}, Headers: {headers}")
+    
+    if command == "CONNECT" or command == "STOMP":
+        # 发送STOMP CONNECTED响应
+        await frontend_ws_manager._send_frame(websocket, "CONNECTED", {
+            "version": "1.2",
+            "heart-beat": "4000,4000",
+            "server": "frontai-ws/1.0",
+        })
+        logger.info(f"[WS {client_id}] Sent CONNECTED frame")
+    elif command == "SUBSCRIBE":
+        destination = headers.get("destination", "")
+        sub_id = headers.get("id", str(uuid4()))
+        await frontend_ws_manager.subscribe(client_id, destination, sub_id)
+        receipt = headers.get("receipt")
+        if receipt:
+            await frontend_ws_manager._send_receipt(websocket, receipt)
+    elif command == "UNSUBSCRIBE":
+        sub_id = headers.get("id", "")
+        await frontend_ws_manager.unsubscribe(client_id, sub_id)
+    elif command == "SEND":
+        destination = headers.get("destination", "")
+        logger.info(f"Received SEND to {destination}: {body[:100] if body else ''}...")
+    elif command == "DISCONNECT":
+        frontend_ws_manager.disconnect(client_id)
+        return False
+    elif command == "PING" or command == "":
+        await frontend_ws_manager.heartbeat(client_id)
+    return True
+
+
 async def _handle_websocket(websocket: WebSocket, client_id: str):
     """处理WebSocket连接的公共逻辑"""
     conn = await frontend_ws_manager.connect(websocket, client_id)
@@ -405,62 +520,25 @@ async def _handle_websocket(websocket: WebSocket, client_id: str):
         while True:
             try:
                 raw_data = await websocket.receive_text()
-                logger.info(f"[WS {client_id}] Received: {raw_data[:200] if raw_data else 'empty'}...")
-                
-                if not raw_data or raw_data.strip() in ("", "\n", "\r\n"):
-                    await frontend_ws_manager.heartbeat(client_id)
-                    continue
+                logger.debug(f"[WS {client_id}] Received: {raw_data[:200] if raw_data else 'empty'}...")
                 
-                # SockJS包装的消息格式: ["message"]
-                if raw_data.startswith("[") and raw_data.endswith("]"):
+                # SockJS包装的消息格式: ["message", ...]
+                messages = [raw_data]
+                if raw_data and raw_data.startswith("[") and raw_data.endswith("]"):
                     try:
                         sockjs_messages = json.loads(raw_data)
                         if isinstance(sockjs_messages, list) and sockjs_messages:
-                            raw_data = sockjs_messages[0]
-                            logger.info(f"[WS {client_id}] Unwrapped SockJS: {repr(raw_data[:50])}...")
-                            # 解包后检查是否为心跳
-                            if raw_data in ("\n", "\r\n", ""):
-                                await frontend_ws_manager.heartbeat(client_id)
-                                continue
+                            messages = sockjs_messages
                     except:
                         pass
                 
-                try:
-                    data = json.loads(raw_data)
-                except json.JSONDecodeError:
-                    data = _parse_stomp_frame(raw_data)
-                
-                command = data.get("command", "").upper()
-                headers = data.get("headers", {})
-                body = data.get("body", "")
-                logger.info(f"[WS {client_id}] Command: {command}, Headers: {headers}")
-                
-                if command == "CONNECT" or command == "STOMP":
-                    # 发送STOMP CONNECTED响应
-                    await frontend_ws_manager._send_frame(websocket, "CONNECTED", {
-                        "version": "1.2",
-                        "heart-beat": "4000,4000",
-                        "server": "frontai-ws/1.0",
-                    })
-                    logger.info(f"[WS {client_id}] Sent CONNECTED frame")
-                elif command == "SUBSCRIBE":
-                    destination = headers.get("destination", "")
-                    sub_id = headers.get("id", str(uuid4()))
-                    await frontend_ws_manager.subscribe(client_id, destination, sub_id)
-                    receipt = headers.get("receipt")
-                    if receipt:
-                        await frontend_ws_manager._send_receipt(websocket, receipt)
-                elif command == "UNSUBSCRIBE":
-                    sub_id = headers.get("id", "")
-                    await frontend_ws_manager.unsubscribe(client_id, sub_id)
-                elif command == "SEND":
-                    destination = headers.get("destination", "")
-                    logger.info(f"Received SEND to {destination}: {body[:100] if body else ''}...")
-                elif command == "DISCONNECT":
-                    frontend_ws_manager.disconnect(client_id)
+                keep_open = True
+                for message in messages:
+                    if not await _handle_inbound(websocket, client_id, message):
+                        keep_open = False
+                        break
+                if not keep_open:
                     break
-                elif command == "PING" or command == "":
-                    await frontend_ws_manager.heartbeat(client_id)
                     
             except WebSocketDisconnect:
                 break
@@ -12,7 +12,7 @@ from decimal import Decimal
 from typing import Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func, text, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from geoalchemy2.functions import ST_AsGeoJSON, ST_GeomFromGeoJSON, ST_DWithin, ST_Distance, ST_MakeEnvelope, ST_Transform
 from geoalchemy2.shape import from_shape, to_shape
@@ -56,6 +56,87 @@ class EntityRepository:
         logger.info(f"创建实体: type={entity.type}, id={entity.id}")
         return entity
     
+    async def create_many(self, items: Sequence[EntityCreate], created_by: Optional[str] = None) -> list[Entity]:
+        """
+        批量创建实体（一条 INSERT ... RETURNING）
+        
+        几何在 Python 侧转为 WKB 绑定，避免逐行 ST_GeomFromGeoJSON 与逐行 flush/refresh
+        """
+        if not items:
+            return []
+        rows = [
+            {
+                "type": data.type.value,
+                "layer_code": data.layer_code,
+                "device_id": data.device_id,
+                "geometry": from_shape(shape(data.geometry.model_dump()), srid=4326),
+                "properties": data.properties,
+                "source": data.source.value,
+                "visible_on_map": data.visible_on_map,
+                "is_dynamic": data.is_dynamic,
+                "style_overrides": data.style_overrides,
+                "scenario_id": data.scenario_id,
+                "event_id": data.event_id,
+                "created_by": created_by,
+            }
+            for data in items
+        ]
+        result = await self._db.execute(
+            insert(Entity).returning(Entity, sort_by_parameter_order=True),
+            rows,
+        )
+        entities = list(result.scalars().all())
+        
+        logger.info(f"批量创建实体: {len(entities)} 个")
+        return entities
+    
+    async def soft_delete_in_layers(
+        self,
+        scenario_id: UUID,
+        layer_codes: Sequence[str],
+        source: Optional[str] = None,
+        plot_group: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        按图层软删除想定内的实体（一条 UPDATE ... RETURNING）
+        
+        同一事务内先对 (想定, 图层) 加事务级咨询锁，并发的两次替换按图层编码顺序串行执行
+        
+        Args:
+            source: 仅删除该来源的实体（如 system，不影响人工标绘）
+            plot_group: 仅删除 properties.plotGroup 等于该值的实体
+            
+        Returns:
+            被删除实体的 {id, type, layerCode}
+        """
+        if not layer_codes:
+            return []
+        for code in sorted(set(layer_codes)):
+            await self._db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                {"key": f"entity_layer:{scenario_id}:{code}"},
+            )
+        stmt = (
+            update(Entity)
+            .where(Entity.deleted_at.is_(None))
+            .where(Entity.scenario_id == scenario_id)
+            .where(Entity.layer_code.in_(list(layer_codes)))
+        )
+        if source:
+            stmt = stmt.where(Entity.source == source)
+        if plot_group:
+            stmt = stmt.where(Entity.properties["plotGroup"].astext == plot_group)
+        stmt = (
+            stmt.values(deleted_at=datetime.utcnow())
+            .returning(Entity.id, Entity.type, Entity.layer_code)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._db.execute(stmt)
+        deleted = [{"id": str(row.id), "type": row.type, "layerCode": row.layer_code} for row in result.all()]
+        
+        logger.info(f"按图层删除实体: layers={list(layer_codes)}, count={len(deleted)}")
+        return deleted
+    
     async def get_by_id(self, entity_id: UUID) -> Optional[Entity]:
         """根据ID查询实体"""
         result = await self._db.execute(
@@ -353,6 +434,16 @@ class LayerRepository:
         )
         return result.scalar_one_or_none()
     
+    async def existing_codes(self, codes: Sequence[str]) -> set[str]:
+        """返回给定编码中已存在的图层编码"""
+        if not codes:
+            return set()
+        result = await self._db.execute(
+            select(Layer.code)
+            .where(Layer.code.in_(list(set(codes))))
+        )
+        return set(result.scalars().all())
+    
     async def get_by_id(self, layer_id: UUID) -> Optional[Layer]:
         """根据ID查询图层"""
         result = await self._db.execute(
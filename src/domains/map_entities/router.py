@@ -65,11 +65,12 @@ async def list_entities(
     bbox: Optional[str] = Query(None, description="边界框 minLng,minLat,maxLng,maxLat"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(100, ge=1, le=500, description="每页数量"),
+    crs: str = Query("wgs84", pattern="^(wgs84|gcj02)$", description="返回坐标系 wgs84/gcj02"),
     service: EntityService = Depends(get_entity_service),
 ) -> EntityListResponse:
     """获取实体列表"""
     return await service.list(
-        scenario_id, entity_types, layer_code, is_visible, bbox, page, page_size
+        scenario_id, entity_types, layer_code, is_visible, bbox, page, page_size, crs
     )
 
 
@@ -78,10 +79,11 @@ async def list_entities_in_bounds(
     scenario_id: UUID = Query(..., description="想定ID"),
     bounds: str = Query(..., description="边界框 minLng,minLat,maxLng,maxLat"),
     entity_types: Optional[str] = Query(None, description="类型过滤，逗号分隔"),
+    crs: str = Query("wgs84", pattern="^(wgs84|gcj02)$", description="返回坐标系 wgs84/gcj02"),
     service: EntityService = Depends(get_entity_service),
 ) -> EntityListResponse:
     """获取边界框内的实体"""
-    return await service.list_in_bounds(scenario_id, bounds, entity_types)
+    return await service.list_in_bounds(scenario_id, bounds, entity_types, crs)
 
 
 @entity_router.get("/nearby", response_model=list[EntityWithDistance])
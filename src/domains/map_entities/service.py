@@ -17,6 +17,8 @@ from geoalchemy2.functions import ST_AsGeoJSON
 from geoalchemy2.shape import to_shape
 
 from src.core.exceptions import NotFoundError, ConflictError, ValidationError
+from src.core.coord_transform import get_static_geometry_cache, transform_geometries
+from src.core.geodesy import polyline_length_m
 from .repository import EntityRepository, LayerRepository
 
 
@@ -63,6 +65,88 @@ class EntityService:
         entity = await self._entity_repo.create(data, created_by)
         response = await self._to_response(entity)
         
+        # 广播实体创建事件（通过WebSocket发送给前端，包含完整数据）
+        broadcast_data = self._broadcast_payload(response, data.scenario_id)
+        logger.info(f"广播实体创建: type={response.type.value}, geometry={broadcast_data['geometry']}")
+        await _get_stomp_broker().broadcast_entity_create(broadcast_data)
+        
+        # 如果是危险区域（前端绘制），触发风险检测通知
+        if response.type.value == 'danger_area':
+            logger.info(f"[危险区域创建] 检测到 danger_area 类型，准备触发风险检测: entity_id={entity.id}")
+            await self._trigger_danger_area_risk_check(response, data.scenario_id)
+        
+        return response
+    
+    async def create_batch(
+        self,
+        items: list[EntityCreate],
+        scenario_id: Optional[UUID] = None,
+        replace_layers: Optional[list[str]] = None,
+        replace_group: Optional[str] = None,
+        created_by: Optional[str] = None,
+    ) -> tuple[list[EntityResponse], list[dict]]:
+        """
+        批量创建实体（不提交、不广播，由调用方在同一事务内提交后调用 broadcast_batch）
+        
+        业务规则:
+        - 所有图层一次校验，任一不存在则整批失败
+        - replace_layers 非空时先软删除想定内这些图层中系统生成的实体（可按 plotGroup 限定），
+          人工标绘不受影响
+        
+        Returns:
+            (创建的实体响应列表（与 items 顺序一致）, 被删除实体的 {id, type, layerCode} 列表)
+        """
+        codes = {data.layer_code for data in items} | set(replace_layers or [])
+        existing = await self._layer_repo.existing_codes(list(codes))
+        missing = sorted(codes - existing)
+        if missing:
+            raise NotFoundError("Layer", ",".join(missing))
+        
+        deleted: list[dict] = []
+        if replace_layers:
+            if not scenario_id:
+                raise ValidationError("按图层替换必须指定想定ID")
+            deleted = await self._entity_repo.soft_delete_in_layers(
+                scenario_id, replace_layers, source=EntitySource.system.value, plot_group=replace_group,
+            )
+        
+        entities = await self._entity_repo.create_many(items, created_by)
+        # 几何即为刚写入的 GeoJSON，无需逐个 ST_AsGeoJSON 回查
+        responses = [
+            self._build_response(entity, data.geometry.model_dump())
+            for entity, data in zip(entities, items)
+        ]
+        return responses, deleted
+    
+    async def broadcast_batch(
+        self,
+        created: list[EntityResponse],
+        deleted: list[dict],
+        scenario_id: Optional[UUID] = None,
+        replaced_layers: Optional[list[str]] = None,
+    ) -> None:
+        """
+        合并广播一批实体变更（事务提交后调用）
+        
+        一条 /topic/map.entity.batch 消息代替逐个 entity.create / entity.delete，
+        危险区域仍逐个触发风险检测
+        """
+        # 与单个创建/删除一致：不按 scenario_id 过滤连接（前端未绑定场景）
+        await _get_stomp_broker().broadcast_entity_batch({
+            "created": [self._broadcast_payload(r, scenario_id) for r in created],
+            "deleted": deleted,
+            "replacedLayers": replaced_layers or [],
+            "scenarioId": str(scenario_id) if scenario_id else None,
+        })
+        logger.info(f"广播实体批量变更: created={len(created)}, deleted={len(deleted)}")
+        
+        for response in created:
+            if response.type.value == 'danger_area':
+                await self._trigger_danger_area_risk_check(response, scenario_id)
+    
+    @staticmethod
+    def _broadcast_payload(response: EntityResponse, scenario_id: Optional[UUID]) -> dict:
+        """实体创建广播数据（单个创建与批量创建共用）"""
         # 构建广播用的 geometry（为圆形区域补充 center 和 radius）
         broadcast_geometry = response.geometry.model_dump() if response.geometry else {}
         circle_types = {'danger_area', 'safety_area', 'command_post_candidate'}
@@ -75,8 +159,7 @@ class EntityService:
             if 'range' in response.properties:
                 broadcast_geometry['radius'] = response.properties['range']
         
-        # 广播实体创建事件（通过WebSocket发送给前端，包含完整数据）
-        broadcast_data = {
+        return {
             "id": str(response.id),
             "type": response.type.value,
             "layerCode": response.layer_code,
@@ -85,19 +168,10 @@ class EntityService:
             "visibleOnMap": response.visible_on_map,
             "styleOverrides": response.style_overrides,
             "source": response.source.value,
-            "scenarioId": str(data.scenario_id) if data.scenario_id else None,
+            "scenarioId": str(scenario_id) if scenario_id else None,
             "createdAt": response.created_at.isoformat(),
             "updatedAt": response.updated_at.isoformat(),
         }
-        logger.info(f"广播实体创建: type={response.type.value}, geometry={broadcast_data['geometry']}")
-        await _get_stomp_broker().broadcast_entity_create(broadcast_data)
-        
-        # 如果是危险区域（前端绘制），触发风险检测通知
-        if response.type.value == 'danger_area':
-            logger.info(f"[危险区域创建] 检测到 danger_area 类型，准备触发风险检测: entity_id={entity.id}")
-            await self._trigger_danger_area_risk_check(response, data.scenario_id)
-        
-        return response
     
     async def _trigger_danger_area_risk_check(
         self, 
@@ -181,6 +255,7 @@ class EntityService:
         bbox: Optional[str] = None,
         page: int = 1,
         page_size: int = 100,
+        crs: str = "wgs84",
     ) -> EntityListResponse:
         """
         分页查询实体列表
@@ -188,6 +263,7 @@ class EntityService:
         Args:
             entity_types: 逗号分隔的类型列表
             bbox: "minLng,minLat,maxLng,maxLat"
+            crs: 返回几何的坐标系，wgs84（默认）或 gcj02
         """
         types_list = entity_types.split(',') if entity_types else None
         bbox_tuple = None
@@ -200,7 +276,7 @@ class EntityService:
             scenario_id, types_list, layer_code, is_visible, bbox_tuple, page, page_size
         )
         
-        responses = [await self._to_response(e) for e in items]
+        responses = await self._to_responses(items, crs)
         return EntityListResponse(items=responses, total=total)
     
     async def list_in_bounds(
@@ -208,12 +284,14 @@ class EntityService:
         scenario_id: UUID,
         bounds: str,
         entity_types: Optional[str] = None,
+        crs: str = "wgs84",
     ) -> EntityListResponse:
         """
         查询边界框内的实体
         
         Args:
             bounds: "minLng,minLat,maxLng,maxLat"
+            crs: 返回几何的坐标系，wgs84（默认）或 gcj02
         """
         parts = bounds.split(',')
         if len(parts) != 4:
@@ -226,7 +304,7 @@ class EntityService:
         types_list = entity_types.split(',') if entity_types else None
         
         items = await self._entity_repo.list_in_bounds(scenario_id, bounds_tuple, types_list)
-        responses = [await self._to_response(e) for e in items]
+        responses = await self._to_responses(items, crs)
         
         return EntityListResponse(items=responses, total=len(responses))
     
@@ -499,18 +577,12 @@ class EntityService:
                 sampled_tracks.append(tracks[-1])
             tracks = sampled_tracks
         
-        # 计算总距离（Haversine公式）
+        # 计算总距离（Haversine公式，整条轨迹批量计算）
         total_distance_km: Optional[float] = None
         if len(tracks) >= 2:
-            total_distance_km = 0.0
-            for i in range(1, len(tracks)):
-                prev = tracks[i - 1]
-                curr = tracks[i]
-                total_distance_km += self._haversine_distance(
-                    prev.latitude, prev.longitude,
-                    curr.latitude, curr.longitude
-                )
-            total_distance_km = round(total_distance_km, 3)
+            total_distance_km = round(
+                polyline_length_m([(t.longitude, t.latitude) for t in tracks]) / 1000.0, 3
+            )
         
         # 计算总时长
         duration_min: Optional[float] = None
@@ -527,31 +599,37 @@ class EntityService:
             duration_min=duration_min,
         )
     
-    @staticmethod
-    def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    async def _to_responses(self, entities, crs: str = "wgs84") -> list[EntityResponse]:
         """
-        Haversine公式计算两点间球面距离（km）
+        批量转响应模型
         
-        精度足够用于轨迹距离统计
+        crs=gcj02 时全部几何一次批量转换；静态实体按 (id, updated_at) 走静态几何缓存，
+        同一图层反复加载时不再重复计算。
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        R = 6371.0  # 地球半径(km)
-        
-        lat1_rad = radians(lat1)
-        lat2_rad = radians(lat2)
-        delta_lat = radians(lat2 - lat1)
-        delta_lon = radians(lon2 - lon1)
-        
-        a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon / 2) ** 2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        
-        return R * c
+        if crs not in ("wgs84", "gcj02"):
+            raise ValidationError(
+                error_code="EN4003",
+                message=f"不支持的坐标系: {crs}，可选 wgs84 / gcj02"
+            )
+        geojsons = [await self._entity_repo.get_geometry_as_geojson(e) for e in entities]
+        if crs == "gcj02":
+            static_idx = [i for i, e in enumerate(entities) if geojsons[i] and not e.is_dynamic]
+            dynamic_idx = [i for i, e in enumerate(entities) if geojsons[i] and e.is_dynamic]
+            cached = get_static_geometry_cache().get_or_transform(
+                [(entities[i].id, entities[i].updated_at, geojsons[i]) for i in static_idx], "gcj02"
+            )
+            converted = transform_geometries([geojsons[i] for i in dynamic_idx], "gcj02")
+            for i, geometry in zip(static_idx + dynamic_idx, cached + converted):
+                geojsons[i] = geometry
+        return [self._build_response(e, g) for e, g in zip(entities, geojsons)]
     
     async def _to_response(self, entity) -> EntityResponse:
         """ORM模型转响应模型"""
         geojson = await self._entity_repo.get_geometry_as_geojson(entity)
-        
+        return self._build_response(entity, geojson)
+    
+    @staticmethod
+    def _build_response(entity, geojson: Optional[dict]) -> EntityResponse:
         return EntityResponse(
             id=entity.id,
             type=entity.type,
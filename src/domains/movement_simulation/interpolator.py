@@ -5,15 +5,14 @@
 """
 from __future__ import annotations
 
-import math
 from typing import Tuple, List, Optional
 from dataclasses import dataclass
 
-from .schemas import Point
+import numpy as np
 
+from src.core.geodesy import bearing_deg, bearings_deg, haversine_m, segment_lengths_m
 
-# 地球半径（米）
-EARTH_RADIUS_M = 6371000.0
+from .schemas import Point
 
 
 @dataclass
@@ -48,25 +47,24 @@ class RouteInterpolator:
         
         self._route = route
         self._segment_distances: List[float] = []
+        self._segment_headings: List[float] = []
         self._cumulative_distances: List[float] = []
         self._total_distance_m: float = 0.0
         
         self._calculate_distances()
     
     def _calculate_distances(self) -> None:
-        """计算各段距离和累计距离"""
-        cumulative = 0.0
-        self._cumulative_distances = [0.0]
-        
-        for i in range(len(self._route) - 1):
-            p1 = self._route[i]
-            p2 = self._route[i + 1]
-            segment_dist = self.haversine_distance(p1.lon, p1.lat, p2.lon, p2.lat)
-            self._segment_distances.append(segment_dist)
-            cumulative += segment_dist
-            self._cumulative_distances.append(cumulative)
-        
-        self._total_distance_m = cumulative
+        """批量计算各段距离、累计距离与朝向"""
+        coords = np.array([(p.lon, p.lat) for p in self._route], dtype=np.float64)
+        segments = segment_lengths_m(coords)
+        cumulative = np.concatenate(([0.0], np.cumsum(segments)))
+        
+        self._segment_distances = segments.tolist()
+        self._cumulative_distances = cumulative.tolist()
+        self._total_distance_m = float(cumulative[-1])
+        self._segment_headings = bearings_deg(
+            coords[:-1, 0], coords[:-1, 1], coords[1:, 0], coords[1:, 1]
+        ).tolist()
     
     @property
     def total_distance_m(self) -> float:
@@ -175,10 +173,7 @@ class RouteInterpolator:
         if segment_index >= len(self._route) - 1:
             segment_index = len(self._route) - 2
         
-        p1 = self._route[segment_index]
-        p2 = self._route[segment_index + 1]
-        
-        return self.calculate_bearing(p1.lon, p1.lat, p2.lon, p2.lat)
+        return self._segment_headings[segment_index]
     
     @staticmethod
     def _interpolate_altitude(
@@ -198,18 +193,7 @@ class RouteInterpolator:
         
         精度足够用于路径距离计算
         """
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (
-            math.sin(delta_lat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return EARTH_RADIUS_M * c
+        return haversine_m(lon1, lat1, lon2, lat2)
     
     @staticmethod
     def calculate_bearing(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
@@ -218,21 +202,7 @@ class RouteInterpolator:
         
         返回值范围: 0-360，正北为0，顺时针增加
         """
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        x = math.sin(delta_lon) * math.cos(lat2_rad)
-        y = (
-            math.cos(lat1_rad) * math.sin(lat2_rad) -
-            math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(delta_lon)
-        )
-        
-        bearing_rad = math.atan2(x, y)
-        bearing_deg = math.degrees(bearing_rad)
-        
-        # 转换为0-360范围
-        return (bearing_deg + 360) % 360
+        return bearing_deg(lon1, lat1, lon2, lat2)
     
     def get_remaining_distance(self, traveled_m: float) -> float:
         """计算剩余距离"""
@@ -16,7 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from shapely import wkb
 
 from src.core.exceptions import NotFoundError, ValidationError
-from src.core.coord_transform import wgs84_to_gcj02, gcj02_to_wgs84
+from src.core.coord_transform import wgs84_to_gcj02, gcj02_to_wgs84, wgs84_to_gcj02_array
 from src.domains.resources.teams.service import TeamService
 from src.domains.resources.teams.schemas import TeamResponse
 from src.domains.routing.service import RoutePlanningService
@@ -423,10 +423,10 @@ class TeamDispatchService:
             )
         
         # 4. 将结果路径点从WGS84转GCJ02
-        gcj02_points = []
-        for p in internal_result.path_points:
-            gcj_coord = wgs84_to_gcj02(p.lon, p.lat)
-            gcj02_points.append(RoutingPoint(lon=gcj_coord[0], lat=gcj_coord[1]))
+        gcj02_coords = wgs84_to_gcj02_array(
+            [(p.lon, p.lat) for p in internal_result.path_points]
+        ).tolist()
+        gcj02_points = [RoutingPoint(lon=lon, lat=lat) for lon, lat in gcj02_coords]
         
         logger.info(f"内部A*规划完成: 原始点={len(internal_result.path_points)}, 转换后={len(gcj02_points)}")
         
@@ -11,6 +11,8 @@ from .schemas import (
     PlotPolygonRequest,
     PlotRouteRequest,
     PlottingResponse,
+    PlotBatchRequest,
+    PlotBatchResponse,
 )
 
 __all__ = [
@@ -21,4 +23,6 @@ __all__ = [
     "PlotPolygonRequest",
     "PlotRouteRequest",
     "PlottingResponse",
+    "PlotBatchRequest",
+    "PlotBatchResponse",
 ]
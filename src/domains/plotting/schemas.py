@@ -6,7 +6,9 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal, Union
+
+from typing_extensions import Annotated
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -106,3 +108,67 @@ class PlottingResponse(BaseModel):
     entity_id: UUID = Field(..., description="创建的实体ID")
     entity_type: str = Field(..., description="实体类型")
     message: str = Field(..., description="结果消息")
+
+
+# ==================== 批量标绘 ====================
+# 批量条目复用单个标绘请求，kind 作为区分字段；scenario_id 缺省时取批次的想定ID
+
+class PlotPointItem(PlotPointRequest):
+    kind: Literal["point"] = "point"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+class PlotCircleItem(PlotCircleRequest):
+    kind: Literal["circle"] = "circle"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+class PlotPolygonItem(PlotPolygonRequest):
+    kind: Literal["polygon"] = "polygon"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+class PlotRouteItem(PlotRouteRequest):
+    kind: Literal["route"] = "route"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+class PlotEventRangeItem(PlotEventRangeRequest):
+    kind: Literal["event_range"] = "event_range"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+class PlotWeatherAreaItem(PlotWeatherAreaRequest):
+    kind: Literal["weather_area"] = "weather_area"
+    scenario_id: Optional[UUID] = Field(None, description="想定ID（缺省取批次想定）")
+
+
+PlotBatchItem = Annotated[
+    Union[
+        PlotPointItem, PlotCircleItem, PlotPolygonItem,
+        PlotRouteItem, PlotEventRangeItem, PlotWeatherAreaItem,
+    ],
+    Field(discriminator="kind"),
+]
+
+
+class PlotBatchRequest(BaseModel):
+    """批量标绘请求（同一事务写入，提交后合并为一条广播）"""
+    scenario_id: UUID = Field(..., description="想定ID")
+    items: List[PlotBatchItem] = Field(..., min_length=1, max_length=1000, description="标绘条目（kind 区分类型）")
+    replace_layers: List[str] = Field(
+        default_factory=list,
+        description="按图层替换：先删除想定内这些图层中系统生成的标绘，再写入本批",
+    )
+    group: Optional[str] = Field(
+        None, max_length=100,
+        description="标绘分组，写入 properties.plotGroup；指定时替换只删除同组标绘",
+    )
+
+
+class PlotBatchResponse(BaseModel):
+    """批量标绘响应"""
+    success: bool = Field(..., description="是否成功")
+    results: List[PlottingResponse] = Field(..., description="各条目结果（与请求顺序一致）")
+    deleted_count: int = Field(0, description="按图层替换删除的实体数")
+    message: str = Field(..., description="结果消息")
@@ -12,10 +12,14 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from uuid import UUID
 
+from shapely.geometry import shape
+from shapely.validation import explain_validity
+
 from src.core.database import AsyncSessionLocal
+from src.core.exceptions import ValidationError
 from src.domains.map_entities.service import EntityService
 from src.domains.map_entities.schemas import (
     EntityCreate, EntityType, EntitySource, GeoJsonGeometry
@@ -23,7 +27,8 @@ from src.domains.map_entities.schemas import (
 from .schemas import (
     PlottingType, PlotPointRequest, PlotCircleRequest,
     PlotPolygonRequest, PlotRouteRequest, PlottingResponse,
-    PlotEventRangeRequest, PlotWeatherAreaRequest
+    PlotEventRangeRequest, PlotWeatherAreaRequest,
+    PlotBatchRequest, PlotBatchResponse,
 )
 
 logger = logging.getLogger(__name__)
@@ -55,6 +60,247 @@ PLOTTING_LAYER_MAP: Dict[PlottingType, str] = {
 }
 
 
+# ==================== 实体构建（单个标绘与批量标绘共用） ====================
+
+def _point_entity(request: PlotPointRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """点类标绘 -> EntityCreate"""
+    entity_type = EntityType(request.plotting_type.value)
+    layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.manual")
+    
+    # 根据类型构建properties，确保前端能正确渲染
+    properties: Dict[str, Any] = {
+        "name": request.name,
+        "locationName": request.name,
+    }
+    
+    if request.description:
+        properties["textContent"] = request.description
+    
+    # rescue_target 特殊处理（触发波纹动画）
+    if request.plotting_type == PlottingType.rescue_target:
+        properties["level"] = request.level or 3
+        properties["origin"] = "ai_plotting"
+    
+    # situation_point 文字标签
+    if request.plotting_type == PlottingType.situation_point:
+        properties["textContent"] = request.description or request.name
+    
+    if request.extra_properties:
+        properties.update(request.extra_properties)
+    
+    return EntityCreate(
+        type=entity_type,
+        layer_code=layer_code,
+        geometry=GeoJsonGeometry(
+            type="Point",
+            coordinates=[request.longitude, request.latitude]
+        ),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+def _circle_entity(request: PlotCircleRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """圆形区域标绘 -> EntityCreate"""
+    entity_type = EntityType(request.plotting_type.value)
+    layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.dispose")
+    
+    # 前端handleEntity.js读取properties.range作为半径
+    properties: Dict[str, Any] = {
+        "locationName": request.name,
+        "range": request.radius_m,
+        "isSelect": "1" if request.is_selected else "0",
+    }
+    
+    if request.description:
+        properties["textContent"] = request.description
+    
+    # 圆形几何 - 前端需要geometry.center和geometry.radius
+    geometry_data: Dict[str, Any] = {
+        "type": "Point",
+        "coordinates": [request.center_longitude, request.center_latitude],
+        "center": [request.center_longitude, request.center_latitude],
+        "radius": request.radius_m,
+    }
+    
+    return EntityCreate(
+        type=entity_type,
+        layer_code=layer_code,
+        geometry=GeoJsonGeometry(**geometry_data),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+def _polygon_entity(request: PlotPolygonRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """多边形标绘 -> EntityCreate"""
+    entity_type = EntityType(request.plotting_type.value)
+    layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.dispose")
+    
+    properties: Dict[str, Any] = {
+        "name": request.name,
+    }
+    if request.description:
+        properties["textContent"] = request.description
+    
+    return EntityCreate(
+        type=entity_type,
+        layer_code=layer_code,
+        geometry=GeoJsonGeometry(
+            type="Polygon",
+            coordinates=[request.coordinates]  # GeoJSON Polygon需要嵌套数组
+        ),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+def _route_entity(request: PlotRouteRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """路线标绘 -> EntityCreate"""
+    # 前端handleEntity.js读取properties.deviceType, routeType, isSelect
+    properties: Dict[str, Any] = {
+        "name": request.name,
+        "deviceType": request.device_type,
+        "routeType": "planned_route",
+        "isSelect": "1" if request.is_selected else "0",
+    }
+    
+    return EntityCreate(
+        type=EntityType.planned_route,
+        layer_code=PLOTTING_LAYER_MAP[PlottingType.planned_route],
+        geometry=GeoJsonGeometry(
+            type="LineString",
+            coordinates=request.coordinates
+        ),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+def _event_range_entity(request: PlotEventRangeRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """事件区域范围标绘 -> EntityCreate"""
+    properties: Dict[str, Any] = {
+        "name": request.name,
+    }
+    if request.description:
+        properties["textContent"] = request.description
+    
+    # 前端支持数组格式: [外圈, 中圈, 内圈]
+    # GeoJSON MultiPolygon 需要 [[ring], [ring], [ring]] 格式
+    geometry_data: Dict[str, Any] = {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [request.outer_ring],   # 每个 polygon 需要套一层数组
+            [request.middle_ring],
+            [request.inner_ring],
+        ]
+    }
+    
+    return EntityCreate(
+        type=EntityType.event_range,
+        layer_code=PLOTTING_LAYER_MAP[PlottingType.event_range],
+        geometry=GeoJsonGeometry(**geometry_data),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+def _weather_area_entity(request: PlotWeatherAreaRequest, scenario_id: Optional[UUID] = None) -> EntityCreate:
+    """天气区域标绘 -> EntityCreate"""
+    properties: Dict[str, Any] = {
+        "name": request.name,
+    }
+    if request.description:
+        properties["textContent"] = request.description
+    
+    # 前端需要 geometry.bbox 格式: [minLng, minLat, maxLng, maxLat]
+    geometry_data: Dict[str, Any] = {
+        "type": "Polygon",
+        "bbox": [
+            request.min_longitude,
+            request.min_latitude,
+            request.max_longitude,
+            request.max_latitude,
+        ],
+        "coordinates": [[
+            [request.min_longitude, request.min_latitude],
+            [request.max_longitude, request.min_latitude],
+            [request.max_longitude, request.max_latitude],
+            [request.min_longitude, request.max_latitude],
+            [request.min_longitude, request.min_latitude],
+        ]]
+    }
+    
+    return EntityCreate(
+        type=EntityType.weather_area,
+        layer_code=PLOTTING_LAYER_MAP[PlottingType.weather_area],
+        geometry=GeoJsonGeometry(**geometry_data),
+        properties=properties,
+        source=EntitySource.system,
+        visible_on_map=True,
+        scenario_id=request.scenario_id or scenario_id,
+    )
+
+
+# 批量条目 kind -> 实体构建函数
+_BATCH_BUILDERS = {
+    "point": _point_entity,
+    "circle": _circle_entity,
+    "polygon": _polygon_entity,
+    "route": _route_entity,
+    "event_range": _event_range_entity,
+    "weather_area": _weather_area_entity,
+}
+
+
+def _geometry_error(geometry: GeoJsonGeometry) -> Optional[str]:
+    """几何校验，合法返回 None；多部件几何逐个部件校验（事件范围的三圈按设计互相重叠）"""
+    geom = shape(geometry.model_dump())
+    if geom.is_empty:
+        return "几何为空"
+    for part in getattr(geom, "geoms", (geom,)):
+        if not part.is_valid:
+            return f"几何非法: {explain_validity(part)}"
+    return None
+
+
+def build_batch_entities(request: PlotBatchRequest) -> List[EntityCreate]:
+    """
+    批量标绘条目 -> EntityCreate 列表（写库前整批校验）
+    
+    几何用 shapely 构造一次，坐标不足/环未闭合/自相交/空几何等错误与条目下标一起收集，
+    任一条目非法则整批拒绝，不产生部分写入
+    """
+    entities: List[EntityCreate] = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(request.items):
+        try:
+            data = _BATCH_BUILDERS[item.kind](item, request.scenario_id)
+            error = _geometry_error(data.geometry)
+            if error:
+                raise ValueError(error)
+        except Exception as e:
+            errors.append({"index": index, "kind": item.kind, "name": item.name, "error": str(e)})
+            continue
+        if request.group:
+            data.properties["plotGroup"] = request.group
+        entities.append(data)
+    
+    if errors:
+        raise ValidationError(f"批量标绘校验失败: {len(errors)}/{len(request.items)} 个条目几何非法", details=errors)
+    return entities
+
+
 class PlottingService:
     """态势标绘服务 - 提供统一的标绘能力"""
     
@@ -70,44 +316,9 @@ class PlottingService:
         - rescue_target: ADD_POINT_IMG 带波纹动画
         - situation_point: ADD_POINT_LABEL 文字标签
         """
-        entity_type = EntityType(request.plotting_type.value)
-        layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.manual")
-        
-        # 根据类型构建properties，确保前端能正确渲染
-        properties: Dict[str, Any] = {
-            "name": request.name,
-            "locationName": request.name,
-        }
-        
-        if request.description:
-            properties["textContent"] = request.description
-        
-        # rescue_target 特殊处理（触发波纹动画）
-        if request.plotting_type == PlottingType.rescue_target:
-            properties["level"] = request.level or 3
-            properties["origin"] = "ai_plotting"
-        
-        # situation_point 文字标签
-        if request.plotting_type == PlottingType.situation_point:
-            properties["textContent"] = request.description or request.name
-        
-        if request.extra_properties:
-            properties.update(request.extra_properties)
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=entity_type,
-                layer_code=layer_code,
-                geometry=GeoJsonGeometry(
-                    type="Point",
-                    coordinates=[request.longitude, request.latitude]
-                ),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_point_entity(request))
             await db.commit()
         
         logger.info(
@@ -131,38 +342,9 @@ class PlottingService:
         
         前端渲染效果: ADD_AREA_POINT（圆形区域+中心图标）
         """
-        entity_type = EntityType(request.plotting_type.value)
-        layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.dispose")
-        
-        # 前端handleEntity.js读取properties.range作为半径
-        properties: Dict[str, Any] = {
-            "locationName": request.name,
-            "range": request.radius_m,
-            "isSelect": "1" if request.is_selected else "0",
-        }
-        
-        if request.description:
-            properties["textContent"] = request.description
-        
-        # 圆形几何 - 前端需要geometry.center和geometry.radius
-        geometry_data: Dict[str, Any] = {
-            "type": "Point",
-            "coordinates": [request.center_longitude, request.center_latitude],
-            "center": [request.center_longitude, request.center_latitude],
-            "radius": request.radius_m,
-        }
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=entity_type,
-                layer_code=layer_code,
-                geometry=GeoJsonGeometry(**geometry_data),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_circle_entity(request))
             await db.commit()
         
         logger.info(
@@ -186,29 +368,9 @@ class PlottingService:
         
         前端渲染效果: ADD_POLYGON_AREA
         """
-        entity_type = EntityType(request.plotting_type.value)
-        layer_code = PLOTTING_LAYER_MAP.get(request.plotting_type, "layer.dispose")
-        
-        properties: Dict[str, Any] = {
-            "name": request.name,
-        }
-        if request.description:
-            properties["textContent"] = request.description
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=entity_type,
-                layer_code=layer_code,
-                geometry=GeoJsonGeometry(
-                    type="Polygon",
-                    coordinates=[request.coordinates]  # GeoJSON Polygon需要嵌套数组
-                ),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_polygon_entity(request))
             await db.commit()
         
         logger.info(
@@ -230,28 +392,9 @@ class PlottingService:
         
         前端渲染效果: ADD_NAVIGATION_ROUTE（导航动画）
         """
-        # 前端handleEntity.js读取properties.deviceType, routeType, isSelect
-        properties: Dict[str, Any] = {
-            "name": request.name,
-            "deviceType": request.device_type,
-            "routeType": "planned_route",
-            "isSelect": "1" if request.is_selected else "0",
-        }
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=EntityType.planned_route,
-                layer_code=PLOTTING_LAYER_MAP[PlottingType.planned_route],
-                geometry=GeoJsonGeometry(
-                    type="LineString",
-                    coordinates=request.coordinates
-                ),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_route_entity(request))
             await db.commit()
         
         logger.info(
@@ -290,36 +433,9 @@ class PlottingService:
         
         前端渲染效果: 红色半透明三层区域（外/中/内）
         """
-        layer_code = PLOTTING_LAYER_MAP[PlottingType.event_range]
-        
-        properties: Dict[str, Any] = {
-            "name": request.name,
-        }
-        if request.description:
-            properties["textContent"] = request.description
-        
-        # 前端支持数组格式: [外圈, 中圈, 内圈]
-        # GeoJSON MultiPolygon 需要 [[ring], [ring], [ring]] 格式
-        geometry_data: Dict[str, Any] = {
-            "type": "MultiPolygon",
-            "coordinates": [
-                [request.outer_ring],   # 每个 polygon 需要套一层数组
-                [request.middle_ring],
-                [request.inner_ring],
-            ]
-        }
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=EntityType.event_range,
-                layer_code=layer_code,
-                geometry=GeoJsonGeometry(**geometry_data),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_event_range_entity(request))
             await db.commit()
         
         logger.info(
@@ -340,43 +456,9 @@ class PlottingService:
         
         前端渲染效果: 雨区粒子特效 + 自动飞行
         """
-        layer_code = PLOTTING_LAYER_MAP[PlottingType.weather_area]
-        
-        properties: Dict[str, Any] = {
-            "name": request.name,
-        }
-        if request.description:
-            properties["textContent"] = request.description
-        
-        # 前端需要 geometry.bbox 格式: [minLng, minLat, maxLng, maxLat]
-        geometry_data: Dict[str, Any] = {
-            "type": "Polygon",
-            "bbox": [
-                request.min_longitude,
-                request.min_latitude,
-                request.max_longitude,
-                request.max_latitude,
-            ],
-            "coordinates": [[
-                [request.min_longitude, request.min_latitude],
-                [request.max_longitude, request.min_latitude],
-                [request.max_longitude, request.max_latitude],
-                [request.min_longitude, request.max_latitude],
-                [request.min_longitude, request.min_latitude],
-            ]]
-        }
-        
         async with AsyncSessionLocal() as db:
             service = EntityService(db)
-            entity = await service.create(EntityCreate(
-                type=EntityType.weather_area,
-                layer_code=layer_code,
-                geometry=GeoJsonGeometry(**geometry_data),
-                properties=properties,
-                source=EntitySource.system,
-                visible_on_map=True,
-                scenario_id=request.scenario_id,
-            ))
+            entity = await service.create(_weather_area_entity(request))
             await db.commit()
         
         logger.info(
@@ -390,3 +472,45 @@ class PlottingService:
             entity_type="weather_area",
             message=f"已标绘天气区域: {request.name}"
         )
+    
+    @staticmethod
+    async def plot_batch(request: PlotBatchRequest) -> PlotBatchResponse:
+        """
+        批量标绘
+        
+        - 全部条目先校验，再在同一事务内一条 INSERT 写入，要么全部成功要么全部回滚
+        - replace_layers: 同一事务内先删除想定内这些图层中系统生成的标绘（指定 group 时只删同组），
+          前端看到的是一次性的图层替换，不会出现半旧半新的中间态
+        - 提交后合并为一条 /topic/map.entity.batch 广播
+        """
+        items = build_batch_entities(request)
+        
+        async with AsyncSessionLocal() as db:
+            service = EntityService(db)
+            created, deleted = await service.create_batch(
+                items,
+                scenario_id=request.scenario_id,
+                replace_layers=request.replace_layers,
+                replace_group=request.group,
+            )
+            await db.commit()
+            await service.broadcast_batch(created, deleted, request.scenario_id, request.replace_layers)
+        
+        logger.info(
+            f"批量标绘: scenario={request.scenario_id}, created={len(created)}, "
+            f"deleted={len(deleted)}, replace_layers={request.replace_layers}"
+        )
+        
+        results = [
+            PlottingResponse(
+                success=True,
+                entity_id=entity.id,
+                entity_type=entity.type.value,
+                message=f"已标绘{entity.type.value}: {item.name}",
+            )
+            for entity, item in zip(created, request.items)
+        ]
+        message = f"已批量标绘 {len(results)} 个"
+        if request.replace_layers:
+            message += f"，替换图层 {','.join(request.replace_layers)} 删除 {len(deleted)} 个"
+        return PlotBatchResponse(success=True, results=results, deleted_count=len(deleted), message=message)
@@ -16,7 +16,6 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import math
 import time
 import uuid
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -25,6 +24,7 @@ from uuid import UUID
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.geodesy import haversine_m
 from src.planning.algorithms.routing import (
     DatabaseRouteEngine,
     VehicleCapability,
@@ -810,16 +810,4 @@ class ResourceSchedulingCore:
     @staticmethod
     def haversine_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
         """计算两点间的球面距离（米）"""
-        R = 6371000
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.asin(math.sqrt(a))
-        
-        return R * c
+        return haversine_m(lon1, lat1, lon2, lat2)
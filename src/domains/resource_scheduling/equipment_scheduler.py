@@ -9,7 +9,6 @@
 from __future__ import annotations
 
 import logging
-import math
 import time
 from typing import Dict, List, Optional, Set, Tuple
 from uuid import UUID
@@ -17,6 +16,8 @@ from uuid import UUID
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.geodesy import haversine_km
+
 from .equipment_schemas import (
     EquipmentType,
     EquipmentPriority,
@@ -543,16 +544,4 @@ class EquipmentScheduler:
     @staticmethod
     def haversine_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
         """计算两点间的球面距离（公里）"""
-        R = 6371.0
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.asin(math.sqrt(a))
-
-        return R * c
+        return haversine_km(lon1, lat1, lon2, lat2)
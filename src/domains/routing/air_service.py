@@ -6,16 +6,14 @@
 from __future__ import annotations
 
 import logging
-import math
 from typing import Optional
 
+from src.core.geodesy import haversine_m
+
 from .schemas import Point, RouteResult
 
 logger = logging.getLogger(__name__)
 
-# 地球半径（米）
-EARTH_RADIUS_M: float = 6371000.0
-
 # 默认无人机巡航速度（km/h）
 DEFAULT_CRUISE_SPEED_KMH: float = 50.0
 
@@ -61,7 +59,7 @@ class AirRoutePlanningService:
         )
         
         # Haversine 公式计算直线距离（米）
-        distance_m = self._haversine_distance(
+        distance_m = haversine_m(
             origin.lon, origin.lat,
             destination.lon, destination.lat
         )
@@ -82,36 +80,6 @@ class AirRoutePlanningService:
             segments=[],
             polyline=[origin, destination],
         )
-    
-    @staticmethod
-    def _haversine_distance(
-        lon1: float,
-        lat1: float,
-        lon2: float,
-        lat2: float,
-    ) -> float:
-        """
-        Haversine 公式计算两点间球面距离（米）
-        
-        Args:
-            lon1, lat1: 起点经纬度
-            lon2, lat2: 终点经纬度
-            
-        Returns:
-            距离（米）
-        """
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (
-            math.sin(delta_lat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return EARTH_RADIUS_M * c
 
 
 _air_service: Optional[AirRoutePlanningService] = None
@@ -9,6 +9,7 @@
 核心组件：
 - SimulationService: 仿真服务
 - SimulationClock: 仿真时钟
+- SimulationScheduler: 共享注入调度器（按仿真时间精确唤醒，持久化可恢复，支持快进回放）
 - SimulationScenario: 仿真场景ORM模型
 
 使用示例:
@@ -34,6 +35,9 @@ event_id = await service.inject_event(scenario.id, ImmediateInjectionRequest(
     event=EventTemplate(title="余震", event_type="landslide", priority="critical"),
 ))
 
+# 快进回放：立即按计划顺序执行 T+120min 之前的预设注入
+await service.fast_forward(scenario.id, FastForwardRequest(until_min=120))
+
 # 停止仿真（ROLLBACK 还原数据）
 await service.stop_simulation(scenario.id, rollback=True)
 
@@ -56,6 +60,8 @@ from .schemas import (
     ImmediateInjectionRequest,
     TimeScaleUpdateRequest,
     SimulationTimeResponse,
+    FastForwardRequest,
+    FastForwardResponse,
     AssessmentGrade,
     AssessmentResult,
     AssessmentResponse,
@@ -66,6 +72,12 @@ from .models import (
     DrillAssessment,
 )
 from .clock import SimulationClock
+from .scheduler import (
+    SimulationScheduler,
+    SimulationStore,
+    get_simulation_scheduler,
+    shutdown_simulation_scheduler,
+)
 from .service import SimulationService
 from .router import router as simulation_router
 
@@ -85,6 +97,8 @@ __all__ = [
     "ImmediateInjectionRequest",
     "TimeScaleUpdateRequest",
     "SimulationTimeResponse",
+    "FastForwardRequest",
+    "FastForwardResponse",
     "AssessmentGrade",
     "AssessmentResult",
     "AssessmentResponse",
@@ -94,6 +108,10 @@ __all__ = [
     "DrillAssessment",
     # 服务
     "SimulationClock",
+    "SimulationScheduler",
+    "SimulationStore",
+    "get_simulation_scheduler",
+    "shutdown_simulation_scheduler",
     "SimulationService",
     # 路由
     "simulation_router",
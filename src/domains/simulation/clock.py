@@ -36,6 +36,9 @@ class SimulationClock:
     clock.pause()
     clock.resume()
     clock.set_time_scale(4.0)
+    
+    # 快进：仿真时间直接前移（调度器回放时使用）
+    clock.advance(600)
     ```
     """
     
@@ -52,6 +55,8 @@ class SimulationClock:
             time_scale: 时间倍率（1.0 = 实时，2.0 = 2倍速）
         """
         self._simulation_start = simulation_start
+        # 仿真起点（不随倍率调整/快进变化，已过仿真时间以此为基准）
+        self._origin = simulation_start
         self._time_scale = float(time_scale)
         
         # 真实世界的开始时间（调用start()时设置）
@@ -87,6 +92,49 @@ class SimulationClock:
             self._pause_time = None
             logger.debug(f"仿真时钟恢复，本次暂停时长: {pause_duration}")
     
+    @classmethod
+    def restore(
+        cls,
+        origin: datetime,
+        current: datetime,
+        time_scale: Decimal,
+        paused: bool = False,
+    ) -> "SimulationClock":
+        """
+        从持久化状态恢复时钟（服务重启后使用）
+        
+        Args:
+            origin: 仿真起始时间
+            current: 恢复时刻对应的仿真时间
+            time_scale: 时间倍率
+            paused: 是否以暂停状态恢复
+        """
+        clock = cls(simulation_start=current, time_scale=time_scale)
+        clock._origin = origin
+        clock._real_start = datetime.utcnow()
+        if paused:
+            clock._paused = True
+            clock._pause_time = clock._real_start
+        return clock
+    
+    def advance(self, simulation_seconds: float) -> None:
+        """仿真时间直接前移（不影响真实时间基准与暂停状态）"""
+        if simulation_seconds > 0:
+            self._simulation_start += timedelta(seconds=simulation_seconds)
+    
+    def real_seconds_until(self, elapsed_simulation_seconds: float) -> float:
+        """
+        距离已过仿真时间达到指定值还需的真实秒数
+        
+        已到达返回0；未启动或暂停中返回 inf
+        """
+        remaining = elapsed_simulation_seconds - self.elapsed_simulation_seconds
+        if remaining <= 0:
+            return 0.0
+        if not self.is_started or self._paused:
+            return float("inf")
+        return remaining / self._time_scale
+    
     def set_time_scale(self, time_scale: Decimal) -> None:
         """
         设置时间倍率
@@ -104,6 +152,8 @@ class SimulationClock:
         self._simulation_start = current_sim_time
         self._real_start = datetime.utcnow()
         self._total_pause_duration = timedelta()
+        if self._paused:
+            self._pause_time = self._real_start
         
         # 设置新倍率
         self._time_scale = float(time_scale)
@@ -142,8 +192,8 @@ class SimulationClock:
     
     @property
     def elapsed_simulation_seconds(self) -> float:
-        """已过仿真时间（秒）"""
-        return self.elapsed_real_seconds * self._time_scale
+        """已过仿真时间（秒，相对仿真起点，倍率调整前后连续）"""
+        return (self.current_simulation_time - self._origin).total_seconds()
     
     @property
     def time_scale(self) -> float:
@@ -208,7 +258,7 @@ class SimulationClock:
     def get_status(self) -> dict:
         """获取时钟状态"""
         return {
-            "simulation_start": self._simulation_start.isoformat(),
+            "simulation_start": self._origin.isoformat(),
             "current_simulation_time": self.current_simulation_time.isoformat(),
             "time_scale": self._time_scale,
             "is_started": self.is_started,
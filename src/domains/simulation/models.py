@@ -3,6 +3,7 @@
 
 对应SQL表:
 - simulation_scenarios_v2 - 仿真场景元数据
+- injected_events_v2 - 预设注入事件（调度器持久化）
 - drill_assessments_v2 - 演练评估
 
 架构说明:
@@ -114,6 +115,10 @@ class SimulationScenario(Base):
         DateTime(timezone=True),
         comment="当前仿真时间"
     )
+    clock_checkpoint_at: Optional[datetime] = Column(
+        DateTime(timezone=True),
+        comment="current_simulation_time 对应的真实时间（重启后据此恢复运行中的时钟）"
+    )
     
     # ==================== 状态 ====================
     status: str = Column(
@@ -171,6 +176,8 @@ class InjectedEvent(Base):
     业务说明:
     - 仿真中的事件注入记录
     - 支持定时注入和立即注入
+    - event_data: {relative_time_min, seq, event_template, injected_event_id}
+    - inject_time 为计划注入的仿真时间，status: pending/injected/failed
     """
     __tablename__ = "injected_events_v2"
     __table_args__ = {"schema": "operational_v2"}
@@ -17,7 +17,7 @@ from src.core.exceptions import NotFoundError, ConflictError, ValidationError
 from .schemas import (
     SimulationScenarioCreate, SimulationScenarioResponse, SimulationListResponse,
     ImmediateInjectionRequest, InjectionQueueResponse,
-    TimeScaleUpdateRequest, SimulationTimeResponse,
+    TimeScaleUpdateRequest, SimulationTimeResponse, FastForwardRequest, FastForwardResponse,
     AssessmentCreateRequest, AssessmentResponse,
 )
 from .service import SimulationService
@@ -186,6 +186,28 @@ async def update_time_scale(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.detail)
 
 
+@router.post("/{simulation_id}/fast-forward", response_model=FastForwardResponse)
+async def fast_forward_simulation(
+    simulation_id: UUID,
+    request: FastForwardRequest = FastForwardRequest(),
+    service: SimulationService = Depends(get_service),
+) -> FastForwardResponse:
+    """
+    快进仿真
+    
+    不等待真实时间，按计划顺序立即执行预设注入，仿真时间推进到各注入时刻：
+    - **until_min**: 快进到的仿真分钟数，缺省时执行全部待注入
+    
+    结果只取决于注入计划，可用于数秒内回放整个想定
+    """
+    try:
+        return await service.fast_forward(simulation_id, request)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.detail)
+
+
 # =============================================================================
 # 事件注入
 # =============================================================================
@@ -0,0 +1,502 @@
+"""
+仿真注入调度器
+
+所有仿真共用一个调度协程（替代每个仿真一个5秒轮询任务）：
+- 每个仿真维护按计划仿真时间 (relative_time_min, 创建顺序) 排序的最小堆
+- 调度协程取各运行中仿真的堆顶，按各自时钟倍率换算成真实等待时间，精确睡到最近的一个；
+  启动/暂停/倍率调整/新增注入时立即唤醒重新计算
+- 注入状态写入 injected_events_v2，时钟状态定期写回 simulation_scenarios_v2，
+  服务重启后 start() 恢复运行中/暂停中的仿真
+- fast_forward() 按计划顺序立即执行注入，并把时钟推进到各注入时刻，用于确定性回放
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text, update
+
+from .clock import SimulationClock
+from .models import InjectedEvent, SimulationScenario
+from .schemas import EventTemplate, ScheduledInjection
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_INTERVAL_SEC = float(os.environ.get("SIMULATION_CHECKPOINT_SEC", "30"))
+INJECTION_MAX_ATTEMPTS = int(os.environ.get("SIMULATION_INJECTION_MAX_ATTEMPTS", "3"))
+INJECTION_RETRY_SEC = float(os.environ.get("SIMULATION_INJECTION_RETRY_SEC", "5"))
+
+# (simulation_id, scenario_id, 事件模板) -> 真实事件ID
+Injector = Callable[[UUID, UUID, EventTemplate], Awaitable[UUID]]
+
+
+def injection_to_row(
+    simulation_id: UUID,
+    origin: datetime,
+    injection: ScheduledInjection,
+    seq: int,
+) -> InjectedEvent:
+    """预设注入 → injected_events_v2 记录"""
+    return InjectedEvent(
+        id=UUID(injection.id),
+        simulation_id=simulation_id,
+        event_type=injection.event_template.event_type,
+        event_data={
+            "relative_time_min": injection.relative_time_min,
+            "seq": seq,
+            "event_template": injection.event_template.model_dump(mode="json"),
+        },
+        inject_time=origin + timedelta(minutes=injection.relative_time_min),
+        status="injected" if injection.injected else "pending",
+        injected_at=injection.injected_at,
+    )
+
+
+def rows_to_injections(rows: Iterable[InjectedEvent]) -> List[ScheduledInjection]:
+    """injected_events_v2 记录 → 预设注入（按创建顺序）"""
+    ordered = sorted(rows, key=lambda r: (r.event_data or {}).get("seq", 0))
+    injections = []
+    for row in ordered:
+        data = row.event_data or {}
+        injections.append(ScheduledInjection(
+            id=str(row.id),
+            relative_time_min=data.get("relative_time_min", 0),
+            event_template=EventTemplate(**data.get("event_template", {})),
+            injected=row.status == "injected",
+            injected_event_id=data.get("injected_event_id"),
+            injected_at=row.injected_at,
+        ))
+    return injections
+
+
+@dataclass
+class _SimulationState:
+    """单个仿真的调度状态"""
+    simulation_id: UUID
+    scenario_id: UUID
+    clock: SimulationClock
+    injections: Dict[str, ScheduledInjection] = field(default_factory=dict)
+    # (计划仿真秒数, 序号, 注入ID)
+    heap: List[Tuple[float, int, str]] = field(default_factory=list)
+    attempts: Dict[str, int] = field(default_factory=dict)
+    next_seq: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def push(self, injection: ScheduledInjection, due_s: Optional[float] = None) -> None:
+        self.injections[injection.id] = injection
+        if injection.injected:
+            return
+        due = due_s if due_s is not None else injection.relative_time_min * 60.0
+        heapq.heappush(self.heap, (due, self.next_seq, injection.id))
+        self.next_seq += 1
+
+    def head_due(self) -> Optional[float]:
+        """堆顶计划时间（顺带弹出已注入/已移除的过期条目）"""
+        while self.heap:
+            due, _, injection_id = self.heap[0]
+            injection = self.injections.get(injection_id)
+            if injection is not None and not injection.injected:
+                return due
+            heapq.heappop(self.heap)
+        return None
+
+    @property
+    def running(self) -> bool:
+        return self.clock.is_started and not self.clock.is_paused
+
+
+class SimulationStore:
+    """调度器状态持久化（使用独立数据库会话，不参与请求事务）"""
+
+    def __init__(self, session_factory: Callable) -> None:
+        self._session_factory = session_factory
+
+    async def load_active(self) -> List[Tuple[SimulationScenario, List[InjectedEvent]]]:
+        """加载运行中/暂停中的仿真及其预设注入"""
+        async with self._session_factory() as db:
+            scenarios = (await db.execute(
+                select(SimulationScenario).where(SimulationScenario.status.in_(("running", "paused")))
+            )).scalars().all()
+            if not scenarios:
+                return []
+            rows = (await db.execute(
+                select(InjectedEvent).where(InjectedEvent.simulation_id.in_([s.id for s in scenarios]))
+            )).scalars().all()
+        by_simulation: Dict[UUID, List[InjectedEvent]] = {}
+        for row in rows:
+            by_simulation.setdefault(row.simulation_id, []).append(row)
+        return [(s, by_simulation.get(s.id, [])) for s in scenarios]
+
+    async def checkpoint(self, clocks: Sequence[Tuple[UUID, SimulationClock]]) -> None:
+        """写回时钟：当前仿真时间、倍率及对应的真实时间"""
+        if not clocks:
+            return
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            for simulation_id, clock in clocks:
+                await db.execute(
+                    update(SimulationScenario)
+                    .where(SimulationScenario.id == simulation_id)
+                    .values(
+                        current_simulation_time=clock.current_simulation_time,
+                        time_scale=clock.time_scale,
+                        clock_checkpoint_at=now,
+                    )
+                )
+            await db.commit()
+
+    async def mark_injection(
+        self,
+        injection_id: str,
+        status: str,
+        injected_event_id: Optional[UUID] = None,
+        injected_at: Optional[datetime] = None,
+    ) -> None:
+        async with self._session_factory() as db:
+            await db.execute(text("""
+                UPDATE operational_v2.injected_events_v2
+                SET status = :status,
+                    injected_at = :injected_at,
+                    event_data = COALESCE(event_data, '{}'::jsonb)
+                        || jsonb_build_object('injected_event_id', CAST(:event_id AS text))
+                WHERE id = :id
+            """), {
+                "id": injection_id,
+                "status": status,
+                "injected_at": injected_at,
+                "event_id": str(injected_event_id) if injected_event_id else None,
+            })
+            await db.commit()
+
+
+async def _inject_with_event_service(simulation_id: UUID, scenario_id: UUID, template: EventTemplate) -> UUID:
+    """默认注入：独立会话调用 SimulationService 创建真实事件，提交后再广播"""
+    from src.core import database
+    from .service import SimulationService
+
+    async with database.AsyncSessionLocal() as db:
+        return await SimulationService(db).execute_injection(simulation_id, scenario_id, template, commit=True)
+
+
+class SimulationScheduler:
+    """
+    仿真注入调度器（进程内单例）
+
+    使用示例:
+    ```python
+    scheduler = get_simulation_scheduler()
+    await scheduler.start()                       # 恢复持久化的仿真并启动调度协程
+
+    scheduler.load(simulation_id, scenario_id, clock, injections)
+    scheduler.start_clock(simulation_id)
+    scheduler.set_time_scale(simulation_id, Decimal("4.0"))
+    scheduler.pause_clock(simulation_id)
+
+    fired = await scheduler.fast_forward(simulation_id, until_min=120)
+    await scheduler.stop()
+    ```
+    """
+
+    def __init__(
+        self,
+        injector: Optional[Injector] = None,
+        store: Optional[SimulationStore] = None,
+        checkpoint_interval_sec: float = CHECKPOINT_INTERVAL_SEC,
+        max_attempts: int = INJECTION_MAX_ATTEMPTS,
+        retry_sec: float = INJECTION_RETRY_SEC,
+    ) -> None:
+        self._injector = injector or _inject_with_event_service
+        self._store = store
+        self._checkpoint_interval = checkpoint_interval_sec
+        self._max_attempts = max_attempts
+        self._retry_sec = retry_sec
+        self._states: Dict[UUID, _SimulationState] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_checkpoint = time.monotonic()
+        self._started = False
+        # 注入时刻相对计划的仿真时间延迟（秒）
+        self.stats = {"fired": 0, "failed": 0, "max_lag_sim_s": 0.0}
+
+    # =========================================================================
+    # 生命周期
+    # =========================================================================
+
+    async def start(self) -> None:
+        """恢复持久化的仿真并启动调度协程"""
+        if self._started:
+            return
+        self._started = True
+        if self._store is not None:
+            await self._recover()
+        self._wake()
+
+    async def stop(self) -> None:
+        """停止调度协程并写回时钟"""
+        self._started = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._checkpoint()
+
+    async def _recover(self) -> None:
+        try:
+            active = await self._store.load_active()
+        except Exception as e:
+            logger.warning(f"恢复仿真调度状态失败: {e}")
+            return
+        now = datetime.now(timezone.utc)
+        for scenario, rows in active:
+            current = scenario.current_simulation_time or scenario.start_simulation_time or datetime.utcnow()
+            paused = scenario.status == "paused"
+            if not paused and scenario.clock_checkpoint_at is not None:
+                # 停机期间仿真时间照常流逝，错过的注入恢复后立即补发
+                current += (now - scenario.clock_checkpoint_at) * float(scenario.time_scale)
+            clock = SimulationClock.restore(
+                origin=scenario.start_simulation_time or current,
+                current=current,
+                time_scale=scenario.time_scale,
+                paused=paused,
+            )
+            self.load(scenario.id, scenario.scenario_id, clock, rows_to_injections(rows))
+        if active:
+            logger.info(f"恢复仿真调度: {len(active)} 个仿真")
+
+    # =========================================================================
+    # 仿真状态
+    # =========================================================================
+
+    def is_loaded(self, simulation_id: UUID) -> bool:
+        return simulation_id in self._states
+
+    def clock(self, simulation_id: UUID) -> Optional[SimulationClock]:
+        state = self._states.get(simulation_id)
+        return state.clock if state else None
+
+    def load(
+        self,
+        simulation_id: UUID,
+        scenario_id: UUID,
+        clock: SimulationClock,
+        injections: Sequence[ScheduledInjection] = (),
+    ) -> None:
+        """登记仿真（已登记则忽略）"""
+        if simulation_id in self._states:
+            return
+        state = _SimulationState(simulation_id, scenario_id, clock)
+        for injection in injections:
+            state.push(injection)
+        self._states[simulation_id] = state
+        self._wake()
+
+    def unload(self, simulation_id: UUID) -> Optional[SimulationClock]:
+        """移除仿真，返回其时钟"""
+        state = self._states.pop(simulation_id, None)
+        self._wake()
+        return state.clock if state else None
+
+    def add_injections(self, simulation_id: UUID, injections: Sequence[ScheduledInjection]) -> None:
+        state = self._states[simulation_id]
+        for injection in injections:
+            state.push(injection)
+        self._wake()
+
+    def injections(self, simulation_id: UUID) -> Optional[List[ScheduledInjection]]:
+        """预设注入（按计划时间排序），未登记返回 None"""
+        state = self._states.get(simulation_id)
+        if state is None:
+            return None
+        return sorted(state.injections.values(), key=lambda i: i.relative_time_min)
+
+    def start_clock(self, simulation_id: UUID) -> SimulationClock:
+        """启动或恢复时钟"""
+        clock = self._states[simulation_id].clock
+        if clock.is_started:
+            clock.resume()
+        else:
+            clock.start()
+        self._wake()
+        return clock
+
+    def pause_clock(self, simulation_id: UUID) -> Optional[SimulationClock]:
+        clock = self.clock(simulation_id)
+        if clock is not None:
+            clock.pause()
+            self._wake()
+        return clock
+
+    def set_time_scale(self, simulation_id: UUID, time_scale) -> Optional[SimulationClock]:
+        clock = self.clock(simulation_id)
+        if clock is not None:
+            clock.set_time_scale(time_scale)
+            self._wake()
+        return clock
+
+    async def fast_forward(
+        self,
+        simulation_id: UUID,
+        until_min: Optional[float] = None,
+    ) -> List[ScheduledInjection]:
+        """
+        快进：按计划顺序立即执行注入，时钟推进到各注入的计划时刻
+
+        结果只取决于注入计划本身（与真实时间、调度协程无关），可用于回放想定。
+
+        Args:
+            until_min: 快进到的仿真分钟数，缺省时执行全部待注入
+
+        Returns:
+            本次成功注入的列表
+        """
+        state = self._states[simulation_id]
+        horizon = until_min * 60.0 if until_min is not None else float("inf")
+        fired: List[ScheduledInjection] = []
+        async with state.lock:
+            while (due := state.head_due()) is not None and due <= horizon:
+                _, _, injection_id = heapq.heappop(state.heap)
+                injection = state.injections[injection_id]
+                state.clock.advance(due - state.clock.elapsed_simulation_seconds)
+                if await self._fire(state, injection, due):
+                    fired.append(injection)
+            if until_min is not None:
+                state.clock.advance(horizon - state.clock.elapsed_simulation_seconds)
+        self._wake()
+        await self._checkpoint([state])
+        logger.info(f"仿真快进: simulation={simulation_id}, 注入 {len(fired)} 个")
+        return fired
+
+    # =========================================================================
+    # 调度协程
+    # =========================================================================
+
+    def _wake(self) -> None:
+        self._wakeup.set()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="simulation-scheduler")
+
+    def _next_wait(self) -> Optional[float]:
+        """距最近一次注入（或时钟写回）的真实秒数，无事可做返回 None"""
+        wait = float("inf")
+        running = False
+        for state in self._states.values():
+            if not state.running:
+                continue
+            running = True
+            due = state.head_due()
+            if due is not None:
+                wait = min(wait, state.clock.real_seconds_until(due))
+        if running and self._store is not None:
+            wait = min(wait, max(0.0, self._last_checkpoint + self._checkpoint_interval - time.monotonic()))
+        return None if wait == float("inf") else wait
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                self._wakeup.clear()
+                await self._fire_due()
+                if self._store is not None and time.monotonic() - self._last_checkpoint >= self._checkpoint_interval:
+                    await self._checkpoint()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_wait())
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"仿真调度协程异常: {e}", exc_info=True)
+
+    async def _fire_due(self) -> None:
+        for state in list(self._states.values()):
+            if not state.running:
+                continue
+            async with state.lock:
+                while (due := state.head_due()) is not None and due <= state.clock.elapsed_simulation_seconds:
+                    _, _, injection_id = heapq.heappop(state.heap)
+                    await self._fire(state, state.injections[injection_id], due)
+
+    async def _fire(self, state: _SimulationState, injection: ScheduledInjection, due_s: float) -> bool:
+        """执行一次注入；失败时按重试间隔重新入堆，超过次数标记为失败"""
+        lag = state.clock.elapsed_simulation_seconds - due_s
+        try:
+            event_id = await self._injector(state.simulation_id, state.scenario_id, injection.event_template)
+        except Exception as e:
+            attempts = state.attempts.get(injection.id, 0) + 1
+            state.attempts[injection.id] = attempts
+            if attempts < self._max_attempts:
+                logger.warning(f"注入事件失败({attempts}/{self._max_attempts})，稍后重试: {e}")
+                retry_due = state.clock.elapsed_simulation_seconds + self._retry_sec * state.clock.time_scale
+                state.push(injection, due_s=retry_due)
+            else:
+                logger.error(f"注入事件失败，放弃: simulation={state.simulation_id}, id={injection.id}: {e}")
+                self.stats["failed"] += 1
+                await self._mark(injection.id, "failed")
+            return False
+
+        injection.injected = True
+        injection.injected_event_id = event_id
+        injection.injected_at = datetime.utcnow()
+        state.attempts.pop(injection.id, None)
+        self.stats["fired"] += 1
+        self.stats["max_lag_sim_s"] = max(self.stats["max_lag_sim_s"], lag)
+        await self._mark(injection.id, "injected", event_id, injection.injected_at)
+        logger.info(
+            f"自动注入事件: simulation={state.simulation_id}, event_id={event_id}, "
+            f"at T+{injection.relative_time_min}min, 延迟 {lag:.2f}s(仿真)"
+        )
+        return True
+
+    async def _mark(self, injection_id: str, status: str, event_id: Optional[UUID] = None,
+                    injected_at: Optional[datetime] = None) -> None:
+        if self._store is None:
+            return
+        try:
+            await self._store.mark_injection(injection_id, status, event_id, injected_at)
+        except Exception as e:
+            logger.warning(f"保存注入状态失败: {e}")
+
+    async def _checkpoint(self, states: Optional[Iterable[_SimulationState]] = None) -> None:
+        self._last_checkpoint = time.monotonic()
+        if self._store is None:
+            return
+        states = self._states.values() if states is None else states
+        clocks = [(s.simulation_id, s.clock) for s in states if s.clock.is_started]
+        try:
+            await self._store.checkpoint(clocks)
+        except Exception as e:
+            logger.warning(f"保存仿真时钟失败: {e}")
+
+
+# 全局单例
+_scheduler: Optional[SimulationScheduler] = None
+
+
+def get_simulation_scheduler() -> SimulationScheduler:
+    """获取仿真注入调度器单例"""
+    global _scheduler
+    if _scheduler is None:
+        from src.core.database import AsyncSessionLocal
+        _scheduler = SimulationScheduler(store=SimulationStore(AsyncSessionLocal))
+    return _scheduler
+
+
+async def shutdown_simulation_scheduler() -> None:
+    """关闭仿真注入调度器"""
+    global _scheduler
+    if _scheduler:
+        await _scheduler.stop()
+        _scheduler = None
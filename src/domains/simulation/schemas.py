@@ -103,7 +103,7 @@ class EventTemplate(BaseModel):
 
 class ScheduledInjection(BaseModel):
     """
-    预设注入事件（内存管理，仿真结束后随数据库回滚一起清除）
+    预设注入事件（持久化于 injected_events_v2，由 SimulationScheduler 按仿真时间调度）
     """
     id: str = Field(..., description="注入ID")
     relative_time_min: int = Field(..., ge=0, description="相对仿真开始的时间（分钟）")
@@ -148,6 +148,17 @@ class SimulationTimeResponse(BaseModel):
     elapsed_simulation_seconds: float = Field(..., description="仿真已过秒数")
 
 
+class FastForwardRequest(BaseModel):
+    """快进请求"""
+    until_min: Optional[float] = Field(None, ge=0, description="快进到的仿真分钟数，缺省时执行全部待注入")
+
+
+class FastForwardResponse(BaseModel):
+    """快进响应"""
+    injected: list[ScheduledInjection] = Field(default_factory=list, description="本次注入")
+    simulation_time: datetime = Field(..., description="快进后的仿真时间")
+
+
 # ============================================================================
 # 演练评估
 # ============================================================================
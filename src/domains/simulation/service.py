@@ -5,15 +5,15 @@
 - 仿真使用真实数据表，启动时创建 SAVEPOINT
 - 事件注入直接调用真实的 EventService
 - 仿真结束后 ROLLBACK TO SAVEPOINT 还原数据
+- 时钟与预设注入由进程内共享的 SimulationScheduler 管理（持久化，重启可恢复）
 """
 from __future__ import annotations
 
-import asyncio
 import logging
 import uuid as uuid_lib
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional, Dict, List
+from typing import Optional, List
 from uuid import UUID
 
 from sqlalchemy import select, text
@@ -25,11 +25,14 @@ from .schemas import (
     SimulationScenarioCreate, SimulationScenarioResponse, SimulationListResponse,
     InjectionEventCreate, ScheduledInjection, InjectionQueueResponse,
     ImmediateInjectionRequest, EventTemplate,
-    TimeScaleUpdateRequest, SimulationTimeResponse,
+    TimeScaleUpdateRequest, SimulationTimeResponse, FastForwardRequest, FastForwardResponse,
     AssessmentCreateRequest, AssessmentResponse, AssessmentResult, AssessmentGrade,
 )
-from .models import SimulationScenario, DrillAssessment
+from .models import SimulationScenario, DrillAssessment, InjectedEvent
 from .clock import SimulationClock
+from .scheduler import (
+    SimulationScheduler, get_simulation_scheduler, injection_to_row, rows_to_injections,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,16 +64,12 @@ class SimulationService:
     - 仿真启动时创建数据库 SAVEPOINT
     - 仿真期间所有操作（事件、任务等）直接写入真实表
     - 仿真结束后 ROLLBACK TO SAVEPOINT 还原数据
+    - 服务按请求创建，时钟与注入队列保存在共享调度器中
     """
     
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(self, db: AsyncSession, scheduler: Optional[SimulationScheduler] = None) -> None:
         self._db = db
-        # 活跃仿真的时钟: simulation_id -> SimulationClock
-        self._clocks: Dict[UUID, SimulationClock] = {}
-        # 注入调度任务: simulation_id -> asyncio.Task
-        self._injection_tasks: Dict[UUID, asyncio.Task] = {}
-        # 预设注入事件（内存管理）: simulation_id -> List[ScheduledInjection]
-        self._scheduled_injections: Dict[UUID, List[ScheduledInjection]] = {}
+        self._scheduler = scheduler or get_simulation_scheduler()
     
     # =========================================================================
     # 仿真场景管理
@@ -99,7 +98,7 @@ class SimulationService:
         self._db.add(scenario)
         await self._db.flush()
         
-        # 将预设注入事件存入内存
+        # 预设注入事件与场景同一事务持久化
         scheduled = []
         for inject in data.inject_events:
             scheduled.append(ScheduledInjection(
@@ -108,12 +107,19 @@ class SimulationService:
                 event_template=inject.event_template,
                 injected=False,
             ))
-        if scheduled:
-            self._scheduled_injections[scenario.id] = scheduled
+        for seq, injection in enumerate(scheduled):
+            self._db.add(injection_to_row(scenario.id, start_sim_time, injection, seq))
         
         await self._db.commit()
         await self._db.refresh(scenario)
         
+        self._scheduler.load(
+            scenario.id,
+            scenario.scenario_id,
+            SimulationClock(simulation_start=start_sim_time, time_scale=scenario.time_scale),
+            scheduled,
+        )
+        
         logger.info(f"创建仿真场景: id={scenario.id}, name={data.name}")
         
         return self._to_scenario_response(scenario)
@@ -123,8 +129,8 @@ class SimulationService:
         scenario = await self._get_scenario_or_raise(simulation_id)
         
         # 如果正在运行，更新当前仿真时间
-        if simulation_id in self._clocks:
-            clock = self._clocks[simulation_id]
+        clock = self._scheduler.clock(simulation_id)
+        if clock is not None and clock.is_started:
             scenario.current_simulation_time = clock.current_simulation_time
         
         return self._to_scenario_response(scenario)
@@ -189,31 +195,21 @@ class SimulationService:
         #     scenario.savepoint_name = savepoint_name
         #     logger.info(f"创建仿真快照: {savepoint_name}")
         
-        # 创建或恢复时钟
-        if simulation_id not in self._clocks:
-            clock = SimulationClock(
-                simulation_start=scenario.start_simulation_time or datetime.utcnow(),
-                time_scale=scenario.time_scale,
-            )
-            self._clocks[simulation_id] = clock
-        else:
-            clock = self._clocks[simulation_id]
+        # 创建或恢复时钟，并开始按仿真时间调度预设注入
+        await self._ensure_scheduled(scenario)
+        clock = self._scheduler.start_clock(simulation_id)
         
         if scenario.status == 'ready':
-            clock.start()
             scenario.started_at = datetime.utcnow()
-        else:
-            clock.resume()
         
         scenario.status = 'running'
         scenario.paused_at = None
+        scenario.current_simulation_time = clock.current_simulation_time
+        scenario.clock_checkpoint_at = datetime.utcnow()
         
         await self._db.commit()
         await self._db.refresh(scenario)
         
-        # 启动注入调度
-        self._start_injection_scheduler(simulation_id)
-        
         # 广播仿真启动事件
         await self._broadcast_simulation_event(simulation_id, "started")
         
@@ -231,22 +227,19 @@ class SimulationService:
                 message=f"仿真状态不允许暂停: {scenario.status}"
             )
         
-        # 暂停时钟
-        if simulation_id in self._clocks:
-            clock = self._clocks[simulation_id]
-            clock.pause()
+        # 暂停时钟（调度器随之停止该仿真的注入）
+        clock = self._scheduler.pause_clock(simulation_id)
+        if clock is not None:
             scenario.current_simulation_time = clock.current_simulation_time
             scenario.total_pause_duration_s = clock.total_pause_duration_seconds
         
         scenario.status = 'paused'
         scenario.paused_at = datetime.utcnow()
+        scenario.clock_checkpoint_at = scenario.paused_at
         
         await self._db.commit()
         await self._db.refresh(scenario)
         
-        # 停止注入调度
-        self._stop_injection_scheduler(simulation_id)
-        
         # 广播仿真暂停事件
         await self._broadcast_simulation_event(simulation_id, "paused")
         
@@ -280,12 +273,11 @@ class SimulationService:
                 message=f"仿真已结束: {scenario.status}"
             )
         
-        # 记录最终仿真时间
-        if simulation_id in self._clocks:
-            clock = self._clocks[simulation_id]
+        # 记录最终仿真时间，并从调度器移除
+        clock = self._scheduler.unload(simulation_id)
+        if clock is not None and clock.is_started:
             scenario.current_simulation_time = clock.current_simulation_time
             scenario.total_pause_duration_s = clock.total_pause_duration_seconds
-            del self._clocks[simulation_id]
         
         # TODO: 回滚数据库到快照（暂时禁用，后续启用）
         # if rollback and scenario.savepoint_name:
@@ -306,12 +298,6 @@ class SimulationService:
         await self._db.commit()
         await self._db.refresh(scenario)
         
-        # 停止注入调度
-        self._stop_injection_scheduler(simulation_id)
-        
-        # 清理内存中的预设注入
-        self._scheduled_injections.pop(simulation_id, None)
-        
         # 广播仿真停止事件
         await self._broadcast_simulation_event(simulation_id, "stopped")
         
@@ -337,22 +323,56 @@ class SimulationService:
                 message=f"只能在运行中调整时间倍率: {scenario.status}"
             )
         
-        # 更新时钟
-        if simulation_id in self._clocks:
-            clock = self._clocks[simulation_id]
-            clock.set_time_scale(request.time_scale)
+        # 更新时钟（调度器按新倍率重新计算下一次注入的等待时间）
+        await self._ensure_scheduled(scenario)
+        clock = self._scheduler.set_time_scale(simulation_id, request.time_scale)
         
         # 更新数据库
         scenario.time_scale = request.time_scale
+        scenario.current_simulation_time = clock.current_simulation_time
+        scenario.clock_checkpoint_at = datetime.utcnow()
         await self._db.commit()
         
         logger.info(f"时间倍率调整: id={simulation_id}, scale={request.time_scale}")
         
         return self._get_time_response(simulation_id)
     
+    async def fast_forward(
+        self,
+        simulation_id: UUID,
+        request: FastForwardRequest,
+    ) -> FastForwardResponse:
+        """
+        快进：不等待真实时间，按计划顺序立即执行预设注入
+        
+        时钟推进到各注入的计划时刻，注入顺序与仿真时间只取决于注入计划，可用于回放想定。
+        """
+        scenario = await self._get_scenario_or_raise(simulation_id)
+        
+        if scenario.status not in ('running', 'paused'):
+            raise ConflictError(
+                error_code="SI4002",
+                message=f"只能对运行中或暂停的仿真快进: {scenario.status}"
+            )
+        
+        await self._ensure_scheduled(scenario)
+        injected = await self._scheduler.fast_forward(simulation_id, request.until_min)
+        
+        clock = self._scheduler.clock(simulation_id)
+        scenario.current_simulation_time = clock.current_simulation_time
+        scenario.clock_checkpoint_at = datetime.utcnow()
+        await self._db.commit()
+        
+        logger.info(f"仿真快进: id={simulation_id}, until_min={request.until_min}, injected={len(injected)}")
+        
+        return FastForwardResponse(
+            injected=injected,
+            simulation_time=clock.current_simulation_time,
+        )
+    
     def _get_time_response(self, simulation_id: UUID) -> SimulationTimeResponse:
         """获取时间响应"""
-        clock = self._clocks.get(simulation_id)
+        clock = self._scheduler.clock(simulation_id)
         if clock:
             return SimulationTimeResponse(
                 real_time=datetime.utcnow(),
@@ -393,21 +413,44 @@ class SimulationService:
                 message=f"只能在运行中注入事件: {scenario.status}"
             )
         
-        # 调用真实 EventService 创建事件
-        event_id = await self._create_real_event(scenario.scenario_id, request.event)
-        
-        # 广播注入事件
-        await self._broadcast_injected_event(simulation_id, request.event, event_id)
+        event_id = await self.execute_injection(simulation_id, scenario.scenario_id, request.event)
         
         logger.info(f"事件注入: simulation={simulation_id}, event_id={event_id}")
         
         return event_id
     
+    async def execute_injection(
+        self,
+        simulation_id: UUID,
+        scenario_id: UUID,
+        template: EventTemplate,
+        commit: bool = False,
+    ) -> UUID:
+        """
+        创建真实事件并广播（立即注入与调度器预设注入共用）
+        
+        Args:
+            commit: 广播前先提交会话（调度器使用独立会话，没有请求级提交；
+                    失败时回滚，不广播不存在的事件）
+        """
+        try:
+            event_id = await self._create_real_event(scenario_id, template)
+            if commit:
+                await self._db.commit()
+        except Exception:
+            if commit:
+                await self._db.rollback()
+            raise
+        await self._broadcast_injected_event(simulation_id, template, event_id)
+        return event_id
+    
     async def get_injection_queue(self, simulation_id: UUID) -> InjectionQueueResponse:
-        """获取注入队列（从内存获取）"""
+        """获取注入队列（调度器中没有时从数据库读取）"""
         await self._get_scenario_or_raise(simulation_id)
         
-        scheduled = self._scheduled_injections.get(simulation_id, [])
+        scheduled = self._scheduler.injections(simulation_id)
+        if scheduled is None:
+            scheduled = await self._load_injections(simulation_id)
         
         pending = [s for s in scheduled if not s.injected]
         injected = [s for s in scheduled if s.injected]
@@ -464,78 +507,34 @@ class SimulationService:
         
         return event.id
     
-    def _start_injection_scheduler(self, simulation_id: UUID) -> None:
-        """启动注入调度器"""
-        if simulation_id in self._injection_tasks:
-            return
-        
-        task = asyncio.create_task(
-            self._injection_loop(simulation_id),
-            name=f"injection-{simulation_id}"
+    async def _load_injections(self, simulation_id: UUID) -> List[ScheduledInjection]:
+        """从数据库读取预设注入"""
+        result = await self._db.execute(
+            select(InjectedEvent).where(InjectedEvent.simulation_id == simulation_id)
         )
-        self._injection_tasks[simulation_id] = task
+        return rows_to_injections(result.scalars().all())
     
-    def _stop_injection_scheduler(self, simulation_id: UUID) -> None:
-        """停止注入调度器"""
-        task = self._injection_tasks.pop(simulation_id, None)
-        if task and not task.done():
-            task.cancel()
-    
-    async def _injection_loop(self, simulation_id: UUID) -> None:
-        """注入调度循环"""
-        try:
-            while True:
-                await asyncio.sleep(5)  # 每5秒检查一次
-                
-                clock = self._clocks.get(simulation_id)
-                if not clock or clock.is_paused:
-                    continue
-                
-                # 计算已过仿真时间（分钟）
-                elapsed_min = clock.elapsed_simulation_seconds / 60
-                
-                # 获取预设注入列表
-                scheduled = self._scheduled_injections.get(simulation_id, [])
-                
-                for injection in scheduled:
-                    if injection.injected:
-                        continue
-                    
-                    # 检查是否到达注入时间
-                    if elapsed_min >= injection.relative_time_min:
-                        try:
-                            # 获取场景
-                            scenario = await self._get_scenario_or_raise(simulation_id)
-                            
-                            # 创建真实事件
-                            event_id = await self._create_real_event(
-                                scenario.scenario_id,
-                                injection.event_template,
-                            )
-                            
-                            # 更新注入状态
-                            injection.injected = True
-                            injection.injected_event_id = event_id
-                            injection.injected_at = datetime.utcnow()
-                            
-                            # 广播
-                            await self._broadcast_injected_event(
-                                simulation_id,
-                                injection.event_template,
-                                event_id,
-                            )
-                            
-                            logger.info(
-                                f"自动注入事件: simulation={simulation_id}, "
-                                f"event_id={event_id}, at T+{injection.relative_time_min}min"
-                            )
-                        except Exception as e:
-                            logger.error(f"注入事件失败: {e}", exc_info=True)
-        
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"注入调度异常: {e}", exc_info=True)
+    async def _ensure_scheduled(self, scenario: SimulationScenario) -> None:
+        """仿真尚未登记到调度器时（如服务重启前创建），按数据库状态登记"""
+        if self._scheduler.is_loaded(scenario.id):
+            return
+        origin = scenario.start_simulation_time or datetime.utcnow()
+        current = scenario.current_simulation_time or origin
+        if scenario.status == 'ready':
+            clock = SimulationClock(simulation_start=origin, time_scale=scenario.time_scale)
+        else:
+            clock = SimulationClock.restore(
+                origin=origin,
+                current=current,
+                time_scale=scenario.time_scale,
+                paused=scenario.status != 'running',
+            )
+        self._scheduler.load(
+            scenario.id,
+            scenario.scenario_id,
+            clock,
+            await self._load_injections(scenario.id),
+        )
     
     # =========================================================================
     # 评估生成
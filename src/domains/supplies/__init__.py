@@ -11,6 +11,15 @@ from .inventory_service import (
     SupplyInventoryItem,
     TransferRequest,
     TransferResult,
+    AllocationResult,
+)
+from .allocation import (
+    SupplyDemand,
+    StockLot,
+    AllocationLine,
+    AllocationPolicy,
+    AllocationPlan,
+    plan_allocation,
 )
 from .schemas import (
     SupplyCreate, SupplyUpdate, SupplyResponse, 
@@ -24,6 +33,13 @@ __all__ = [
     "SupplyInventoryItem",
     "TransferRequest",
     "TransferResult",
+    "AllocationResult",
+    "SupplyDemand",
+    "StockLot",
+    "AllocationLine",
+    "AllocationPolicy",
+    "AllocationPlan",
+    "plan_allocation",
     "SupplyCreate",
     "SupplyUpdate",
     "SupplyResponse",
@@ -0,0 +1,243 @@
+"""
+多仓物资分配规划
+
+把一次救援的完整物资需求分配到各存放点的库存批次上，同一遍计算同时得出缺口。
+
+分配规则:
+- 需求按优先级（critical > high > medium > low）、数量从大到小依次分配
+- 每个需求在候选批次中按代价从低到高取用，代价 =
+    到目的地距离(km)
+    + 新启用存放点的惩罚(km，倾向于少开仓、集中发运)
+    - 临期奖励(km/天 × 距离 FEFO 期限的剩余天数，先到期先出)
+- 已过期或剩余保质期不足 min_shelf_days 的批次不参与分配（由查询侧过滤）
+
+规划本身不访问数据库，预留由 SupplyInventoryService.allocate_supplies 执行。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from src.core.geodesy import distances_m
+
+PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+
+@dataclass
+class SupplyDemand:
+    """物资需求（supply_id 与 supply_code 至少提供一个）"""
+    quantity: int
+    supply_code: str = ""
+    supply_id: Optional[UUID] = None
+    supply_name: Optional[str] = None
+    priority: str = "medium"
+
+    @property
+    def key(self) -> str:
+        return str(self.supply_id) if self.supply_id else self.supply_code
+
+
+@dataclass
+class StockLot:
+    """可分配的库存批次（一条 supply_inventory_v2 记录）"""
+    inventory_id: UUID
+    depot_id: UUID
+    depot_name: str
+    supply_id: UUID
+    supply_code: str
+    supply_name: str
+    available: int
+    expiry_date: Optional[date] = None
+    batch_no: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+@dataclass
+class AllocationLine:
+    """分配明细：从某批次取用的数量"""
+    inventory_id: UUID
+    depot_id: UUID
+    depot_name: str
+    supply_id: UUID
+    supply_code: str
+    quantity: int
+    distance_km: Optional[float]
+    expiry_date: Optional[date]
+    batch_no: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "inventory_id": str(self.inventory_id),
+            "depot_id": str(self.depot_id),
+            "depot_name": self.depot_name,
+            "supply_id": str(self.supply_id),
+            "supply_code": self.supply_code,
+            "quantity": self.quantity,
+            "distance_km": self.distance_km,
+            "expiry_date": self.expiry_date.isoformat() if self.expiry_date else None,
+            "batch_no": self.batch_no,
+        }
+
+
+@dataclass
+class AllocationPolicy:
+    """分配代价参数"""
+    new_depot_penalty_km: float = 5.0
+    fefo_horizon_days: int = 30
+    fefo_km_per_day: float = 1.0
+    min_shelf_days: int = 0
+
+
+@dataclass
+class AllocationPlan:
+    """分配方案"""
+    lines: List[AllocationLine] = field(default_factory=list)
+    shortages: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def fulfilled(self) -> bool:
+        return not self.shortages
+
+    @property
+    def depots_used(self) -> List[str]:
+        return sorted({str(line.depot_id) for line in self.lines})
+
+
+def shortage_entry(code: str, name: str, required: int, available: int, priority: str) -> Dict[str, Any]:
+    """缺口记录（与 SupplyInventoryService.calculate_shortage 的格式一致）"""
+    shortage = required - available
+    severity = "critical" if priority == "critical" or shortage > required * 0.5 else "warning"
+    return {
+        "supply_code": code,
+        "supply_name": name,
+        "required": required,
+        "available": available,
+        "shortage": shortage,
+        "severity": severity,
+    }
+
+
+def merge_demands(demands: Sequence[SupplyDemand]) -> List[SupplyDemand]:
+    """同一物资的多条需求合并，优先级取最高"""
+    merged: Dict[str, SupplyDemand] = {}
+    for d in demands:
+        if d.quantity <= 0:
+            continue
+        existing = merged.get(d.key)
+        if existing is None:
+            merged[d.key] = SupplyDemand(d.quantity, d.supply_code, d.supply_id, d.supply_name, d.priority)
+            continue
+        existing.quantity += d.quantity
+        existing.supply_code = existing.supply_code or d.supply_code
+        if PRIORITY_ORDER.get(d.priority, 2) < PRIORITY_ORDER.get(existing.priority, 2):
+            existing.priority = d.priority
+    return list(merged.values())
+
+
+def resolve_supply_ids(demands: Sequence[SupplyDemand], lots: Sequence[StockLot]) -> List[SupplyDemand]:
+    """
+    按候选批次把只给了编码的需求统一到 supply_id
+
+    同一物资分别以 supply_id 和 supply_code 提出的需求解析后键相同，
+    merge_demands 才能合并；否则两条需求会在同一库存记录上各生成一条明细。
+    编码在候选批次中对应多个 supply_id 时保持按编码分配。
+    """
+    ids_by_code: Dict[str, set] = {}
+    for lot in lots:
+        ids_by_code.setdefault(lot.supply_code, set()).add(lot.supply_id)
+    resolved: List[SupplyDemand] = []
+    for d in demands:
+        ids = ids_by_code.get(d.supply_code, set()) if not d.supply_id else set()
+        if len(ids) == 1:
+            d = SupplyDemand(d.quantity, d.supply_code, next(iter(ids)), d.supply_name, d.priority)
+        resolved.append(d)
+    return resolved
+
+
+def plan_allocation(
+    demands: Sequence[SupplyDemand],
+    lots: Sequence[StockLot],
+    destination: Optional[Tuple[float, float]] = None,
+    policy: Optional[AllocationPolicy] = None,
+    today: Optional[date] = None,
+) -> AllocationPlan:
+    """
+    计算分配方案
+
+    Args:
+        demands: 需求列表
+        lots: 候选库存批次
+        destination: 目的地 (lat, lng)，缺省时不考虑距离
+        policy: 代价参数
+        today: FEFO 计算基准日期，默认当天
+    """
+    policy = policy or AllocationPolicy()
+    today = today or date.today()
+    demands = merge_demands(resolve_supply_ids(demands, lots))
+
+    distance = np.zeros(len(lots))
+    if destination is not None and lots:
+        lats = np.array([lot.latitude if lot.latitude is not None else np.nan for lot in lots], dtype=np.float64)
+        lngs = np.array([lot.longitude if lot.longitude is not None else np.nan for lot in lots], dtype=np.float64)
+        distance = distances_m(destination[1], destination[0], lngs, lats) / 1000.0
+        # 无坐标的存放点排在所有有坐标的之后
+        distance = np.where(np.isnan(distance), np.nanmax(distance, initial=0.0) + 1000.0, distance)
+
+    fefo_bonus = np.zeros(len(lots))
+    for i, lot in enumerate(lots):
+        if lot.expiry_date is not None:
+            expiry = lot.expiry_date.date() if isinstance(lot.expiry_date, datetime) else lot.expiry_date
+            days_left = (expiry - today).days
+            fefo_bonus[i] = max(0, policy.fefo_horizon_days - days_left) * policy.fefo_km_per_day
+
+    by_key: Dict[str, List[int]] = {}
+    for i, lot in enumerate(lots):
+        by_key.setdefault(str(lot.supply_id), []).append(i)
+        by_key.setdefault(lot.supply_code, []).append(i)
+
+    remaining = np.array([lot.available for lot in lots], dtype=np.int64)
+    used_depots: set = set()
+    plan = AllocationPlan()
+    ordered = sorted(demands, key=lambda d: (PRIORITY_ORDER.get(d.priority, 2), -d.quantity))
+
+    for demand in ordered:
+        candidates = [i for i in by_key.get(demand.key, []) if remaining[i] > 0]
+        cost = {
+            i: distance[i] - fefo_bonus[i] + (0.0 if lots[i].depot_id in used_depots else policy.new_depot_penalty_km)
+            for i in candidates
+        }
+        need = demand.quantity
+        # 同代价时先到期的批次优先，再按库存ID保证结果确定
+        for i in sorted(candidates, key=lambda i: (cost[i], lots[i].expiry_date or date.max, str(lots[i].inventory_id))):
+            if need <= 0:
+                break
+            take = int(min(need, remaining[i]))
+            lot = lots[i]
+            plan.lines.append(AllocationLine(
+                inventory_id=lot.inventory_id,
+                depot_id=lot.depot_id,
+                depot_name=lot.depot_name,
+                supply_id=lot.supply_id,
+                supply_code=lot.supply_code,
+                quantity=take,
+                distance_km=round(float(distance[i]), 2) if destination is not None else None,
+                expiry_date=lot.expiry_date,
+                batch_no=lot.batch_no,
+            ))
+            remaining[i] -= take
+            need -= take
+            used_depots.add(lot.depot_id)
+
+        if need > 0:
+            name = demand.supply_name or next(
+                (lots[i].supply_name for i in by_key.get(demand.key, [])), demand.supply_code or demand.key
+            )
+            plan.shortages.append(shortage_entry(
+                demand.supply_code or demand.key, name, demand.quantity, demand.quantity - need, demand.priority,
+            ))
+    return plan
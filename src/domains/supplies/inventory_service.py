@@ -9,6 +9,8 @@
 - 乐观锁（version字段）防止并发更新丢失
 - 批量 SELECT FOR UPDATE 减少死锁风险
 - 自动重试机制（指数退避）
+- 多仓分配（allocate_supplies）一次查询候选批次、一次 UPDATE ... FROM (VALUES ...) 预留，
+  按库存ID顺序加锁避免死锁
 """
 from __future__ import annotations
 
@@ -17,13 +19,24 @@ import logging
 import random
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError
 
+from .allocation import (
+    AllocationLine,
+    AllocationPlan,
+    AllocationPolicy,
+    StockLot,
+    SupplyDemand,
+    merge_demands,
+    plan_allocation,
+    shortage_entry,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,6 +114,20 @@ class ReserveResult:
     retried_count: int = 0
 
 
+@dataclass
+class AllocationResult:
+    """多仓分配结果"""
+    success: bool
+    plan: AllocationPlan
+    reserved: bool = False
+    retried_count: int = 0
+    error: Optional[str] = None
+
+    @property
+    def shortages(self) -> List[Dict[str, Any]]:
+        return self.plan.shortages
+
+
 @dataclass
 class TransferRequest:
     """调拨申请"""
@@ -747,16 +774,224 @@ class SupplyInventoryService:
 
             avail = available_by_code.get(code, 0)
             if avail < required:
-                shortage = required - avail
-                severity = "critical" if priority == "critical" or shortage > required * 0.5 else "warning"
-
-                shortages.append({
-                    "supply_code": code,
-                    "supply_name": supply_names.get(code, req.get("supply_name", code)),
-                    "required": required,
-                    "available": avail,
-                    "shortage": shortage,
-                    "severity": severity,
-                })
+                shortages.append(shortage_entry(
+                    code, supply_names.get(code, req.get("supply_name", code)), required, avail, priority,
+                ))
 
         return shortages
+
+    async def allocate_supplies(
+        self,
+        demands: Sequence[SupplyDemand],
+        destination: Optional[Tuple[float, float]] = None,
+        depot_types: Optional[List[str]] = None,
+        depot_ids: Optional[List[UUID]] = None,
+        scenario_id: Optional[UUID] = None,
+        policy: Optional[AllocationPolicy] = None,
+        reserve: bool = True,
+        max_retries: int = 3,
+    ) -> AllocationResult:
+        """
+        多仓物资分配与预留
+        
+        1. 一次查询取出所有需求物资在各存放点的可用批次
+        2. 按距离、开仓数、先到期先出(FEFO)规划分配，同一遍得出缺口
+        3. reserve=True 时以单条 UPDATE ... FROM (VALUES ...) 预留全部明细，
+           按库存ID顺序加锁；期间库存被并发占用则回滚后重新规划
+        
+        Args:
+            demands: 需求列表
+            destination: 目的地 (lat, lng)
+            depot_types/depot_ids/scenario_id: 存放点范围，含义同 get_available_inventory
+            policy: 分配代价参数
+            reserve: False 时只规划（计算缺口与建议来源），不预留
+            
+        Returns:
+            AllocationResult（部分满足时仍预留可满足的部分，缺口见 shortages）
+        """
+        policy = policy or AllocationPolicy()
+        demands = merge_demands(demands)
+        logger.info(
+            f"[多仓分配] 需求{len(demands)}种, destination={destination}, reserve={reserve}"
+        )
+        
+        retried = 0
+        last_error: Optional[Exception] = None
+        while retried <= max_retries:
+            lots = await self._load_stock_lots(demands, depot_types, depot_ids, scenario_id, policy.min_shelf_days)
+            plan = plan_allocation(demands, lots, destination, policy)
+            if not reserve or not plan.lines:
+                return AllocationResult(success=plan.fulfilled, plan=plan, retried_count=retried)
+            
+            try:
+                # 同一库存记录的明细在 VALUES 中合并，按去重后的记录数判断是否全部预留
+                expected = len({line.inventory_id for line in plan.lines})
+                reserved = await self._reserve_lines(plan.lines)
+                if reserved == expected:
+                    await self._db.commit()
+                    logger.info(
+                        f"[多仓分配] 预留{len(plan.lines)}条明细, 存放点{len(plan.depots_used)}个, "
+                        f"缺口{len(plan.shortages)}种"
+                    )
+                    return AllocationResult(
+                        success=plan.fulfilled, plan=plan, reserved=True, retried_count=retried,
+                    )
+                # 规划后库存被其他请求占用，回滚后按最新库存重新规划
+                await self._db.rollback()
+                last_error = None
+                retried += 1
+                logger.warning(
+                    f"[多仓分配] {expected - reserved}条库存记录已变化，重新规划 {retried}/{max_retries}"
+                )
+            except OperationalError as e:
+                await self._db.rollback()
+                last_error = e
+                retried += 1
+                if retried <= max_retries:
+                    delay = (2 ** retried) * 0.2 + random.uniform(0, 0.2)
+                    logger.warning(
+                        f"[多仓分配] 数据库错误，重试 {retried}/{max_retries}，等待 {delay:.2f}s: {e}"
+                    )
+                    await asyncio.sleep(delay)
+        
+        logger.error(f"[多仓分配] 超过最大重试次数: {last_error or '库存持续变化'}")
+        return AllocationResult(
+            success=False,
+            plan=plan,
+            retried_count=retried,
+            error=str(last_error) if last_error else "库存持续变化，预留失败",
+        )
+
+    async def release_allocation(self, lines: Sequence[AllocationLine]) -> int:
+        """批量释放 allocate_supplies 的预留，单条 UPDATE，返回更新的库存记录数"""
+        if not lines:
+            return 0
+        values_sql, params = self._line_values(lines)
+        sql = text(f"""
+            WITH locked AS (
+                SELECT si.id
+                FROM operational_v2.supply_inventory_v2 si
+                WHERE si.id = ANY(:inventory_ids)
+                ORDER BY si.id
+                FOR UPDATE
+            )
+            UPDATE operational_v2.supply_inventory_v2 si
+            SET reserved_quantity = GREATEST(0, si.reserved_quantity - v.quantity),
+                updated_at = NOW()
+            FROM (VALUES {values_sql}) AS v(id, quantity), locked
+            WHERE si.id = v.id AND locked.id = v.id
+            RETURNING si.id
+        """)
+        result = await self._db.execute(sql, params)
+        released = len(result.fetchall())
+        await self._db.commit()
+        logger.info(f"[释放分配] 释放{released}条库存记录")
+        return released
+
+    async def _load_stock_lots(
+        self,
+        demands: Sequence[SupplyDemand],
+        depot_types: Optional[List[str]],
+        depot_ids: Optional[List[UUID]],
+        scenario_id: Optional[UUID],
+        min_shelf_days: int,
+    ) -> List[StockLot]:
+        """一次查询所有需求物资的可用批次"""
+        conditions = [
+            "sd.is_active = true",
+            "(si.quantity - si.reserved_quantity) > 0",
+            "(s.id::text = ANY(:supply_ids) OR s.code = ANY(:supply_codes))",
+            "(si.expiry_date IS NULL OR si.expiry_date >= CURRENT_DATE + :min_shelf_days)",
+        ]
+        params: Dict[str, Any] = {
+            "supply_ids": [str(d.supply_id) for d in demands if d.supply_id],
+            "supply_codes": [d.supply_code for d in demands if not d.supply_id and d.supply_code],
+            "min_shelf_days": min_shelf_days,
+        }
+        if depot_types:
+            conditions.append("sd.depot_type = ANY(:depot_types)")
+            params["depot_types"] = depot_types
+        if depot_ids:
+            conditions.append("sd.id = ANY(:depot_ids)")
+            params["depot_ids"] = [str(d) for d in depot_ids]
+        if scenario_id:
+            conditions.append("(sd.scenario_id = :scenario_id OR sd.depot_type != 'field_depot')")
+            params["scenario_id"] = str(scenario_id)
+
+        sql = text(f"""
+            SELECT
+                si.id AS inventory_id,
+                sd.id AS depot_id,
+                sd.name AS depot_name,
+                s.id AS supply_id,
+                s.code AS supply_code,
+                s.name AS supply_name,
+                (si.quantity - si.reserved_quantity) AS available,
+                si.expiry_date,
+                si.batch_no,
+                ST_Y(sd.location::geometry) AS latitude,
+                ST_X(sd.location::geometry) AS longitude
+            FROM operational_v2.supply_inventory_v2 si
+            JOIN operational_v2.supply_depots_v2 sd ON sd.id = si.depot_id
+            JOIN operational_v2.supplies_v2 s ON s.id = si.supply_id
+            WHERE {" AND ".join(conditions)}
+        """)
+        result = await self._db.execute(sql, params)
+        return [
+            StockLot(
+                inventory_id=row.inventory_id,
+                depot_id=row.depot_id,
+                depot_name=row.depot_name,
+                supply_id=row.supply_id,
+                supply_code=row.supply_code,
+                supply_name=row.supply_name,
+                available=row.available,
+                expiry_date=row.expiry_date,
+                batch_no=row.batch_no,
+                latitude=row.latitude,
+                longitude=row.longitude,
+            )
+            for row in result.fetchall()
+        ]
+
+    async def _reserve_lines(self, lines: Sequence[AllocationLine]) -> int:
+        """
+        单条 UPDATE 预留全部明细，返回成功更新的记录数（不提交）
+        
+        CTE 按库存ID排序 FOR UPDATE，所有请求以相同顺序加锁；
+        可用量不足的记录不更新，由调用方比较返回数决定提交或回滚。
+        """
+        values_sql, params = self._line_values(lines)
+        sql = text(f"""
+            WITH locked AS (
+                SELECT si.id
+                FROM operational_v2.supply_inventory_v2 si
+                WHERE si.id = ANY(:inventory_ids)
+                ORDER BY si.id
+                FOR UPDATE
+            )
+            UPDATE operational_v2.supply_inventory_v2 si
+            SET reserved_quantity = si.reserved_quantity + v.quantity,
+                updated_at = NOW()
+            FROM (VALUES {values_sql}) AS v(id, quantity), locked
+            WHERE si.id = v.id AND locked.id = v.id
+              AND si.quantity - si.reserved_quantity >= v.quantity
+            RETURNING si.id
+        """)
+        result = await self._db.execute(sql, params)
+        return len(result.fetchall())
+
+    @staticmethod
+    def _line_values(lines: Sequence[AllocationLine]) -> Tuple[str, Dict[str, Any]]:
+        """明细 → VALUES 子句与参数（同一库存记录的数量合并）"""
+        quantities: Dict[str, int] = {}
+        for line in lines:
+            key = str(line.inventory_id)
+            quantities[key] = quantities.get(key, 0) + line.quantity
+        params: Dict[str, Any] = {"inventory_ids": list(quantities)}
+        rows = []
+        for i, (inventory_id, quantity) in enumerate(sorted(quantities.items())):
+            rows.append(f"(CAST(:id_{i} AS uuid), CAST(:qty_{i} AS integer))")
+            params[f"id_{i}"] = inventory_id
+            params[f"qty_{i}"] = quantity
+        return ", ".join(rows), params
@@ -0,0 +1,102 @@
+"""语音会话音频工具。
+
+- 基于 NumPy 的能量VAD：直接在 PCM 字节的只读视图上计算，不拷贝、不逐样本解包
+- PCMRingBuffer：预分配固定容量的录音缓冲，限制单次发言的最大时长
+"""
+from __future__ import annotations
+
+import numpy as np
+
+PCM_SAMPLE_WIDTH = 2  # 16-bit
+
+
+def frame_rms(audio_data: bytes | bytearray | memoryview) -> float:
+    """计算单帧 16-bit PCM 的能量（RMS）。"""
+    usable = len(audio_data) - len(audio_data) % PCM_SAMPLE_WIDTH
+    if usable < PCM_SAMPLE_WIDTH:
+        return 0.0
+    samples = np.frombuffer(audio_data, dtype="<i2", count=usable // PCM_SAMPLE_WIDTH)
+    # 转int64后点积，避免int16平方溢出
+    wide = samples.astype(np.int64)
+    return (int(wide @ wide) / wide.size) ** 0.5
+
+
+def frame_energies(audio_data: bytes | bytearray | memoryview, frame_bytes: int) -> np.ndarray:
+    """把一段音频按固定帧长切分，批量计算每帧 RMS。
+
+    尾部不足一帧的数据被忽略。
+
+    Returns:
+        shape=(帧数,) 的 float64 数组
+    """
+    frame_samples = frame_bytes // PCM_SAMPLE_WIDTH
+    num_frames = len(audio_data) // frame_bytes
+    if num_frames == 0 or frame_samples == 0:
+        return np.zeros(0, dtype=np.float64)
+    if num_frames == 1:
+        # 常见情况（客户端每次发送一帧）走点积，避免einsum的调度开销
+        return np.array([frame_rms(memoryview(audio_data)[:frame_bytes])])
+    samples = np.frombuffer(audio_data, dtype="<i2", count=num_frames * frame_samples)
+    frames = samples.reshape(num_frames, frame_samples).astype(np.int64)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_samples)
+
+
+class PCMRingBuffer:
+    """固定容量的 PCM 录音缓冲。
+
+    容量对应最大发言时长。写满后继续写入会覆盖最早的音频，
+    调用方可通过 is_full 判断是否需要提前结束本轮识别。
+    """
+
+    def __init__(self, capacity_bytes: int) -> None:
+        if capacity_bytes <= 0:
+            raise ValueError("capacity_bytes必须大于0")
+        # 按采样宽度对齐，避免覆盖时切断采样点
+        self.capacity = capacity_bytes - capacity_bytes % PCM_SAMPLE_WIDTH
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        self.dropped_bytes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        return self._size >= self.capacity
+
+    def extend(self, data: bytes | bytearray | memoryview) -> None:
+        """追加音频，超出容量时丢弃最早的数据。"""
+        data = memoryview(data)
+        if len(data) >= self.capacity:
+            self.dropped_bytes += self._size + len(data) - self.capacity
+            self._view[:] = data[len(data) - self.capacity:]
+            self._start = 0
+            self._size = self.capacity
+            return
+
+        overflow = self._size + len(data) - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            self.dropped_bytes += overflow
+
+        end = (self._start + self._size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self._view[end:end + first] = data[:first]
+        if first < len(data):
+            self._view[:len(data) - first] = data[first:]
+        self._size += len(data)
+
+    def getvalue(self) -> bytes:
+        """按时间顺序返回缓冲中的全部音频。"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return bytes(self._view[self._start:end])
+        return bytes(self._view[self._start:]) + bytes(self._view[:end - self.capacity])
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self.dropped_bytes = 0
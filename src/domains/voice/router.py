@@ -11,7 +11,8 @@
 1. 客户端发送 JSON 控制消息:
    - {"type": "start", "config": {...}}  开始录音会话
    - {"type": "stop"}  手动结束录音，触发识别
-   - {"type": "cancel"}  取消当前会话
+   - {"type": "cancel"}  取消当前会话（同时停止正在播报的回复）
+   - {"type": "barge_in"}  客户端检测到用户插话，停止正在播报的回复
 
 2. 客户端发送二进制音频数据:
    - PCM 16-bit, 16kHz, 单声道
@@ -21,11 +22,18 @@
    - {"type": "ready"}  准备就绪
    - {"type": "recording"}  开始录音确认
    - {"type": "vad", "is_speaking": true/false, "finalized": false}  VAD状态
+   - {"type": "asr_partial", "text": "...", "provider": "aliyun"}  识别中间结果（streaming_asr=true 时）
    - {"type": "recognized", "text": "...", "latency_ms": 123}  识别完成
    - {"type": "ai_thinking"}  AI正在思考
    - {"type": "llm_chunk", "text": "..."}  LLM流式文字块
    - {"type": "llm_done", "text": "..."}  LLM完成
    - {"type": "tts", "audio": "base64...", "audio_format": "wav"}  TTS音频
+   - {"type": "tts", "binary": true, "size": N, "audio_format": "wav"}  TTS音频头，
+     紧随其后的一帧二进制消息即音频数据（start 配置 binary_tts=true 时）
+   - {"type": "tts_chunk", "segment": 0, "audio_format": "pcm_s16le", "sample_rate": 24000, ...}
+     流式TTS音频块（streaming_tts=true 时），audio 字段或紧随的二进制帧为PCM数据
+   - {"type": "tts_done", "ttfa_ms": 850, "segments": 3}  流式TTS结束
+   - {"type": "tts_cancelled", "reason": "barge_in"}  回复被打断
    - {"type": "error", "message": "..."}  错误
 
 配置选项 (在 start 消息的 config 中传递):
@@ -35,6 +43,10 @@
    - system_prompt: str  系统提示词
    - tts_speed: float  TTS语速（默认1.3）
    - vad_silence_duration: float  VAD静默触发阈值秒数（默认1.0）
+   - binary_tts: bool  TTS音频以二进制帧返回，省去base64编码（默认false）
+   - streaming_tts: bool  LLM边生成边按句合成、音频块即时下发（默认false）
+   - barge_in: bool  流式模式下检测到用户说话即停止播报（默认true）
+   - streaming_asr: bool  音频边收边送入ASR并返回中间结果，发言结束时只需等待收尾（默认false）
 """
 from __future__ import annotations
 
@@ -44,11 +56,17 @@ import json
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from .audio import PCMRingBuffer, frame_energies, frame_rms
+from .speech_pipeline import SpeechPipeline
+
+if TYPE_CHECKING:
+    from src.infra.clients.asr import ManagedASRStream
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["语音对话"])
@@ -61,6 +79,8 @@ DEFAULT_SILENCE_DURATION = 1.0  # 默认静默触发时长(秒)
 VAD_ENERGY_THRESHOLD = 500  # 能量阈值（根据环境调整）
 VAD_SPEECH_FRAMES_REQUIRED = 3  # 连续多少帧有语音才确认开始说话
 VAD_SILENCE_FRAMES_REQUIRED = 25  # 连续多少帧静默才确认停止说话（25帧≈0.5秒）
+MAX_UTTERANCE_SECONDS = 30  # 单次发言最大时长，超出后自动触发识别
+MAX_UTTERANCE_BYTES = VAD_SAMPLE_RATE * 2 * MAX_UTTERANCE_SECONDS
 
 # 默认系统提示词
 DEFAULT_SYSTEM_PROMPT = """你是一个智能应急救援助手，负责协助用户进行应急指挥和救援决策。
@@ -74,7 +94,7 @@ class VoiceSession:
 
     session_id: str
     websocket: WebSocket
-    audio_buffer: bytearray = field(default_factory=bytearray)
+    audio_buffer: PCMRingBuffer = field(default_factory=lambda: PCMRingBuffer(MAX_UTTERANCE_BYTES))
     is_recording: bool = False
     created_at: float = field(default_factory=time.time)
     config: dict = field(default_factory=dict)
@@ -87,6 +107,11 @@ class VoiceSession:
     vad_processing: bool = False  # 是否正在处理ASR（防止重复触发）
     vad_speech_frames: int = 0  # 连续语音帧计数
     vad_silence_frames: int = 0  # 连续静默帧计数
+    # 流式回复状态（streaming_tts）
+    response_task: Optional[asyncio.Task] = None  # 后台生成回复的任务
+    turn_started_at: float = 0.0  # 本轮用户发言结束时间，首音延迟的起点
+    # 流式识别会话（streaming_asr），本轮首个音频块到达时开启
+    asr_stream: Optional["ManagedASRStream"] = None
 
 
 class VoiceChatManager:
@@ -106,18 +131,10 @@ class VoiceChatManager:
             self._semantic_router = VoiceSemanticRouter()
             logger.info("语义路由器已加载")
         return self._semantic_router
+
     def _calculate_energy(self, audio_data: bytes) -> float:
         """计算音频帧的能量（RMS）。"""
-        import struct
-        if len(audio_data) < 2:
-            return 0.0
-        # 解析 16-bit PCM
-        num_samples = len(audio_data) // 2
-        samples = struct.unpack(f'<{num_samples}h', audio_data)
-        # 计算 RMS
-        sum_sq = sum(s * s for s in samples)
-        rms = (sum_sq / num_samples) ** 0.5
-        return rms
+        return frame_rms(audio_data)
 
     async def _get_asr_service(self):
         """延迟加载 ASR 服务。"""
@@ -170,6 +187,10 @@ class VoiceChatManager:
         """断开连接。"""
         session = self._sessions.pop(session_id, None)
         if session:
+            if session.response_task is not None:
+                session.response_task.cancel()
+            if session.asr_stream is not None:
+                asyncio.create_task(self._abort_asr_stream(session))
             logger.info(f"语音会话已断开: {session_id}")
 
     async def handle_message(self, session: VoiceSession, data: bytes | str) -> None:
@@ -180,7 +201,10 @@ class VoiceChatManager:
             await self._handle_control(session, data)
 
     async def _handle_audio(self, session: VoiceSession, audio_data: bytes) -> None:
-        """处理音频数据并进行VAD检测。"""
+        """处理音频数据并进行VAD检测。
+
+        客户端可以一次发送多帧（长度为帧长整数倍），各帧能量批量计算。
+        """
         if not session.is_recording:
             return
 
@@ -189,43 +213,19 @@ class VoiceChatManager:
             return
 
         session.audio_buffer.extend(audio_data)
+        if session.config.get("streaming_asr", False):
+            await self._feed_asr_stream(session, audio_data)
 
-        # VAD 检测（仅当启用且音频帧大小正确时）
+        # VAD 检测（仅当启用且音频长度为整数帧时）
         enable_vad = session.config.get("enable_vad", True)
 
-        if enable_vad and len(audio_data) == VAD_FRAME_BYTES:
+        if enable_vad and audio_data and len(audio_data) % VAD_FRAME_BYTES == 0:
             try:
                 # 基于能量的 VAD
-                energy = self._calculate_energy(audio_data)
+                energies = frame_energies(audio_data, VAD_FRAME_BYTES)
                 threshold = session.config.get("vad_energy_threshold", VAD_ENERGY_THRESHOLD)
-                is_speech = energy > threshold
-
-                if is_speech:
-                    session.vad_speech_frames += 1
-                    session.vad_silence_frames = 0
-
-                    # 连续几帧有语音才确认开始说话
-                    if session.vad_speech_frames >= VAD_SPEECH_FRAMES_REQUIRED and not session.vad_is_speaking:
-                        session.vad_is_speaking = True
-                        session.vad_speech_started = True
-                        logger.debug(f"VAD: 检测到语音开始 (energy={energy:.0f})")
-                        await self._send_json(
-                            session.websocket,
-                            {"type": "vad", "is_speaking": True, "finalized": False}
-                        )
-                else:
-                    session.vad_silence_frames += 1
-                    session.vad_speech_frames = 0
-
-                    # 连续静默帧数达到阈值
-                    if session.vad_is_speaking and session.vad_silence_frames >= VAD_SILENCE_FRAMES_REQUIRED:
-                        session.vad_is_speaking = False
-                        session.vad_silence_start = time.time()
-                        logger.debug("VAD: 检测到语音停止，开始静默计时")
-                        await self._send_json(
-                            session.websocket,
-                            {"type": "vad", "is_speaking": False, "finalized": False}
-                        )
+                for energy in energies.tolist():
+                    await self._vad_step(session, energy, energy > threshold)
 
                 # 检查是否应该触发识别
                 if session.vad_speech_started and not session.vad_is_speaking and session.vad_silence_start > 0:
@@ -235,25 +235,98 @@ class VoiceChatManager:
                     if elapsed >= silence_duration:
                         # 静默超过阈值，自动触发识别
                         logger.info(f"VAD: 静默{elapsed:.1f}秒，自动触发ASR")
-                        session.vad_processing = True
+                        await self._finalize_utterance(session)
+                        return
 
-                        await self._send_json(
-                            session.websocket,
-                            {"type": "vad", "is_speaking": False, "finalized": True}
-                        )
+            except Exception as e:
+                logger.warning(f"VAD检测异常: {e}")
 
-                        # 执行识别
-                        await self._recognize_and_respond(session)
+        # 达到最大发言时长，不再等待静默
+        if session.audio_buffer.is_full:
+            if enable_vad and not session.vad_speech_started:
+                # 整段都是静音/低于阈值的噪声：丢弃，不送ASR
+                logger.debug(f"VAD: {MAX_UTTERANCE_SECONDS}秒内未检测到语音，丢弃缓冲")
+                session.audio_buffer.clear()
+                await self._abort_asr_stream(session)
+                return
+            logger.info(f"发言达到最大时长{MAX_UTTERANCE_SECONDS}秒，自动触发ASR")
+            await self._finalize_utterance(session)
+
+    async def _feed_asr_stream(self, session: VoiceSession, audio_data: bytes) -> None:
+        """把音频送入流式识别会话（本轮首块音频到达时开启会话）。"""
+        try:
+            if session.asr_stream is None:
+                asr = await self._get_asr_service()
 
-                        # 重置VAD状态，准备下一轮
-                        session.vad_speech_started = False
-                        session.vad_silence_start = 0.0
-                        session.vad_speech_frames = 0
-                        session.vad_silence_frames = 0
-                        session.vad_processing = False
+                async def _on_partial(result) -> None:
+                    await self._send_json(
+                        session.websocket,
+                        {"type": "asr_partial", "text": result.text, "provider": result.provider},
+                    )
 
-            except Exception as e:
-                logger.warning(f"VAD检测异常: {e}")
+                session.asr_stream = await asr.open_stream(on_partial=_on_partial)
+            await session.asr_stream.feed(audio_data)
+        except Exception as e:
+            # 流式会话不可用时，结束时回退为整段识别
+            logger.warning(f"流式ASR送入音频失败: {e}")
+            await self._abort_asr_stream(session)
+
+    async def _abort_asr_stream(self, session: VoiceSession) -> None:
+        """放弃本轮流式识别会话。"""
+        stream, session.asr_stream = session.asr_stream, None
+        if stream is not None:
+            await stream.abort()
+
+    async def _vad_step(self, session: VoiceSession, energy: float, is_speech: bool) -> None:
+        """按单帧结果推进VAD状态机。"""
+        if is_speech:
+            session.vad_speech_frames += 1
+            session.vad_silence_frames = 0
+
+            # 连续几帧有语音才确认开始说话
+            if session.vad_speech_frames >= VAD_SPEECH_FRAMES_REQUIRED and not session.vad_is_speaking:
+                session.vad_is_speaking = True
+                session.vad_speech_started = True
+                logger.debug(f"VAD: 检测到语音开始 (energy={energy:.0f})")
+                await self._send_json(
+                    session.websocket,
+                    {"type": "vad", "is_speaking": True, "finalized": False}
+                )
+                if session.config.get("barge_in", True):
+                    await self._cancel_response(session, "barge_in")
+        else:
+            session.vad_silence_frames += 1
+            session.vad_speech_frames = 0
+
+            # 连续静默帧数达到阈值
+            if session.vad_is_speaking and session.vad_silence_frames >= VAD_SILENCE_FRAMES_REQUIRED:
+                session.vad_is_speaking = False
+                session.vad_silence_start = time.time()
+                logger.debug("VAD: 检测到语音停止，开始静默计时")
+                await self._send_json(
+                    session.websocket,
+                    {"type": "vad", "is_speaking": False, "finalized": False}
+                )
+
+    async def _finalize_utterance(self, session: VoiceSession) -> None:
+        """结束本轮发言：执行识别并重置VAD状态。"""
+        session.vad_processing = True
+        try:
+            await self._send_json(
+                session.websocket,
+                {"type": "vad", "is_speaking": False, "finalized": True}
+            )
+
+            # 执行识别
+            await self._recognize_and_respond(session)
+        finally:
+            # 重置VAD状态，准备下一轮
+            session.vad_is_speaking = False
+            session.vad_speech_started = False
+            session.vad_silence_start = 0.0
+            session.vad_speech_frames = 0
+            session.vad_silence_frames = 0
+            session.vad_processing = False
 
     async def _handle_control(self, session: VoiceSession, message: str) -> None:
         """处理控制消息。"""
@@ -268,6 +341,7 @@ class VoiceChatManager:
         if msg_type == "start":
             session.is_recording = True
             session.audio_buffer.clear()
+            await self._abort_asr_stream(session)
             session.config = data.get("config", {})
             # 重置 VAD 状态
             session.vad_is_speaking = False
@@ -297,9 +371,14 @@ class VoiceChatManager:
         elif msg_type == "cancel":
             session.is_recording = False
             session.audio_buffer.clear()
+            await self._abort_asr_stream(session)
+            await self._cancel_response(session, "cancel")
             logger.info(f"取消录音: {session.session_id}")
             await self._send_json(session.websocket, {"type": "cancelled"})
 
+        elif msg_type == "barge_in":
+            await self._cancel_response(session, "barge_in")
+
         elif msg_type == "ping":
             await self._send_json(session.websocket, {"type": "pong"})
 
@@ -308,16 +387,22 @@ class VoiceChatManager:
 
     async def _recognize_and_respond(self, session: VoiceSession) -> None:
         """执行语音识别并返回结果。"""
-        audio_data = bytes(session.audio_buffer)
+        audio_data = session.audio_buffer.getvalue()
         session.audio_buffer.clear()
+        stream, session.asr_stream = session.asr_stream, None
 
         try:
             asr = await self._get_asr_service()
 
-            logger.info(f"开始ASR识别: {len(audio_data)} bytes")
+            logger.info(f"开始ASR识别: {len(audio_data)} bytes, streaming={stream is not None}")
             start_ts = time.time()
+            session.turn_started_at = start_ts
 
-            result = await asr.recognize(audio_data)
+            if stream is not None:
+                # 音频已在录音过程中送入，这里只等待收尾
+                result = await stream.finish()
+            else:
+                result = await asr.recognize(audio_data)
 
             latency_ms = int((time.time() - start_ts) * 1000)
 
@@ -337,20 +422,46 @@ class VoiceChatManager:
             # 如果配置了AI对话（默认启用），调用LLM生成回复
             enable_ai = session.config.get("enable_ai_response", True)
             if enable_ai and result.text.strip():
-                await self._generate_ai_response(session, result.text)
+                if session.config.get("streaming_tts", False):
+                    # 流式模式在后台生成回复，接收循环保持畅通以便用户打断
+                    await self._start_response(session, result.text)
+                else:
+                    await self._generate_ai_response(session, result.text)
 
         except Exception as e:
             logger.exception(f"ASR识别失败: {e}")
             await self._send_error(session.websocket, f"语音识别失败: {str(e)}")
 
+    async def _start_response(self, session: VoiceSession, user_text: str) -> None:
+        """在后台任务中生成回复（替换上一轮未完成的回复）。"""
+        await self._cancel_response(session, "superseded")
+        task = asyncio.create_task(self._generate_ai_response(session, user_text))
+        session.response_task = task
+
+        def _clear(done: asyncio.Task) -> None:
+            if session.response_task is done:
+                session.response_task = None
+
+        task.add_done_callback(_clear)
+
+    async def _cancel_response(self, session: VoiceSession, reason: str) -> None:
+        """取消正在生成/播报的回复（LLM生成与未完成的TTS合成一并停止）。"""
+        task = session.response_task
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info(f"回复已取消: {session.session_id}, reason={reason}")
+        await self._send_json(session.websocket, {"type": "tts_cancelled", "reason": reason})
+
     async def _generate_ai_response(self, session: VoiceSession, user_text: str) -> None:
         """生成AI回复并合成语音（流式输出）。
 
         流程：
         0. 语义路由分类，决定使用哪个Agent
-        1. 流式调用 LLM，边生成边发送 llm_chunk
+        1. 调用 LLM 生成回复（streaming_tts 时流式调用，边生成边发送 llm_chunk 并分句合成）
         2. 完成后发送 llm_done（完整文本）
-        3. TTS 合成后发送 tts（音频）
+        3. TTS 合成后发送 tts（音频）；streaming_tts 时音频块以 tts_chunk 即时下发
         """
         try:
             # 0. 语义路由分类
@@ -414,6 +525,10 @@ class VoiceChatManager:
             logger.info(f"调用LLM: '{user_text[:50]}...'")
             start_ts = time.time()
 
+            if session.config.get("streaming_tts", False):
+                await self._stream_llm_response(session, user_text, messages)
+                return
+
             # 非流式调用 LLM（更稳定）
             try:
                 response = await llm.ainvoke(messages)
@@ -435,41 +550,168 @@ class VoiceChatManager:
             session.chat_history.append({"role": "assistant", "content": ai_text})
 
             # 2. 调用TTS合成语音（如果启用）
-            enable_tts = session.config.get("enable_tts", True)
+            await self._synthesize_and_send_tts(session, ai_text)
 
-            if enable_tts and ai_text:
-                try:
-                    tts = await self._get_tts_service()
-                    from src.infra.clients.tts import TTSConfig
+        except Exception as e:
+            logger.exception(f"AI回复生成失败: {e}")
+            await self._send_error(session.websocket, f"AI回复生成失败: {str(e)}")
 
-                    tts_config = TTSConfig(
-                        speed=session.config.get("tts_speed", 1.3),
-                    )
+    async def _stream_llm_response(self, session: VoiceSession, user_text: str, messages: list) -> None:
+        """流式调用LLM，文本块边生成边下发并送入句级TTS流水线。"""
+        llm = self._get_llm()
+        pipeline = await self._new_speech_pipeline(session)
+        start_ts = time.time()
+        parts: list[str] = []
 
-                    start_ts = time.time()
-                    tts_result = await tts.synthesize(ai_text, tts_config)
-                    tts_latency = int((time.time() - start_ts) * 1000)
+        try:
+            async for chunk in llm.astream(messages):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                if not text:
+                    continue
+                parts.append(text)
+                await self._send_json(session.websocket, {"type": "llm_chunk", "text": text})
+                if pipeline is not None:
+                    pipeline.feed(text)
+        except BaseException:
+            # 打断或LLM异常：停止已提交的分段合成
+            if pipeline is not None:
+                await pipeline.cancel()
+            raise
+
+        ai_text = "".join(parts).strip()
+        llm_latency = int((time.time() - start_ts) * 1000)
+        logger.info(f"LLM完成: '{ai_text[:50]}...' ({llm_latency}ms)")
 
-                    audio_base64 = base64.b64encode(tts_result.audio_data).decode("utf-8")
-                    logger.info(f"TTS合成完成: {len(tts_result.audio_data)} bytes ({tts_latency}ms)")
+        await self._send_json(
+            session.websocket,
+            {"type": "llm_done", "text": ai_text, "llm_latency_ms": llm_latency},
+        )
 
-                    # 单独发送TTS音频
-                    await self._send_json(
-                        session.websocket,
-                        {
-                            "type": "tts",
-                            "audio": audio_base64,
-                            "audio_format": "wav",
-                            "tts_latency_ms": tts_latency,
-                        },
-                    )
+        # 保存对话历史
+        session.chat_history.append({"role": "user", "content": user_text})
+        session.chat_history.append({"role": "assistant", "content": ai_text})
 
-                except Exception as tts_err:
-                    logger.warning(f"TTS合成失败: {tts_err}")
+        if pipeline is not None:
+            await self._finish_speech_pipeline(session, pipeline)
 
-        except Exception as e:
-            logger.exception(f"AI回复生成失败: {e}")
-            await self._send_error(session.websocket, f"AI回复生成失败: {str(e)}")
+    async def _new_speech_pipeline(self, session: VoiceSession) -> Optional[SpeechPipeline]:
+        """创建句级TTS流水线（未启用TTS时返回None）。"""
+        if not session.config.get("enable_tts", True):
+            return None
+        try:
+            tts = await self._get_tts_service()
+        except Exception as tts_err:
+            logger.warning(f"TTS服务不可用，仅返回文字: {tts_err}")
+            return None
+        from src.infra.clients.tts import TTSConfig
+
+        tts_config = TTSConfig(
+            speed=session.config.get("tts_speed", 1.3),
+        )
+
+        async def _sink(segment: int, pcm: bytes, sample_rate: int) -> None:
+            await self._send_tts_audio(
+                session, pcm, "pcm_s16le", msg_type="tts_chunk",
+                segment=segment, sample_rate=sample_rate,
+            )
+
+        return SpeechPipeline(
+            tts,
+            tts_config,
+            _sink,
+            started_at=session.turn_started_at or None,
+        )
+
+    async def _finish_speech_pipeline(self, session: VoiceSession, pipeline: SpeechPipeline) -> None:
+        """等待流水线播报完毕并发送 tts_done（被取消时停止全部合成）。"""
+        try:
+            stats = await pipeline.finish()
+        except asyncio.CancelledError:
+            await pipeline.cancel()
+            raise
+
+        logger.info(
+            f"流式TTS完成: segments={stats.segments}, ttfa={stats.ttfa_ms}ms, "
+            f"bytes={stats.audio_bytes}, failed={stats.failed_segments}"
+        )
+        await self._send_json(
+            session.websocket,
+            {
+                "type": "tts_done",
+                "ttfa_ms": stats.ttfa_ms,
+                "segments": stats.segments,
+                "audio_bytes": stats.audio_bytes,
+                "failed_segments": stats.failed_segments,
+            },
+        )
+
+    async def _synthesize_and_send_tts(self, session: VoiceSession, ai_text: str) -> None:
+        """合成TTS语音并发送给客户端（未启用TTS时跳过）。
+
+        binary_tts=true 时先发JSON头再发一帧二进制音频，否则沿用base64 JSON。
+        streaming_tts=true 时走句级流水线，逐块下发。
+        """
+        enable_tts = session.config.get("enable_tts", True)
+        if not enable_tts or not ai_text:
+            return
+
+        if session.config.get("streaming_tts", False):
+            pipeline = await self._new_speech_pipeline(session)
+            if pipeline is not None:
+                pipeline.feed(ai_text)
+                await self._finish_speech_pipeline(session, pipeline)
+            return
+
+        try:
+            tts = await self._get_tts_service()
+            from src.infra.clients.tts import TTSConfig
+
+            tts_config = TTSConfig(
+                speed=session.config.get("tts_speed", 1.3),
+            )
+
+            start_ts = time.time()
+            tts_result = await tts.synthesize(ai_text, tts_config)
+            tts_latency = int((time.time() - start_ts) * 1000)
+            logger.info(f"TTS合成完成: {len(tts_result.audio_data)} bytes ({tts_latency}ms)")
+
+            await self._send_tts_audio(session, tts_result.audio_data, "wav", tts_latency_ms=tts_latency)
+
+        except Exception as tts_err:
+            logger.warning(f"TTS合成失败: {tts_err}")
+
+    async def _send_tts_audio(
+        self,
+        session: VoiceSession,
+        audio_data: bytes,
+        audio_format: str,
+        msg_type: str = "tts",
+        **extra: object,
+    ) -> None:
+        """发送TTS音频：二进制帧或base64 JSON。"""
+        if session.config.get("binary_tts", False):
+            await self._send_json(
+                session.websocket,
+                {
+                    "type": msg_type,
+                    "binary": True,
+                    "size": len(audio_data),
+                    "audio_format": audio_format,
+                    **extra,
+                },
+            )
+            await session.websocket.send_bytes(audio_data)
+            return
+
+        await self._send_json(
+            session.websocket,
+            {
+                "type": msg_type,
+                "audio": base64.b64encode(audio_data).decode("utf-8"),
+                "audio_format": audio_format,
+                **extra,
+            },
+        )
 
     async def _send_json(self, websocket: WebSocket, data: dict) -> None:
         """发送JSON消息。"""
@@ -631,36 +873,7 @@ class VoiceChatManager:
         session.chat_history.append({"role": "assistant", "content": ai_text})
         
         # 调用TTS合成语音（如果启用）
-        enable_tts = session.config.get("enable_tts", True)
-        
-        if enable_tts and ai_text:
-            try:
-                tts = await self._get_tts_service()
-                from src.infra.clients.tts import TTSConfig
-                
-                tts_config = TTSConfig(
-                    speed=session.config.get("tts_speed", 1.3),
-                )
-                
-                start_ts = time.time()
-                tts_result = await tts.synthesize(ai_text, tts_config)
-                tts_latency = int((time.time() - start_ts) * 1000)
-                
-                audio_base64 = base64.b64encode(tts_result.audio_data).decode("utf-8")
-                logger.info(f"TTS合成完成: {len(tts_result.audio_data)} bytes ({tts_latency}ms)")
-                
-                await self._send_json(
-                    session.websocket,
-                    {
-                        "type": "tts",
-                        "audio": audio_base64,
-                        "audio_format": "wav",
-                        "tts_latency_ms": tts_latency,
-                    },
-                )
-                
-            except Exception as tts_err:
-                logger.warning(f"TTS合成失败: {tts_err}")
+        await self._synthesize_and_send_tts(session, ai_text)
 
     async def _send_llm_response_and_tts(
         self, session: VoiceSession, user_text: str, ai_text: str
@@ -686,36 +899,7 @@ class VoiceChatManager:
         session.chat_history.append({"role": "assistant", "content": ai_text})
         
         # 调用TTS合成语音（如果启用）
-        enable_tts = session.config.get("enable_tts", True)
-        
-        if enable_tts and ai_text:
-            try:
-                tts = await self._get_tts_service()
-                from src.infra.clients.tts import TTSConfig
-                
-                tts_config = TTSConfig(
-                    speed=session.config.get("tts_speed", 1.3),
-                )
-                
-                start_ts = time.time()
-                tts_result = await tts.synthesize(ai_text, tts_config)
-                tts_latency = int((time.time() - start_ts) * 1000)
-                
-                audio_base64 = base64.b64encode(tts_result.audio_data).decode("utf-8")
-                logger.info(f"TTS合成完成: {len(tts_result.audio_data)} bytes ({tts_latency}ms)")
-                
-                await self._send_json(
-                    session.websocket,
-                    {
-                        "type": "tts",
-                        "audio": audio_base64,
-                        "audio_format": "wav",
-                        "tts_latency_ms": tts_latency,
-                    },
-                )
-                
-            except Exception as tts_err:
-                logger.warning(f"TTS合成失败: {tts_err}")
+        await self._synthesize_and_send_tts(session, ai_text)
 
 
 # 全局管理器实例
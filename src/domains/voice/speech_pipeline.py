@@ -0,0 +1,208 @@
+"""句级流水线语音合成。
+
+LLM 边生成边按句/分句切分，每段立即提交 TTS 流式合成（有限并发），
+音频块按段顺序、按 Provider 产出节奏转发给客户端：
+第一段的首个音频块不必等待整段回复生成完或整段语音合成完。
+
+用法::
+
+    pipeline = SpeechPipeline(tts, tts_config, sink)
+    async for chunk in llm.astream(messages):
+        pipeline.feed(chunk.content)
+    stats = await pipeline.finish()
+
+    # 用户打断
+    await pipeline.cancel()
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 句末标点：遇到即切分
+SENTENCE_DELIMITERS = frozenset("。！？!?；;\n")
+# 分句标点：当前段达到最小长度时切分
+CLAUSE_DELIMITERS = frozenset("，,、：:")
+
+# (段序号, PCM数据, 采样率)
+AudioSink = Callable[[int, bytes, int], Awaitable[None]]
+
+
+class SentenceSegmenter:
+    """增量句子切分器。
+
+    首段使用更短的分句阈值，尽早产出第一段以降低首音延迟；
+    没有标点的超长文本按 max_chars 强制切分。
+    """
+
+    def __init__(
+        self,
+        first_clause_chars: int = 4,
+        clause_chars: int = 10,
+        max_chars: int = 60,
+    ) -> None:
+        self.first_clause_chars = first_clause_chars
+        self.clause_chars = clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def _clause_threshold(self) -> int:
+        return self.first_clause_chars if self._emitted == 0 else self.clause_chars
+
+    def feed(self, text: str) -> List[str]:
+        """追加文本，返回已完整的段。"""
+        self._buffer += text
+        segments: List[str] = []
+        start = 0
+        for i, char in enumerate(self._buffer):
+            length = i + 1 - start
+            if (
+                char in SENTENCE_DELIMITERS
+                or (char in CLAUSE_DELIMITERS and length >= self._clause_threshold())
+                or length >= self.max_chars
+            ):
+                segment = self._buffer[start:i + 1].strip()
+                start = i + 1
+                if segment:
+                    segments.append(segment)
+                    self._emitted += 1
+        self._buffer = self._buffer[start:]
+        return segments
+
+    def flush(self) -> List[str]:
+        """返回剩余文本。"""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        if not segment:
+            return []
+        self._emitted += 1
+        return [segment]
+
+
+@dataclass
+class SpeechPipelineStats:
+    """流水线统计。"""
+
+    segments: int = 0
+    audio_chunks: int = 0
+    audio_bytes: int = 0
+    ttfa_ms: Optional[int] = None  # 首音延迟：started_at → 首个音频块送出
+    failed_segments: int = 0
+    cancelled: bool = False
+
+
+class SpeechPipeline:
+    """句级流水线 TTS。
+
+    Args:
+        tts: TTSService（需提供 synthesize_stream）。
+        tts_config: 合成配置。
+        sink: 音频块回调，按段顺序调用。
+        max_concurrency: 同时合成的段数。
+        segmenter: 句子切分器，默认 SentenceSegmenter()。
+        started_at: 首音延迟的起点（time.time()），默认为创建时刻。
+    """
+
+    def __init__(
+        self,
+        tts,
+        tts_config,
+        sink: AudioSink,
+        max_concurrency: int = 2,
+        segmenter: Optional[SentenceSegmenter] = None,
+        started_at: Optional[float] = None,
+    ) -> None:
+        self._tts = tts
+        self._tts_config = tts_config
+        self._sink = sink
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._segmenter = segmenter or SentenceSegmenter()
+        self._started_at = started_at or time.time()
+        self._synth_tasks: List[asyncio.Task] = []
+        # 待转发的段：每段一个音频块队列，None 为段结束标记；整体以 None 结束
+        self._order: asyncio.Queue[Optional[asyncio.Queue]] = asyncio.Queue()
+        self._forwarded_segments = 0
+        self._forwarder = asyncio.create_task(self._forward())
+        self._closed = False
+        self.stats = SpeechPipelineStats()
+
+    def feed(self, text: str) -> None:
+        """追加LLM输出文本，完整的段立即开始合成。"""
+        if self._closed or not text:
+            return
+        for segment in self._segmenter.feed(text):
+            self._submit(segment)
+
+    def _submit(self, text: str) -> None:
+        index = self.stats.segments
+        self.stats.segments += 1
+        chunks: asyncio.Queue = asyncio.Queue()
+        self._order.put_nowait(chunks)
+        self._synth_tasks.append(asyncio.create_task(self._synthesize(index, text, chunks)))
+
+    async def _synthesize(self, index: int, text: str, chunks: asyncio.Queue) -> None:
+        try:
+            async with self._semaphore:
+                async for chunk in self._tts.synthesize_stream(text, self._tts_config):
+                    chunks.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.failed_segments += 1
+            logger.warning(f"分段TTS合成失败 segment={index}: {e}")
+        finally:
+            chunks.put_nowait(None)
+
+    async def _forward(self) -> None:
+        while True:
+            chunks = await self._order.get()
+            if chunks is None:
+                return
+            await self._forward_segment(self._forwarded_segments, chunks)
+            self._forwarded_segments += 1
+
+    async def _forward_segment(self, segment_index: int, chunks: asyncio.Queue) -> None:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                return
+            if self.stats.ttfa_ms is None:
+                self.stats.ttfa_ms = int((time.time() - self._started_at) * 1000)
+            self.stats.audio_chunks += 1
+            self.stats.audio_bytes += len(chunk.audio_data)
+            await self._sink(segment_index, chunk.audio_data, chunk.sample_rate)
+
+    async def finish(self) -> SpeechPipelineStats:
+        """输入结束：合成剩余文本并等待全部音频转发完毕。"""
+        if not self._closed:
+            self._closed = True
+            for segment in self._segmenter.flush():
+                self._submit(segment)
+            self._order.put_nowait(None)
+        try:
+            await self._forwarder
+        finally:
+            await self._cancel_synthesis()
+        return self.stats
+
+    async def cancel(self) -> SpeechPipelineStats:
+        """立即停止（用户打断）：取消转发与所有进行中的合成。"""
+        self._closed = True
+        self.stats.cancelled = True
+        self._forwarder.cancel()
+        await asyncio.gather(self._forwarder, return_exceptions=True)
+        await self._cancel_synthesis()
+        return self.stats
+
+    async def _cancel_synthesis(self) -> None:
+        pending = [task for task in self._synth_tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
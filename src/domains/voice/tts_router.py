@@ -6,6 +6,7 @@
 - POST /api/v2/tts/synthesize  合成语音（返回Base64）
 - POST /api/v2/tts/synthesize/stream  合成语音（返回二进制流）
 - GET /api/v2/tts/health  健康检查
+- GET /api/v2/tts/cache/stats  音频缓存统计
 """
 from __future__ import annotations
 
@@ -55,6 +56,10 @@ class TTSSynthesizeRequest(BaseModel):
         "wav",
         description="输出格式：wav 或 mp3",
     )
+    phrases: bool = Field(
+        False,
+        description="按分句切成短语合成拼接：固定短语复用缓存，含数字的短语实时合成（仅wav）",
+    )
 
 
 class TTSSynthesizeResponse(BaseModel):
@@ -103,7 +108,10 @@ async def synthesize_speech(request: TTSSynthesizeRequest) -> TTSSynthesizeRespo
             format=request.format,
         )
 
-        result = await tts.synthesize(request.text, config)
+        if request.phrases and request.format == "wav":
+            result = await tts.synthesize_phrases(request.text, config)
+        else:
+            result = await tts.synthesize(request.text, config)
 
         audio_base64 = base64.b64encode(result.audio_data).decode("utf-8")
 
@@ -148,7 +156,10 @@ async def synthesize_speech_stream(request: TTSSynthesizeRequest) -> Response:
             format=request.format,
         )
 
-        result = await tts.synthesize(request.text, config)
+        if request.phrases and request.format == "wav":
+            result = await tts.synthesize_phrases(request.text, config)
+        else:
+            result = await tts.synthesize(request.text, config)
 
         content_type = "audio/wav" if request.format == "wav" else "audio/mpeg"
 
@@ -200,3 +211,11 @@ async def tts_health_check() -> TTSHealthResponse:
             provider="unknown",
             healthy=False,
         )
+
+
+@router.get("/cache/stats")
+async def tts_cache_stats() -> dict:
+    """TTS 音频缓存统计（命中率、占用等）。"""
+    tts = await get_tts_service()
+    stats = tts.cache_stats
+    return {"enabled": stats is not None, "stats": stats or {}}
@@ -2,31 +2,47 @@
 高德地理编码API
 
 提供地址转坐标功能。
+
+- 复用共享长连接客户端（见 src.infra.clients.http_pool）
+- 按规范化地址缓存成功结果，TTL 由 AMAP_GEOCODE_CACHE_TTL_S 配置（默认1天，0关闭）
 """
 from __future__ import annotations
 
 import logging
-from typing import Optional, Dict
-
-import httpx
+import os
+import re
+import unicodedata
+from typing import Any, Dict, Optional
 
+from src.infra.clients.http_pool import ResponseCache, get_http_registry
 from src.infra.settings import load_settings
 
 logger = logging.getLogger(__name__)
 
-AMAP_GEOCODE_URL = "https://restapi.amap.com/v3/geocode/geo"
+AMAP_API_HOST = os.getenv("AMAP_API_HOST", "https://restapi.amap.com").rstrip("/")
+AMAP_GEOCODE_URL = f"{AMAP_API_HOST}/v3/geocode/geo"
+GEOCODE_TIMEOUT = 10.0
 
+_WHITESPACE_RE = re.compile(r"\s+")
 
-async def amap_geocode_async(address: str) -> Optional[Dict[str, float]]:
-    """
-    地址转坐标（异步）
-    
-    Args:
-        address: 地址文本，如"北京市朝阳区"
-        
-    Returns:
-        {"longitude": float, "latitude": float} 或 None
-    """
+_geocode_cache = ResponseCache(
+    "amap_geocode",
+    ttl_s=float(os.getenv("AMAP_GEOCODE_CACHE_TTL_S", "86400")),
+    max_entries=4096,
+)
+
+
+def normalize_address(address: str) -> str:
+    """缓存键用的地址规范化：NFKC（全角转半角）、去空白、小写"""
+    return _WHITESPACE_RE.sub("", unicodedata.normalize("NFKC", address)).lower()
+
+
+def get_geocode_cache() -> ResponseCache:
+    """地理编码缓存（用于查看统计或测试清空）"""
+    return _geocode_cache
+
+
+def _geocode_params(address: str) -> Optional[Dict[str, str]]:
     settings = load_settings()
     api_key = settings.amap_api_key
     
@@ -34,33 +50,53 @@ async def amap_geocode_async(address: str) -> Optional[Dict[str, float]]:
         logger.error("未配置高德API Key (AMAP_API_KEY)")
         return None
     
-    params = {
+    return {
         "key": api_key,
         "address": address,
         "output": "JSON",
     }
+
+
+def _parse_geocode(address: str, data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    if data.get("status") == "1" and data.get("geocodes"):
+        location = data["geocodes"][0]["location"]  # "116.397128,39.916527"
+        lng, lat = location.split(",")
+        return {
+            "longitude": float(lng),
+            "latitude": float(lat),
+        }
     
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(AMAP_GEOCODE_URL, params=params)
-            data = response.json()
+    logger.warning(f"地理编码失败: {address}, response={data}")
+    return None
+
+
+async def amap_geocode_async(address: str) -> Optional[Dict[str, float]]:
+    """
+    地址转坐标（异步）
+    
+    Args:
+        address: 地址文本，如"北京市朝阳区"
         
-        if data.get("status") == "1" and data.get("geocodes"):
-            location = data["geocodes"][0]["location"]  # "116.397128,39.916527"
-            lng, lat = location.split(",")
-            result = {
-                "longitude": float(lng),
-                "latitude": float(lat),
-            }
+    Returns:
+        {"longitude": float, "latitude": float} 或 None
+    """
+    async def _fetch() -> Optional[Dict[str, float]]:
+        params = _geocode_params(address)
+        if params is None:
+            return None
+        try:
+            client = get_http_registry().get_async_client("amap", timeout=GEOCODE_TIMEOUT)
+            response = await client.get(AMAP_GEOCODE_URL, params=params, timeout=GEOCODE_TIMEOUT)
+            result = _parse_geocode(address, response.json())
+        except Exception as e:
+            logger.error(f"地理编码异常: {address}, error={e}")
+            return None
+        if result:
             logger.info(f"地理编码成功: {address} -> {result}")
-            return result
-        
-        logger.warning(f"地理编码失败: {address}, response={data}")
-        return None
-        
-    except Exception as e:
-        logger.error(f"地理编码异常: {address}, error={e}")
-        return None
+        return result
+    
+    result = await _geocode_cache.get_or_fetch(normalize_address(address), _fetch)
+    return dict(result) if result else None
 
 
 def amap_geocode(address: str) -> Optional[Dict[str, float]]:
@@ -73,35 +109,22 @@ def amap_geocode(address: str) -> Optional[Dict[str, float]]:
     Returns:
         {"longitude": float, "latitude": float} 或 None
     """
-    settings = load_settings()
-    api_key = settings.amap_api_key
+    key = normalize_address(address)
+    cached = _geocode_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     
-    if not api_key:
-        logger.error("未配置高德API Key (AMAP_API_KEY)")
+    params = _geocode_params(address)
+    if params is None:
         return None
     
-    params = {
-        "key": api_key,
-        "address": address,
-        "output": "JSON",
-    }
-    
     try:
-        with httpx.Client(timeout=10) as client:
-            response = client.get(AMAP_GEOCODE_URL, params=params)
-            data = response.json()
-        
-        if data.get("status") == "1" and data.get("geocodes"):
-            location = data["geocodes"][0]["location"]
-            lng, lat = location.split(",")
-            return {
-                "longitude": float(lng),
-                "latitude": float(lat),
-            }
-        
-        logger.warning(f"地理编码失败: {address}, response={data}")
-        return None
-        
+        client = get_http_registry().get_sync_client("amap", timeout=GEOCODE_TIMEOUT)
+        response = client.get(AMAP_GEOCODE_URL, params=params, timeout=GEOCODE_TIMEOUT)
+        result = _parse_geocode(address, response.json())
     except Exception as e:
         logger.error(f"地理编码异常: {address}, error={e}")
         return None
+    
+    _geocode_cache.put(key, result)
+    return dict(result) if result else None
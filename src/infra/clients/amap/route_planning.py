@@ -3,23 +3,37 @@
 
 提供普通路径规划和避障路径规划两个工具。
 API文档: https://lbs.amap.com/api/webservice/guide/api/newroute
+
+- 复用共享长连接客户端（见 src.infra.clients.http_pool）
+- 按 (起点, 终点, 避让区域哈希, 策略, 途经点, 车牌) 缓存结果，
+  TTL 由 AMAP_ROUTE_CACHE_TTL_S 配置（默认300秒，路况会变化，0关闭）
 """
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
 import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from langchain_core.tools import tool
 
+from src.infra.clients.http_pool import ResponseCache, get_http_registry
 from src.infra.settings import load_settings
 
 logger = logging.getLogger(__name__)
 
 # API配置
-AMAP_API_BASE_URL = "https://restapi.amap.com/v5/direction/driving"
+AMAP_API_HOST = os.getenv("AMAP_API_HOST", "https://restapi.amap.com").rstrip("/")
+AMAP_API_BASE_URL = f"{AMAP_API_HOST}/v5/direction/driving"
 DEFAULT_TIMEOUT = 30.0
 
+_route_cache = ResponseCache(
+    "amap_route",
+    ttl_s=float(os.getenv("AMAP_ROUTE_CACHE_TTL_S", "300")),
+    max_entries=2048,
+)
+
 # 缓存settings实例
 _settings = None
 
@@ -57,6 +71,59 @@ def _format_avoidpolygons(polygons: List[List[tuple]]) -> str:
     return "|".join(formatted_polygons)
 
 
+def get_route_cache() -> ResponseCache:
+    """路径规划缓存（用于查看统计或测试清空）"""
+    return _route_cache
+
+
+def _route_cache_key(params: Dict[str, str]) -> Tuple[str, ...]:
+    """缓存键：坐标已按6位小数格式化，避让多边形取哈希，不含API Key"""
+    avoid = params.get("avoidpolygons", "")
+    return (
+        params["origin"],
+        params["destination"],
+        hashlib.sha1(avoid.encode("utf-8")).hexdigest() if avoid else "",
+        params["strategy"],
+        params.get("waypoints", ""),
+        params.get("plate", ""),
+    )
+
+
+def _request_route(params: Dict[str, str]) -> Dict[str, Any]:
+    """同步请求（命中缓存时不发请求）"""
+    key = _route_cache_key(params)
+    cached = _route_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        client = get_http_registry().get_sync_client("amap", timeout=DEFAULT_TIMEOUT)
+        response = client.get(AMAP_API_BASE_URL, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+    except httpx.HTTPError as e:
+        logger.error("高德API请求失败", extra={"error": str(e)})
+        raise RuntimeError(f"高德API请求失败: {e}") from e
+    result = _parse_route_response(data)
+    _route_cache.put(key, result)
+    return result
+
+
+async def _request_route_async(params: Dict[str, str]) -> Dict[str, Any]:
+    """异步请求，相同参数的并发请求合并为一次"""
+    async def _fetch() -> Dict[str, Any]:
+        try:
+            client = get_http_registry().get_async_client("amap", timeout=DEFAULT_TIMEOUT)
+            response = await client.get(AMAP_API_BASE_URL, params=params, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            logger.error("高德API请求失败", extra={"error": str(e)})
+            raise RuntimeError(f"高德API请求失败: {e}") from e
+        return _parse_route_response(data)
+    
+    return await _route_cache.get_or_fetch(_route_cache_key(params), _fetch)
+
+
 def _parse_route_response(data: Dict[str, Any]) -> Dict[str, Any]:
     """解析高德API返回的路径规划结果"""
     if data.get("status") != "1":
@@ -163,16 +230,7 @@ def amap_route_planning(
     if plate:
         params["plate"] = plate
     
-    try:
-        with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-            response = client.get(AMAP_API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError as e:
-        logger.error("高德API请求失败", extra={"error": str(e)})
-        raise RuntimeError(f"高德API请求失败: {e}") from e
-    
-    result = _parse_route_response(data)
+    result = _request_route(params)
     logger.info(
         "高德路径规划完成",
         extra={
@@ -264,16 +322,7 @@ def amap_route_planning_with_avoidance(
     if plate:
         params["plate"] = plate
     
-    try:
-        with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-            response = client.get(AMAP_API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError as e:
-        logger.error("高德API请求失败", extra={"error": str(e)})
-        raise RuntimeError(f"高德API请求失败: {e}") from e
-    
-    result = _parse_route_response(data)
+    result = _request_route(params)
     logger.info(
         "高德避障路径规划完成",
         extra={
@@ -284,7 +333,7 @@ def amap_route_planning_with_avoidance(
     return result
 
 
-# 异步版本供智能体节点直接调用
+# 异步版本供智能体节点直接调用（返回结果可能来自缓存，调用方不得原地修改）
 
 async def amap_route_planning_async(
     origin_lon: float,
@@ -319,16 +368,7 @@ async def amap_route_planning_async(
     if plate:
         params["plate"] = plate
     
-    try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(AMAP_API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError as e:
-        logger.error("高德API请求失败", extra={"error": str(e)})
-        raise RuntimeError(f"高德API请求失败: {e}") from e
-    
-    return _parse_route_response(data)
+    return await _request_route_async(params)
 
 
 async def amap_route_planning_with_avoidance_async(
@@ -372,13 +412,4 @@ async def amap_route_planning_with_avoidance_async(
     if plate:
         params["plate"] = plate
     
-    try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(AMAP_API_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError as e:
-        logger.error("高德API请求失败", extra={"error": str(e)})
-        raise RuntimeError(f"高德API请求失败: {e}") from e
-    
-    return _parse_route_response(data)
+    return await _request_route_async(params)
@@ -19,6 +19,11 @@
     print(f"Provider: {result.provider}")
     print(f"延迟: {result.latency_ms}ms")
 
+    # 流式识别（中间结果实时回调）
+    stream = await asr.open_stream(on_partial=send_partial)
+    await stream.feed(chunk)
+    result = await stream.finish()
+
     await asr.stop()
 
 环境变量配置::
@@ -38,10 +43,18 @@
     HEALTH_CHECK_INTERVAL=30       # 健康检查间隔（秒）
     ASR_FAILURE_THRESHOLD=2        # 熔断失败阈值
     ASR_RECOVERY_SECONDS=60        # 熔断恢复等待秒数
+
+    # 延迟感知与对冲请求
+    ASR_HEDGE_ENABLED=false        # 主Provider超过延迟分位数未返回时并发请求备用
+    ASR_HEDGE_PERCENTILE=90        # 触发对冲的延迟分位数
+    ASR_HEDGE_MIN_DELAY_MS=300     # 对冲等待下限
+    ASR_HEDGE_DEFAULT_DELAY_MS=2000  # 样本不足时的对冲等待
+    ASR_LATENCY_MIN_SAMPLES=20     # 分位数生效所需的最少样本
+    ASR_LATENCY_SWITCH_RATIO=2.0   # 主Provider中位延迟超过备用该倍数时优先备用（0关闭）
 """
-from .base import ASRConfig, ASRError, ASRProvider, ASRResult
+from .base import ASRConfig, ASRError, ASRProvider, ASRResult, ASRStream, BufferedASRStream
 from .firered_provider import FireRedASRProvider
-from .manager import ASRManager
+from .manager import ASRManager, LatencyHistogram, ManagedASRStream
 from .service import ASRService
 
 __all__ = [
@@ -51,5 +64,9 @@ __all__ = [
     "ASRConfig",
     "ASRResult",
     "ASRError",
+    "ASRStream",
+    "BufferedASRStream",
+    "ManagedASRStream",
+    "LatencyHistogram",
     "FireRedASRProvider",
 ]
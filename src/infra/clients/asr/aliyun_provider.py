@@ -5,6 +5,7 @@
 - 完善超时处理
 - 轻量健康检查（可选静音识别或直接返回True）
 - 详细错误信息
+- 流式识别：边收音频边发送，实时回调中间结果
 """
 from __future__ import annotations
 
@@ -12,9 +13,9 @@ import asyncio
 import logging
 import os
 import time
-from typing import Optional
+from typing import List, Optional
 
-from .base import ASRConfig, ASRError, ASRProvider, ASRResult
+from .base import ASRConfig, ASRError, ASRProvider, ASRResult, ASRStream, PartialCallback
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,129 @@ class _AliyunASRCallback:
             raise self.error
 
 
+class _AliyunStreamCallback(_AliyunASRCallback):
+    """流式回调桥接：SDK 线程的事件经 call_soon_threadsafe 转回事件循环。
+
+    已结束的句子累积拼接，未结束的句子作为中间结果回调。
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        loop: asyncio.AbstractEventLoop,
+        on_partial: Optional[PartialCallback],
+    ) -> None:
+        super().__init__(timeout_seconds)
+        self._loop = loop
+        self._on_partial = on_partial
+        self._sentences: List[str] = []
+        self._current: str = ""
+        self._started_at = time.time()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._sentences) + self._current
+
+    def _set_done(self) -> None:
+        self._loop.call_soon_threadsafe(self._done.set)
+
+    def on_close(self) -> None:
+        logger.debug("aliyun_asr_stream_close")
+        self._set_done()
+
+    def on_complete(self) -> None:
+        logger.debug("aliyun_asr_stream_complete")
+        self._set_done()
+
+    def on_error(self, result) -> None:  # noqa: ANN001
+        msg = getattr(result, "message", "unknown_error")
+        self._request_id = getattr(result, "request_id", "")
+        logger.error("aliyun_asr_stream_error: %s, request_id=%s", msg, self._request_id)
+        self.error = ASRError(
+            message=f"阿里云ASR错误: {msg}",
+            provider="aliyun",
+            request_id=self._request_id,
+        )
+        self._set_done()
+
+    def on_event(self, result) -> None:  # noqa: ANN001
+        try:
+            sentence = result.get_sentence()
+        except Exception:
+            sentence = None
+        if not sentence or "text" not in sentence:
+            return
+        text = sentence.get("text", "") or ""
+        if sentence.get("sentence_end") or sentence.get("end_time") is not None:
+            self._sentences.append(text)
+            self._current = ""
+        else:
+            self._current = text
+        self._loop.call_soon_threadsafe(self._emit_partial, self.text)
+
+    def _emit_partial(self, text: str) -> None:
+        if self._on_partial is None or not text:
+            return
+        try:
+            self._on_partial(ASRResult(
+                text=text,
+                is_final=False,
+                provider="aliyun",
+                latency_ms=int((time.time() - self._started_at) * 1000),
+            ))
+        except Exception as e:
+            logger.warning("阿里云ASR中间结果回调异常: %s", e)
+
+
+class _AliyunASRStream(ASRStream):
+    """阿里云流式识别会话：每块音频立即发送，stop 后等待最终结果。"""
+
+    def __init__(self, recognition, callback: _AliyunStreamCallback, model: str) -> None:  # noqa: ANN001
+        self._recognition = recognition
+        self._callback = callback
+        self._model = model
+        self._stopped = False
+
+    async def feed(self, chunk: bytes) -> None:
+        if self._stopped or not chunk:
+            return
+        try:
+            self._recognition.send_audio_frame(chunk)
+        except Exception as e:
+            raise ASRError(message=f"阿里云ASR发送音频失败: {e}", provider="aliyun", cause=e) from e
+
+    async def _stop(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        # SDK stop() 是同步阻塞，放线程池执行
+        await asyncio.get_running_loop().run_in_executor(None, self._recognition.stop)
+
+    async def finish(self) -> ASRResult:
+        finish_ts = time.time()
+        try:
+            await self._stop()
+            await self._callback.wait()
+        except ASRError:
+            raise
+        except Exception as e:
+            raise ASRError(message=f"阿里云ASR识别失败: {e}", provider="aliyun", cause=e) from e
+        return ASRResult(
+            text=self._callback.text,
+            confidence=1.0,
+            is_final=True,
+            provider="aliyun",
+            latency_ms=int((time.time() - finish_ts) * 1000),
+            metadata={"model": self._model, "streaming": True},
+        )
+
+    async def abort(self) -> None:
+        try:
+            await self._stop()
+        except Exception:
+            pass
+
+
 class AliyunASRProvider(ASRProvider):
     """阿里云百炼 fun-asr 提供方。"""
 
@@ -205,6 +329,39 @@ class AliyunASRProvider(ASRProvider):
         )
         return result
 
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
+    async def open_stream(
+        self,
+        config: ASRConfig | None = None,
+        on_partial: PartialCallback | None = None,
+    ) -> ASRStream:
+        """开启流式识别：连接建立后每块音频立即发送，中间结果实时回调。"""
+        cfg = config or ASRConfig()
+        from dashscope.audio.asr import Recognition
+
+        callback = _AliyunStreamCallback(
+            timeout_seconds=self._timeout_seconds,
+            loop=asyncio.get_running_loop(),
+            on_partial=on_partial,
+        )
+        recognition = Recognition(
+            model=self._model,
+            format=cfg.format,
+            sample_rate=cfg.sample_rate,
+            callback=callback,
+            semantic_punctuation_enabled=False,
+            punctuation_prediction_enabled=cfg.enable_punctuation,
+        )
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, recognition.start)
+        except Exception as e:
+            raise ASRError(message=f"阿里云ASR流式连接失败: {e}", provider=self.name, cause=e) from e
+        logger.info("阿里云ASR流式识别已开启", extra={"format": cfg.format, "sample_rate": cfg.sample_rate})
+        return _AliyunASRStream(recognition, callback, self._model)
+
     async def health_check(self) -> bool:
         """健康检查。
 
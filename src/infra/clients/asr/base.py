@@ -1,12 +1,14 @@
 """ASR 抽象基类与数据模型。
 
 定义语音识别契约，规范入参/出参与健康检查接口。
+流式识别：Provider 通过 open_stream 返回 ASRStream，边收音频边输出中间结果；
+不支持流式的 Provider 使用默认的 BufferedASRStream（缓存音频，结束时整段识别）。
 """
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 
 @dataclass
@@ -92,6 +94,64 @@ class ASRProvider(ABC):
             bool: True 表示服务可用，False 表示不可用。
         """
 
+    @property
+    def supports_streaming(self) -> bool:
+        """是否支持真正的流式识别（边收音频边出中间结果）。"""
+        return False
+
+    async def open_stream(
+        self,
+        config: ASRConfig | None = None,
+        on_partial: PartialCallback | None = None,
+    ) -> "ASRStream":
+        """开启流式识别会话。
+
+        默认实现缓存音频，finish 时整段调用 recognize，不产生中间结果。
+
+        Args:
+            config: 识别配置。
+            on_partial: 中间结果回调（在事件循环线程中同步调用）。
+        """
+        return BufferedASRStream(self, config)
+
+
+# 中间结果回调：参数为 is_final=False 的 ASRResult
+PartialCallback = Callable[[ASRResult], None]
+
+
+class ASRStream(ABC):
+    """流式识别会话。"""
+
+    @abstractmethod
+    async def feed(self, chunk: bytes) -> None:
+        """送入一块音频。"""
+
+    @abstractmethod
+    async def finish(self) -> ASRResult:
+        """音频结束，等待并返回最终结果。"""
+
+    @abstractmethod
+    async def abort(self) -> None:
+        """放弃本次识别，释放连接。"""
+
+
+class BufferedASRStream(ASRStream):
+    """不支持流式的 Provider 的兼容实现：缓存音频，结束时整段识别。"""
+
+    def __init__(self, provider: ASRProvider, config: ASRConfig | None = None) -> None:
+        self._provider = provider
+        self._config = config
+        self._buffer = bytearray()
+
+    async def feed(self, chunk: bytes) -> None:
+        self._buffer += chunk
+
+    async def finish(self) -> ASRResult:
+        return await self._provider.recognize(bytes(self._buffer), self._config)
+
+    async def abort(self) -> None:
+        self._buffer.clear()
+
 
 class ASRError(Exception):
     """ASR 通用异常。"""
@@ -5,21 +5,80 @@
 - 更清晰的熔断器状态管理
 - 半开状态试探机制
 - 详细的状态日志
+- 每个Provider的延迟直方图，参与Provider选择
+- 对冲请求（hedging）：主Provider超过延迟分位数仍未返回时并发请求备用，取先成功者
+- 流式识别：音频边到边送入Provider，实时输出中间结果
 """
 from __future__ import annotations
 
 import asyncio
+import bisect
 import logging
 import os
 import time
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
 
-from .base import ASRConfig, ASRError, ASRProvider, ASRResult
+from .base import ASRConfig, ASRError, ASRProvider, ASRResult, ASRStream
 
 logger = logging.getLogger(__name__)
 
 
+class LatencyHistogram:
+    """分桶延迟直方图。
+
+    样本数达到 decay_every 时所有桶计数减半，使分位数偏重近期样本，
+    Provider 变慢/恢复后能较快反映出来。
+    """
+
+    BUCKET_BOUNDS_MS = (
+        50, 100, 150, 200, 300, 400, 500, 700, 1000, 1500,
+        2000, 3000, 5000, 8000, 12000, 20000, 30000, 60000,
+    )
+
+    def __init__(self, decay_every: int = 200) -> None:
+        self._counts = [0.0] * (len(self.BUCKET_BOUNDS_MS) + 1)
+        self._total = 0.0
+        self._decay_every = decay_every
+        self.samples = 0
+
+    def record(self, latency_ms: float) -> None:
+        """记录一次延迟。"""
+        self._counts[bisect.bisect_left(self.BUCKET_BOUNDS_MS, latency_ms)] += 1
+        self._total += 1
+        self.samples += 1
+        if self._total >= self._decay_every:
+            self._counts = [c / 2 for c in self._counts]
+            self._total /= 2
+
+    @property
+    def count(self) -> float:
+        """衰减后的有效样本数。"""
+        return self._total
+
+    def percentile(self, p: float) -> Optional[int]:
+        """返回第 p 百分位所在桶的上界（毫秒），无样本时返回 None。"""
+        if self._total <= 0:
+            return None
+        target = self._total * p / 100
+        cumulative = 0.0
+        for i, c in enumerate(self._counts):
+            cumulative += c
+            if c and cumulative >= target:
+                break
+        if i < len(self.BUCKET_BOUNDS_MS):
+            return self.BUCKET_BOUNDS_MS[i]
+        return self.BUCKET_BOUNDS_MS[-1] * 2
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": self.samples,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+        }
+
+
 @dataclass
 class ProviderStatus:
     """Provider健康状态。
@@ -32,6 +91,8 @@ class ProviderStatus:
         last_latency_ms: 最后一次操作延迟（毫秒）。
         half_open: 是否处于半开试探阶段。
         recovery_at: 允许再次尝试的时间戳。
+        latency: 整段识别延迟直方图。
+        stream_latency: 流式识别收尾延迟（音频结束 → 最终结果）直方图。
     """
 
     available: bool = True  # 默认可用，等待健康检查确认
@@ -41,6 +102,8 @@ class ProviderStatus:
     last_latency_ms: int = 0
     half_open: bool = False
     recovery_at: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    stream_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
 
 
 class ASRManager:
@@ -51,6 +114,8 @@ class ASRManager:
     2. 自动降级：主Provider失败时自动切换到备用Provider
     3. 健康检查：后台定期检查各Provider健康状态
     4. 熔断恢复：服务恢复后自动切回高优先级Provider
+    5. 延迟感知：主Provider近期中位延迟远高于备用时优先选备用
+    6. 对冲请求：主Provider超过历史延迟分位数仍未返回时并发请求备用
     """
 
     def __init__(
@@ -61,6 +126,8 @@ class ASRManager:
         health_check_interval: int | None = None,
         failure_threshold: int | None = None,
         recovery_seconds: int | None = None,
+        hedge_enabled: bool | None = None,
+        hedge_percentile: float | None = None,
     ) -> None:
         """初始化ASR管理器。
 
@@ -71,6 +138,8 @@ class ASRManager:
             health_check_interval: 健康检查间隔秒数，默认30秒。
             failure_threshold: 熔断失败阈值，默认2次。
             recovery_seconds: 熔断恢复等待秒数，默认60秒。
+            hedge_enabled: 是否启用对冲请求，默认从环境变量读取（关闭）。
+            hedge_percentile: 触发对冲的主Provider延迟分位数，默认90。
         """
         # 创建默认Provider
         if providers is None:
@@ -91,6 +160,17 @@ class ASRManager:
             10, int(os.getenv("ASR_RECOVERY_SECONDS", "60"))
         )
 
+        # 延迟感知与对冲配置
+        if hedge_enabled is None:
+            hedge_enabled = os.getenv("ASR_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self._hedge_enabled = hedge_enabled
+        self._hedge_percentile = hedge_percentile or float(os.getenv("ASR_HEDGE_PERCENTILE", "90"))
+        self._hedge_min_delay_ms = int(os.getenv("ASR_HEDGE_MIN_DELAY_MS", "300"))
+        self._hedge_default_delay_ms = int(os.getenv("ASR_HEDGE_DEFAULT_DELAY_MS", "2000"))
+        self._latency_min_samples = int(os.getenv("ASR_LATENCY_MIN_SAMPLES", "20"))
+        self._latency_switch_ratio = float(os.getenv("ASR_LATENCY_SWITCH_RATIO", "2.0"))
+        self._hedge_stats = {"hedged": 0, "hedge_wins": 0}
+
         # 初始化状态
         self._provider_status: dict[str, ProviderStatus] = {
             name: ProviderStatus() for name in self._providers
@@ -109,6 +189,8 @@ class ASRManager:
                 "health_check_interval": self._health_check_interval,
                 "failure_threshold": self._failure_threshold,
                 "recovery_seconds": self._recovery_seconds,
+                "hedge_enabled": self._hedge_enabled,
+                "hedge_percentile": self._hedge_percentile,
             },
         )
 
@@ -152,9 +234,11 @@ class ASRManager:
 
         return providers
 
-    def _mark_success(self, name: str) -> None:
-        """标记Provider成功，重置失败计数。"""
+    def _mark_success(self, name: str, latency_ms: int | None = None, streaming: bool = False) -> None:
+        """标记Provider成功，重置失败计数并记录延迟。"""
         status = self._provider_status[name]
+        if latency_ms is not None:
+            (status.stream_latency if streaming else status.latency).record(latency_ms)
         status.consecutive_successes += 1
         status.consecutive_failures = 0
         status.available = True
@@ -184,11 +268,11 @@ class ASRManager:
     async def recognize(
         self, audio_data: bytes, config: ASRConfig | None = None
     ) -> ASRResult:
-        """执行语音识别，支持自动降级。
+        """执行语音识别，支持自动降级与对冲请求。
 
         流程：
-        1. 选择Provider（根据健康状态和优先级）
-        2. 尝试识别
+        1. 选择Provider（根据健康状态、优先级与近期延迟）
+        2. 尝试识别；启用对冲时，主Provider超过延迟分位数未返回即并发请求备用
         3. 失败时自动降级到备用Provider
 
         Raises:
@@ -205,60 +289,140 @@ class ASRManager:
             },
         )
 
-        start_ts = time.time()
+        primary_task = asyncio.create_task(
+            self._timed(provider, provider.recognize(audio_data, config))
+        )
+        return await self._race(
+            provider, primary_task, audio_data, config,
+            hedge_delay_ms=self._hedge_delay_ms(provider.name),
+        )
 
-        try:
-            result = await provider.recognize(audio_data, config)
-            self._mark_success(provider.name)
-            logger.info(
-                "ASR识别成功",
-                extra={
-                    "provider": result.provider,
-                    "latency_ms": result.latency_ms,
-                    "text_preview": result.text[:30] if result.text else "",
-                },
-            )
-            return result
+    async def open_stream(
+        self,
+        config: ASRConfig | None = None,
+        on_partial: Callable[[ASRResult], Awaitable[None]] | None = None,
+    ) -> "ManagedASRStream":
+        """开启流式识别会话。
+
+        音频边到边送入所选Provider，中间结果按顺序通过 on_partial 回调；
+        finish 时若Provider流式失败或（启用对冲时）收尾过慢，用缓存的整段音频请求备用Provider。
+        """
+        provider = self._select_provider()
+        stream = ManagedASRStream(self, provider, config, on_partial)
+        await stream.open()
+        return stream
 
+    async def _timed(
+        self, provider: ASRProvider, call: Awaitable[ASRResult], streaming: bool = False
+    ) -> ASRResult:
+        """执行一次Provider调用，记录延迟与成功/失败状态。"""
+        start_ts = time.time()
+        try:
+            result = await call
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             latency_ms = int((time.time() - start_ts) * 1000)
             logger.warning(
-                "ASR识别失败，尝试降级",
+                "ASR识别失败",
                 extra={"provider": provider.name, "error": str(e), "latency_ms": latency_ms},
             )
             self._mark_failure(provider.name)
+            raise
+        latency_ms = int((time.time() - start_ts) * 1000)
+        self._mark_success(provider.name, latency_ms, streaming=streaming)
+        logger.info(
+            "ASR识别成功",
+            extra={
+                "provider": result.provider,
+                "latency_ms": latency_ms,
+                "streaming": streaming,
+                "text_preview": result.text[:30] if result.text else "",
+            },
+        )
+        return result
 
-            # 尝试降级到备用Provider
-            fallback = self._get_fallback_provider(exclude=provider.name)
-            if fallback:
-                logger.info(
-                    "ASR降级切换",
-                    extra={"from": provider.name, "to": fallback.name},
-                )
-                try:
-                    result = await fallback.recognize(audio_data, config)
-                    self._mark_success(fallback.name)
-                    logger.info(
-                        "ASR降级识别成功",
-                        extra={
-                            "provider": result.provider,
-                            "latency_ms": result.latency_ms,
-                        },
-                    )
-                    return result
-                except Exception as fallback_error:
-                    self._mark_failure(fallback.name)
-                    raise ASRError(
-                        message=f"所有ASR Provider失败: primary={provider.name}, fallback={fallback.name}",
-                        provider="manager",
-                        cause=fallback_error,
-                    ) from fallback_error
+    def _hedge_delay_ms(self, name: str, streaming: bool = False) -> Optional[int]:
+        """对冲等待时间：主Provider历史延迟的分位数，未启用对冲时返回None。"""
+        if not self._hedge_enabled:
+            return None
+        status = self._provider_status[name]
+        histogram = status.stream_latency if streaming else status.latency
+        if histogram.count < self._latency_min_samples:
+            return self._hedge_default_delay_ms
+        return max(self._hedge_min_delay_ms, histogram.percentile(self._hedge_percentile) or 0)
 
+    async def _race(
+        self,
+        primary: ASRProvider,
+        primary_task: asyncio.Task,
+        audio_data: bytes,
+        config: ASRConfig | None,
+        hedge_delay_ms: Optional[int],
+        streaming: bool = False,
+    ) -> ASRResult:
+        """等待主Provider，必要时启动备用Provider，返回先成功的结果。
+
+        hedge_delay_ms 为 None 时只在主Provider失败后降级（顺序降级）；
+        否则主Provider超过该时间未返回即并发请求备用，落后者被取消。
+        """
+        tasks: dict[asyncio.Task, ASRProvider] = {primary_task: primary}
+        primary_start = time.time()
+        errors: list[BaseException] = []
+        fallback: Optional[ASRProvider] = None
+
+        def _start_fallback(reason: str) -> None:
+            nonlocal fallback
+            fallback = self._get_fallback_provider(exclude=primary.name)
+            if fallback is None:
+                return
+            logger.info("ASR降级切换", extra={"from": primary.name, "to": fallback.name, "reason": reason})
+            task = asyncio.create_task(self._timed(fallback, fallback.recognize(audio_data, config)))
+            tasks[task] = fallback
+
+        try:
+            timeout = hedge_delay_ms / 1000 if hedge_delay_ms is not None else None
+            done, _ = await asyncio.wait([primary_task], timeout=timeout)
+            if not done:
+                self._hedge_stats["hedged"] += 1
+                _start_fallback("hedge")
+
+            while tasks:
+                done, _ = await asyncio.wait(list(tasks), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        if provider is not primary:
+                            if hedge_delay_ms is not None:
+                                self._hedge_stats["hedge_wins"] += 1
+                            if primary_task in tasks:
+                                # 主Provider落后被取消：已耗时是其延迟的下界，计入直方图
+                                status = self._provider_status[primary.name]
+                                histogram = status.stream_latency if streaming else status.latency
+                                histogram.record((time.time() - primary_start) * 1000)
+                        return task.result()
+                    errors.append(task.exception())
+                    if provider is primary and fallback is None:
+                        _start_fallback("failure")
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        last_error = errors[-1] if errors else None
+        cause = last_error if isinstance(last_error, Exception) else None
+        if fallback is None:
             raise ASRError(
-                message=f"ASR Provider失败且无备用: {provider.name}",
-                provider=provider.name,
-                cause=e if isinstance(e, Exception) else None,
-            ) from e
+                message=f"ASR Provider失败且无备用: {primary.name}",
+                provider=primary.name,
+                cause=cause,
+            ) from last_error
+        raise ASRError(
+            message=f"所有ASR Provider失败: primary={primary.name}, fallback={fallback.name}",
+            provider="manager",
+            cause=cause,
+        ) from last_error
 
     def _select_provider(self) -> ASRProvider:
         """选择最佳Provider。"""
@@ -276,7 +440,8 @@ class ASRManager:
                 logger.info("Provider进入半开状态", extra={"provider": primary.name})
 
             if status.available or not self._health_check_running:
-                return primary
+                faster = self._faster_fallback(primary.name) if status.available else None
+                return faster or primary
 
         # 2. 使用备用Provider
         if self._fallback in self._providers:
@@ -296,6 +461,29 @@ class ASRManager:
 
         raise RuntimeError("没有可用的ASR Provider")
 
+    def _faster_fallback(self, primary_name: str) -> Optional[ASRProvider]:
+        """主Provider近期中位延迟超过备用的 ASR_LATENCY_SWITCH_RATIO 倍时返回备用。"""
+        if self._latency_switch_ratio <= 0 or self._fallback == primary_name:
+            return None
+        if self._fallback not in self._providers:
+            return None
+        fallback_status = self._provider_status[self._fallback]
+        if not fallback_status.available:
+            return None
+        primary_hist = self._provider_status[primary_name].latency
+        fallback_hist = fallback_status.latency
+        if min(primary_hist.count, fallback_hist.count) < self._latency_min_samples:
+            return None
+        primary_p50 = primary_hist.percentile(50) or 0
+        fallback_p50 = fallback_hist.percentile(50) or 0
+        if fallback_p50 and primary_p50 > fallback_p50 * self._latency_switch_ratio:
+            logger.debug(
+                "主Provider延迟偏高，选择备用",
+                extra={"primary": primary_name, "primary_p50_ms": primary_p50, "fallback_p50_ms": fallback_p50},
+            )
+            return self._providers[self._fallback]
+        return None
+
     def _get_fallback_provider(self, exclude: str) -> Optional[ASRProvider]:
         """获取备用Provider（排除指定的）。"""
         if self._fallback in self._providers and self._fallback != exclude:
@@ -321,6 +509,21 @@ class ASRManager:
         """获取所有Provider的健康状态。"""
         return self._get_status_snapshot()
 
+    @property
+    def latency_stats(self) -> dict:
+        """各Provider延迟分位数与对冲统计。"""
+        return {
+            "providers": {
+                name: {
+                    "recognize": status.latency.snapshot(),
+                    "stream_finish": status.stream_latency.snapshot(),
+                }
+                for name, status in self._provider_status.items()
+            },
+            "hedge_enabled": self._hedge_enabled,
+            **self._hedge_stats,
+        }
+
     async def start_health_check(self) -> None:
         """启动后台健康检查任务。"""
         if self._health_check_task is not None:
@@ -397,3 +600,117 @@ class ASRManager:
                 status.consecutive_successes = 0
 
         logger.debug("健康检查完成", extra={"status": self._get_status_snapshot()})
+
+
+class ManagedASRStream:
+    """管理器层的流式识别会话。
+
+    - 音频同时送入Provider流与本地缓存（缓存用于降级/对冲时整段识别）
+    - Provider流式中途失败：记失败并停用该流，finish 时改用整段识别
+    - 中间结果经队列按顺序交给异步回调，finish 返回前全部送出
+    """
+
+    def __init__(
+        self,
+        manager: ASRManager,
+        provider: ASRProvider,
+        config: ASRConfig | None,
+        on_partial: Callable[[ASRResult], Awaitable[None]] | None,
+    ) -> None:
+        self._manager = manager
+        self._provider = provider
+        self._config = config
+        self._on_partial = on_partial
+        self._audio = bytearray()
+        self._stream: Optional[ASRStream] = None
+        self._partials: asyncio.Queue[Optional[ASRResult]] = asyncio.Queue()
+        self._last_partial = ""
+        self._forwarder: Optional[asyncio.Task] = (
+            asyncio.create_task(self._forward_partials()) if on_partial else None
+        )
+        self._closed = False
+
+    @property
+    def provider(self) -> str:
+        return self._provider.name
+
+    async def open(self) -> None:
+        try:
+            self._stream = await self._provider.open_stream(self._config, on_partial=self._emit_partial)
+        except Exception as e:
+            logger.warning("ASR流式会话开启失败，结束时改用整段识别", extra={"provider": self._provider.name, "error": str(e)})
+            self._manager._mark_failure(self._provider.name)
+
+    def _emit_partial(self, result: ASRResult) -> None:
+        if self._closed or result.text == self._last_partial:
+            return
+        self._last_partial = result.text
+        self._partials.put_nowait(result)
+
+    async def _forward_partials(self) -> None:
+        while True:
+            result = await self._partials.get()
+            if result is None:
+                return
+            try:
+                await self._on_partial(result)
+            except Exception as e:
+                logger.warning(f"ASR中间结果回调异常: {e}")
+
+    async def feed(self, chunk: bytes) -> None:
+        """送入一块音频。"""
+        if self._closed:
+            return
+        self._audio += chunk
+        if self._stream is None:
+            return
+        try:
+            await self._stream.feed(chunk)
+        except Exception as e:
+            logger.warning("ASR流式发送失败，结束时改用整段识别", extra={"provider": self._provider.name, "error": str(e)})
+            self._manager._mark_failure(self._provider.name)
+            await self._drop_stream()
+
+    async def finish(self) -> ASRResult:
+        """音频结束，返回最终结果（中间结果已全部送出）。"""
+        self._closed = True
+        try:
+            audio = bytes(self._audio)
+            if self._stream is None:
+                return await self._manager.recognize(audio, self._config)
+            primary_task = asyncio.create_task(
+                self._manager._timed(self._provider, self._stream.finish(), streaming=True)
+            )
+            return await self._manager._race(
+                self._provider, primary_task, audio, self._config,
+                hedge_delay_ms=self._manager._hedge_delay_ms(self._provider.name, streaming=True),
+                streaming=True,
+            )
+        finally:
+            await self._drop_stream()
+            await self._stop_forwarder(drain=True)
+
+    async def abort(self) -> None:
+        """放弃本次识别。"""
+        self._closed = True
+        await self._drop_stream()
+        await self._stop_forwarder(drain=False)
+
+    async def _drop_stream(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                await stream.abort()
+            except Exception:
+                pass
+
+    async def _stop_forwarder(self, drain: bool) -> None:
+        if self._forwarder is None:
+            return
+        if drain:
+            self._partials.put_nowait(None)
+            await asyncio.gather(self._forwarder, return_exceptions=True)
+        else:
+            self._forwarder.cancel()
+            await asyncio.gather(self._forwarder, return_exceptions=True)
+        self._forwarder = None
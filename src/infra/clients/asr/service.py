@@ -5,9 +5,10 @@
 from __future__ import annotations
 
 import logging
+from typing import Awaitable, Callable
 
 from .base import ASRConfig, ASRResult
-from .manager import ASRManager
+from .manager import ASRManager, ManagedASRStream
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,11 @@ class ASRService:
         result = await asr.recognize(audio_data)
         print(result.text)
 
+        # 流式识别：边收音频边出中间结果
+        stream = await asr.open_stream(on_partial=send_partial)
+        await stream.feed(chunk)
+        result = await stream.finish()
+
         await asr.stop()  # 停止健康检查
     """
 
@@ -43,6 +49,11 @@ class ASRService:
         """获取所有Provider的健康状态。"""
         return self._manager.provider_status
 
+    @property
+    def latency_stats(self) -> dict:
+        """各Provider延迟分位数与对冲统计。"""
+        return self._manager.latency_stats
+
     async def recognize(
         self, audio_data: bytes, config: ASRConfig | None = None
     ) -> ASRResult:
@@ -60,6 +71,22 @@ class ASRService:
         """
         return await self._manager.recognize(audio_data, config)
 
+    async def open_stream(
+        self,
+        config: ASRConfig | None = None,
+        on_partial: Callable[[ASRResult], Awaitable[None]] | None = None,
+    ) -> ManagedASRStream:
+        """开启流式识别会话。
+
+        Args:
+            config: 识别配置，None使用默认配置。
+            on_partial: 中间结果回调（按顺序await调用）。
+
+        Returns:
+            ManagedASRStream: 调用 feed 送入音频，finish 获取最终结果，abort 放弃。
+        """
+        return await self._manager.open_stream(config, on_partial)
+
     async def start(self) -> None:
         """启动ASR服务（启动健康检查）。"""
         await self._manager.start_health_check()
@@ -0,0 +1,240 @@
+"""
+共享 HTTP 客户端与响应缓存
+
+外部 Web 服务（高德、OpenMeteo 等）每次请求新建 httpx 客户端会重复 TCP/TLS 握手。
+这里按上游服务名维护长连接客户端：
+
+- HttpClientRegistry：按名称复用 httpx.AsyncClient / httpx.Client，
+  每个名称对应一个上游主机，连接池上限即该主机的并发连接上限
+- ResponseCache：带 TTL 的 LRU 响应缓存，相同键的并发请求只发起一次
+  （独立任务执行，首个请求方取消不影响其他等待者）
+- 异步客户端绑定创建时的事件循环，循环切换（如测试中多次 asyncio.run）时自动重建
+
+环境变量::
+
+    HTTP_POOL_MAX_CONNECTIONS=20        # 每个上游的最大连接数
+    HTTP_POOL_MAX_KEEPALIVE=10          # 每个上游保持的空闲长连接数
+    HTTP_POOL_KEEPALIVE_EXPIRY_S=30     # 空闲长连接保留时间
+
+用法::
+
+    client = get_http_registry().get_async_client("amap", timeout=10)
+    response = await client.get(url, params=params)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import httpx
+
+from src.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw else default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    return float(raw) if raw else default
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """单个上游的连接池配置"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        return cls(
+            max_connections=_env_int("HTTP_POOL_MAX_CONNECTIONS", 20),
+            max_keepalive_connections=_env_int("HTTP_POOL_MAX_KEEPALIVE", 10),
+            keepalive_expiry_s=_env_float("HTTP_POOL_KEEPALIVE_EXPIRY_S", 30.0),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_s,
+        )
+
+
+class HttpClientRegistry:
+    """按上游名称复用的 httpx 客户端注册表"""
+
+    def __init__(self, pool_config: Optional[PoolConfig] = None) -> None:
+        self._pool_config = pool_config or PoolConfig.from_env()
+        self._async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def get_async_client(self, name: str, timeout: float = 30.0) -> httpx.AsyncClient:
+        """
+        获取异步客户端（需在事件循环内调用）
+
+        Args:
+            name: 上游名称，如 "amap"、"openmeteo"
+            timeout: 首次创建时的默认超时（秒），单次请求可用 timeout= 覆盖
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_clients.get(name)
+            if entry is not None and entry[0] is loop and not entry[1].is_closed:
+                return entry[1]
+            if entry is not None:
+                # 原事件循环已结束，其上的连接无法复用，直接丢弃
+                logger.debug(f"事件循环已切换，重建HTTP客户端: {name}")
+            client = httpx.AsyncClient(timeout=timeout, limits=self._pool_config.limits())
+            self._async_clients[name] = (loop, client)
+            return client
+
+    def get_sync_client(self, name: str, timeout: float = 30.0) -> httpx.Client:
+        """获取同步客户端（线程安全，可跨线程共享）"""
+        with self._lock:
+            client = self._sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(timeout=timeout, limits=self._pool_config.limits())
+                self._sync_clients[name] = client
+            return client
+
+    async def aclose(self) -> None:
+        """关闭全部客户端（应用关闭时调用）"""
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            sync_clients = list(self._sync_clients.values())
+            self._async_clients.clear()
+            self._sync_clients.clear()
+        loop = asyncio.get_running_loop()
+        for client_loop, client in async_clients:
+            if client_loop is loop:
+                await client.aclose()
+        for client in sync_clients:
+            client.close()
+        logger.info(f"HTTP客户端已关闭: async={len(async_clients)}, sync={len(sync_clients)}")
+
+
+_registry: Optional[HttpClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_http_registry() -> HttpClientRegistry:
+    """获取全局HTTP客户端注册表（单例）"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = HttpClientRegistry()
+    return _registry
+
+
+async def close_http_clients() -> None:
+    """关闭全局注册表中的全部客户端"""
+    if _registry is not None:
+        await _registry.aclose()
+
+
+class ResponseCache:
+    """
+    带 TTL 的 LRU 响应缓存
+
+    - get_or_fetch：异步获取，未命中时调用 fetch，相同键的并发请求共享同一次调用
+    - get / put：同步接口，供同步工具函数使用
+    - fetch 返回 None 或抛出异常时不缓存
+    - 缓存值在调用方之间共享，调用方不得原地修改
+    """
+
+    def __init__(self, name: str, ttl_s: float, max_entries: int = 1024) -> None:
+        self.name = name
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取未过期的缓存值，未命中返回 None"""
+        value = self._lookup(key)
+        if value is None and self.enabled:
+            self.misses += 1
+        return value
+
+    def _lookup(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled or value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """读取缓存，未命中时调用 fetch 并写入缓存"""
+        if not self.enabled:
+            return await fetch()
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        if self._inflight.pending(key):
+            self.coalesced += 1
+            return await self._inflight.run(key, fetch)
+
+        self.misses += 1
+
+        async def _fetch_and_store() -> Any:
+            # 写缓存放在合并任务内：发起者被取消时结果仍会缓存
+            value = await fetch()
+            self.put(key, value)
+            return value
+
+        return await self._inflight.run(key, _fetch_and_store)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -3,20 +3,34 @@ OpenMeteo 气象数据客户端
 
 免费API，无需Key，全球覆盖，支持16天预报。
 API文档: https://open-meteo.com/en/docs
+
+- 复用共享长连接客户端（见 src.infra.clients.http_pool）
+- 按 (经纬度网格, 预报整点) 缓存：同一网格内的点在同一小时内共用一次请求，
+  请求使用网格中心坐标，保证缓存内容与请求点无关
+
+环境变量::
+
+    OPENMETEO_API_URL=https://api.open-meteo.com/v1/forecast
+    WEATHER_CACHE_TTL_S=900        # 0 关闭缓存
+    WEATHER_CACHE_GRID_DEG=0.05    # 网格边长（度），约5公里
 """
 from __future__ import annotations
 
 import logging
+import math
+import os
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
+from src.infra.clients.http_pool import ResponseCache, get_http_registry
 
 logger = logging.getLogger(__name__)
 
-OPENMETEO_API_URL = "https://api.open-meteo.com/v1/forecast"
+OPENMETEO_API_URL = os.getenv("OPENMETEO_API_URL", "https://api.open-meteo.com/v1/forecast")
 DEFAULT_TIMEOUT = 30.0
+_CURRENT_FIELDS = "temperature_2m,relative_humidity_2m,precipitation,weather_code,wind_speed_10m,wind_direction_10m"
 
 
 @dataclass
@@ -66,11 +80,60 @@ class WeatherForecast:
     fetch_time: datetime
 
 
+def _parse_current(current: Dict[str, Any]) -> WeatherData:
+    return WeatherData(
+        timestamp=datetime.fromisoformat(current.get("time", datetime.utcnow().isoformat())),
+        temperature_c=current.get("temperature_2m", 0),
+        wind_speed_ms=current.get("wind_speed_10m", 0) / 3.6,
+        wind_direction_deg=current.get("wind_direction_10m", 0),
+        precipitation_mm=current.get("precipitation", 0),
+        weather_code=current.get("weather_code", 0),
+        humidity_percent=current.get("relative_humidity_2m"),
+    )
+
+
 class WeatherClient:
     """OpenMeteo气象客户端"""
     
-    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        base_url: Optional[str] = None,
+        cache_ttl_s: Optional[float] = None,
+        grid_deg: Optional[float] = None,
+    ):
         self._timeout = timeout
+        self._base_url = base_url or OPENMETEO_API_URL
+        self._grid_deg = grid_deg if grid_deg is not None else float(os.getenv("WEATHER_CACHE_GRID_DEG", "0.05"))
+        ttl = cache_ttl_s if cache_ttl_s is not None else float(os.getenv("WEATHER_CACHE_TTL_S", "900"))
+        self._cache = ResponseCache("openmeteo", ttl_s=ttl, max_entries=4096)
+    
+    @property
+    def cache_stats(self) -> dict:
+        return self._cache.stats
+    
+    def _grid_cell(self, lon: float, lat: float) -> Tuple[int, int, float, float]:
+        """返回网格索引与网格中心坐标"""
+        g = self._grid_deg
+        if g <= 0:
+            return 0, 0, lon, lat
+        ix, iy = math.floor(lon / g), math.floor(lat / g)
+        return ix, iy, round((ix + 0.5) * g, 6), round((iy + 0.5) * g, 6)
+    
+    async def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        client = get_http_registry().get_async_client("openmeteo", timeout=self._timeout)
+        response = await client.get(self._base_url, params=params, timeout=self._timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _cached_fetch(self, kind: str, lon: float, lat: float, extra: Dict[str, Any]) -> Dict[str, Any]:
+        ix, iy, center_lon, center_lat = self._grid_cell(lon, lat)
+        params = {"latitude": center_lat, "longitude": center_lon, **extra, "timezone": "auto"}
+        if self._grid_deg <= 0:
+            return await self._fetch(params)
+        # 按UTC整点分桶，跨整点后重新拉取
+        key = (kind, ix, iy, int(time.time() // 3600), extra.get("forecast_hours"))
+        return await self._cache.get_or_fetch(key, lambda: self._fetch(params))
     
     async def get_current_weather(self, lon: float, lat: float) -> WeatherData:
         """
@@ -85,29 +148,8 @@ class WeatherClient:
         """
         logger.info(f"获取当前天气: lon={lon}, lat={lat}")
         
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "current": "temperature_2m,relative_humidity_2m,precipitation,weather_code,wind_speed_10m,wind_direction_10m",
-            "timezone": "auto",
-        }
-        
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            response = await client.get(OPENMETEO_API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-        
-        current = data.get("current", {})
-        
-        weather = WeatherData(
-            timestamp=datetime.fromisoformat(current.get("time", datetime.utcnow().isoformat())),
-            temperature_c=current.get("temperature_2m", 0),
-            wind_speed_ms=current.get("wind_speed_10m", 0) / 3.6,
-            wind_direction_deg=current.get("wind_direction_10m", 0),
-            precipitation_mm=current.get("precipitation", 0),
-            weather_code=current.get("weather_code", 0),
-            humidity_percent=current.get("relative_humidity_2m"),
-        )
+        data = await self._cached_fetch("current", lon, lat, {"current": _CURRENT_FIELDS})
+        weather = _parse_current(data.get("current", {}))
         
         logger.info(f"当前天气: temp={weather.temperature_c}°C, wind={weather.wind_speed_ms:.1f}m/s, precip={weather.precipitation_mm}mm")
         return weather
@@ -131,30 +173,14 @@ class WeatherClient:
         """
         logger.info(f"获取天气预报: lon={lon}, lat={lat}, hours={hours}")
         
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "current": "temperature_2m,relative_humidity_2m,precipitation,weather_code,wind_speed_10m,wind_direction_10m",
+        data = await self._cached_fetch("forecast", lon, lat, {
+            "current": _CURRENT_FIELDS,
             "hourly": "temperature_2m,relative_humidity_2m,precipitation_probability,precipitation,weather_code,wind_speed_10m,wind_direction_10m",
             "forecast_hours": min(hours, 168),
-            "timezone": "auto",
-        }
-        
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            response = await client.get(OPENMETEO_API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+        })
         
         current_data = data.get("current", {})
-        current = WeatherData(
-            timestamp=datetime.fromisoformat(current_data.get("time", datetime.utcnow().isoformat())),
-            temperature_c=current_data.get("temperature_2m", 0),
-            wind_speed_ms=current_data.get("wind_speed_10m", 0) / 3.6,
-            wind_direction_deg=current_data.get("wind_direction_10m", 0),
-            precipitation_mm=current_data.get("precipitation", 0),
-            weather_code=current_data.get("weather_code", 0),
-            humidity_percent=current_data.get("relative_humidity_2m"),
-        ) if current_data else None
+        current = _parse_current(current_data) if current_data else None
         
         hourly_data = data.get("hourly", {})
         times = hourly_data.get("time", [])
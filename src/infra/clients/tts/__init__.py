@@ -20,6 +20,14 @@
     with open("output.wav", "wb") as f:
         f.write(result.audio_data)
 
+    # 流式合成：边合成边返回PCM块
+    async for chunk in tts.synthesize_stream("收到，立即出发"):
+        send(chunk.audio_data)
+
+    # 短语级缓存：固定短语复用缓存音频，含数字的短语实时合成后拼接
+    result = await tts.synthesize_phrases("当前位置距火灾区域350米，请及时处置")
+    print(tts.cache_stats)
+
     await tts.close()
 
 环境变量配置::
@@ -27,8 +35,15 @@
     # CosyVoice配置
     COSYVOICE_URL=http://192.168.31.50:10097
     COSYVOICE_TIMEOUT_SECONDS=30
+
+    # 音频缓存配置
+    TTS_CACHE_ENABLED=true
+    TTS_CACHE_MEMORY_MB=64
+    TTS_CACHE_DIR=/var/cache/frontai/tts
+    TTS_CACHE_DISK_MB=512
 """
-from .base import TTSConfig, TTSError, TTSProvider, TTSResult
+from .base import TTSAudioChunk, TTSConfig, TTSError, TTSProvider, TTSResult, pcm_to_wav, wav_to_pcm
+from .cache import TTSAudioCache, TTSSegment, split_phrases
 from .cosyvoice_provider import CosyVoiceTTSProvider
 from .service import TTSService
 
@@ -37,6 +52,12 @@ __all__ = [
     "TTSProvider",
     "TTSConfig",
     "TTSResult",
+    "TTSAudioChunk",
     "TTSError",
     "CosyVoiceTTSProvider",
+    "TTSAudioCache",
+    "TTSSegment",
+    "split_phrases",
+    "pcm_to_wav",
+    "wav_to_pcm",
 ]
@@ -4,9 +4,30 @@
 """
 from __future__ import annotations
 
+import struct
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
+
+WAV_HEADER_BYTES = 44
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """为 16-bit 单声道 PCM 加上标准 44 字节 WAV 头。"""
+    data_size = len(pcm)
+    header = b"".join([
+        b"RIFF", struct.pack("<I", 36 + data_size), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16),
+        b"data", struct.pack("<I", data_size),
+    ])
+    return header + pcm
+
+
+def wav_to_pcm(audio: bytes) -> bytes:
+    """去掉标准 WAV 头，返回 PCM 数据；非 WAV 数据原样返回。"""
+    if audio[:4] == b"RIFF" and audio[8:12] == b"WAVE":
+        return audio[WAV_HEADER_BYTES:]
+    return audio
 
 
 @dataclass
@@ -32,6 +53,23 @@ class TTSResult:
     metadata: Optional[dict[str, Any]] = field(default_factory=dict)
 
 
+@dataclass
+class TTSAudioChunk:
+    """流式合成的音频块。
+
+    Attributes:
+        audio_data: 16-bit 小端单声道 PCM 数据（无WAV头）。
+        sample_rate: 采样率。
+        format: 音频格式，固定为 "pcm_s16le"。
+        index: 本次合成中的块序号（从0开始）。
+    """
+
+    audio_data: bytes
+    sample_rate: int = 22050
+    format: str = "pcm_s16le"
+    index: int = 0
+
+
 @dataclass
 class TTSConfig:
     """TTS 配置项。
@@ -79,6 +117,27 @@ class TTSProvider(ABC):
             TTSError: 合成失败时抛出。
         """
 
+    async def synthesize_stream(
+        self, text: str, config: TTSConfig | None = None
+    ) -> AsyncIterator[TTSAudioChunk]:
+        """流式语音合成，Provider产出音频即返回。
+
+        默认实现退化为整句合成后一次性返回；支持流式的 Provider 应覆盖此方法。
+        消费方提前停止迭代（如用户打断）时，Provider 应尽快终止合成。
+
+        Args:
+            text: 要合成的文本。
+            config: 合成配置，None 表示使用默认值。
+
+        Yields:
+            TTSAudioChunk: PCM 音频块。
+
+        Raises:
+            TTSError: 合成失败时抛出。
+        """
+        result = await self.synthesize(text, config)
+        yield TTSAudioChunk(audio_data=wav_to_pcm(result.audio_data), sample_rate=result.sample_rate)
+
     @abstractmethod
     async def health_check(self) -> bool:
         """健康检查。
@@ -0,0 +1,339 @@
+"""TTS 短语级音频缓存。
+
+指挥回复与预警播报大量重复固定短语（队伍名称、状态确认、预警模板），
+按 (规范化文本, 音色指令, 语速, 采样率) 内容寻址缓存合成结果：
+
+- 内存层：按字节数限制的 LRU
+- 磁盘层：按字节数限制、按访问时间淘汰的文件缓存（可选）
+- 存储格式：16-bit 单声道 PCM + 8 字节头（魔数 + 采样率），不含 WAV 头
+- 请求合并：相同键的并发合成只调用一次 Provider（独立任务执行，首个请求方取消不影响其他等待者）
+
+环境变量::
+
+    TTS_CACHE_ENABLED=true
+    TTS_CACHE_MEMORY_MB=64
+    TTS_CACHE_DIR=/var/cache/frontai/tts     # 不设置则只用内存层
+    TTS_CACHE_DISK_MB=512
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.core.singleflight import SingleFlight
+
+from .base import TTSConfig
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# 短语切分：保留标点在短语末尾
+_PHRASE_RE = re.compile(r"[^，,。！？!?；;：:、\n]+[，,。！？!?；;：:、\n]*")
+_FILE_MAGIC = b"TTSP"
+_FILE_HEADER = struct.Struct("<4sI")
+_FILE_SUFFIX = ".pcm"
+
+
+def normalize_tts_text(text: str) -> str:
+    """缓存键用的文本规范化：NFKC（全角转半角）、去首尾空白、合并连续空白。"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def tts_cache_key(text: str, config: TTSConfig) -> str:
+    """计算缓存键。"""
+    raw = "\x1f".join([
+        normalize_tts_text(text),
+        config.instruct,
+        f"{config.speed:.3f}",
+        str(config.sample_rate),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class TTSSegment:
+    """模板化语句的一个片段。
+
+    Attributes:
+        text: 片段文本。
+        cacheable: 是否读写缓存。固定短语为 True；
+            距离、时间、人数等可变内容为 False，每次重新合成且不入缓存。
+    """
+
+    text: str
+    cacheable: bool = True
+
+
+def split_phrases(text: str) -> List[TTSSegment]:
+    """按分句标点把整句切成短语片段。
+
+    含数字的短语视为可变内容（不入缓存），其余为可复用的固定短语。
+    """
+    segments = []
+    for match in _PHRASE_RE.finditer(text):
+        phrase = match.group(0).strip()
+        if phrase:
+            segments.append(TTSSegment(phrase, cacheable=not any(ch.isdigit() for ch in phrase)))
+    return segments
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    """缓存的音频片段。"""
+
+    pcm: bytes
+    sample_rate: int
+
+
+@dataclass
+class _CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    stores: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        hits = self.memory_hits + self.disk_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
+
+
+class TTSAudioCache:
+    """内存 + 磁盘两级 TTS 音频缓存。
+
+    用法::
+
+        cache = TTSAudioCache(max_memory_bytes=64 << 20, disk_dir="/tmp/tts")
+        audio = await cache.get_or_synthesize(text, config, synthesize_pcm)
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 << 20,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 512 << 20,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+        self._stats = _CacheStats()
+
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk_bytes = 0
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self._disk_dir.glob(f"*/*{_FILE_SUFFIX}"))
+
+    @classmethod
+    def from_env(cls) -> Optional["TTSAudioCache"]:
+        """按环境变量创建缓存，TTS_CACHE_ENABLED=false 时返回 None。"""
+        if os.getenv("TTS_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        try:
+            memory_mb = float(os.getenv("TTS_CACHE_MEMORY_MB", "64"))
+            disk_mb = float(os.getenv("TTS_CACHE_DISK_MB", "512"))
+        except ValueError:
+            memory_mb, disk_mb = 64.0, 512.0
+        return cls(
+            max_memory_bytes=int(memory_mb * (1 << 20)),
+            disk_dir=os.getenv("TTS_CACHE_DIR") or None,
+            max_disk_bytes=int(disk_mb * (1 << 20)),
+        )
+
+    # ---------- 内存层 ----------
+
+    def _memory_get(self, key: str) -> Optional[CachedAudio]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+            return audio
+
+    def _memory_put(self, key: str, audio: CachedAudio) -> None:
+        size = len(audio.pcm)
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old.pcm)
+            self._memory[key] = audio
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.pcm)
+                self._stats.memory_evictions += 1
+
+    # ---------- 磁盘层 ----------
+
+    def _disk_path(self, key: str) -> Path:
+        assert self._disk_dir is not None
+        return self._disk_dir / key[:2] / f"{key}{_FILE_SUFFIX}"
+
+    def _disk_read(self, key: str) -> Optional[CachedAudio]:
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if len(data) < _FILE_HEADER.size:
+            return None
+        magic, sample_rate = _FILE_HEADER.unpack_from(data)
+        if magic != _FILE_MAGIC:
+            return None
+        try:
+            os.utime(path)  # 刷新访问时间，供淘汰使用
+        except OSError:
+            pass
+        return CachedAudio(pcm=data[_FILE_HEADER.size:], sample_rate=sample_rate)
+
+    def _disk_write(self, key: str, audio: CachedAudio) -> None:
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(_FILE_HEADER.pack(_FILE_MAGIC, audio.sample_rate) + audio.pcm)
+        existed = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._disk_bytes += _FILE_HEADER.size + len(audio.pcm) - existed
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """按最后访问时间淘汰，直到低于容量的90%。"""
+        assert self._disk_dir is not None
+        files = []
+        for path in self._disk_dir.glob(f"*/*{_FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self._stats.disk_evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    # ---------- 对外接口 ----------
+
+    async def get(self, text: str, config: TTSConfig) -> Optional[CachedAudio]:
+        """查询缓存（不统计未命中）。"""
+        key = tts_cache_key(text, config)
+        audio = self._memory_get(key)
+        if audio is not None:
+            self._stats.memory_hits += 1
+            return audio
+        if self._disk_dir is None:
+            return None
+        try:
+            audio = await asyncio.to_thread(self._disk_read, key)
+        except Exception as e:
+            logger.warning(f"TTS磁盘缓存读取失败: {e}")
+            return None
+        if audio is not None:
+            self._stats.disk_hits += 1
+            self._memory_put(key, audio)
+        return audio
+
+    async def put(self, text: str, config: TTSConfig, audio: CachedAudio) -> None:
+        """写入缓存（内存 + 磁盘）。"""
+        if not audio.pcm:
+            return
+        key = tts_cache_key(text, config)
+        self._memory_put(key, audio)
+        self._stats.stores += 1
+        if self._disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._disk_write, key, audio)
+            except Exception as e:
+                logger.warning(f"TTS磁盘缓存写入失败: {e}")
+
+    async def get_or_synthesize(
+        self,
+        text: str,
+        config: TTSConfig,
+        synthesize: Callable[[], Awaitable[CachedAudio]],
+        store: bool = True,
+    ) -> Tuple[CachedAudio, bool]:
+        """查询缓存，未命中时合成（相同键的并发请求合并为一次）。
+
+        Args:
+            text: 文本。
+            config: 合成配置。
+            synthesize: 未命中时调用的合成函数。
+            store: 合成结果是否写入缓存（可变内容传 False）。
+
+        Returns:
+            (音频, 是否命中缓存)
+        """
+        cached = await self.get(text, config)
+        if cached is not None:
+            return cached, True
+
+        key = tts_cache_key(text, config)
+        if self._inflight.pending(key):
+            self._stats.coalesced += 1
+            return await self._inflight.run(key, synthesize), True
+
+        self._stats.misses += 1
+
+        async def _synthesize_and_store() -> CachedAudio:
+            # 写缓存放在合并任务内：发起者被取消时结果仍会缓存
+            audio = await synthesize()
+            if store:
+                await self.put(text, config, audio)
+            return audio
+
+        return await self._inflight.run(key, _synthesize_and_store), False
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """命中率等统计。"""
+        with self._lock:
+            result = self._stats.to_dict()
+            result.update({
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_enabled": self._disk_dir is not None,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+            })
+        return result
@@ -6,24 +6,26 @@
 from __future__ import annotations
 
 import asyncio
-import io
 import logging
 import os
 import queue
-import struct
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Optional
+from typing import AsyncIterator, Callable, Optional
 
 import numpy as np
 
-from .base import TTSConfig, TTSError, TTSProvider, TTSResult
+from .base import TTSAudioChunk, TTSConfig, TTSError, TTSProvider, TTSResult, pcm_to_wav
 
 logger = logging.getLogger(__name__)
 
 # 线程池用于执行同步的 Triton 调用
 _executor = ThreadPoolExecutor(max_workers=4)
 
+# 等待流式响应时检查取消标记的间隔（秒）
+_CANCEL_POLL_SECONDS = 0.1
+
 
 class CosyVoiceTTSProvider(TTSProvider):
     """CosyVoice TensorRT-LLM TTS 提供方。
@@ -58,6 +60,9 @@ class CosyVoiceTTSProvider(TTSProvider):
                 self._timeout_seconds = 30.0
 
         self._client = None
+        # 流式请求用的客户端池：一个Triton客户端同一时间只能有一条stream
+        self._stream_clients: queue.SimpleQueue = queue.SimpleQueue()
+        self._all_stream_clients: list = []
 
         logger.info(
             "CosyVoice TTS初始化完成",
@@ -90,19 +95,44 @@ class CosyVoiceTTSProvider(TTSProvider):
                 )
         return self._client
 
-    def _stream_tts_sync(self, text: str) -> tuple[bytes, int]:
-        """同步流式 TTS（在线程池中执行）。
+    def _acquire_stream_client(self):
+        """从池中取出空闲客户端，池空时新建。"""
+        try:
+            return self._stream_clients.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            import tritonclient.grpc as grpcclient
+            client = grpcclient.InferenceServerClient(url=self._url)
+        except Exception as e:
+            raise TTSError(
+                message=f"无法创建Triton客户端: {e}",
+                provider=self.name,
+                cause=e,
+            )
+        self._all_stream_clients.append(client)
+        return client
+
+    def _run_stream_sync(
+        self,
+        text: str,
+        on_chunk: Callable[[np.ndarray], None],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> int:
+        """同步流式 TTS 核心循环（在线程池中执行）。
+
+        每收到一个音频块即调用 on_chunk；cancel_event 被设置时尽快停止。
 
         Returns:
-            tuple: (WAV音频数据, 首包延迟ms)
+            int: 首包延迟ms
         """
         import tritonclient.grpc as grpcclient
 
-        client = self._get_client()
-        audio_chunks = []
+        client = self._acquire_stream_client()
         result_queue = queue.Queue()
         first_chunk_time = None
         start_time = time.time()
+        received = 0
 
         def _callback(result, error):
             nonlocal first_chunk_time
@@ -126,91 +156,84 @@ class CosyVoiceTTSProvider(TTSProvider):
                 request_id=str(int(time.time() * 1000)),
             )
 
-            # 接收流式响应
+            # 接收流式响应（超时按单条消息计算）
+            deadline = time.time() + self._timeout_seconds
             while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("CosyVoice TTS合成已取消")
+                    break
                 try:
-                    msg_type, data = result_queue.get(timeout=self._timeout_seconds)
-                    if msg_type == "error":
-                        raise TTSError(
-                            message=f"Triton TTS错误: {data}",
-                            provider=self.name,
-                        )
-
-                    # 检查是否是最终响应
-                    response = data.get_response()
-                    params = response.parameters
-                    if "triton_final_response" in params:
-                        if params["triton_final_response"].bool_param:
-                            break
-
-                    # 获取音频数据
-                    try:
-                        audio = data.as_numpy("audio")
-                        if audio is not None and len(audio) > 0:
-                            audio_chunks.append(audio.flatten())
-                    except Exception:
-                        pass  # 可能没有音频输出
-
+                    msg_type, data = result_queue.get(timeout=_CANCEL_POLL_SECONDS)
                 except queue.Empty:
-                    logger.warning("Triton TTS响应超时")
-                    break
+                    if time.time() >= deadline:
+                        logger.warning("Triton TTS响应超时")
+                        break
+                    continue
+                deadline = time.time() + self._timeout_seconds
+
+                if msg_type == "error":
+                    raise TTSError(
+                        message=f"Triton TTS错误: {data}",
+                        provider=self.name,
+                    )
+
+                # 检查是否是最终响应
+                response = data.get_response()
+                params = response.parameters
+                if "triton_final_response" in params:
+                    if params["triton_final_response"].bool_param:
+                        break
+
+                # 获取音频数据
+                try:
+                    audio = data.as_numpy("audio")
+                    if audio is not None and len(audio) > 0:
+                        on_chunk(audio.flatten())
+                        received += 1
+                except Exception:
+                    pass  # 可能没有音频输出
 
         finally:
             client.stop_stream()
+            self._stream_clients.put(client)
 
-        if not audio_chunks:
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if received == 0 and not cancelled:
             raise TTSError(
                 message="CosyVoice返回空音频数据",
                 provider=self.name,
             )
 
+        return int((first_chunk_time - start_time) * 1000) if first_chunk_time else 0
+
+    def _stream_tts_sync(self, text: str) -> tuple[bytes, int]:
+        """同步流式 TTS（在线程池中执行），收齐后合并为WAV。
+
+        Returns:
+            tuple: (WAV音频数据, 首包延迟ms)
+        """
+        audio_chunks: list[np.ndarray] = []
+        first_latency_ms = self._run_stream_sync(text, audio_chunks.append)
+
         # 合并音频块
         full_audio = np.concatenate(audio_chunks)
-        first_latency_ms = int((first_chunk_time - start_time) * 1000) if first_chunk_time else 0
 
         # 转换为 WAV 格式
         wav_data = self._numpy_to_wav(full_audio)
 
         return wav_data, first_latency_ms
 
-    def _numpy_to_wav(self, audio: np.ndarray) -> bytes:
-        """将 numpy 音频数组转换为 WAV 格式。"""
-        # 归一化到 int16
+    @staticmethod
+    def _to_int16(audio: np.ndarray) -> np.ndarray:
+        """归一化到 int16。"""
         if audio.dtype == np.float32 or audio.dtype == np.float64:
             audio = np.clip(audio, -1.0, 1.0)
-            audio_int16 = (audio * 32767).astype(np.int16)
-        else:
-            audio_int16 = audio.astype(np.int16)
-
-        # 构建 WAV 头
-        num_samples = len(audio_int16)
-        bytes_per_sample = 2
-        num_channels = 1
-        data_size = num_samples * bytes_per_sample * num_channels
-
-        wav_buffer = io.BytesIO()
-
-        # RIFF 头
-        wav_buffer.write(b'RIFF')
-        wav_buffer.write(struct.pack('<I', 36 + data_size))
-        wav_buffer.write(b'WAVE')
-
-        # fmt 块
-        wav_buffer.write(b'fmt ')
-        wav_buffer.write(struct.pack('<I', 16))  # fmt chunk size
-        wav_buffer.write(struct.pack('<H', 1))   # PCM format
-        wav_buffer.write(struct.pack('<H', num_channels))
-        wav_buffer.write(struct.pack('<I', self._sample_rate))
-        wav_buffer.write(struct.pack('<I', self._sample_rate * num_channels * bytes_per_sample))
-        wav_buffer.write(struct.pack('<H', num_channels * bytes_per_sample))
-        wav_buffer.write(struct.pack('<H', 8 * bytes_per_sample))
-
-        # data 块
-        wav_buffer.write(b'data')
-        wav_buffer.write(struct.pack('<I', data_size))
-        wav_buffer.write(audio_int16.tobytes())
-
-        return wav_buffer.getvalue()
+            return (audio * 32767).astype(np.int16)
+        return audio.astype(np.int16)
+
+    def _numpy_to_wav(self, audio: np.ndarray) -> bytes:
+        """将 numpy 音频数组转换为 WAV 格式。"""
+        return pcm_to_wav(self._to_int16(audio).astype("<i2").tobytes(), self._sample_rate)
 
     async def synthesize(
         self, text: str, config: TTSConfig | None = None
@@ -279,6 +302,55 @@ class CosyVoiceTTSProvider(TTSProvider):
         )
         return result
 
+    async def synthesize_stream(
+        self, text: str, config: TTSConfig | None = None
+    ) -> AsyncIterator[TTSAudioChunk]:
+        """流式合成：Triton每返回一个音频块立即产出 PCM。
+
+        迭代被提前关闭（用户打断/任务取消）时设置取消标记，
+        工作线程在下一个轮询周期停止接收并关闭流。
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue[Optional[np.ndarray]] = asyncio.Queue()
+        cancel_event = threading.Event()
+
+        def _on_chunk(audio: np.ndarray) -> None:
+            loop.call_soon_threadsafe(chunks.put_nowait, audio)
+
+        logger.info(
+            "CosyVoice TTS开始流式合成",
+            extra={"url": self._url, "text_length": len(text)},
+        )
+        future = loop.run_in_executor(_executor, self._run_stream_sync, text, _on_chunk, cancel_event)
+        future.add_done_callback(lambda _: chunks.put_nowait(None))
+        # 提前关闭迭代时不再await，先标记异常已读取，避免未处理异常告警
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        index = 0
+        try:
+            while True:
+                audio = await chunks.get()
+                if audio is None:
+                    break
+                yield TTSAudioChunk(
+                    audio_data=self._to_int16(audio).astype("<i2").tobytes(),
+                    sample_rate=self._sample_rate,
+                    index=index,
+                )
+                index += 1
+            try:
+                await future
+            except TTSError:
+                raise
+            except Exception as e:
+                raise TTSError(
+                    message=f"CosyVoice流式合成失败: {e}",
+                    provider=self.name,
+                    cause=e,
+                ) from e
+        finally:
+            cancel_event.set()
+
     async def health_check(self) -> bool:
         """健康检查：检查 Triton 服务是否可用。"""
         try:
@@ -296,9 +368,14 @@ class CosyVoiceTTSProvider(TTSProvider):
 
     async def close(self) -> None:
         """关闭客户端。"""
+        clients = self._all_stream_clients
+        self._all_stream_clients = []
+        self._stream_clients = queue.SimpleQueue()
         if self._client is not None:
+            clients = clients + [self._client]
+            self._client = None
+        for client in clients:
             try:
-                self._client.close()
+                client.close()
             except Exception:
                 pass
-            self._client = None
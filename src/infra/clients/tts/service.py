@@ -1,13 +1,17 @@
 """TTS服务封装层。
 
 提供简洁的API，封装TTS Provider的复杂性。
+WAV 合成结果经短语级音频缓存（见 cache.py），重复短语不再重复合成。
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional, Sequence
 
-from .base import TTSConfig, TTSResult, TTSError
+from .base import TTSAudioChunk, TTSConfig, TTSResult, TTSError, pcm_to_wav, wav_to_pcm
+from .cache import CachedAudio, TTSAudioCache, TTSSegment, split_phrases
 from .cosyvoice_provider import CosyVoiceTTSProvider
 
 logger = logging.getLogger(__name__)
@@ -26,18 +30,32 @@ class TTSService:
         with open("output.wav", "wb") as f:
             f.write(result.audio_data)
 
+        # 固定短语走缓存，含数字的可变短语实时合成后拼接
+        result = await tts.synthesize_phrases("当前位置距火灾区域350米，请及时处置")
+
         await tts.close()
     """
 
-    def __init__(self, provider: Optional[CosyVoiceTTSProvider] = None) -> None:
+    def __init__(
+        self,
+        provider: Optional[CosyVoiceTTSProvider] = None,
+        cache: Optional[TTSAudioCache] = None,
+        enable_cache: bool = True,
+    ) -> None:
         """初始化TTS服务。
 
         Args:
             provider: TTS Provider实例，默认创建CosyVoice Provider。
+            cache: 音频缓存，默认按环境变量创建（TTS_CACHE_*）。
+            enable_cache: 是否启用缓存。
         """
         self._provider = provider or CosyVoiceTTSProvider()
+        self._cache = (cache or TTSAudioCache.from_env()) if enable_cache else None
         self._healthy: bool = True
-        logger.info("TTS服务创建完成", extra={"provider": self._provider.name})
+        logger.info(
+            "TTS服务创建完成",
+            extra={"provider": self._provider.name, "cache_enabled": self._cache is not None},
+        )
 
     @property
     def provider_name(self) -> str:
@@ -49,6 +67,18 @@ class TTSService:
         """获取服务健康状态。"""
         return self._healthy
 
+    @property
+    def cache_stats(self) -> Optional[dict]:
+        """音频缓存统计（命中率等），未启用缓存时为None。"""
+        return self._cache.stats if self._cache is not None else None
+
+    def _cache_usable(self, config: TTSConfig) -> bool:
+        return self._cache is not None and config.format == "wav"
+
+    async def _synthesize_pcm(self, text: str, config: TTSConfig) -> CachedAudio:
+        result = await self._synthesize_uncached(text, config)
+        return CachedAudio(pcm=wav_to_pcm(result.audio_data), sample_rate=result.sample_rate)
+
     async def synthesize(
         self,
         text: str,
@@ -61,11 +91,96 @@ class TTSService:
             config: 合成配置，None使用默认配置。
 
         Returns:
-            TTSResult: 合成结果。
+            TTSResult: 合成结果（metadata["cache_hit"] 标记是否命中缓存）。
 
         Raises:
             TTSError: 合成失败时抛出。
         """
+        cfg = config or TTSConfig()
+        if not self._cache_usable(cfg):
+            return await self._synthesize_uncached(text, cfg)
+
+        start_ts = time.time()
+        audio, hit = await self._cache.get_or_synthesize(
+            text, cfg, lambda: self._synthesize_pcm(text, cfg),
+        )
+        return self._build_result(audio, start_ts, cache_hit=hit)
+
+    def _build_result(self, audio: CachedAudio, start_ts: float, **metadata: object) -> TTSResult:
+        return TTSResult(
+            audio_data=pcm_to_wav(audio.pcm, audio.sample_rate),
+            format="wav",
+            sample_rate=audio.sample_rate,
+            duration_ms=int(len(audio.pcm) / 2 / audio.sample_rate * 1000),
+            provider=self._provider.name,
+            latency_ms=int((time.time() - start_ts) * 1000),
+            metadata=dict(metadata),
+        )
+
+    async def synthesize_segments(
+        self,
+        segments: Sequence[TTSSegment],
+        config: TTSConfig | None = None,
+        gap_ms: int = 60,
+    ) -> TTSResult:
+        """按片段合成并拼接为一段WAV。
+
+        可缓存片段命中缓存直接复用，其余片段并发合成；片段间插入 gap_ms 静音。
+
+        Args:
+            segments: 片段列表。
+            config: 合成配置（须为wav格式）。
+            gap_ms: 片段间静音时长（毫秒）。
+
+        Returns:
+            TTSResult: 拼接后的合成结果，metadata 含片段数与命中数。
+        """
+        cfg = config or TTSConfig()
+        segments = [seg for seg in segments if seg.text.strip()]
+        if not segments:
+            raise TTSError(message="合成文本不能为空", provider=self._provider.name)
+        if cfg.format != "wav":
+            raise TTSError(message="片段拼接仅支持wav格式", provider=self._provider.name)
+
+        start_ts = time.time()
+
+        async def _one(segment: TTSSegment) -> tuple[CachedAudio, bool]:
+            if self._cache is None:
+                return await self._synthesize_pcm(segment.text, cfg), False
+            return await self._cache.get_or_synthesize(
+                segment.text, cfg, lambda: self._synthesize_pcm(segment.text, cfg),
+                store=segment.cacheable,
+            )
+
+        results = await asyncio.gather(*(_one(seg) for seg in segments))
+
+        sample_rate = results[0][0].sample_rate
+        silence = b"\x00\x00" * int(sample_rate * gap_ms / 1000)
+        parts = []
+        for i, (audio, _) in enumerate(results):
+            if audio.sample_rate != sample_rate:
+                raise TTSError(message="片段采样率不一致，无法拼接", provider=self._provider.name)
+            if i:
+                parts.append(silence)
+            parts.append(audio.pcm)
+
+        return self._build_result(
+            CachedAudio(pcm=b"".join(parts), sample_rate=sample_rate),
+            start_ts,
+            segments=len(segments),
+            segment_cache_hits=sum(1 for _, hit in results if hit),
+        )
+
+    async def synthesize_phrases(
+        self,
+        text: str,
+        config: TTSConfig | None = None,
+        gap_ms: int = 60,
+    ) -> TTSResult:
+        """按分句标点切成短语后合成拼接（固定短语走缓存，含数字的短语实时合成）。"""
+        return await self.synthesize_segments(split_phrases(text), config, gap_ms=gap_ms)
+
+    async def _synthesize_uncached(self, text: str, config: TTSConfig | None) -> TTSResult:
         if not text or not text.strip():
             raise TTSError(message="合成文本不能为空", provider=self._provider.name)
 
@@ -84,6 +199,56 @@ class TTSService:
                 cause=e,
             ) from e
 
+    async def synthesize_stream(
+        self,
+        text: str,
+        config: TTSConfig | None = None,
+    ) -> AsyncIterator[TTSAudioChunk]:
+        """流式语音合成，Provider产出音频块即返回。
+
+        Args:
+            text: 要合成的文本。
+            config: 合成配置，None使用默认配置。
+
+        Yields:
+            TTSAudioChunk: PCM音频块。
+
+        Raises:
+            TTSError: 合成失败时抛出。
+        """
+        if not text or not text.strip():
+            raise TTSError(message="合成文本不能为空", provider=self._provider.name)
+
+        cfg = config or TTSConfig()
+        if self._cache_usable(cfg):
+            cached = await self._cache.get(text, cfg)
+            if cached is not None:
+                yield TTSAudioChunk(audio_data=cached.pcm, sample_rate=cached.sample_rate)
+                return
+
+        collected: list[bytes] = []
+        sample_rate = cfg.sample_rate
+        try:
+            async for chunk in self._provider.synthesize_stream(text, cfg):
+                collected.append(chunk.audio_data)
+                sample_rate = chunk.sample_rate
+                yield chunk
+            self._healthy = True
+        except TTSError:
+            self._healthy = False
+            raise
+        except Exception as e:
+            self._healthy = False
+            raise TTSError(
+                message=f"TTS流式合成失败: {e}",
+                provider=self._provider.name,
+                cause=e,
+            ) from e
+
+        # 完整合成（未被打断）后写入缓存
+        if self._cache_usable(cfg) and collected:
+            await self._cache.put(text, cfg, CachedAudio(pcm=b"".join(collected), sample_rate=sample_rate))
+
     async def synthesize_to_base64(
         self,
         text: str,
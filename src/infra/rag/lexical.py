@@ -0,0 +1,114 @@
+"""本地词法检索：BM25 倒排索引 + 与向量检索结果的 RRF 融合。
+- 分词：字母数字编码（如 GB/T29639-2020、EN4003、IV级中的 IV）整体保留为一个词，其余中文用 jieba 搜索模式切分。
+- 向量检索对精确编码不敏感，词法检索补足“按编号找条文”的场景。
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 字母数字编码：内部允许 - / . 连接，整体作为一个词
+_CODE_RE = re.compile(r"[A-Za-z0-9]+(?:[\-/.][A-Za-z0-9]+)*")
+_PUNCT_RE = re.compile(r"^[\W_]+$")
+
+
+def tokenize(text: str) -> List[str]:
+    """编码整体保留（小写），其余文本 jieba 搜索模式切分，去掉空白与标点。"""
+    import jieba  # 延迟导入，词典加载较慢
+
+    tokens: List[str] = []
+    pos = 0
+    for m in _CODE_RE.finditer(text):
+        if m.start() > pos:
+            tokens.extend(jieba.lcut_for_search(text[pos:m.start()]))
+        tokens.append(m.group().lower())
+        pos = m.end()
+    if pos < len(text):
+        tokens.extend(jieba.lcut_for_search(text[pos:]))
+    return [t for t in (tok.strip() for tok in tokens) if t and not _PUNCT_RE.match(t)]
+
+
+class BM25Index:
+    """BM25 倒排索引（Okapi BM25，只遍历查询词的倒排表）。"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._docs: List[Tuple[str, dict]] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[str, str, dict]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """由 (id, 文本, payload) 构建索引。"""
+        index = cls(k1=k1, b=b)
+        for doc_id, text, payload in docs:
+            index._add(doc_id, text, payload)
+        index._finalize()
+        return index
+
+    def _add(self, doc_id: str, text: str, payload: dict) -> None:
+        idx = len(self._ids)
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, tf in counts.items():
+            self._postings.setdefault(tok, []).append((idx, tf))
+        self._ids.append(doc_id)
+        self._positions[doc_id] = idx
+        self._docs.append((text, payload))
+        self._lengths.append(len(tokens))
+
+    def _finalize(self) -> None:
+        n = len(self._ids)
+        self._avgdl = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            tok: math.log(1.0 + (n - len(post) + 0.5) / (len(post) + 0.5))
+            for tok, post in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """返回 (id, BM25分数)，按分数降序。"""
+        if not self._ids:
+            return []
+        scores: Dict[int, float] = {}
+        k1, b, avgdl = self.k1, self.b, self._avgdl or 1.0
+        for tok in set(tokenize(query)):
+            idf = self._idf.get(tok)
+            if idf is None:
+                continue
+            for idx, tf in self._postings[tok]:
+                norm = tf + k1 * (1 - b + b * self._lengths[idx] / avgdl)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (k1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+        return [(self._ids[idx], score) for idx, score in ranked]
+
+    def document(self, doc_id: str) -> Optional[Tuple[str, dict]]:
+        """按 id 取文本与 payload（融合时补全仅词法命中的文档）。"""
+        idx = self._positions.get(doc_id)
+        return self._docs[idx] if idx is not None else None
+
+
+def rrf_fuse(
+    rankings: Sequence[Sequence[str]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = 60,
+) -> List[Tuple[str, float]]:
+    """加权倒数排名融合：score(d) = Σ w_i / (k + rank_i(d))，rank 从1开始。"""
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
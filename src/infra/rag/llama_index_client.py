@@ -1,24 +1,77 @@
 """RAG 封装：使用 OpenAIEmbeddings + QdrantClient.query_points，兼容本地自定义 embedding。
 - 不依赖 qdrant_client.search 方法，适配新版客户端。
 - 检索为空或异常时直接抛错，不做降级。
+- 异步批量检索：多个子问题一次 embedding 请求 + 一次 query_batch_points，不阻塞事件循环。
+- 查询向量按规范化文本缓存（EmbeddingLRU，与语音路由共用），同步 embed_query 与批量 aembed_documents
+  的向量分开缓存；可选本地 BM25 词法索引，与向量排名做 RRF 融合（精确匹配应急编码/条文编号）。
+- 检索结果 payload 附带 Qdrant 点 ID（POINT_ID_KEY），payload 本身缺少业务 ID 时可回退使用。
+- get_rag 按集合返回共享实例（共用向量缓存），应用关闭时 close_rag 关闭异步客户端。
+
+环境变量::
+
+    RAG_EMBEDDING_CACHE_SIZE=2048
+    RAG_LEXICAL_ENABLED=false
+    RAG_LEXICAL_WEIGHT=1.0
 """
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import logging
-from typing import List, Tuple
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 
-from src.infra.settings import Settings
+from src.core.embedding_cache import EmbeddingLRU
+from src.infra.settings import Settings, load_settings
+from .lexical import BM25Index, rrf_fuse
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "2048"))
+LEXICAL_ENABLED = os.environ.get("RAG_LEXICAL_ENABLED", "false").lower() in ("1", "true", "yes")
+LEXICAL_WEIGHT = float(os.environ.get("RAG_LEXICAL_WEIGHT", "1.0"))
+
+# 融合时向量/词法各取 top_k * 该倍数个候选
+_FUSION_CANDIDATE_FACTOR = 4
+_SCROLL_PAGE_SIZE = 256
+
+# 缓存命名空间：embed_query 与 embed_documents 对部分模型产出不同向量，不能互相命中
+_QUERY_MODE = "query"
+_DOCUMENT_MODE = "document"
+
+# 检索结果 payload 中附带的 Qdrant 点 ID
+POINT_ID_KEY = "point_id"
+
+
+def _hit(point_id: Any, score: float, payload: Optional[dict]) -> Tuple[str, float, dict]:
+    """检索命中 -> (文本, 分数, 附带点 ID 的 payload 副本)"""
+    data = {**(payload or {}), POINT_ID_KEY: str(point_id)}
+    return data.get("text", ""), score, data
+
 
 class LlamaIndexRag:
     """RAG 检索封装（类名保持兼容）。"""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        embeddings: Optional[Any] = None,
+        client: Optional[QdrantClient] = None,
+        aclient: Optional[AsyncQdrantClient] = None,
+        lexical: Optional[bool] = None,
+        cache: Optional[EmbeddingLRU] = None,
+    ) -> None:
+        """
+        Args:
+            embeddings: 自定义 embedding（需提供 embed_query / aembed_documents），默认 OpenAIEmbeddings
+            client / aclient: 自定义同步/异步 Qdrant 客户端（测试可传入 location=":memory:" 的客户端）
+            lexical: 是否启用本地 BM25 融合，默认 RAG_LEXICAL_ENABLED
+            cache: 查询向量缓存，同一 embedding 模型的多个实例可共用，默认每实例一个
+        """
         self._settings = settings
         logger.info(
             "初始化 RAG",
@@ -29,18 +82,27 @@ class LlamaIndexRag:
                 "collection": settings.qdrant_collection,
             },
         )
-        self._embeddings = OpenAIEmbeddings(
+        self._embeddings = embeddings or OpenAIEmbeddings(
             model=settings.embedding_model,
             base_url=settings.embedding_base_url,
             api_key=settings.embedding_api_key,
         )
-        self._client = QdrantClient(
+        self._client = client or QdrantClient(
+            url=settings.qdrant_url,
+            api_key=settings.qdrant_api_key,
+            prefer_grpc=False,
+        )
+        self._aclient = aclient or AsyncQdrantClient(
             url=settings.qdrant_url,
             api_key=settings.qdrant_api_key,
             prefer_grpc=False,
         )
         self._collection = settings.qdrant_collection
         self._top_k = settings.rag_top_k
+        self._cache = cache if cache is not None else EmbeddingLRU(EMBEDDING_CACHE_SIZE)
+        self._lexical_enabled = LEXICAL_ENABLED if lexical is None else lexical
+        self._lexical: Optional[BM25Index] = None
+        self._lexical_lock = asyncio.Lock()
 
     def similarity_search(self, query: str) -> List[Tuple[str, float, dict]]:
         """执行向量检索，返回文本、分数与元数据。"""
@@ -48,7 +110,10 @@ class LlamaIndexRag:
             "执行 RAG 检索",
             extra={"collection": self._collection, "top_k": self._top_k},
         )
-        vector = self._embeddings.embed_query(query)
+        vector = self._cache.get(query, _QUERY_MODE)
+        if vector is None:
+            vector = self._embeddings.embed_query(query)
+            self._cache.put(query, vector, _QUERY_MODE)
         res = self._client.query_points(
             collection_name=self._collection,
             query=vector,
@@ -58,9 +123,173 @@ class LlamaIndexRag:
         points = res.points
         if not points:
             raise RuntimeError("向量检索为空，拒绝继续")
-        results: List[Tuple[str, float, dict]] = []
+        return [_hit(pt.id, float(pt.score or 0.0), pt.payload) for pt in points]
+
+    async def asimilarity_search(self, query: str) -> List[Tuple[str, float, dict]]:
+        """异步单条检索（asimilarity_search_many 的单查询形式）。"""
+        return (await self.asimilarity_search_many([query]))[0]
+
+    async def asimilarity_search_many(
+        self,
+        queries: Sequence[str],
+        top_k: Optional[int] = None,
+        query_filter: Optional[models.Filter] = None,
+        allow_empty: bool = False,
+    ) -> List[List[Tuple[str, float, dict]]]:
+        """
+        异步批量检索，结果与 queries 一一对应
+
+        - 未命中缓存的查询去重后一次 aembed_documents
+        - 全部查询一次 query_batch_points
+        - 启用词法融合时分数为 RRF 融合分，否则为向量相似度；
+          带 query_filter 时不做融合（本地词法索引不支持 payload 过滤）
+        任一查询检索为空直接抛错，与同步接口一致；allow_empty=True 时返回空列表
+        """
+        if not queries:
+            return []
+        limit = top_k or self._top_k
+        logger.info(
+            "执行 RAG 批量检索",
+            extra={"collection": self._collection, "top_k": limit, "queries": len(queries)},
+        )
+        vectors = await self._aembed(queries)
+
+        lexical = await self._ensure_lexical_index() if self._lexical_enabled and query_filter is None else None
+        candidates = limit * _FUSION_CANDIDATE_FACTOR if lexical is not None else limit
+        responses = await self._aclient.query_batch_points(
+            collection_name=self._collection,
+            requests=[
+                models.QueryRequest(query=vector, filter=query_filter, limit=candidates, with_payload=True)
+                for vector in vectors
+            ],
+        )
+
+        batch: List[List[Tuple[str, float, dict]]] = []
+        for query, res in zip(queries, responses):
+            points = res.points
+            if lexical is not None:
+                results = self._fuse(query, points, lexical, limit, candidates)
+            else:
+                results = [_hit(pt.id, float(pt.score or 0.0), pt.payload) for pt in points[:limit]]
+            if not results and not allow_empty:
+                raise RuntimeError(f"向量检索为空，拒绝继续: {query[:50]}")
+            batch.append(results)
+        return batch
+
+    async def _aembed(self, queries: Sequence[str]) -> List[List[float]]:
+        """查询向量：缓存命中直接取，未命中的文本去重后一次批量请求。"""
+        vectors: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for query in dict.fromkeys(queries):
+            cached = self._cache.get(query, _DOCUMENT_MODE)
+            if cached is None:
+                missing.append(query)
+            else:
+                vectors[query] = cached
+        if missing:
+            embedded = await self._embeddings.aembed_documents(missing)
+            for query, vector in zip(missing, embedded):
+                self._cache.put(query, vector, _DOCUMENT_MODE)
+                vectors[query] = vector
+        return [vectors[query] for query in queries]
+
+    def _fuse(
+        self,
+        query: str,
+        points: Sequence[Any],
+        lexical: BM25Index,
+        limit: int,
+        candidates: int,
+    ) -> List[Tuple[str, float, dict]]:
+        """向量排名与 BM25 排名做 RRF 融合，仅词法命中的文档从本地索引补全文本。"""
+        docs: Dict[str, Tuple[str, dict]] = {}
+        vector_ranking: List[str] = []
         for pt in points:
             payload = dict(pt.payload or {})
-            text = payload.get("text", "")
-            results.append((text, float(pt.score or 0.0), payload))
+            doc_id = str(pt.id)
+            docs[doc_id] = (payload.get("text", ""), payload)
+            vector_ranking.append(doc_id)
+        lexical_ranking = [doc_id for doc_id, _ in lexical.search(query, candidates)]
+
+        results: List[Tuple[str, float, dict]] = []
+        for doc_id, score in rrf_fuse([vector_ranking, lexical_ranking], [1.0, LEXICAL_WEIGHT]):
+            doc = docs.get(doc_id) or lexical.document(doc_id)
+            if doc is None:
+                continue
+            results.append(_hit(doc_id, score, doc[1]))
+            if len(results) >= limit:
+                break
         return results
+
+    async def _ensure_lexical_index(self) -> BM25Index:
+        if self._lexical is None:
+            async with self._lexical_lock:
+                if self._lexical is None:
+                    self._lexical = await self.build_lexical_index()
+        return self._lexical
+
+    async def build_lexical_index(self) -> BM25Index:
+        """
+        分页 scroll 整个集合构建 BM25 索引（集合内容变化后可再次调用刷新）
+
+        分词在线程池执行，不阻塞事件循环
+        """
+        docs: List[Tuple[str, str, dict]] = []
+        offset = None
+        while True:
+            records, offset = await self._aclient.scroll(
+                collection_name=self._collection,
+                limit=_SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for rec in records:
+                payload = dict(rec.payload or {})
+                docs.append((str(rec.id), payload.get("text", ""), payload))
+            if offset is None:
+                break
+        index = await asyncio.to_thread(BM25Index.build, docs)
+        self._lexical = index
+        logger.info("RAG 词法索引构建完成", extra={"collection": self._collection, "docs": len(index)})
+        return index
+
+    async def collection_names(self) -> List[str]:
+        """列出 Qdrant 中的全部集合名。"""
+        response = await self._aclient.get_collections()
+        return [c.name for c in response.collections]
+
+    async def aclose(self) -> None:
+        """关闭异步客户端。"""
+        await self._aclient.close()
+
+
+_instances: Dict[str, LlamaIndexRag] = {}
+_instances_lock = threading.Lock()
+_shared_cache: Optional[EmbeddingLRU] = None
+
+
+def get_rag(collection: Optional[str] = None) -> LlamaIndexRag:
+    """获取集合对应的 RAG 实例（单例，缺省为 QDRANT_COLLECTION），各集合共用查询向量缓存"""
+    global _shared_cache
+    settings = load_settings()
+    name = collection or settings.qdrant_collection
+    rag = _instances.get(name)
+    if rag is None:
+        with _instances_lock:
+            rag = _instances.get(name)
+            if rag is None:
+                if _shared_cache is None:
+                    _shared_cache = EmbeddingLRU(EMBEDDING_CACHE_SIZE)
+                rag = LlamaIndexRag(dataclasses.replace(settings, qdrant_collection=name), cache=_shared_cache)
+                _instances[name] = rag
+    return rag
+
+
+async def close_rag() -> None:
+    """关闭全部 RAG 实例的异步客户端"""
+    with _instances_lock:
+        instances = list(_instances.values())
+        _instances.clear()
+    for rag in instances:
+        await rag.aclose()
@@ -135,18 +135,47 @@ async def startup_event():
     from src.domains.movement_simulation import get_movement_manager
     await get_movement_manager()
     logger.info("Movement simulation manager started")
+    
+    # 启动仿真注入调度器（恢复重启前运行中的仿真）
+    from src.domains.simulation import get_simulation_scheduler
+    await get_simulation_scheduler().start()
+    logger.info("Simulation scheduler started")
+    
+    # 启动进程内Agent作业worker（redis后端可改由独立worker进程消费）
+    if settings.agent_job_inprocess_workers:
+        from src.agents.jobs import get_job_manager
+        await get_job_manager().start()
+        logger.info("Agent job workers started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """关闭时停止STOMP消息代理和移动仿真管理器"""
+    # 停止Agent作业worker
+    from src.agents.jobs import get_job_manager
+    await get_job_manager().stop()
+    logger.info("Agent job workers stopped")
+    
     # 停止移动仿真管理器
     from src.domains.movement_simulation import shutdown_movement_manager
     await shutdown_movement_manager()
     logger.info("Movement simulation manager stopped")
     
+    # 停止仿真注入调度器（写回时钟）
+    from src.domains.simulation import shutdown_simulation_scheduler
+    await shutdown_simulation_scheduler()
+    logger.info("Simulation scheduler stopped")
+    
     await stomp_broker.stop()
     logger.info("STOMP broker stopped")
+    
+    # 关闭共享HTTP长连接
+    from src.infra.clients.http_pool import close_http_clients
+    await close_http_clients()
+    
+    # 关闭RAG异步Qdrant客户端
+    from src.infra.rag.llama_index_client import close_rag
+    await close_rag()
 
 
 @app.get("/health")
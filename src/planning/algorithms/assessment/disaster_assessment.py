@@ -35,6 +35,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from ..base import AlgorithmBase, AlgorithmResult, AlgorithmStatus, Location
+from .intensity_grid import get_intensity_grid_engine
 
 logger = logging.getLogger(__name__)
 
@@ -141,9 +142,11 @@ class DisasterAssessment(AlgorithmBase):
     
     def get_default_params(self) -> Dict[str, Any]:
         return {
-            "intensity_radius_km": 50,  # 烈度计算最大半径
-            "grid_resolution_km": 1,    # 网格分辨率
-            "casualty_model": "simple", # 伤亡模型: simple/pager
+            # 烈度计算最大半径。原距离剖面固定覆盖 0-100km（旧默认值 50 未被读取），
+            # 取 100 使均匀栅格的影响面积与原剖面结果一致
+            "intensity_radius_km": 100,
+            "grid_resolution_km": 1,    # 网格分辨率（无暴露栅格文件时）
+            "casualty_model": "simple", # 伤亡模型: simple/grid（逐格脆弱性曲线）
         }
     
     def validate_input(self, problem: Dict[str, Any]) -> Tuple[bool, str]:
@@ -200,9 +203,10 @@ class DisasterAssessment(AlgorithmBase):
         地震灾情评估
         
         算法步骤:
-        1. 计算烈度分布 (衰减模型)
-        2. 估算建筑损毁率 (脆弱性曲线)
-        3. 估算人员伤亡
+        1. 计算烈度分布 (衰减模型，逐格栅格 + 距离剖面)
+        2. 估算影响范围与人口 (烈度>=VI 的格子；无暴露栅格时为均匀人口密度，
+           结果与原 面积×人口密度 一致，配置暴露栅格后按实际人口分布)
+        3. 估算人员伤亡 (simple: 经验公式; grid: 逐格脆弱性曲线)
         4. 确定灾情等级
         """
         eq = EarthquakeParams(
@@ -215,17 +219,35 @@ class DisasterAssessment(AlgorithmBase):
         
         # 1. 计算烈度分布
         intensity_map = self._compute_intensity_map(eq)
+        grid = get_intensity_grid_engine().estimate(
+            magnitude=eq.magnitude,
+            depth_km=eq.depth_km,
+            epicenter=eq.epicenter.to_tuple(),
+            radius_km=self.params["intensity_radius_km"],
+            resolution_km=self.params["grid_resolution_km"],
+            population_density=eq.population_density,
+            event_id=params.get("event_id"),
+            attenuation=(self.INTENSITY_ATTENUATION["k"], self.INTENSITY_ATTENUATION["c"]),
+        )
+        intensity_map["grid"] = grid.summary()
         
         # 2. 估算影响范围 (烈度>=VI的区域)
-        affected_area = self._compute_affected_area(intensity_map, threshold=6)
+        affected_area = grid.aggregates["affected_area_km2"]
         
         # 3. 估算受影响人口
-        affected_pop = int(affected_area * eq.population_density)
-        
-        # 4. 估算伤亡 (简化模型)
-        casualties = self._estimate_earthquake_casualties(
-            eq.magnitude, eq.depth_km, affected_pop, eq.building_vulnerability
-        )
+        affected_pop = grid.aggregates["affected_population"]
+        
+        # 4. 估算伤亡
+        if self.params["casualty_model"] == "grid":
+            casualties = {
+                "deaths": grid.aggregates["deaths"],
+                "injuries": grid.aggregates["injuries_severe"],
+                "missing": grid.aggregates["missing"],
+            }
+        else:
+            casualties = self._estimate_earthquake_casualties(
+                eq.magnitude, eq.depth_km, affected_pop, eq.building_vulnerability
+            )
         
         # 5. 确定灾情等级
         level = self._classify_earthquake_level(eq.magnitude, casualties["deaths"])
@@ -237,6 +259,7 @@ class DisasterAssessment(AlgorithmBase):
             affected_population=affected_pop,
             estimated_casualties=casualties,
             intensity_map=intensity_map,
+            risk_zones=grid.zones,
             confidence=0.75
         )
     
@@ -277,19 +300,6 @@ class DisasterAssessment(AlgorithmBase):
             "max_intensity": max(intensity_profile.values()),
         }
     
-    def _compute_affected_area(self, intensity_map: Dict, threshold: float = 6) -> float:
-        """计算受影响面积 (烈度>=阈值的区域)"""
-        profile = intensity_map["profile"]
-        
-        # 找到烈度低于阈值的最近距离
-        for dist, intensity in sorted(profile.items()):
-            if intensity < threshold:
-                # 近似为圆形区域
-                return math.pi * (dist ** 2)
-        
-        # 如果所有距离都超过阈值
-        return math.pi * (max(profile.keys()) ** 2)
-    
     def _estimate_earthquake_casualties(self, magnitude: float, depth: float,
                                         affected_pop: int, vulnerability: float) -> Dict[str, int]:
         """
@@ -0,0 +1,485 @@
+"""
+栅格化地震烈度与损失估算
+
+业务逻辑:
+=========
+1. 在震中周围的经纬度栅格上逐格计算烈度（与 DisasterAssessment 相同的衰减模型）
+2. 叠加人口/建筑暴露栅格（本地 .npz 文件，或按人口密度生成均匀栅格）
+3. 按建筑类别对每个格子套用脆弱性曲线，得到各损毁等级的期望建筑数
+4. 逐格估算死亡、重伤、需安置人口，并汇总为整体指标与烈度分区
+
+算法实现:
+=========
+- 烈度: I = 1.5*M - k*log10(R) - c*R + 3.0，R 为震源距 (km)，限制在 1-12
+- 脆弱性曲线 P(DS>=ds|I) = Φ((ln(I) - ln(μ)) / σ) 只依赖烈度，
+  预先按 0.01 度烈度步长制成查找表 (建筑类别 × 损毁等级 × 烈度)，逐格查表
+- 只在评估半径内、有人口或建筑的格子上计算，国家尺度栅格中的空白格不参与
+- 结果按 (事件, 震源参数, 栅格窗口, 暴露数据) 缓存
+
+暴露栅格文件 (.npz)::
+
+    population      (H, W)      每格人口
+    buildings       (K, H, W)   每格各类建筑数量
+    building_classes (K,)       类别名，如 masonry/rc_frame/wood/steel
+    building_values (K,)        可选，单栋平均价值（百万元）
+    lat0, lng0                  栅格西南角
+    cell_deg                    格子边长（度）
+
+环境变量::
+
+    EXPOSURE_GRID_PATH=/data/exposure/china_1km.npz
+    INTENSITY_GRID_CACHE_SIZE=16
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.geodesy import EARTH_RADIUS_KM, distances_m
+
+from .loss_estimation import BUILDING_TYPE_ALIASES, BuildingType, DamageState, LossEstimator
+
+logger = logging.getLogger(__name__)
+
+_KM_PER_DEG = EARTH_RADIUS_KM * math.pi / 180.0
+
+# 查找表烈度范围与步长
+_LUT_MIN, _LUT_MAX, _LUT_STEP = 1.0, 12.0, 0.01
+
+# 损毁等级顺序（与输出 damage 图层第一维一致）
+DAMAGE_STATES: Tuple[DamageState, ...] = (
+    DamageState.NONE,
+    DamageState.SLIGHT,
+    DamageState.MODERATE,
+    DamageState.EXTENSIVE,
+    DamageState.COMPLETE,
+)
+
+# 烈度分区（下限, 名称）
+INTENSITY_ZONES: Tuple[Tuple[float, str], ...] = (
+    (9.0, "extreme"),
+    (8.0, "severe"),
+    (7.0, "strong"),
+    (6.0, "moderate"),
+)
+
+
+@dataclass
+class ExposureGrid:
+    """人口/建筑暴露栅格（行自南向北，列自西向东）"""
+    lat0: float
+    lng0: float
+    cell_deg: float
+    population: np.ndarray                 # (H, W)
+    buildings: np.ndarray                  # (K, H, W)
+    building_classes: Tuple[str, ...]
+    building_values: np.ndarray            # (K,) 百万元/栋
+    source: str = "uniform"
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.population.shape
+
+    def window(self, lat: float, lng: float, radius_km: float) -> Tuple[slice, slice]:
+        """震中周围 radius_km 范围对应的行列切片"""
+        h, w = self.shape
+        dlat = radius_km / _KM_PER_DEG
+        dlng = radius_km / (_KM_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+        r0 = max(0, int(math.floor((lat - dlat - self.lat0) / self.cell_deg)))
+        r1 = min(h, int(math.ceil((lat + dlat - self.lat0) / self.cell_deg)))
+        c0 = max(0, int(math.floor((lng - dlng - self.lng0) / self.cell_deg)))
+        c1 = min(w, int(math.ceil((lng + dlng - self.lng0) / self.cell_deg)))
+        return slice(r0, max(r0, r1)), slice(c0, max(c0, c1))
+
+    @classmethod
+    def uniform(
+        cls,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        resolution_km: float,
+        population_density: float,
+        building_inventory: Optional[Sequence[Dict[str, Any]]] = None,
+        persons_per_building: float = 8.0,
+    ) -> "ExposureGrid":
+        """
+        无暴露数据时按人口密度生成均匀栅格
+
+        建筑按 building_inventory 中各类数量的比例分配，总栋数 = 人口 / persons_per_building。
+        """
+        cell_deg = resolution_km / _KM_PER_DEG
+        n = max(1, int(math.ceil(2 * radius_km / resolution_km)))
+        lat0 = lat - n * cell_deg / 2
+        lng_span = n * cell_deg / max(math.cos(math.radians(lat)), 0.01)
+        ncols = max(1, int(math.ceil(lng_span / cell_deg)))
+        lng0 = lng - ncols * cell_deg / 2
+
+        rows_lat = lat0 + (np.arange(n) + 0.5) * cell_deg
+        area = _cell_area_km2(rows_lat, cell_deg)[:, None]
+        population = np.broadcast_to(population_density * area, (n, ncols)).astype(np.float32)
+
+        inventory = building_inventory or DEFAULT_BUILDING_INVENTORY
+        counts = np.array([max(float(b.get("count", 0)), 0.0) for b in inventory])
+        shares = counts / counts.sum() if counts.sum() > 0 else np.full(len(inventory), 1 / len(inventory))
+        total_buildings = population / persons_per_building
+        buildings = (shares[:, None, None] * total_buildings[None]).astype(np.float32)
+        return cls(
+            lat0=lat0,
+            lng0=lng0,
+            cell_deg=cell_deg,
+            population=population,
+            buildings=buildings,
+            building_classes=tuple(str(b.get("type", "masonry")) for b in inventory),
+            building_values=np.array([float(b.get("avg_value_million", 1.0)) for b in inventory]),
+        )
+
+
+# 与 LossEstimator 默认建筑库存一致
+DEFAULT_BUILDING_INVENTORY: List[Dict[str, Any]] = [
+    {"type": "masonry", "count": 3000, "avg_floors": 3, "avg_value_million": 0.5},
+    {"type": "rc_frame", "count": 2000, "avg_floors": 6, "avg_value_million": 2.0},
+]
+
+
+@lru_cache(maxsize=4)
+def load_exposure_grid(path: str) -> ExposureGrid:
+    """读取暴露栅格文件（按路径缓存）"""
+    with np.load(path, allow_pickle=False) as data:
+        classes = tuple(str(c) for c in data["building_classes"])
+        values = data["building_values"] if "building_values" in data else np.ones(len(classes))
+        grid = ExposureGrid(
+            lat0=float(data["lat0"]),
+            lng0=float(data["lng0"]),
+            cell_deg=float(data["cell_deg"]),
+            population=np.ascontiguousarray(data["population"], dtype=np.float32),
+            buildings=np.ascontiguousarray(data["buildings"], dtype=np.float32),
+            building_classes=classes,
+            building_values=np.asarray(values, dtype=np.float64),
+            source=path,
+        )
+    logger.info(f"加载暴露栅格: {path}, shape={grid.shape}, 建筑类别={grid.building_classes}")
+    return grid
+
+
+def default_exposure_grid() -> Optional[ExposureGrid]:
+    """EXPOSURE_GRID_PATH 指向的暴露栅格，未配置或读取失败返回 None"""
+    path = os.getenv("EXPOSURE_GRID_PATH")
+    if not path:
+        return None
+    try:
+        return load_exposure_grid(path)
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"暴露栅格加载失败，改用均匀人口密度: {path}, {e}")
+        return None
+
+
+def _cell_area_km2(lats: np.ndarray, cell_deg: float) -> np.ndarray:
+    """各纬度处一个格子的面积（km²）"""
+    side = cell_deg * _KM_PER_DEG
+    return side * side * np.cos(np.radians(lats))
+
+
+def epicentral_distance_km(
+    epicenter_lat: float,
+    epicenter_lng: float,
+    lats: np.ndarray,
+    lngs: np.ndarray,
+) -> np.ndarray:
+    """各格子中心到震中的距离 (H, W)，km"""
+    return distances_m(epicenter_lng, epicenter_lat, lngs[None, :], lats[:, None]) / 1000.0
+
+
+def attenuate(
+    magnitude: float,
+    depth_km: float,
+    epi_km: np.ndarray,
+    k: float = 1.5,
+    c: float = 0.003,
+) -> np.ndarray:
+    """震中距 → 烈度 (float32)，修正震源深度并限制在 1-12 度"""
+    hypo = np.sqrt(np.maximum(epi_km, 0.1) ** 2 + depth_km ** 2)
+    intensity = 1.5 * magnitude - k * np.log10(hypo) - c * hypo + 3.0
+    return np.clip(intensity, 1.0, 12.0).astype(np.float32)
+
+
+def _fragility_table(building_classes: Sequence[str]) -> np.ndarray:
+    """
+    脆弱性查找表 (K, 5, L)：各类建筑在每个烈度下处于各损毁等级的概率
+    """
+    from scipy.stats import norm
+
+    grid = np.arange(_LUT_MIN, _LUT_MAX + _LUT_STEP / 2, _LUT_STEP)
+    log_i = np.log(grid)
+    table = np.empty((len(building_classes), len(DAMAGE_STATES), grid.size))
+    default = LossEstimator.FRAGILITY_PARAMS[BuildingType.MASONRY]
+    for ki, name in enumerate(building_classes):
+        b_type = BUILDING_TYPE_ALIASES.get(name.lower(), BuildingType.MASONRY)
+        fragility = LossEstimator.FRAGILITY_PARAMS.get(b_type, default)
+        # 累积概率 P(DS >= ds)，ds = slight..complete
+        params = [fragility.get(ds, (8, 0.6)) for ds in DAMAGE_STATES[1:]]
+        cum = np.stack([norm.cdf((log_i - math.log(mu)) / sigma) for mu, sigma in params])
+        table[ki, 0] = 1 - cum[0]
+        table[ki, 1:4] = cum[:3] - cum[1:]
+        table[ki, 4] = cum[3]
+    return np.maximum(table, 0.0).astype(np.float32)
+
+
+@dataclass
+class GridLossResult:
+    """栅格损失估算结果"""
+    lats: np.ndarray                  # (H,) 格子中心纬度
+    lngs: np.ndarray                  # (W,) 格子中心经度
+    cell_area_km2: np.ndarray         # (H,)
+    intensity: np.ndarray             # (H, W)，评估半径外的格子不计入图层与汇总
+    population: np.ndarray            # (H, W)
+    damage: np.ndarray                # (5, H, W) 各损毁等级期望建筑数，顺序见 DAMAGE_STATES
+    deaths: np.ndarray                # (H, W)
+    injuries_severe: np.ndarray       # (H, W)
+    displaced: np.ndarray             # (H, W)
+    aggregates: Dict[str, Any] = field(default_factory=dict)
+    zones: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.intensity.shape
+
+    def summary(self) -> Dict[str, Any]:
+        """不含栅格数组的摘要（可直接序列化）"""
+        return {
+            "shape": list(self.shape),
+            "bounds": {
+                "south": float(self.lats[0]) if self.lats.size else None,
+                "north": float(self.lats[-1]) if self.lats.size else None,
+                "west": float(self.lngs[0]) if self.lngs.size else None,
+                "east": float(self.lngs[-1]) if self.lngs.size else None,
+            },
+            "aggregates": self.aggregates,
+            "zones": self.zones,
+        }
+
+
+class IntensityGridEngine:
+    """
+    栅格烈度/损失估算引擎（结果 LRU 缓存）
+
+    使用示例:
+    ```python
+    engine = get_intensity_grid_engine()
+    result = engine.estimate(magnitude=7.0, depth_km=10, epicenter=(31.0, 103.4), radius_km=150)
+    result.aggregates["deaths"], result.deaths  # 汇总与逐格图层
+    ```
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Hashable, GridLossResult]" = OrderedDict()
+        self._tables: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def estimate(
+        self,
+        magnitude: float,
+        depth_km: float,
+        epicenter: Tuple[float, float],
+        radius_km: float = 50.0,
+        exposure: Optional[ExposureGrid] = None,
+        resolution_km: float = 1.0,
+        population_density: float = 1000.0,
+        building_inventory: Optional[Sequence[Dict[str, Any]]] = None,
+        time_of_day: str = "day",
+        event_id: Optional[str] = None,
+        attenuation: Tuple[float, float] = (1.5, 0.003),
+    ) -> GridLossResult:
+        """
+        估算震中周围 radius_km 范围的烈度与损失
+
+        Args:
+            epicenter: (lat, lng)
+            exposure: 暴露栅格，缺省时读取 EXPOSURE_GRID_PATH，仍无则按人口密度生成均匀栅格
+            resolution_km: 均匀栅格的分辨率（使用暴露栅格时以其分辨率为准）
+            event_id: 事件ID，参与缓存键，同一事件重复评估直接返回缓存
+        """
+        lat, lng = epicenter
+        exposure = exposure or default_exposure_grid()
+        if exposure is None:
+            exposure_key: Hashable = ("uniform", resolution_km, population_density,
+                                      _inventory_key(building_inventory))
+        else:
+            exposure_key = (exposure.source, id(exposure))
+        key = (event_id, round(magnitude, 2), round(depth_km, 2), round(lat, 5), round(lng, 5),
+               round(radius_km, 3), time_of_day, attenuation, exposure_key)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        if exposure is None:
+            exposure = ExposureGrid.uniform(lat, lng, radius_km, resolution_km,
+                                            population_density, building_inventory)
+        result = self._compute(magnitude, depth_km, lat, lng, radius_km, exposure, time_of_day, attenuation)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def _fragility(self, building_classes: Tuple[str, ...]) -> np.ndarray:
+        table = self._tables.get(building_classes)
+        if table is None:
+            table = _fragility_table(building_classes)
+            self._tables[building_classes] = table
+        return table
+
+    def _compute(
+        self,
+        magnitude: float,
+        depth_km: float,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        exposure: ExposureGrid,
+        time_of_day: str,
+        attenuation: Tuple[float, float],
+    ) -> GridLossResult:
+        rows, cols = exposure.window(lat, lng, radius_km)
+        lats = exposure.lat0 + (np.arange(rows.start, rows.stop) + 0.5) * exposure.cell_deg
+        lngs = exposure.lng0 + (np.arange(cols.start, cols.stop) + 0.5) * exposure.cell_deg
+        population = exposure.population[rows, cols]
+        buildings = exposure.buildings[:, rows, cols]
+        h, w = population.shape
+
+        epi_km = epicentral_distance_km(lat, lng, lats, lngs)
+        intensity = attenuate(magnitude, depth_km, epi_km, *attenuation)
+        in_range = epi_km <= radius_km
+        cell_area = _cell_area_km2(lats, exposure.cell_deg)
+
+        # 仅在评估半径内、有暴露的格子上计算
+        exposed = (population > 0) | (buildings.sum(axis=0) > 0)
+        occupied = np.flatnonzero((exposed & in_range).ravel())
+        lut_idx = np.rint((intensity.ravel()[occupied] - _LUT_MIN) / _LUT_STEP).astype(np.intp)
+        table = self._fragility(exposure.building_classes)
+        b_flat = buildings.reshape(len(exposure.building_classes), -1)[:, occupied]
+
+        damage_occ = np.zeros((len(DAMAGE_STATES), occupied.size), dtype=np.float32)
+        loss_ratio = np.array([LossEstimator.LOSS_RATIOS[ds] for ds in DAMAGE_STATES], dtype=np.float32)
+        economic_loss = 0.0
+        for ki in range(len(exposure.building_classes)):
+            probs = table[ki][:, lut_idx]                    # (5, n)
+            counts = b_flat[ki] * probs
+            damage_occ += counts
+            economic_loss += float(exposure.building_values[ki] * (loss_ratio @ counts).sum())
+
+        total_b = damage_occ.sum(axis=0)
+        share = np.divide(damage_occ, total_b, out=np.zeros_like(damage_occ), where=total_b > 0)
+        pop_occ = population.ravel()[occupied]
+        indoor = pop_occ * (0.8 if time_of_day == "night" else 0.5)
+        fatality = np.array([LossEstimator.FATALITY_RATES[ds] for ds in DAMAGE_STATES], dtype=np.float32)
+        deaths_occ = indoor * (fatality @ share)
+        displaced_occ = pop_occ * (share[3] + share[4])
+
+        def _layer(values: np.ndarray) -> np.ndarray:
+            out = np.zeros(h * w, dtype=np.float32)
+            out[occupied] = values
+            return out.reshape(h, w)
+
+        damage = np.zeros((len(DAMAGE_STATES), h * w), dtype=np.float32)
+        damage[:, occupied] = damage_occ
+        damage = damage.reshape(len(DAMAGE_STATES), h, w)
+        deaths = _layer(deaths_occ)
+        injuries = deaths * 3
+        displaced = _layer(displaced_occ)
+
+        area_grid = np.broadcast_to(cell_area[:, None], (h, w))
+        strong = (intensity >= 6.0) & in_range
+        totals = damage.reshape(len(DAMAGE_STATES), -1).sum(axis=1)
+        total_deaths = float(deaths.sum())
+        aggregates = {
+            "max_intensity": round(float(intensity.max()), 1) if intensity.size else 0.0,
+            "affected_area_km2": round(float(area_grid[strong].sum()), 2),
+            "affected_population": int(population[strong].sum()),
+            "mean_affected_intensity": round(float(intensity[strong].mean()), 2) if strong.any() else 0.0,
+            "exposed_population": int(population[in_range].sum()),
+            "deaths": int(total_deaths),
+            "injuries_severe": int(total_deaths * 3),
+            "missing": int(total_deaths * 0.2),
+            "displaced": int(displaced.sum()),
+            "damage_distribution": {ds.name.lower(): int(v) for ds, v in zip(DAMAGE_STATES, totals)},
+            "economic_loss_million": round(economic_loss, 2),
+            "cell_count": h * w,
+            "occupied_cells": int(occupied.size),
+        }
+        zones = []
+        upper = np.inf
+        for lower, name in INTENSITY_ZONES:
+            band = (intensity >= lower) & (intensity < upper) & in_range
+            upper = lower
+            if not band.any():
+                continue
+            band_rows, band_cols = np.nonzero(band)
+            zones.append({
+                "zone": name,
+                "min_intensity": lower,
+                "area_km2": round(float(area_grid[band].sum()), 2),
+                "population": int(population[band].sum()),
+                "deaths": int(deaths[band].sum()),
+                "bbox": [float(lngs[band_cols.min()]), float(lats[band_rows.min()]),
+                         float(lngs[band_cols.max()]), float(lats[band_rows.max()])],
+            })
+
+        return GridLossResult(
+            lats=lats,
+            lngs=lngs,
+            cell_area_km2=cell_area,
+            intensity=intensity,
+            population=population,
+            damage=damage,
+            deaths=deaths,
+            injuries_severe=injuries,
+            displaced=displaced,
+            aggregates=aggregates,
+            zones=zones,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def _inventory_key(inventory: Optional[Sequence[Dict[str, Any]]]) -> Hashable:
+    if not inventory:
+        return None
+    return tuple((str(b.get("type")), float(b.get("count", 0)), float(b.get("avg_value_million", 1.0)))
+                 for b in inventory)
+
+
+_engine: Optional[IntensityGridEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_intensity_grid_engine() -> IntensityGridEngine:
+    """获取全局栅格损失估算引擎（单例）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = IntensityGridEngine(int(os.getenv("INTENSITY_GRID_CACHE_SIZE", "16")))
+    return _engine
@@ -8,6 +8,10 @@ from enum import Enum
 import time
 import logging
 
+import numpy as np
+
+from src.core.geodesy import distance_matrix_m, haversine_km
+
 logger = logging.getLogger(__name__)
 
 
@@ -182,20 +186,28 @@ def haversine_distance(loc1: Location, loc2: Location) -> float:
     
     使用Haversine公式
     """
-    import math
-    
-    R = 6371  # 地球半径(km)
-    
-    lat1, lon1 = math.radians(loc1.lat), math.radians(loc1.lng)
-    lat2, lon2 = math.radians(loc2.lat), math.radians(loc2.lng)
-    
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    return haversine_km(loc1.lng, loc1.lat, loc2.lng, loc2.lat)
+
+
+def haversine_matrix(
+    sources: List[Optional[Location]],
+    targets: Optional[List[Location]] = None,
+) -> np.ndarray:
+    """
+    批量计算两组位置的距离矩阵(km)，shape=(len(sources), len(targets))
     
-    return R * c
+    targets 省略时为 sources 自身；sources 中为 None 的位置对应行距离为0
+    """
+    if targets is None:
+        targets = sources
+    if not sources or not targets:
+        return np.zeros((len(sources), len(targets)))
+    missing = np.array([loc is None for loc in sources])
+    src = np.array([(loc.lng, loc.lat) if loc is not None else (0.0, 0.0) for loc in sources])
+    dst = np.array([(loc.lng, loc.lat) for loc in targets])
+    matrix = distance_matrix_m(src[:, 0], src[:, 1], dst[:, 0], dst[:, 1]) / 1000.0
+    matrix[missing] = 0.0
+    return matrix
 
 
 def estimate_travel_time(distance_km: float, speed_kmh: float = 40) -> int:
@@ -11,8 +11,10 @@
 
 from .vehicle_cargo_matcher import VehicleCargoMatcher
 from .capability_matcher import CapabilityMatcher
+from .sparse_model import SparseMatchModel
 
 __all__ = [
     "VehicleCargoMatcher", 
-    "CapabilityMatcher"
+    "CapabilityMatcher",
+    "SparseMatchModel",
 ]
@@ -24,20 +24,24 @@
 
 算法实现:
 =========
-- 建模: 二元变量 assignment[i][j] = 1 表示资源j分配给需求i
-- 约束: 能力覆盖、容量限制、距离限制
+- 建模: 二元变量 assignment[i][j] = 1 表示资源j分配给需求i，
+  只为可行对（能力/熟练度/距离均满足）建变量，见 sparse_model.SparseMatchModel
+- 约束: 必须需求覆盖、容量限制
 - 目标: 最小化总距离或最大化总匹配分数
+- 增量: previous_solution 作为 hint；resolve() 在少量需求变化时复用候选列表重解
 """
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any, Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
 from ..base import (
     AlgorithmBase, AlgorithmResult, AlgorithmStatus,
-    Location, haversine_distance
+    Location
 )
+from .sparse_model import SparseMatchModel
 
 logger = logging.getLogger(__name__)
 
@@ -111,9 +115,18 @@ class CapabilityMatcher(AlgorithmBase):
             "time_limit_sec": 30
         }
     })
+    
+    # 少量需求变化后增量重解（以上次解为 hint）
+    result = matcher.resolve(changed_needs=[{...}], removed_need_ids=["NEED-003"])
     ```
     """
     
+    def __init__(self, params: Dict[str, Any] = None):
+        super().__init__(params)
+        self._model: Optional[SparseMatchModel] = None
+        self._last_pairs: list = []
+        self._time_limit = self.params["time_limit_sec"]
+    
     def get_default_params(self) -> Dict[str, Any]:
         return {
             "max_distance_km": 100,
@@ -139,6 +152,7 @@ class CapabilityMatcher(AlgorithmBase):
         resources = [r for r in resources if r.status == "available"]
         
         if not resources:
+            self._model = None
             return AlgorithmResult(
                 status=AlgorithmStatus.INFEASIBLE,
                 solution=[],
@@ -148,20 +162,86 @@ class CapabilityMatcher(AlgorithmBase):
                 message="无可用资源"
             )
         
-        # 尝试使用OR-Tools求解
+        max_distance = constraints.get("max_distance_km", self.params["max_distance_km"])
+        self._model = SparseMatchModel(resources, max_distance)
+        self._model.set_needs(needs)
+        self._time_limit = constraints.get("time_limit_sec", self.params["time_limit_sec"])
+        
+        hint = None
+        if problem.get("previous_solution"):
+            hint = {}
+            for a in problem["previous_solution"]:
+                hint.setdefault(a["need_id"], set()).add(a["resource_id"])
+        return self._solve_model(hint=hint)
+    
+    def resolve(
+        self,
+        changed_needs: List[Dict[str, Any]] = (),
+        removed_need_ids: List[str] = (),
+        fix_unchanged: bool = False,
+    ) -> AlgorithmResult:
+        """
+        增量重解: 少量需求新增/变化/删除后，沿用上次的资源与候选列表重新求解
+        
+        只重算变化需求的候选列表，并以上次的解作为 hint；
+        fix_unchanged=True 时未变化需求的分配保持不变，只为变化的需求求解。
+        需先调用 run()/solve()。
+        """
+        if self._model is None:
+            raise RuntimeError("resolve 前需先调用 run()")
+        previous = self._model.pairs_by_need_id(self._last_pairs)
+        changed_ids = self._model.update_needs(self._parse_needs(list(changed_needs)), removed_need_ids)
+        unchanged = {k: v for k, v in previous.items() if k not in changed_ids}
+        if fix_unchanged:
+            # 未分配的未变化需求也保持未分配
+            for need in self._model.needs:
+                if need.id not in changed_ids:
+                    unchanged.setdefault(need.id, set())
+        
+        start_time = time.time()
+        result = self._solve_model(hint=unchanged, fixed=unchanged if fix_unchanged else None)
+        result.time_ms = (time.time() - start_time) * 1000
+        result.trace["changed_needs"] = len(changed_ids)
+        return result
+    
+    def _solve_model(
+        self,
+        hint: Optional[Dict[str, set]] = None,
+        fixed: Optional[Dict[str, set]] = None,
+    ) -> AlgorithmResult:
+        """在当前稀疏模型上求解并汇总结果"""
+        model = self._model
         try:
-            assignments = self._solve_with_ortools(needs, resources, constraints)
+            pairs = model.solve_cp_sat(self.params["optimization_mode"], self._time_limit, hint=hint, fixed=fixed)
         except ImportError:
             logger.warning("OR-Tools未安装，使用贪心算法")
-            assignments = self._solve_greedy(needs, resources, constraints)
+            pairs = model.solve_greedy(fixed)
+        if pairs is None:
+            # 必须需求无法同时满足（如多个需求争用同一资源），退回贪心给出部分分配，固定的分配保持不变
+            logger.warning("CP-SAT无可行解，使用贪心算法给出部分分配")
+            pairs = model.solve_greedy(fixed)
+        self._last_pairs = pairs
+        
+        assignments = [
+            Assignment(
+                need_id=model.needs[i].id,
+                task_id=model.needs[i].task_id,
+                resource_id=model.resources[j].resource_id,
+                resource_name=model.resources[j].resource_name,
+                capability_id=model.needs[i].capability_id,
+                proficiency=prof,
+                distance_km=round(dist, 2),
+            )
+            for i, j, dist, prof in pairs
+        ]
         
         # 计算统计
-        required_needs = [n for n in needs if n.importance == "required"]
-        required_covered = sum(1 for a in assignments 
-                              if any(n.id == a.need_id and n.importance == "required" for n in needs))
+        required_needs = [n for n in model.needs if n.importance == "required"]
+        required_ids = {n.id for n in required_needs}
+        required_covered = len({a.need_id for a in assignments if a.need_id in required_ids})
         
         return AlgorithmResult(
-            status=AlgorithmStatus.SUCCESS if required_covered == len(required_needs) else AlgorithmStatus.PARTIAL,
+            status=AlgorithmStatus.SUCCESS if required_covered == len(required_ids) else AlgorithmStatus.PARTIAL,
             solution=[{
                 "need_id": a.need_id,
                 "task_id": a.task_id,
@@ -173,13 +253,14 @@ class CapabilityMatcher(AlgorithmBase):
             } for a in assignments],
             metrics={
                 "total_assignments": len(assignments),
-                "required_coverage": required_covered / len(required_needs) if required_needs else 1.0,
+                "required_coverage": required_covered / len(required_ids) if required_ids else 1.0,
                 "total_distance": sum(a.distance_km for a in assignments),
                 "avg_proficiency": sum(a.proficiency for a in assignments) / len(assignments) if assignments else 0,
             },
             trace={
-                "total_needs": len(needs),
-                "total_resources": len(resources),
+                "total_needs": len(model.needs),
+                "total_resources": len(model.resources),
+                "feasible_pairs": model.pair_count,
             },
             time_ms=0
         )
@@ -213,170 +294,3 @@ class CapabilityMatcher(AlgorithmBase):
                 max_assignments=d.get("max_assignments", 1)
             ))
         return resources
-    
-    def _solve_with_ortools(self, needs: List[CapabilityNeed], 
-                            resources: List[ResourceCapability],
-                            constraints: Dict) -> List[Assignment]:
-        """使用OR-Tools CP-SAT求解"""
-        from ortools.sat.python import cp_model
-        
-        model = cp_model.CpModel()
-        
-        n_needs = len(needs)
-        n_resources = len(resources)
-        max_distance = constraints.get("max_distance_km", self.params["max_distance_km"])
-        
-        # 预计算距离和能力匹配
-        distances = {}  # (need_idx, res_idx) -> distance
-        can_satisfy = {}  # (need_idx, res_idx) -> bool
-        proficiencies = {}  # (need_idx, res_idx) -> proficiency
-        
-        for i, need in enumerate(needs):
-            for j, res in enumerate(resources):
-                # 距离
-                if need.location:
-                    dist = haversine_distance(need.location, res.location)
-                else:
-                    dist = 0
-                distances[(i, j)] = dist
-                
-                # 能力匹配
-                cap_id = need.capability_id
-                if cap_id in res.capabilities and res.capabilities[cap_id] >= need.min_level:
-                    can_satisfy[(i, j)] = True
-                    proficiencies[(i, j)] = res.capabilities[cap_id]
-                else:
-                    can_satisfy[(i, j)] = False
-                    proficiencies[(i, j)] = 0
-        
-        # 决策变量: assignment[i][j] = 1 表示资源j分配给需求i
-        assignment = {}
-        for i in range(n_needs):
-            for j in range(n_resources):
-                assignment[(i, j)] = model.NewBoolVar(f"assign_{i}_{j}")
-        
-        # 约束1: 每个必须需求至少有一个资源
-        for i, need in enumerate(needs):
-            if need.importance == "required":
-                valid_resources = [j for j in range(n_resources) 
-                                   if can_satisfy.get((i, j), False) and distances[(i, j)] <= max_distance]
-                if valid_resources:
-                    model.Add(sum(assignment[(i, j)] for j in valid_resources) >= 1)
-        
-        # 约束2: 能力必须满足
-        for i in range(n_needs):
-            for j in range(n_resources):
-                if not can_satisfy.get((i, j), False):
-                    model.Add(assignment[(i, j)] == 0)
-        
-        # 约束3: 距离限制
-        for i in range(n_needs):
-            for j in range(n_resources):
-                if distances[(i, j)] > max_distance:
-                    model.Add(assignment[(i, j)] == 0)
-        
-        # 约束4: 资源容量限制
-        for j, res in enumerate(resources):
-            model.Add(sum(assignment[(i, j)] for i in range(n_needs)) <= res.max_assignments)
-        
-        # 目标函数
-        if self.params["optimization_mode"] == "min_distance":
-            # 最小化总距离
-            total_distance = []
-            for i in range(n_needs):
-                for j in range(n_resources):
-                    dist_scaled = int(distances[(i, j)] * 100)
-                    total_distance.append(assignment[(i, j)] * dist_scaled)
-            model.Minimize(sum(total_distance))
-        else:
-            # 最大化匹配质量 (熟练度)
-            total_quality = []
-            for i in range(n_needs):
-                for j in range(n_resources):
-                    prof_scaled = int(proficiencies.get((i, j), 0) * 100)
-                    total_quality.append(assignment[(i, j)] * prof_scaled)
-            model.Maximize(sum(total_quality))
-        
-        # 求解
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = constraints.get(
-            "time_limit_sec", self.params["time_limit_sec"]
-        )
-        status = solver.Solve(model)
-        
-        # 提取结果
-        assignments = []
-        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            for i, need in enumerate(needs):
-                for j, res in enumerate(resources):
-                    if solver.Value(assignment[(i, j)]) == 1:
-                        assignments.append(Assignment(
-                            need_id=need.id,
-                            task_id=need.task_id,
-                            resource_id=res.resource_id,
-                            resource_name=res.resource_name,
-                            capability_id=need.capability_id,
-                            proficiency=proficiencies.get((i, j), 0),
-                            distance_km=round(distances[(i, j)], 2)
-                        ))
-        
-        return assignments
-    
-    def _solve_greedy(self, needs: List[CapabilityNeed],
-                      resources: List[ResourceCapability],
-                      constraints: Dict) -> List[Assignment]:
-        """贪心算法 (备用)"""
-        max_distance = constraints.get("max_distance_km", self.params["max_distance_km"])
-        assignments = []
-        resource_usage = {r.resource_id: 0 for r in resources}
-        
-        # 按重要性排序需求
-        importance_order = {"required": 0, "preferred": 1, "optional": 2}
-        sorted_needs = sorted(needs, key=lambda n: importance_order.get(n.importance, 2))
-        
-        for need in sorted_needs:
-            best_resource = None
-            best_score = -1
-            
-            for res in resources:
-                # 检查容量
-                if resource_usage[res.resource_id] >= res.max_assignments:
-                    continue
-                
-                # 检查能力
-                if need.capability_id not in res.capabilities:
-                    continue
-                
-                proficiency = res.capabilities[need.capability_id]
-                if proficiency < need.min_level:
-                    continue
-                
-                # 检查距离
-                if need.location:
-                    dist = haversine_distance(need.location, res.location)
-                    if dist > max_distance:
-                        continue
-                else:
-                    dist = 0
-                
-                # 计算分数: 熟练度高、距离近更好
-                score = proficiency * 100 - dist
-                
-                if score > best_score:
-                    best_score = score
-                    best_resource = (res, dist, proficiency)
-            
-            if best_resource:
-                res, dist, prof = best_resource
-                assignments.append(Assignment(
-                    need_id=need.id,
-                    task_id=need.task_id,
-                    resource_id=res.resource_id,
-                    resource_name=res.resource_name,
-                    capability_id=need.capability_id,
-                    proficiency=prof,
-                    distance_km=round(dist, 2)
-                ))
-                resource_usage[res.resource_id] += 1
-        
-        return assignments
@@ -18,16 +18,18 @@
 from __future__ import annotations
 
 import logging
-import math
 import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple, Set
 from uuid import UUID
 
 import networkx as nx
+import numpy as np
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.geodesy import nearest_index, one_to_many_m
+
 from .types import (
     Audit,
     PathCandidate,
@@ -238,9 +240,13 @@ class DatabaseRouteEngine:
         if graph.number_of_edges() == 0:
             raise InfeasiblePathError("所有路段均不可通行（车辆能力不足或灾害封锁）")
         
+        # 节点坐标转为数组，最近节点与启发值一次批量计算
+        node_ids = list(node_coords)
+        node_xy = np.array([node_coords[n] for n in node_ids], dtype=np.float64).reshape(-1, 2)
+
         # 找到最近的起终点节点
-        start_node = self._find_nearest_node(node_coords, start)
-        end_node = self._find_nearest_node(node_coords, end)
+        start_node = self._find_nearest_node(node_ids, node_xy, start)
+        end_node = self._find_nearest_node(node_ids, node_xy, end)
         
         if start_node is None:
             raise InfeasiblePathError(f"起点({start.lon:.4f},{start.lat:.4f})附近无可达路网节点")
@@ -252,17 +258,16 @@ class DatabaseRouteEngine:
             f"{graph.number_of_edges()}边, 起点节点={start_node}, 终点节点={end_node}"
         )
         
-        # A*搜索
+        # A*搜索：目标固定，预先算好所有节点到终点的球面距离作为启发值
         search_start = time.perf_counter()
+        end_lon, end_lat = node_coords[end_node]
+        heuristic_m = dict(zip(node_ids, one_to_many_m(end_lon, end_lat, node_xy[:, 0], node_xy[:, 1]).tolist()))
         try:
             path_nodes = nx.astar_path(
                 graph,
                 start_node,
                 end_node,
-                heuristic=lambda n1, n2: self._haversine_distance(
-                    node_coords[n1][0], node_coords[n1][1],
-                    node_coords[n2][0], node_coords[n2][1],
-                ),
+                heuristic=lambda n1, n2: heuristic_m[n1],
                 weight="weight",
             )
         except nx.NetworkXNoPath:
@@ -632,52 +637,17 @@ class DatabaseRouteEngine:
     
     def _find_nearest_node(
         self,
-        node_coords: Dict[str, Tuple[float, float]],
+        node_ids: List[str],
+        node_xy: np.ndarray,
         point: Point,
         max_distance_m: float = 5000.0,
     ) -> Optional[str]:
-        """找到距离指定点最近的节点"""
-        nearest_node: Optional[str] = None
-        nearest_distance = float("inf")
-        
-        for node_id, (lon, lat) in node_coords.items():
-            dist = self._haversine_distance(point.lon, point.lat, lon, lat)
-            if dist < nearest_distance:
-                nearest_distance = dist
-                nearest_node = node_id
-        
-        if nearest_distance > max_distance_m:
+        """找到距离指定点最近的节点（node_xy 为与 node_ids 对齐的 [lon, lat] 数组）"""
+        idx, nearest_distance = nearest_index(point.lon, point.lat, node_xy[:, 0], node_xy[:, 1])
+        if idx < 0 or nearest_distance > max_distance_m:
             return None
-        
-        return nearest_node
-    
-    def _haversine_distance(
-        self,
-        lon1: float,
-        lat1: float,
-        lon2: float,
-        lat2: float,
-    ) -> float:
-        """
-        计算两点间的球面距离（米）
-        
-        Haversine公式
-        """
-        R = 6371000  # 地球半径（米）
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.asin(math.sqrt(a))
-        
-        return R * c
-    
+        return node_ids[idx]
+
     def _build_result(
         self,
         path_nodes: List[str],
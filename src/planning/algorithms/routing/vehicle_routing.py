@@ -24,8 +24,11 @@
 算法实现:
 =========
 - 使用OR-Tools Routing求解器
+- 距离/时间矩阵批量计算（或由调用方传入路网矩阵），以矩阵形式注册到求解器，
+  不逐弧回调Python
 - 支持多种启发式策略
-- 支持局部搜索优化
+- 支持局部搜索优化，时间预算随问题规模自适应
+- 重规划时以上次路线 (initial_routes) 热启动
 """
 from __future__ import annotations
 
@@ -33,13 +36,18 @@ import logging
 from typing import Any, Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 from ..base import (
     AlgorithmBase, AlgorithmResult, AlgorithmStatus,
-    Location, haversine_distance, TimeWindow
+    Location, haversine_matrix, TimeWindow
 )
 
 logger = logging.getLogger(__name__)
 
+# 时间维度允许的最大等待(分钟)
+_MAX_WAIT_MIN = 60
+
 
 @dataclass
 class Depot:
@@ -107,7 +115,12 @@ class VehicleRoutingPlanner(AlgorithmBase):
         "constraints": {
             "use_time_windows": True,
             "time_limit_sec": 30
-        }
+        },
+        # 可选: 路网矩阵（节点顺序 depots + tasks）
+        "distance_matrix_km": [[...]],
+        "travel_time_matrix_min": [[...]],
+        # 可选: 上次的 solution，新增任务/车辆退出后热启动重规划
+        "initial_routes": previous_result.solution,
     })
     ```
     """
@@ -116,7 +129,9 @@ class VehicleRoutingPlanner(AlgorithmBase):
         return {
             "first_solution_strategy": "PATH_CHEAPEST_ARC",
             "local_search_metaheuristic": "GUIDED_LOCAL_SEARCH",
-            "time_limit_sec": 30,
+            "time_limit_sec": 30,  # 未显式指定时按规模自适应，以此为上限
+            "min_time_limit_sec": 1,
+            "time_per_node_sec": 0.02,
             "distance_scale": 100,  # 距离放大系数(OR-Tools用整数)
         }
     
@@ -136,13 +151,18 @@ class VehicleRoutingPlanner(AlgorithmBase):
         tasks = self._parse_tasks(problem["tasks"])
         vehicles = self._parse_vehicles(problem["vehicles"])
         constraints = problem.get("constraints", {})
+        trace: Dict[str, Any] = {
+            "depots": len(depots),
+            "tasks": len(tasks),
+            "vehicles": len(vehicles),
+        }
         
         # 尝试OR-Tools求解
         try:
-            routes = self._solve_with_ortools(depots, tasks, vehicles, constraints)
+            routes = self._solve_with_ortools(depots, tasks, vehicles, constraints, problem, trace)
         except ImportError:
             logger.warning("OR-Tools未安装，使用贪心算法")
-            routes = self._solve_greedy(depots, tasks, vehicles, constraints)
+            routes = self._solve_greedy(depots, tasks, vehicles, constraints, problem)
         
         # 统计
         total_distance = sum(r.total_distance_km for r in routes)
@@ -165,11 +185,7 @@ class VehicleRoutingPlanner(AlgorithmBase):
                 "total_tasks": len(tasks),
                 "vehicles_used": len([r for r in routes if r.stops]),
             },
-            trace={
-                "depots": len(depots),
-                "tasks": len(tasks),
-                "vehicles": len(vehicles),
-            },
+            trace=trace,
             time_ms=0
         )
     
@@ -206,9 +222,105 @@ class VehicleRoutingPlanner(AlgorithmBase):
             speed_kmh=v.get("speed_kmh", 40)
         ) for v in data]
     
+    def _build_matrices(self, locations: List[Location], vehicles: List[VRPVehicle],
+                        problem: Dict[str, Any]) -> Tuple[np.ndarray, Dict[float, np.ndarray], str]:
+        """
+        批量构建距离矩阵(km)与行驶时间矩阵(分钟)
+        
+        优先使用调用方提供的路网矩阵 (distance_matrix_km / travel_time_matrix_min，
+        节点顺序为 depots + tasks)；否则距离按球面距离批量计算，时间按各车速度换算。
+        
+        Returns:
+            (距离矩阵, {速度: 时间矩阵}, 矩阵来源)
+        """
+        n = len(locations)
+        source = "haversine"
+        if problem.get("distance_matrix_km") is not None:
+            distance = np.asarray(problem["distance_matrix_km"], dtype=np.float64)
+            source = "provided"
+        else:
+            distance = haversine_matrix(locations)
+        if distance.shape != (n, n):
+            raise ValueError(f"distance_matrix_km 形状应为 {(n, n)}，实际 {distance.shape}")
+        
+        speeds = sorted({v.speed_kmh for v in vehicles})
+        if problem.get("travel_time_matrix_min") is not None:
+            travel = np.asarray(problem["travel_time_matrix_min"], dtype=np.float64)
+            if travel.shape != (n, n):
+                raise ValueError(f"travel_time_matrix_min 形状应为 {(n, n)}，实际 {travel.shape}")
+            times = {speed: travel for speed in speeds}
+            source = "provided"
+        else:
+            times = {speed: distance / max(speed, 1e-6) * 60 for speed in speeds}
+        return distance, times, source
+    
+    def _time_budget(self, n_tasks: int, n_vehicles: int, constraints: Dict, warm_start: bool) -> float:
+        """
+        求解时间预算(秒)
+        
+        显式给出 time_limit_sec 时直接使用；否则按问题规模在 [min_time_limit_sec, time_limit_sec]
+        之间取值，热启动再减半。引导局部搜索不会自行收敛，小问题用满30秒没有收益。
+        """
+        if constraints.get("time_limit_sec") is not None:
+            return float(constraints["time_limit_sec"])
+        budget = self.params["min_time_limit_sec"] + self.params["time_per_node_sec"] * n_tasks * max(1, n_vehicles) ** 0.5
+        if warm_start:
+            budget /= 2
+        return float(min(max(budget, self.params["min_time_limit_sec"]), self.params["time_limit_sec"]))
+    
+    def _initial_routes(self, previous: List[Dict], tasks: List[TaskNode], vehicles: List[VRPVehicle],
+                        n_depots: int, distance: np.ndarray, starts: List[int],
+                        schedule: Optional[Tuple[List[np.ndarray], np.ndarray, np.ndarray, int]] = None,
+                        ) -> List[List[int]]:
+        """
+        上次的路线 → 各车节点序列（热启动）
+        
+        已删除的任务丢弃；已退出车辆的任务与新增任务按最小插入代价插入有余量的路线，
+        启用时间窗时 schedule = (各车时间transit矩阵, 最早, 最晚, 时间上限)，只插入到时间上可行的位置。
+        """
+        task_nodes = {t.id: n_depots + i for i, t in enumerate(tasks)}
+        by_vehicle = {r.get("vehicle_id"): r for r in previous}
+        routes: List[List[int]] = []
+        placed = set()
+        for v in vehicles:
+            nodes = []
+            for stop in (by_vehicle.get(v.id) or {}).get("stops", []):
+                node = task_nodes.get(stop.get("task_id"))
+                if node is not None and node not in placed:
+                    nodes.append(node)
+                    placed.add(node)
+            routes.append(nodes)
+        
+        loads = [sum(tasks[n - n_depots].demand for n in nodes) for nodes in routes]
+        for node in range(n_depots, n_depots + len(tasks)):
+            if node in placed:
+                continue
+            demand = tasks[node - n_depots].demand
+            best = None
+            for k, nodes in enumerate(routes):
+                if loads[k] + demand > vehicles[k].capacity:
+                    continue
+                path = [starts[k]] + nodes + [starts[k]]
+                arr = np.array(path)
+                delta = distance[arr[:-1], node] + distance[node, arr[1:]] - distance[arr[:-1], arr[1:]]
+                for pos in np.argsort(delta, kind="stable"):
+                    if best is not None and delta[pos] >= best[0]:
+                        break
+                    if schedule is None or _schedule_feasible(
+                        path[:pos + 1] + [node] + path[pos + 1:], schedule[0][k], *schedule[1:]
+                    ):
+                        best = (delta[pos], k, int(pos))
+                        break
+            if best is not None:
+                _, k, pos = best
+                routes[k].insert(pos, node)
+                loads[k] += demand
+        return routes
+    
     def _solve_with_ortools(self, depots: List[Depot], tasks: List[TaskNode],
-                            vehicles: List[VRPVehicle], constraints: Dict) -> List[VRPRoute]:
-        """使用OR-Tools求解"""
+                            vehicles: List[VRPVehicle], constraints: Dict,
+                            problem: Dict[str, Any], trace: Dict[str, Any]) -> List[VRPRoute]:
+        """使用OR-Tools求解（矩阵式transit，支持以上次路线热启动）"""
         from ortools.constraint_solver import routing_enums_pb2
         from ortools.constraint_solver import pywrapcp
         
@@ -218,8 +330,9 @@ class VehicleRoutingPlanner(AlgorithmBase):
         n_locations = len(all_locations)
         n_depots = len(depots)
         
-        # 构建距离矩阵
-        distance_matrix = self._build_distance_matrix(all_locations)
+        # 构建距离/时间矩阵
+        distance_matrix, time_matrices, source = self._build_matrices(all_locations, vehicles, problem)
+        trace["matrix_source"] = source
         
         # 确定每辆车的起点depot索引
         starts = []
@@ -233,24 +346,15 @@ class VehicleRoutingPlanner(AlgorithmBase):
         manager = pywrapcp.RoutingIndexManager(n_locations, len(vehicles), starts, ends)
         routing = pywrapcp.RoutingModel(manager)
         
-        # 距离回调
+        # 距离: 整数矩阵注册到求解器内部，避免逐弧回调Python
         scale = self.params["distance_scale"]
-        def distance_callback(from_index, to_index):
-            from_node = manager.IndexToNode(from_index)
-            to_node = manager.IndexToNode(to_index)
-            return int(distance_matrix[from_node][to_node] * scale)
-        
-        transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+        scaled_distance = np.rint(distance_matrix * scale).astype(np.int64)
+        transit_callback_index = routing.RegisterTransitMatrix(scaled_distance.tolist())
         routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
         
         # 容量约束
-        def demand_callback(from_index):
-            from_node = manager.IndexToNode(from_index)
-            if from_node < n_depots:
-                return 0
-            return tasks[from_node - n_depots].demand
-        
-        demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
+        demands = [0] * n_depots + [t.demand for t in tasks]
+        demand_callback_index = routing.RegisterUnaryTransitVector(demands)
         routing.AddDimensionWithVehicleCapacity(
             demand_callback_index,
             0,
@@ -260,26 +364,31 @@ class VehicleRoutingPlanner(AlgorithmBase):
         )
         
         # 时间窗约束
-        if constraints.get("use_time_windows", False):
-            def time_callback(from_index, to_index):
-                from_node = manager.IndexToNode(from_index)
-                to_node = manager.IndexToNode(to_index)
-                # 行驶时间 + 服务时间
-                dist = distance_matrix[from_node][to_node]
-                travel_time = int(dist / 40 * 60)  # 假设40km/h
-                service_time = 0
-                if from_node >= n_depots:
-                    service_time = tasks[from_node - n_depots].service_time_min
-                return travel_time + service_time
-            
-            time_callback_index = routing.RegisterTransitCallback(time_callback)
-            routing.AddDimension(
-                time_callback_index,
-                60,  # 允许等待
-                max(v.max_time_min for v in vehicles),
+        use_time_windows = constraints.get("use_time_windows", False)
+        schedule = None
+        if use_time_windows:
+            # 行驶时间 + 出发节点服务时间，按车速分别注册
+            service = np.array([0] * n_depots + [t.service_time_min for t in tasks], dtype=np.int64)[:, None]
+            time_transits = {speed: matrix.astype(np.int64) + service for speed, matrix in time_matrices.items()}
+            time_indices = {
+                speed: routing.RegisterTransitMatrix(transit.tolist())
+                for speed, transit in time_transits.items()
+            }
+            horizon = max(v.max_time_min for v in vehicles)
+            routing.AddDimensionWithVehicleTransits(
+                [time_indices[v.speed_kmh] for v in vehicles],
+                _MAX_WAIT_MIN,  # 允许等待
+                horizon,
                 False,
                 'Time'
             )
+            earliest = np.zeros(n_locations, dtype=np.int64)
+            latest = np.full(n_locations, horizon, dtype=np.int64)
+            for i, task in enumerate(tasks):
+                if task.time_window:
+                    earliest[n_depots + i] = task.time_window.start
+                    latest[n_depots + i] = task.time_window.end
+            schedule = ([time_transits[v.speed_kmh] for v in vehicles], earliest, latest, horizon)
             
             time_dimension = routing.GetDimensionOrDie('Time')
             for i, task in enumerate(tasks):
@@ -290,6 +399,18 @@ class VehicleRoutingPlanner(AlgorithmBase):
                         task.time_window.end
                     )
         
+        # 热启动: 上次的路线作为初始解
+        initial = None
+        previous = problem.get("initial_routes")
+        if previous:
+            routes_nodes = self._initial_routes(
+                previous, tasks, vehicles, n_depots, distance_matrix, starts, schedule
+            )
+            initial = routing.ReadAssignmentFromRoutes(routes_nodes, True)
+            if initial is None:
+                logger.warning("上次路线不满足当前约束，改为从头求解")
+        trace["warm_start"] = initial is not None
+        
         # 求解参数
         search_parameters = pywrapcp.DefaultRoutingSearchParameters()
         search_parameters.first_solution_strategy = getattr(
@@ -300,16 +421,20 @@ class VehicleRoutingPlanner(AlgorithmBase):
             routing_enums_pb2.LocalSearchMetaheuristic,
             self.params["local_search_metaheuristic"]
         )
-        search_parameters.time_limit.FromSeconds(
-            constraints.get("time_limit_sec", self.params["time_limit_sec"])
-        )
+        time_limit = self._time_budget(len(tasks), len(vehicles), constraints, initial is not None)
+        search_parameters.time_limit.FromMilliseconds(int(time_limit * 1000))
+        trace["time_limit_sec"] = round(time_limit, 2)
         
         # 求解
-        solution = routing.SolveWithParameters(search_parameters)
+        if initial is not None:
+            solution = routing.SolveFromAssignmentWithParameters(initial, search_parameters)
+        else:
+            solution = routing.SolveWithParameters(search_parameters)
         
         # 提取路线
         routes = []
         if solution:
+            time_dimension = routing.GetDimensionOrDie('Time') if use_time_windows else None
             for vehicle_idx, vehicle in enumerate(vehicles):
                 route = VRPRoute(
                     vehicle_id=vehicle.id,
@@ -321,8 +446,10 @@ class VehicleRoutingPlanner(AlgorithmBase):
                     total_load=0
                 )
                 
+                travel = time_matrices[vehicle.speed_kmh]
                 index = routing.Start(vehicle_idx)
                 route_distance = 0
+                route_time = 0.0
                 
                 while not routing.IsEnd(index):
                     node = manager.IndexToNode(index)
@@ -330,9 +457,8 @@ class VehicleRoutingPlanner(AlgorithmBase):
                     if node >= n_depots:
                         task = tasks[node - n_depots]
                         arrival_time = None
-                        if constraints.get("use_time_windows"):
-                            time_var = routing.GetDimensionOrDie('Time').CumulVar(index)
-                            arrival_time = solution.Value(time_var)
+                        if time_dimension is not None:
+                            arrival_time = solution.Value(time_dimension.CumulVar(index))
                         
                         route.stops.append({
                             "task_id": task.id,
@@ -345,23 +471,29 @@ class VehicleRoutingPlanner(AlgorithmBase):
                     prev_index = index
                     index = solution.Value(routing.NextVar(index))
                     route_distance += routing.GetArcCostForVehicle(prev_index, index, vehicle_idx)
+                    route_time += travel[node, manager.IndexToNode(index)]
                 
                 route.total_distance_km = round(route_distance / scale, 2)
-                route.total_time_min = int(route.total_distance_km / vehicle.speed_kmh * 60)
+                route.total_time_min = int(route_time)
                 routes.append(route)
         
         return routes
     
     def _solve_greedy(self, depots: List[Depot], tasks: List[TaskNode],
-                      vehicles: List[VRPVehicle], constraints: Dict) -> List[VRPRoute]:
+                      vehicles: List[VRPVehicle], constraints: Dict,
+                      problem: Dict[str, Any]) -> List[VRPRoute]:
         """贪心算法(备用)"""
-        depot_map = {d.id: d for d in depots}
-        unassigned = list(tasks)
+        depot_map = {d.id: i for i, d in enumerate(depots)}
+        n_depots = len(depots)
+        distance_matrix, _, _ = self._build_matrices(
+            [d.location for d in depots] + [t.location for t in tasks], vehicles, problem
+        )
+        unassigned = list(range(len(tasks)))
         routes = []
         
         for vehicle in vehicles:
-            depot = depot_map.get(vehicle.depot_id)
-            if not depot:
+            depot_idx = depot_map.get(vehicle.depot_id)
+            if depot_idx is None:
                 continue
             
             route = VRPRoute(
@@ -374,30 +506,32 @@ class VehicleRoutingPlanner(AlgorithmBase):
                 total_load=0
             )
             
-            current_location = depot.location
+            current_node = depot_idx
             current_load = 0
             current_distance = 0
             
             while unassigned:
                 # 找最近可行任务
-                best_task = None
+                best_idx = None
                 best_distance = float('inf')
                 
-                for task in unassigned:
+                for task_idx in unassigned:
+                    task = tasks[task_idx]
                     if current_load + task.demand > vehicle.capacity:
                         continue
                     
-                    dist = haversine_distance(current_location, task.location)
+                    dist = distance_matrix[current_node, n_depots + task_idx]
                     
                     if current_distance + dist > vehicle.max_distance_km:
                         continue
                     
                     if dist < best_distance:
                         best_distance = dist
-                        best_task = task
+                        best_idx = task_idx
                 
-                if best_task is None:
+                if best_idx is None:
                     break
+                best_task = tasks[best_idx]
                 
                 # 分配任务
                 route.stops.append({
@@ -407,24 +541,27 @@ class VehicleRoutingPlanner(AlgorithmBase):
                 })
                 current_load += best_task.demand
                 current_distance += best_distance
-                current_location = best_task.location
-                unassigned.remove(best_task)
+                current_node = n_depots + best_idx
+                unassigned.remove(best_idx)
             
             route.total_load = current_load
-            route.total_distance_km = round(current_distance, 2)
+            route.total_distance_km = round(float(current_distance), 2)
             route.total_time_min = int(current_distance / vehicle.speed_kmh * 60)
             routes.append(route)
         
         return routes
-    
-    def _build_distance_matrix(self, locations: List[Location]) -> List[List[float]]:
-        """构建距离矩阵"""
-        n = len(locations)
-        matrix = [[0.0] * n for _ in range(n)]
-        
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    matrix[i][j] = haversine_distance(locations[i], locations[j])
-        
-        return matrix
+
+
+def _schedule_feasible(path: List[int], transit: np.ndarray, earliest: np.ndarray,
+                       latest: np.ndarray, horizon: int) -> bool:
+    """从0时刻出发按 transit 推进，检查时间窗、最大等待与时间上限"""
+    t = 0
+    for a, b in zip(path[:-1], path[1:]):
+        t += int(transit[a, b])
+        if t < earliest[b]:
+            if earliest[b] - t > _MAX_WAIT_MIN:
+                return False
+            t = int(earliest[b])
+        if t > latest[b]:
+            return False
+    return t <= horizon
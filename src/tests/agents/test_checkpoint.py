@@ -0,0 +1,140 @@
+"""Unit tests for PrunedMemorySaver and RedisCheckpointSaver.
+
+Checks that pruning keeps interrupt/resume working while bounding
+the stored checkpoint history and channel blobs, for both the in-memory
+saver and RedisCheckpointSaver (against fakeredis).
+"""
+from __future__ import annotations
+
+import operator
+from typing import Annotated, Any, Dict, List, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.agents.base.checkpoint import PrunedMemorySaver, RedisCheckpointSaver
+
+
+class _State(TypedDict):
+    n: int
+    payload: List[int]
+    log: Annotated[List[str], operator.add]
+
+
+def _step(name: str):
+    def _node(state: _State) -> Dict[str, Any]:
+        return {"n": state["n"] + 1, "log": [name]}
+    return _node
+
+
+def _build_graph(saver: PrunedMemorySaver):
+    graph = StateGraph(_State)
+    for name in ("a", "b", "c", "d"):
+        graph.add_node(name, _step(name))
+    graph.set_entry_point("a")
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", "d")
+    graph.add_edge("d", END)
+    return graph.compile(checkpointer=saver, interrupt_before=["d"])
+
+
+def test_resume_after_pruning() -> None:
+    """Interrupted threads resume correctly with only the last N checkpoints kept."""
+
+    saver = PrunedMemorySaver(keep_last=2)
+    app = _build_graph(saver)
+    config = {"configurable": {"thread_id": "t-1"}}
+
+    interrupted = app.invoke({"n": 0, "payload": list(range(100)), "log": []}, config)
+    assert interrupted["log"] == ["a", "b", "c"]
+    assert len(saver.storage["t-1"][""]) == 2
+
+    final = app.invoke(None, config)
+    assert final["n"] == 4
+    assert final["log"] == ["a", "b", "c", "d"]
+    assert final["payload"] == list(range(100))
+    assert len(list(saver.list(config))) == 2
+
+
+def test_unreferenced_blobs_are_dropped() -> None:
+    """Blobs only referenced by pruned checkpoints are removed."""
+
+    saver = PrunedMemorySaver(keep_last=1)
+    app = _build_graph(saver)
+    config = {"configurable": {"thread_id": "t-2"}}
+    app.invoke({"n": 0, "payload": [1], "log": []}, config)
+
+    latest = saver.get_tuple(config)
+    assert latest is not None
+    referenced = set(latest.checkpoint["channel_versions"].items())
+    stored = {(k[2], k[3]) for k in saver.blobs if k[0] == "t-2"}
+    assert stored <= referenced
+
+
+def test_delete_thread_clears_state() -> None:
+    saver = PrunedMemorySaver(keep_last=3)
+    app = _build_graph(saver)
+    config = {"configurable": {"thread_id": "t-3"}}
+    app.invoke({"n": 0, "payload": [], "log": []}, config)
+
+    saver.delete_thread("t-3")
+
+    assert saver.get_tuple(config) is None
+    assert not [k for k in saver.blobs if k[0] == "t-3"]
+
+
+def test_memory_prune_only_touches_its_own_blob_index() -> None:
+    """Pruning one thread leaves other threads' blobs and index entries alone."""
+
+    saver = PrunedMemorySaver(keep_last=1)
+    app = _build_graph(saver)
+    app.invoke({"n": 0, "payload": [1], "log": []}, {"configurable": {"thread_id": "t-4"}})
+    other = {k for k in saver.blobs if k[0] == "t-4"}
+    app.invoke({"n": 0, "payload": [2], "log": []}, {"configurable": {"thread_id": "t-5"}})
+
+    assert {k for k in saver.blobs if k[0] == "t-4"} == other
+    indexed = {(k[2], k[3]) for k in saver.blobs if k[0] == "t-5"}
+    assert saver._blob_index["t-5"][""] == indexed
+
+    saver.delete_thread("t-5")
+    assert "t-5" not in saver._blob_index
+
+
+def test_redis_saver_put_get_list_and_prune() -> None:
+    """RedisCheckpointSaver keeps the last N checkpoints and survives a restart."""
+
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis(decode_responses=False)
+    saver = RedisCheckpointSaver("redis://unused", "test", keep_last=2, client=redis)
+    app = _build_graph(saver)
+    config = {"configurable": {"thread_id": "r-1"}}
+
+    interrupted = app.invoke({"n": 0, "payload": list(range(50)), "log": []}, config)
+    assert interrupted["log"] == ["a", "b", "c"]
+
+    history = list(saver.list(config))
+    assert len(history) == 2
+    assert history[0].checkpoint["id"] > history[1].checkpoint["id"]
+    assert history[0].parent_config["configurable"]["checkpoint_id"] == history[1].checkpoint["id"]
+    assert len(list(saver.list(config, limit=1))) == 1
+    assert redis.zcard("lg_ckpt:test:r-1::idx") == 2
+
+    # after pruning only blobs referenced by the kept checkpoints remain
+    referenced = set()
+    for tup in history:
+        referenced.update(
+            saver._blob_key("r-1", "", ch, v).encode() for ch, v in tup.checkpoint["channel_versions"].items()
+        )
+    assert set(redis.keys("lg_ckpt:test:r-1::b:*")) <= referenced
+
+    # a fresh saver (process restart) resumes the interrupted thread from Redis
+    restarted = RedisCheckpointSaver("redis://unused", "test", keep_last=2, client=redis)
+    latest = restarted.get_tuple(config)
+    assert latest.checkpoint["channel_values"]["payload"] == list(range(50))
+    final = _build_graph(restarted).invoke(None, config)
+    assert final["n"] == 4 and final["log"] == ["a", "b", "c", "d"]
+
+    restarted.delete_thread("r-1")
+    assert restarted.get_tuple(config) is None
+    assert not redis.keys("lg_ckpt:test:r-1:*")
@@ -0,0 +1,62 @@
+"""预警影响分析引擎测试：缓冲距离、路线穿越与结果合并"""
+from __future__ import annotations
+
+import pytest
+
+from src.agents.early_warning.impact import (
+    ImpactCandidate,
+    compute_impacts,
+    hazard_geometry,
+    merge_hits,
+)
+
+# 约 2km × 2km 的灾害区域
+BOUNDARY = {
+    "type": "Polygon",
+    "coordinates": [[[104.00, 31.00], [104.02, 31.00], [104.02, 31.018], [104.00, 31.018], [104.00, 31.00]]],
+}
+HAZARD = hazard_geometry(BOUNDARY, {"lon": 104.01, "lat": 31.009})
+
+
+def _team(object_id: str, lon: float, lat: float, route=None) -> ImpactCandidate:
+    return ImpactCandidate("team", object_id, object_id, lon, lat, route=route, notify_target_type="team_leader")
+
+
+def test_buffer_distance_is_measured_to_area_edge() -> None:
+    candidates = [
+        _team("inside", 104.01, 31.009),
+        _team("near", 104.03, 31.009),   # 东侧约 950m
+        _team("far", 104.10, 31.009),    # 东侧约 7.6km
+    ]
+
+    hits = {h.candidate.object_id: h for h in compute_impacts(candidates, HAZARD, 3000)}
+
+    assert set(hits) == {"inside", "near"}
+    assert hits["inside"].distance_m == 0
+    assert hits["near"].distance_m == pytest.approx(952, rel=0.02)
+
+
+def test_route_crossing_reports_entry_point() -> None:
+    # 从西侧远处出发，横穿灾害区域
+    route = [[103.90, 31.009], [104.05, 31.009], [104.10, 31.009]]
+    missing = [[103.90, 31.05], [104.10, 31.05]]
+    candidates = [_team("crossing", 103.90, 31.009, route), _team("clear", 103.90, 31.05, missing)]
+
+    hits = compute_impacts(candidates, HAZARD, 1000)
+
+    assert [h.candidate.object_id for h in hits] == ["crossing"]
+    assert hits[0].route_affected
+    lon, lat = hits[0].route_intersection
+    assert lon == pytest.approx(104.00, abs=1e-6) and lat == pytest.approx(31.009, abs=1e-6)
+
+
+def test_merge_keeps_nearest_distance_and_route_flag() -> None:
+    route = [[103.95, 31.009], [104.05, 31.009]]
+    candidates = [_team("t1", 104.025, 31.009), _team("t1", 103.95, 31.009, route)]
+
+    merged = merge_hits(compute_impacts(candidates, HAZARD, 3000))
+
+    assert len(merged) == 1
+    assert merged[0].route_affected and merged[0].distance_m == pytest.approx(476, rel=0.02)
+    # 无边界时按中心点计算
+    assert hazard_geometry(None, {"lon": 104.0, "lat": 31.0}).geom_type == "Point"
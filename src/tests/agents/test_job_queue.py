@@ -0,0 +1,143 @@
+"""Redis Stream 作业队列与作业管理器（fakeredis）：入队/消费/确认/结果、有界拒绝、超时"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.agents.jobs import AgentJobManager, BoundedResultStore, JobQueueFullError, RedisStreamJobQueue
+from src.agents.jobs.queue import JOB_INFLIGHT_PREFIX, JOB_STREAM_PREFIX
+
+
+def _manager(queue: RedisStreamJobQueue, job_timeout: float = 5.0) -> AgentJobManager:
+    return AgentJobManager(queue, job_timeout=job_timeout, poll_timeout=0.05)
+
+
+def test_enqueue_dequeue_ack_and_result() -> None:
+    async def run() -> tuple:
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        manager = _manager(RedisStreamJobQueue(client=redis))
+        results = BoundedResultStore(max_entries=10)
+        done = asyncio.Event()
+
+        async def handler(job_id: str, payload: dict) -> None:
+            results[job_id] = {"status": "completed", "echo": payload["event_id"]}
+            done.set()
+
+        manager.register("analyze", handler)
+        first = await manager.submit("analyze", "emergency-1", {"event_id": "e1"})
+        duplicate = await manager.submit("analyze", "emergency-1", {"event_id": "e1"})
+        await manager.start()
+        await asyncio.wait_for(done.wait(), 2)
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        stats = await manager.stats()
+        return (
+            first, duplicate, results.get("emergency-1"), stats["types"]["analyze"],
+            await redis.xlen(f"{JOB_STREAM_PREFIX}analyze"),
+            await redis.exists(f"{JOB_INFLIGHT_PREFIX}emergency-1"),
+        )
+
+    first, duplicate, result, stats, stream_len, inflight = asyncio.run(run())
+    assert (first, duplicate) == (True, False)
+    assert result == {"status": "completed", "echo": "e1"}
+    assert (stats["completed"], stats["deduplicated"], stats["queue_length"]) == (1, 1, 0)
+    # 确认后消息删除、去重标记释放，同一事件可再次提交
+    assert (stream_len, inflight) == (0, 0)
+
+
+def test_full_queue_rejects_new_jobs_but_still_dedups() -> None:
+    async def run() -> tuple:
+        queue = RedisStreamJobQueue(client=fakeredis.FakeAsyncRedis(decode_responses=True), max_length=2)
+        manager = _manager(queue)
+
+        async def handler(job_id: str, payload: dict) -> None:
+            return None
+
+        manager.register("analyze", handler)
+        assert await manager.submit("analyze", "a", {})
+        assert await manager.submit("analyze", "b", {})
+        duplicate = await manager.submit("analyze", "a", {})
+        with pytest.raises(JobQueueFullError) as exc:
+            await manager.submit("analyze", "c", {})
+        # 出队确认一条后恢复可提交
+        message = await queue.dequeue("analyze", "w1", timeout=0.1)
+        await queue.ack(message)
+        accepted = await manager.submit("analyze", "c", {})
+        return duplicate, exc.value, accepted, (await manager.stats())["types"]["analyze"]
+
+    duplicate, error, accepted, stats = asyncio.run(run())
+    assert duplicate is False
+    assert error.status_code == 503 and error.detail["error_code"] == "JOB_QUEUE_FULL"
+    assert accepted is True
+    assert (stats["submitted"], stats["rejected"], stats["deduplicated"]) == (3, 1, 1)
+
+
+def test_idle_read_returns_none_and_timed_out_job_is_acked() -> None:
+    async def run() -> tuple:
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        blocks = []
+        xreadgroup = redis.xreadgroup
+
+        async def spy(*args, **kwargs):
+            blocks.append(kwargs.get("block"))
+            return await xreadgroup(*args, **kwargs)
+
+        redis.xreadgroup = spy
+        queue = RedisStreamJobQueue(client=redis)
+        idle = await queue.dequeue("analyze", "w1", timeout=0.05)
+
+        manager = _manager(queue, job_timeout=0.05)
+        failures = []
+
+        async def slow(job_id: str, payload: dict) -> None:
+            await asyncio.sleep(1)
+
+        async def on_failure(job_id: str, payload: dict, error: str) -> None:
+            failures.append((job_id, error))
+
+        manager.register("analyze", slow, on_failure=on_failure)
+        await manager.submit("analyze", "slow-1", {})
+        await manager.start()
+        for _ in range(100):
+            if failures:
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return (
+            idle, blocks, failures, (await manager.stats())["types"]["analyze"],
+            await redis.exists(f"{JOB_INFLIGHT_PREFIX}slow-1"),
+        )
+
+    idle, blocks, failures, stats, inflight = asyncio.run(run())
+    assert idle is None
+    assert blocks[0] == 50
+    assert failures and failures[0][0] == "slow-1" and "超时" in failures[0][1]
+    assert stats["timed_out"] == 1
+    # 超时作业同样确认并释放去重标记
+    assert inflight == 0
+
+
+def test_poll_block_is_capped_below_socket_timeout() -> None:
+    class _Client:
+        def __init__(self) -> None:
+            self.blocks = []
+
+        async def xgroup_create(self, *args, **kwargs) -> None:
+            return None
+
+        async def xreadgroup(self, *args, **kwargs):
+            self.blocks.append(kwargs["block"])
+            return []
+
+        async def xautoclaim(self, *args, **kwargs):
+            return ["0-0", [], []]
+
+    client = _Client()
+    message = asyncio.run(RedisStreamJobQueue(client=client).dequeue("analyze", "w1", timeout=5.0))
+    assert message is None
+    # 默认轮询 5s 也只阻塞 2s，低于共享客户端 socket_timeout(5s)，空闲时不会读超时
+    assert client.blocks == [2000]
@@ -0,0 +1,116 @@
+"""ResourceLock 的 Lua 原子多键锁（fakeredis + lupa 执行脚本）"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+from redis.crc import key_slot
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from src.agents.exceptions import AIResourceLockedError
+from src.agents.utils import resource_lock
+from src.agents.utils.resource_lock import (
+    FENCING_COUNTER_KEY,
+    LOCK_KEY_PREFIX,
+    ResourceLock,
+    get_locked_teams,
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def _client():
+        return redis
+
+    async def _available():
+        return True
+
+    monkeypatch.setattr(resource_lock, "get_redis_client", _client)
+    monkeypatch.setattr(resource_lock, "redis_available", _available)
+    return redis
+
+
+def test_all_or_nothing_with_conflicting_holders(client):
+    async def _run():
+        first = ResourceLock("evt-1")
+        second = ResourceLock("evt-2")
+        await first.acquire_team_locks(["t1", "t2"])
+        with pytest.raises(AIResourceLockedError) as exc:
+            await second.acquire_team_locks(["t2", "t3", "t1"])
+        # 冲突时一个键都不写
+        assert await client.get(f"{LOCK_KEY_PREFIX}t3") is None
+        assert sorted(exc.value.locked_resources) == ["t1", "t2"]
+        assert exc.value.details["locked_by"] == "evt-1"
+        assert await get_locked_teams() == {"t1": "evt-1", "t2": "evt-1"}
+
+        await second.acquire_team_locks(["t3"])
+        assert second.fencing_token > first.fencing_token
+
+        # 同一事件可重入，令牌递增且旧键一并换新
+        token = first.fencing_token
+        await first.acquire_team_locks(["t4"])
+        assert first.fencing_token > token
+        assert first.locked_teams == {"t1", "t2", "t4"}
+        assert await client.get(f"{LOCK_KEY_PREFIX}t1") == f"evt-1:{first.fencing_token}"
+
+    asyncio.run(_run())
+
+
+def test_release_only_own_keys_and_partial_release(client):
+    async def _run():
+        lock = ResourceLock("evt-1", ttl_seconds=30)
+        await lock.acquire_team_locks(["t1", "t2", "t3"])
+        # t2 过期后被其他事件抢占
+        await client.set(f"{LOCK_KEY_PREFIX}t2", "evt-9:99")
+        await lock.release_locks(["t1"])
+        assert lock.locked_teams == {"t2", "t3"}
+        assert await lock.renew_locks() == 1
+        assert lock.lease_lost
+        await lock.release_locks()
+        assert await client.get(f"{LOCK_KEY_PREFIX}t2") == "evt-9:99"
+        assert await client.get(f"{LOCK_KEY_PREFIX}t3") is None
+
+    asyncio.run(_run())
+
+
+def test_background_lease_renewal(client):
+    async def _run():
+        lock = ResourceLock("evt-1", ttl_seconds=2)
+        await lock.acquire_team_locks(["t1"])
+        lock.start_lease_renewal(interval_seconds=0.05)
+        await client.pexpire(f"{LOCK_KEY_PREFIX}t1", 100)
+        await asyncio.sleep(0.2)
+        assert await client.pttl(f"{LOCK_KEY_PREFIX}t1") > 1000
+        await lock.release_locks()
+        assert lock._renew_task is None
+
+    asyncio.run(_run())
+
+
+def test_script_keys_share_one_cluster_slot(client):
+    async def _run():
+        await ResourceLock("evt-1").acquire_team_locks(["t1", "team-42"])
+        return [key async for key in client.scan_iter(match="*")]
+
+    keys = asyncio.run(_run())
+    assert sorted(keys) == sorted([FENCING_COUNTER_KEY, f"{LOCK_KEY_PREFIX}t1", f"{LOCK_KEY_PREFIX}team-42"])
+    assert len({key_slot(key.encode()) for key in keys}) == 1
+
+
+def test_registered_scripts_are_kept_per_client_and_collected_with_it():
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    other = fakeredis.FakeAsyncRedis(decode_responses=True)
+    scripts = resource_lock._lock_scripts(redis)
+    assert resource_lock._lock_scripts(redis) is scripts
+    assert resource_lock._lock_scripts(other) is not scripts
+
+    ref = weakref.ref(redis)
+    del redis, scripts
+    gc.collect()
+    assert ref() is None
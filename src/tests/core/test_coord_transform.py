@@ -0,0 +1,71 @@
+"""坐标系批量转换测试：逆向迭代收敛、GeoJSON 转换与静态图层缓存"""
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.coord_transform import (
+    StaticGeometryCache,
+    gcj02_to_wgs84,
+    gcj02_to_wgs84_array,
+    transform_feature_collection,
+    transform_geometry,
+    wgs84_to_gcj02,
+    wgs84_to_gcj02_array,
+)
+
+
+def test_inverse_converges_and_roundtrips() -> None:
+    rng = np.random.default_rng(7)
+    wgs = np.column_stack([rng.uniform(74, 134, 2000), rng.uniform(18, 53, 2000)])
+
+    gcj = wgs84_to_gcj02_array(wgs)
+    back = gcj02_to_wgs84_array(gcj)
+    assert np.abs(back - wgs).max() < 1e-9
+    assert np.allclose(back[:20], [gcj02_to_wgs84(*p) for p in gcj[:20].tolist()], atol=1e-9)
+
+
+def test_zero_copy_keeps_extra_columns() -> None:
+    points = np.array([[104.06, 30.67, 512.0], [2.35, 48.85, 35.0]])
+
+    result = wgs84_to_gcj02_array(points, copy=False)
+    assert result is points
+    assert tuple(points[0, :2]) == wgs84_to_gcj02(104.06, 30.67)
+    assert points[:, 2].tolist() == [512.0, 35.0]
+    assert points[1, :2].tolist() == [2.35, 48.85]
+
+
+def test_geojson_transform_preserves_structure() -> None:
+    polygon = {"type": "Polygon", "coordinates": [[[104, 30], [105, 30, 12], [105, 31], [104, 30]]]}
+    collection = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"n": 1}, "geometry": {"type": "Point", "coordinates": [104.06, 30.67]}},
+            {"type": "Feature", "properties": {"n": 2}, "geometry": polygon},
+            {"type": "Feature", "properties": {"n": 3}, "geometry": None},
+        ],
+    }
+
+    converted = transform_feature_collection(collection, "gcj02")
+    point = converted["features"][0]["geometry"]["coordinates"]
+    ring = converted["features"][1]["geometry"]["coordinates"][0]
+    assert tuple(point) == wgs84_to_gcj02(104.06, 30.67)
+    assert ring[1][2] == 12 and tuple(ring[2]) == wgs84_to_gcj02(105, 31)
+    assert converted["features"][2]["geometry"] is None
+    # 入参不被修改
+    assert polygon["coordinates"][0][0] == [104, 30]
+
+    back = transform_geometry(converted["features"][1]["geometry"], "wgs84")
+    assert np.allclose([p[:2] for p in back["coordinates"][0]], [p[:2] for p in polygon["coordinates"][0]])
+
+
+def test_static_cache_reuses_until_version_changes() -> None:
+    cache = StaticGeometryCache(max_entries=2)
+    line = {"type": "LineString", "coordinates": [[104, 30], [104.1, 30.1]]}
+
+    first = cache.get_or_transform([("road", 1, line)], "gcj02")[0]
+    assert cache.get_or_transform([("road", 1, line)], "gcj02")[0] is first
+    assert cache.get_or_transform([("road", 2, line)], "gcj02")[0] is not first
+    assert cache.stats == {"entries": 2, "hits": 1, "misses": 2}
+
+    cache.invalidate("road")
+    assert cache.stats["entries"] == 0
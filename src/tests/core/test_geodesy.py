@@ -0,0 +1,54 @@
+"""地理计算内核测试：批量结果与标量实现一致"""
+from __future__ import annotations
+
+import numpy as np
+
+from src.core import geodesy
+from src.core.coord_transform import gcj02_to_wgs84, wgs84_to_gcj02
+
+
+def test_batch_distances_match_scalar() -> None:
+    rng = np.random.default_rng(1)
+    lons = rng.uniform(100, 110, 50)
+    lats = rng.uniform(25, 35, 50)
+
+    expected = [geodesy.haversine_m(104.0, 31.0, x, y) for x, y in zip(lons, lats)]
+    assert np.allclose(geodesy.one_to_many_m(104.0, 31.0, lons, lats), expected)
+
+    matrix = geodesy.distance_matrix_m(lons[:5], lats[:5], lons[5:8], lats[5:8])
+    assert matrix.shape == (5, 3)
+    assert np.isclose(matrix[2, 1], geodesy.haversine_m(lons[2], lats[2], lons[6], lats[6]))
+
+    idx, dist = geodesy.nearest_index(104.0, 31.0, lons, lats)
+    assert idx == int(np.argmin(expected)) and np.isclose(dist, min(expected))
+    assert geodesy.nearest_index(104.0, 31.0, [], [])[0] == -1
+
+    coords = np.column_stack([lons, lats])
+    assert np.isclose(
+        geodesy.polyline_length_m(coords),
+        sum(geodesy.haversine_m(*coords[i - 1], *coords[i]) for i in range(1, len(coords))),
+    )
+
+
+def test_bearing_and_destination_roundtrip() -> None:
+    lons, lats = geodesy.destination_points(104.0, 31.0, [0, 90, 225], 1500.0)
+
+    assert np.allclose(geodesy.distances_m(104.0, 31.0, lons, lats), 1500.0)
+    assert np.allclose(geodesy.bearings_deg(104.0, 31.0, lons, lats), [0, 90, 225], atol=1e-6)
+    assert np.isclose(geodesy.bearing_deg(104.0, 31.0, lons[1], lats[1]), 90.0)
+
+
+def test_points_in_polygon() -> None:
+    square = [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]
+    inside = geodesy.points_in_polygon([1, 3, 1.5, -0.1], [1, 1, 1.9, 1], square)
+    assert inside.tolist() == [True, False, True, False]
+
+
+def test_coordinate_arrays_match_scalar_transform() -> None:
+    points = [(104.06, 30.67), (116.39, 39.91), (2.35, 48.85), (121.47, 31.23)]
+
+    gcj = geodesy.wgs84_to_gcj02_array(points)
+    assert np.allclose(gcj, [wgs84_to_gcj02(*p) for p in points])
+    assert np.allclose(geodesy.gcj02_to_wgs84_array(gcj), [gcj02_to_wgs84(*p) for p in gcj.tolist()])
+    # 境外坐标不偏移
+    assert tuple(gcj[2]) == points[2]
@@ -0,0 +1,77 @@
+"""SockJS 会话层测试：批量合并、队列溢出、单接收者与空闲回收"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from src.core.sockjs import (
+    SockJSQueueOverflow,
+    SockJSSessionManager,
+    parse_send_body,
+)
+
+
+def test_poll_batches_queued_messages_and_wakes_on_send() -> None:
+    async def run() -> None:
+        manager = SockJSSessionManager(heartbeat_sec=1.0, batch_limit=3)
+        session, created = manager.open("s1")
+        assert await manager.poll(session, created) == "o"
+
+        for i in range(4):
+            await session.send_text("a" + json.dumps([f"m{i}"]))
+        assert await manager.poll(session, False) == 'a["m0", "m1", "m2"]'
+        assert await manager.poll(session, False) == 'a["m3"]'
+
+        waiter = asyncio.create_task(manager.poll(session, False))
+        await asyncio.sleep(0.01)
+        # 第二个接收请求被拒绝
+        assert (await manager.poll(session, False)).startswith("c[2010")
+        await session.send_text('a["late"]')
+        assert await asyncio.wait_for(waiter, 0.5) == 'a["late"]'
+        assert session.sent_messages == 5
+        await manager.close_all()
+
+    asyncio.run(run())
+
+
+def test_queue_overflow_closes_session_and_reaper_notifies() -> None:
+    async def run() -> None:
+        closed = []
+        manager = SockJSSessionManager(heartbeat_sec=0.05, disconnect_delay_sec=0.05, queue_limit=2)
+        session, created = manager.open("slow", on_close=lambda s: closed.append(s.session_id))
+        assert await manager.poll(session, created) == "o"
+        manager.open("idle", on_close=lambda s: closed.append(s.session_id))
+
+        await session.send_text('a["1","2"]')
+        with pytest.raises(SockJSQueueOverflow):
+            await session.send_text('a["3"]')
+        assert session.closed
+
+        # 积压消息先送出，再发送关闭帧并移除会话
+        assert await manager.poll(session, False) == 'a["1", "2"]'
+        assert await manager.poll(session, False) == 'c[1013, "Outbound queue overflow"]'
+        assert "slow" not in manager.sessions
+
+        await asyncio.sleep(0.2)
+        assert manager.sessions == {}
+        assert closed == ["slow", "idle"]
+
+    asyncio.run(run())
+
+
+def test_stream_wraps_frames_and_parse_send_body() -> None:
+    async def run() -> list:
+        manager = SockJSSessionManager(heartbeat_sec=1.0)
+        session, created = manager.open("s2")
+        await session.send_text('a["x"]')
+        session.close()
+        return [chunk async for chunk in manager.stream(session, created, lambda f: f + "\n", prelude="hh\n")]
+
+    assert asyncio.run(run()) == ["hh\n", "o\n", 'a["x"]\n', 'c[3000, "Go away!"]\n']
+
+    assert parse_send_body(b'["CONNECT", "SUBSCRIBE"]') == ["CONNECT", "SUBSCRIBE"]
+    for body in (b"", b'{"a": 1}'):
+        with pytest.raises(ValueError):
+            parse_send_body(body)
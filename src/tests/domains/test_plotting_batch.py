@@ -0,0 +1,145 @@
+"""批量标绘测试：条目区分、与单个标绘一致的实体构建、整批几何校验、批量写入与按图层替换的 SQL"""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from geoalchemy2.elements import WKBElement
+from sqlalchemy.dialects import postgresql
+
+from src.core.exceptions import ValidationError
+from src.domains.map_entities.repository import EntityRepository
+from src.domains.plotting.schemas import PlotBatchRequest, PlotCircleRequest
+from src.domains.plotting.service import _circle_entity, build_batch_entities
+
+
+def _request(items, **kwargs) -> PlotBatchRequest:
+    return PlotBatchRequest.model_validate({"scenario_id": str(uuid4()), "items": items, **kwargs})
+
+
+def test_builds_heterogeneous_items_with_batch_defaults() -> None:
+    request = _request(
+        [
+            {"kind": "point", "plotting_type": "rescue_target", "name": "被困群众", "longitude": 103.1, "latitude": 31.2},
+            {"kind": "circle", "plotting_type": "danger_area", "name": "滑坡区",
+             "center_longitude": 103.2, "center_latitude": 31.3, "radius_m": 500},
+            {"kind": "route", "name": "进场路线", "coordinates": [[103.1, 31.2], [103.2, 31.3]]},
+            {"kind": "weather_area", "name": "雨区", "min_longitude": 103.0, "min_latitude": 31.0,
+             "max_longitude": 103.5, "max_latitude": 31.5},
+        ],
+        replace_layers=["layer.dispose"],
+        group="ai-round-1",
+    )
+    entities = build_batch_entities(request)
+
+    assert [e.type.value for e in entities] == ["rescue_target", "danger_area", "planned_route", "weather_area"]
+    assert [e.layer_code for e in entities] == ["layer.rescue", "layer.dispose", "layer.path", "layer.weather"]
+    assert all(e.scenario_id == request.scenario_id for e in entities)
+    assert all(e.properties["plotGroup"] == "ai-round-1" for e in entities)
+    assert entities[0].properties["level"] == 3
+
+    # 与单个标绘接口构建的实体一致（分组属性除外）
+    single = _circle_entity(PlotCircleRequest(**request.items[1].model_dump(exclude={"kind"}) | {
+        "scenario_id": request.scenario_id}))
+    batch_circle = entities[1].model_dump()
+    batch_circle["properties"].pop("plotGroup")
+    assert batch_circle == single.model_dump()
+
+
+def test_rejects_whole_batch_with_indexed_geometry_errors() -> None:
+    request = _request([
+        {"kind": "point", "plotting_type": "event_point", "name": "ok", "longitude": 103.1, "latitude": 31.2},
+        {"kind": "route", "name": "单点路线", "coordinates": [[103.1, 31.2]]},
+        {"kind": "polygon", "name": "两点多边形", "coordinates": [[103.1, 31.2], [103.2, 31.3]]},
+    ])
+    with pytest.raises(ValidationError) as exc:
+        build_batch_entities(request)
+
+    assert [e["index"] for e in exc.value.detail["details"]] == [1, 2]
+    assert [e["kind"] for e in exc.value.detail["details"]] == ["route", "polygon"]
+
+
+def test_rejects_self_intersecting_polygon_but_keeps_event_range_rings() -> None:
+    ring = [[103.0, 31.0], [103.2, 31.0], [103.2, 31.2], [103.0, 31.2], [103.0, 31.0]]
+    request = _request([
+        {"kind": "event_range", "name": "影响范围", "outer_ring": ring,
+         "middle_ring": [[103.05, 31.05], [103.15, 31.05], [103.15, 31.15], [103.05, 31.15], [103.05, 31.05]],
+         "inner_ring": [[103.08, 31.08], [103.12, 31.08], [103.12, 31.12], [103.08, 31.12], [103.08, 31.08]]},
+        {"kind": "polygon", "name": "蝴蝶结",
+         "coordinates": [[103.0, 31.0], [103.2, 31.2], [103.2, 31.0], [103.0, 31.2], [103.0, 31.0]]},
+    ])
+    with pytest.raises(ValidationError) as exc:
+        build_batch_entities(request)
+
+    details = exc.value.detail["details"]
+    assert [e["index"] for e in details] == [1]
+    assert "Self-intersection" in details[0]["error"]
+
+
+def test_unknown_kind_is_rejected_by_schema() -> None:
+    with pytest.raises(Exception):
+        _request([{"kind": "hexagon", "name": "x"}])
+
+
+class _RecordingSession:
+    """记录 execute 调用的 AsyncSession 替身"""
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def execute(self, statement, params=None):
+        self.calls.append((statement, params))
+        rows = [SimpleNamespace(id=uuid4(), type="danger_area", layer_code="layer.dispose")]
+        return SimpleNamespace(all=lambda: rows, scalars=lambda: SimpleNamespace(all=lambda: ["entity"]))
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_create_many_is_one_insert_with_wkb_geometry() -> None:
+    request = _request([
+        {"kind": "point", "plotting_type": "event_point", "name": "a", "longitude": 103.1, "latitude": 31.2},
+        {"kind": "route", "name": "b", "coordinates": [[103.1, 31.2], [103.2, 31.3]]},
+    ])
+    db = _RecordingSession()
+    created = asyncio.run(EntityRepository(db).create_many(build_batch_entities(request), created_by="ai"))
+
+    assert created == ["entity"]
+    assert len(db.calls) == 1
+    statement, rows = db.calls[0]
+    assert _sql(statement).startswith("INSERT INTO") and "RETURNING" in _sql(statement)
+    assert [row["type"] for row in rows] == ["event_point", "planned_route"]
+    assert all(isinstance(row["geometry"], WKBElement) and row["geometry"].srid == 4326 for row in rows)
+    assert {row["created_by"] for row in rows} == {"ai"}
+
+
+def test_soft_delete_in_layers_locks_sorted_layers_and_filters_by_source_and_group() -> None:
+    scenario_id = uuid4()
+    db = _RecordingSession()
+    deleted = asyncio.run(EntityRepository(db).soft_delete_in_layers(
+        scenario_id, ["layer.path", "layer.dispose", "layer.path"], source="system", plot_group="ai-round-1",
+    ))
+
+    *locks, (update_stmt, _) = db.calls
+    # 去重并按图层编码排序加锁，并发替换加锁顺序一致不会死锁
+    assert ["pg_advisory_xact_lock" in str(stmt) for stmt, _ in locks] == [True, True]
+    assert [params["key"] for _, params in locks] == [
+        f"entity_layer:{scenario_id}:layer.dispose",
+        f"entity_layer:{scenario_id}:layer.path",
+    ]
+    sql = _sql(update_stmt)
+    assert sql.startswith("UPDATE") and "deleted_at IS NULL" in sql
+    assert "source = " in sql and "properties ->> " in sql
+    params = update_stmt.compile(dialect=postgresql.dialect()).params
+    assert "system" in params.values() and "ai-round-1" in params.values()
+    assert deleted[0]["layerCode"] == "layer.dispose"
+
+
+def test_soft_delete_without_group_only_filters_source() -> None:
+    db = _RecordingSession()
+    asyncio.run(EntityRepository(db).soft_delete_in_layers(uuid4(), ["layer.dispose"], source="system"))
+    sql = _sql(db.calls[-1][0])
+    assert "source = " in sql and "properties" not in sql.split("WHERE", 1)[1]
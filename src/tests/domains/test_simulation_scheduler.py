@@ -0,0 +1,180 @@
+"""仿真注入调度器测试：按仿真时间精确唤醒、暂停、快进回放与重启恢复"""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.domains.simulation.clock import SimulationClock
+from src.domains.simulation.scheduler import SimulationScheduler
+from src.domains.simulation.schemas import EventTemplate, ScheduledInjection
+
+START = datetime(2025, 11, 27, 8, 0)
+
+
+def _injection(minute: float, title: str) -> ScheduledInjection:
+    return ScheduledInjection(
+        id=str(uuid4()),
+        relative_time_min=minute,
+        event_template=EventTemplate(title=title, event_type="landslide"),
+    )
+
+
+class _Recorder:
+    def __init__(self, fail_titles: tuple = ()) -> None:
+        self.fired = []
+        self.fail_titles = fail_titles
+
+    async def __call__(self, simulation_id, scenario_id, template):
+        if template.title in self.fail_titles:
+            raise RuntimeError("event service down")
+        self.fired.append(template.title)
+        return uuid4()
+
+
+def test_fires_at_simulated_due_time_and_respects_pause() -> None:
+    async def run() -> None:
+        recorder = _Recorder()
+        scheduler = SimulationScheduler(injector=recorder)
+        sim_id = uuid4()
+        clock = SimulationClock(START, time_scale=Decimal("10"))
+        scheduler.load(sim_id, uuid4(), clock, [_injection(1, "a"), _injection(2, "b")])
+        scheduler.start_clock(sim_id)
+
+        # 距 T+1min 还差 0.2 仿真秒（10倍速下 20ms 真实时间），旧实现最多要等 5 秒
+        clock.advance(59.8)
+        t0 = time.perf_counter()
+        while not recorder.fired and time.perf_counter() - t0 < 1.0:
+            await asyncio.sleep(0.005)
+        assert recorder.fired == ["a"]
+        assert time.perf_counter() - t0 < 0.5
+        assert scheduler.stats["max_lag_sim_s"] < 1.0
+
+        scheduler.pause_clock(sim_id)
+        clock.advance(120)
+        await asyncio.sleep(0.05)
+        assert recorder.fired == ["a"]
+
+        scheduler.start_clock(sim_id)
+        await asyncio.sleep(0.05)
+        assert recorder.fired == ["a", "b"]
+        await scheduler.stop()
+
+    asyncio.run(run())
+
+
+def test_fast_forward_is_deterministic_and_retries_failures() -> None:
+    async def run() -> tuple:
+        recorder = _Recorder(fail_titles=("broken",))
+        scheduler = SimulationScheduler(injector=recorder, max_attempts=2)
+        sim_id = uuid4()
+        clock = SimulationClock(START)
+        plan = [_injection(30, "late"), _injection(10, "first"), _injection(10, "second"),
+                _injection(20, "broken"), _injection(90, "after")]
+        scheduler.load(sim_id, uuid4(), clock, plan)
+
+        fired = await scheduler.fast_forward(sim_id, until_min=60)
+        queue = scheduler.injections(sim_id)
+        await scheduler.stop()
+        return recorder.fired, [i.event_template.title for i in fired], clock, queue, scheduler.stats
+
+    fired, returned, clock, queue, stats = asyncio.run(run())
+    assert fired == returned == ["first", "second", "late"]
+    assert clock.current_simulation_time == START + timedelta(minutes=60)
+    assert [i.event_template.title for i in queue if not i.injected] == ["broken", "after"]
+    assert stats["failed"] == 1
+
+
+def test_recovers_running_clock_from_checkpoint() -> None:
+    sim_id = uuid4()
+    checkpoint_at = datetime.now(timezone.utc) - timedelta(seconds=60)
+    origin = datetime(2025, 11, 27, 8, 0, tzinfo=timezone.utc)
+    scenario = SimpleNamespace(
+        id=sim_id, scenario_id=uuid4(), status="running", time_scale=Decimal("2"),
+        start_simulation_time=origin, current_simulation_time=origin + timedelta(minutes=5),
+        clock_checkpoint_at=checkpoint_at,
+    )
+    rows = [
+        SimpleNamespace(id=uuid4(), simulation_id=sim_id, status="injected", injected_at=None,
+                        event_data={"relative_time_min": 1, "seq": 0,
+                                    "event_template": {"title": "done", "event_type": "fire"}}),
+        SimpleNamespace(id=uuid4(), simulation_id=sim_id, status="pending", injected_at=None,
+                        event_data={"relative_time_min": 6, "seq": 1,
+                                    "event_template": {"title": "missed", "event_type": "fire"}}),
+    ]
+
+    class _Store:
+        marked = []
+
+        async def load_active(self):
+            return [(scenario, rows)]
+
+        async def checkpoint(self, clocks):
+            pass
+
+        async def mark_injection(self, injection_id, status, event_id=None, injected_at=None):
+            self.marked.append(status)
+
+    async def run() -> tuple:
+        recorder = _Recorder()
+        store = _Store()
+        scheduler = SimulationScheduler(injector=recorder, store=store)
+        await scheduler.start()
+        clock = scheduler.clock(sim_id)
+        elapsed = clock.elapsed_simulation_seconds
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        return elapsed, recorder.fired, store.marked
+
+    elapsed, fired, marked = asyncio.run(run())
+    # 停机 60 秒 × 2 倍速：T+5min → T+7min，错过的 T+6min 注入恢复后补发
+    assert 419 < elapsed < 425
+    assert fired == ["missed"] and marked == ["injected"]
+
+
+def test_default_injector_commits_before_broadcast(monkeypatch) -> None:
+    from src.core import database
+    from src.domains.simulation.service import SimulationService
+
+    calls = []
+    event_id = uuid4()
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            calls.append("close")
+
+        async def commit(self):
+            calls.append("commit")
+
+        async def rollback(self):
+            calls.append("rollback")
+
+    async def create_event(self, scenario_id, template):
+        calls.append("create")
+        return event_id
+
+    async def broadcast(self, simulation_id, template, injected_event_id):
+        calls.append("broadcast")
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", _Session)
+    monkeypatch.setattr(SimulationService, "_create_real_event", create_event)
+    monkeypatch.setattr(SimulationService, "_broadcast_injected_event", broadcast)
+
+    async def run() -> list:
+        scheduler = SimulationScheduler()
+        sim_id = uuid4()
+        scheduler.load(sim_id, uuid4(), SimulationClock(START), [_injection(5, "a")])
+        fired = await scheduler.fast_forward(sim_id)
+        await scheduler.stop()
+        return fired
+
+    fired = asyncio.run(run())
+    assert [i.event_template.title for i in fired] == ["a"]
+    # 事件先提交再广播，会话关闭时不会回滚掉已广播的事件
+    assert calls == ["create", "commit", "broadcast", "close"]
@@ -0,0 +1,109 @@
+"""多仓物资分配规划测试"""
+import asyncio
+from datetime import date, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.domains.supplies.allocation import AllocationPolicy, StockLot, SupplyDemand, plan_allocation
+from src.domains.supplies.inventory_service import SupplyInventoryService
+
+TODAY = date(2026, 6, 1)
+DEST = (31.0, 103.6)
+
+
+def _lot(depot_id, code, available, lat, lng, expiry_days=None, name="仓库"):
+    return StockLot(
+        inventory_id=uuid4(),
+        depot_id=depot_id,
+        depot_name=name,
+        supply_id=uuid4(),
+        supply_code=code,
+        supply_name=code,
+        available=available,
+        expiry_date=TODAY + timedelta(days=expiry_days) if expiry_days is not None else None,
+        latitude=lat,
+        longitude=lng,
+    )
+
+
+def test_nearest_depot_first_and_shortage_in_same_pass():
+    near, far = uuid4(), uuid4()
+    lots = [
+        _lot(far, "WATER", 100, 31.5, 104.2),
+        _lot(near, "WATER", 60, 31.01, 103.61),
+    ]
+    plan = plan_allocation([SupplyDemand(200, "WATER", priority="critical")], lots, DEST, today=TODAY)
+
+    assert [line.depot_id for line in plan.lines] == [near, far]
+    assert [line.quantity for line in plan.lines] == [60, 100]
+    assert plan.shortages == [{
+        "supply_code": "WATER", "supply_name": "WATER", "required": 200,
+        "available": 160, "shortage": 40, "severity": "critical",
+    }]
+
+
+def test_fefo_prefers_expiring_lot_at_same_depot():
+    depot = uuid4()
+    fresh = _lot(depot, "FOOD", 50, 31.01, 103.61, expiry_days=300)
+    expiring = _lot(depot, "FOOD", 50, 31.01, 103.61, expiry_days=5)
+    plan = plan_allocation([SupplyDemand(30, "FOOD")], [fresh, expiring], DEST, today=TODAY)
+
+    assert [line.inventory_id for line in plan.lines] == [expiring.inventory_id]
+    assert plan.fulfilled
+
+
+def test_consolidates_onto_already_used_depot():
+    main, other = uuid4(), uuid4()
+    lots = [
+        _lot(main, "TENT", 10, 31.02, 103.62),
+        _lot(main, "BLANKET", 10, 31.02, 103.62),
+        # 略近但需要额外启用一个存放点
+        _lot(other, "BLANKET", 10, 31.015, 103.615),
+    ]
+    demands = [SupplyDemand(10, "TENT", priority="critical"), SupplyDemand(10, "BLANKET")]
+    plan = plan_allocation(demands, lots, DEST, AllocationPolicy(new_depot_penalty_km=5), today=TODAY)
+
+    assert plan.depots_used == [str(main)]
+    assert plan.fulfilled
+
+
+def test_mixed_id_and_code_demands_share_one_line_per_lot():
+    lot = _lot(uuid4(), "WATER", 100, 31.01, 103.61)
+    demands = [SupplyDemand(30, supply_id=lot.supply_id), SupplyDemand(20, "WATER", priority="high")]
+    plan = plan_allocation(demands, [lot], DEST, today=TODAY)
+
+    assert [(line.inventory_id, line.quantity) for line in plan.lines] == [(lot.inventory_id, 50)]
+    assert plan.fulfilled
+
+
+class _FakeDb:
+    """_load_stock_lots 返回固定批次，预留 UPDATE 按 VALUES 中的记录数返回"""
+
+    def __init__(self, lots):
+        self.lots = lots
+        self.calls = []
+
+    async def execute(self, sql, params):
+        if "UPDATE" in str(sql):
+            self.calls.append("reserve")
+            rows = [(i,) for i in params["inventory_ids"]]
+        else:
+            self.calls.append("load")
+            rows = [SimpleNamespace(**vars(lot)) for lot in self.lots]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+
+def test_allocate_commits_when_mixed_demands_hit_same_inventory_row():
+    lot = _lot(uuid4(), "WATER", 100, 31.01, 103.61)
+    db = _FakeDb([lot])
+    demands = [SupplyDemand(30, supply_id=lot.supply_id), SupplyDemand(20, "WATER")]
+    result = asyncio.run(SupplyInventoryService(db).allocate_supplies(demands, DEST))
+
+    assert result.success and result.reserved and result.retried_count == 0
+    assert db.calls == ["load", "reserve", "commit"]
@@ -0,0 +1,135 @@
+"""EmergencyAI图并行分支与延迟预算测试
+
+用桩节点替换真实节点（无需LLM/KG/数据库），验证：
+- 独立阶段并行执行，trace计数与阶段列表正确合并
+- 每个节点耗时记录在 trace["node_timings_ms"]
+- 延迟预算不足时跳过可选阶段
+- 仿真节点不阻塞事件循环，与报告生成真正并行
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+import pytest
+
+from src.agents.emergency_ai import graph as graph_module
+from src.agents.emergency_ai.state import create_initial_state
+
+STAGE_DELAY = 0.2
+
+_NODE_OUTPUTS: Dict[str, Dict[str, Any]] = {
+    "understand_disaster": {"parsed_disaster": {"disaster_type": "earthquake"}},
+    "enhance_with_cases": {"similar_cases": [{"case_id": "c1"}]},
+    "query_rules": {"_kg_rules": [{"rule_id": "TRR-1"}]},
+    "apply_rules": {"matched_rules": [{"rule_id": "TRR-1"}]},
+    "htn_decompose": {"task_sequence": [{"task_id": "EM01"}]},
+    "classify_domains": {},
+    "apply_phase_priority": {},
+    "assemble_modules": {},
+    "match_resources": {},
+    "optimize_allocation": {"allocation_solutions": [{"solution_id": "s1"}]},
+    "check_transport": {"transport_plans": []},
+    "check_safety_rules": {"safety_violations": []},
+    "filter_hard_rules": {},
+    "score_soft_rules": {"recommended_scheme": {"solution_id": "s1"}},
+    "explain_scheme": {"scheme_explanation": "ok"},
+    "generate_reports": {"generated_reports": {"initial": "r"}},
+    "run_simulation": {"final_output": {"simulation_result": {"survival_rate": 0.9}}},
+    "generate_output": {},
+}
+
+_SLOW_NODES = {
+    "enhance_with_cases", "query_rules",
+    "check_transport", "check_safety_rules",
+    "generate_reports", "run_simulation",
+}
+
+
+def _stub(name: str) -> Callable[[Dict[str, Any]], Any]:
+    async def _node(state: Dict[str, Any]) -> Dict[str, Any]:
+        if name in _SLOW_NODES:
+            await asyncio.sleep(STAGE_DELAY)
+        # 与真实节点一致：原地修改trace并返回完整trace
+        trace = state.get("trace", {})
+        trace["phases_executed"] = trace.get("phases_executed", []) + [name]
+        trace["llm_calls"] = trace.get("llm_calls", 0) + 1
+        return {**_NODE_OUTPUTS[name], "trace": trace, "current_phase": name}
+    return _node
+
+
+@pytest.fixture
+def stub_graph(monkeypatch: pytest.MonkeyPatch):
+    for name in _NODE_OUTPUTS:
+        monkeypatch.setattr(graph_module, name, _stub(name))
+    return graph_module.build_emergency_ai_graph().compile()
+
+
+def test_independent_stages_run_concurrently(stub_graph) -> None:
+    state = create_initial_state("evt-1", "scn-1", "地震")
+
+    started = time.perf_counter()
+    final = asyncio.run(stub_graph.ainvoke(state))
+    elapsed = time.perf_counter() - started
+
+    trace = final["trace"]
+    # 6个慢节点两两并行：约3个延迟而非6个
+    assert elapsed < STAGE_DELAY * 5
+    assert trace["llm_calls"] == len(_NODE_OUTPUTS)
+    assert sorted(trace["phases_executed"]) == sorted(_NODE_OUTPUTS)
+    assert trace["phases_executed"][-1] == "generate_output"
+    assert set(trace["node_timings_ms"]) == set(_NODE_OUTPUTS)
+    assert trace["node_timings_ms"]["query_rules"] >= STAGE_DELAY * 1000 * 0.9
+    assert final["current_phase"] == "generate_output"
+    assert trace["skipped_stages"] == []
+
+
+def test_latency_budget_skips_optional_stages(stub_graph) -> None:
+    state = create_initial_state("evt-2", "scn-1", "地震", constraints={"latency_budget_ms": 1})
+
+    final = asyncio.run(stub_graph.ainvoke(state))
+
+    trace = final["trace"]
+    skipped = set(trace["skipped_stages"])
+    assert skipped == {"enhance_with_cases", "explain_scheme", "generate_reports", "run_simulation"}
+    assert not skipped & set(trace["phases_executed"])
+    assert final["similar_cases"] == []
+    assert "generate_output" in trace["phases_executed"]
+
+
+def test_simulation_node_does_not_block_event_loop(monkeypatch) -> None:
+    """仿真在线程池中执行，并行分支（报告生成）在仿真期间照常推进"""
+    from src.agents.emergency_ai.nodes import simulation
+    from src.planning.algorithms.base import AlgorithmResult, AlgorithmStatus
+
+    class _SlowSimulator:
+        def run(self, problem: Dict[str, Any]) -> AlgorithmResult:
+            time.sleep(STAGE_DELAY)
+            summary = {"avg_survival_rate": 0.9, "avg_preventable_deaths": 1.0,
+                       "avg_survival_quality": 80.0, "avg_completion_time_min": 120}
+            return AlgorithmResult(status=AlgorithmStatus.SUCCESS, solution={"summary": summary},
+                                   metrics={}, trace={}, time_ms=0)
+
+    monkeypatch.setattr(simulation, "DiscreteEventSimulator", _SlowSimulator)
+    monkeypatch.setattr(simulation, "_prepare_sim_tasks", lambda state: [])
+    monkeypatch.setattr(simulation, "_prepare_sim_resources", lambda scheme, state: [])
+    monkeypatch.setattr(simulation, "_prepare_sim_scenario", lambda state: {})
+
+    async def run() -> tuple:
+        ticks = []
+
+        async def _reports() -> None:
+            for _ in range(10):
+                await asyncio.sleep(STAGE_DELAY / 20)
+                ticks.append(time.perf_counter())
+
+        state = {"event_id": "evt-1", "recommended_scheme": {"solution_id": "s1"}, "trace": {}}
+        start = time.perf_counter()
+        result, _ = await asyncio.gather(simulation.run_simulation(state), _reports())
+        return result, ticks, start
+
+    result, ticks, start = asyncio.run(run())
+    assert result["final_output"]["simulation_result"]["survival_rate"] == 0.9
+    # 阻塞事件循环时报告分支要等仿真结束才能开始推进
+    assert ticks[0] - start < STAGE_DELAY / 2
@@ -0,0 +1,153 @@
+"""Unit tests for LLMResponseCache.
+
+Covers the deterministic cache behaviour without any real LLM:
+- Normalized exact-match hits
+- Coalescing of concurrent identical requests
+- Cancelling the first requester does not cancel coalesced waiters
+- Embedding-similarity hits scoped by the non-semantic prompt vars
+- Failures are not cached
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+from src.agents.emergency_ai.utils.llm_cache import LLMCacheConfig, LLMResponseCache
+
+
+def _counting_call(counter: Dict[str, int], delay: float = 0.0) -> Any:
+    async def _call() -> Dict[str, Any]:
+        counter["calls"] += 1
+        await asyncio.sleep(delay)
+        return {"disaster_type": "earthquake", "call": counter["calls"]}
+    return _call
+
+
+def test_normalized_prompt_hits_exact_tier() -> None:
+    """Whitespace/full-width differences should map to the same cache key."""
+
+    cache = LLMResponseCache("test", LLMCacheConfig())
+    counter = {"calls": 0}
+
+    async def _run() -> List[Dict[str, Any]]:
+        first = await cache.get_or_call(
+            namespace="parse", model_params={"m": 1},
+            prompt_vars={"description": "某镇  发生 6.5级地震"}, call=_counting_call(counter),
+        )
+        second = await cache.get_or_call(
+            namespace="parse", model_params={"m": 1},
+            prompt_vars={"description": " 某镇 发生 ６.５级地震 "}, call=_counting_call(counter),
+        )
+        return [first, second]
+
+    first, second = asyncio.run(_run())
+
+    assert counter["calls"] == 1
+    assert first == second
+    stats = cache.stats["namespaces"]["parse"]
+    assert stats["exact_hits"] == 1 and stats["misses"] == 1
+
+
+def test_concurrent_identical_requests_are_coalesced() -> None:
+    """Identical in-flight requests should share a single LLM call."""
+
+    cache = LLMResponseCache("test", LLMCacheConfig())
+    counter = {"calls": 0}
+
+    async def _run() -> List[Dict[str, Any]]:
+        return await asyncio.gather(*[
+            cache.get_or_call(
+                namespace="parse", model_params={}, prompt_vars={"description": "x"},
+                call=_counting_call(counter, delay=0.05),
+            )
+            for _ in range(5)
+        ])
+
+    results = asyncio.run(_run())
+
+    assert counter["calls"] == 1
+    assert all(r == results[0] for r in results)
+    assert cache.stats["namespaces"]["parse"]["coalesced"] == 4
+
+
+def test_cancelled_leader_does_not_cancel_waiters() -> None:
+    """The shared LLM call outlives the requester that started it."""
+
+    cache = LLMResponseCache("test", LLMCacheConfig())
+    counter = {"calls": 0}
+
+    def _request() -> Any:
+        return cache.get_or_call(
+            namespace="parse", model_params={}, prompt_vars={"description": "x"},
+            call=_counting_call(counter, delay=0.05),
+        )
+
+    async def _run() -> tuple:
+        leader = asyncio.create_task(_request())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(_request())
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await waiter
+        # the result was cached even though its requester went away
+        cached = await _request()
+        return leader.cancelled(), result, cached
+
+    leader_cancelled, result, cached = asyncio.run(_run())
+
+    assert leader_cancelled
+    assert result == cached == {"disaster_type": "earthquake", "call": 1}
+    assert counter["calls"] == 1
+
+
+def test_semantic_tier_respects_scope() -> None:
+    """Similar descriptions hit only when the remaining prompt vars match."""
+
+    async def _embed(text: str) -> List[float]:
+        return [1.0, 0.01] if "地震" in text else [0.0, 1.0]
+
+    cache = LLMResponseCache(
+        "test", LLMCacheConfig(semantic_enabled=True, semantic_threshold=0.99), embed_func=_embed,
+    )
+    counter = {"calls": 0}
+
+    async def _run() -> None:
+        await cache.get_or_call(
+            namespace="parse", model_params={}, call=_counting_call(counter),
+            prompt_vars={"description": "A镇地震", "context_info": "c1"}, semantic_field="description",
+        )
+        await cache.get_or_call(
+            namespace="parse", model_params={}, call=_counting_call(counter),
+            prompt_vars={"description": "A镇发生地震", "context_info": "c1"}, semantic_field="description",
+        )
+        await cache.get_or_call(
+            namespace="parse", model_params={}, call=_counting_call(counter),
+            prompt_vars={"description": "A镇发生地震", "context_info": "c2"}, semantic_field="description",
+        )
+
+    asyncio.run(_run())
+
+    assert counter["calls"] == 2
+    assert cache.stats["namespaces"]["parse"]["semantic_hits"] == 1
+
+
+def test_failures_are_not_cached() -> None:
+    """A failed call must propagate and leave no entry behind."""
+
+    cache = LLMResponseCache("test", LLMCacheConfig())
+
+    async def _boom() -> Dict[str, Any]:
+        raise ValueError("llm down")
+
+    async def _run() -> None:
+        try:
+            await cache.get_or_call(namespace="p", model_params={}, prompt_vars={"d": "x"}, call=_boom)
+        except ValueError:
+            pass
+        else:  # pragma: no cover - defensive
+            raise AssertionError("expected ValueError")
+
+    asyncio.run(_run())
+
+    assert cache.stats["entries"] == 0
+    assert cache.stats["namespaces"]["p"]["errors"] == 1
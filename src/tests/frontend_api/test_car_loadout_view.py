@@ -0,0 +1,183 @@
+"""车辆装备读模型测试（构建与差异计算、按变化来源增量刷新、写入提交后再刷新，不访问数据库）"""
+import asyncio
+from enum import Enum
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.domains.frontend_api.car import loadout_builder
+
+
+class _Status(Enum):
+    available = "available"
+
+
+def _vehicle(name):
+    return SimpleNamespace(id=uuid4(), code=name, name=name, status=_Status.available)
+
+
+def _device(name, device_type="drone", module_types=("sensor",), slots=1, exclusive_to=None):
+    return SimpleNamespace(
+        id=uuid4(), name=name, code=name, model=None, manufacturer=None, properties={},
+        device_type=SimpleNamespace(value=device_type), compatible_module_types=list(module_types),
+        module_slots=slots, exclusive_to_vehicle_id=exclusive_to,
+    )
+
+
+def _module(name, module_type="sensor", device_types=("drone",), exclusive_to=None):
+    return {
+        "id": str(uuid4()), "name": name, "module_type": module_type,
+        "compatible_device_types": list(device_types), "exclusive_to_device_id": exclusive_to,
+    }
+
+
+def _sources():
+    car_a, car_b = _vehicle("A"), _vehicle("B")
+    drone = _device("无人机")
+    other = _device("机器狗", device_type="robot")
+    thermal = _module("热成像")
+    recommendation = {
+        "id": uuid4(), "status": "ready",
+        "recommended_devices": [{"device_id": str(drone.id), "reason": "搜救", "priority": "high",
+                                 "modules": [{"module_id": thermal["id"], "reason": "夜间"}]}],
+        "loading_plan": {str(car_a.id): {"vehicle_name": "A", "devices": [str(drone.id)]}},
+    }
+    return loadout_builder.LoadoutSources(
+        vehicles=[car_a, car_b],
+        devices=[drone, other],
+        modules=[thermal, _module("机械臂", device_types=("robot",), module_type="utility")],
+        recommendation=recommendation,
+    ), car_a, car_b, drone, thermal
+
+
+def test_build_applies_loading_plan_and_module_compatibility():
+    sources, car_a, car_b, drone, thermal = _sources()
+    data = loadout_builder.build_car_list(sources)
+
+    cars = {car.id: car for car in data.carItemDataList}
+    item_a = {item.id: item for item in cars[str(car_a.id)].itemDataList}[str(drone.id)]
+    item_b = {item.id: item for item in cars[str(car_b.id)].itemDataList}[str(drone.id)]
+    assert cars[str(car_a.id)].isSelected and not cars[str(car_b.id)].isSelected
+    assert item_a.isSelected == 1 and item_a.aiReason == "搜救"
+    assert item_b.isSelected == 0 and item_b.aiReason is None
+    assert [(m.id, m.isSelected) for m in item_a.modules] == [(thermal["id"], 1)]
+    # 机器狗的模块类型 utility 不在其允许列表中
+    robot = [item for item in cars[str(car_a.id)].itemDataList if item.name == "机器狗"][0]
+    assert not robot.hasModules and robot.modules == []
+
+
+def test_assignment_change_rebuilds_only_that_car_and_diffs_items():
+    sources, car_a, car_b, drone, _ = _sources()
+    context = loadout_builder.build_context(sources)
+    before = loadout_builder.build_car_list(sources, context)
+
+    sources.assignments = {(str(car_b.id), str(drone.id)): True}
+    after = loadout_builder.build_car_list(sources, context, before, car_ids={str(car_b.id)})
+
+    assert after.carItemDataList[0] is before.carItemDataList[0]
+    changes = loadout_builder.diff_car_list(before.model_dump(mode="json"), after.model_dump(mode="json"))
+    assert list(changes) == ["cars"]
+    [updated] = changes["cars"]["updated"]
+    assert updated["id"] == str(car_b.id)
+    assert [(item["id"], item["isSelected"]) for item in updated["items"]] == [(str(drone.id), 1)]
+    assert changes["cars"]["added"] == [] and changes["cars"]["removed"] == []
+
+
+def test_diff_reports_top_level_and_removed_cars():
+    sources, *_ = _sources()
+    before = loadout_builder.build_car_list(sources).model_dump(mode="json")
+    sources.quest_status = "dispatched"
+    removed = sources.vehicles.pop()
+    after = loadout_builder.build_car_list(sources).model_dump(mode="json")
+
+    changes = loadout_builder.diff_car_list(before, after)
+    assert changes["carQuestStatus"] == "dispatched"
+    assert changes["cars"]["removed"] == [str(removed.id)]
+    assert loadout_builder.diff_car_list(after, after) == {}
+
+
+def test_router_commits_before_refreshing_read_model(monkeypatch):
+    from src.domains.frontend_api.car import router as car_router
+
+    calls = []
+
+    class _Db:
+        async def commit(self):
+            calls.append("commit")
+
+    class _View:
+        async def refresh(self, db, event_id, sources, car_ids=None):
+            calls.append(("refresh", sources, car_ids))
+
+    monkeypatch.setattr(car_router, "get_loadout_view", lambda: _View())
+    asyncio.run(car_router._refresh_loadout(_Db(), uuid4(), {"assignments"}, car_ids={"c1"}))
+    # 快照与差异只发布已提交的数据
+    assert calls == ["commit", ("refresh", {"assignments"}, {"c1"})]
+
+
+def _view(monkeypatch, sources, fingerprint):
+    """读模型替身：指纹与来源加载不查库，版本/Redis/推送为空操作"""
+    from src.domains.frontend_api.car import loadout_view
+
+    view = loadout_view.CarLoadoutView()
+    loaded = []
+    pending = {}
+
+    async def _fingerprint(db):
+        return dict(fingerprint)
+
+    async def _load_sources(db, event_id, target, changed):
+        loaded.append(set(changed))
+        for name in changed:
+            setattr(target, name, pending.pop(name) if name in pending else getattr(sources, name))
+
+    async def _next_version(key, current):
+        return current + 1
+
+    async def _noop(*args):
+        return None
+
+    monkeypatch.setattr(view, "_fingerprint", _fingerprint)
+    monkeypatch.setattr(view, "_load_sources", _load_sources)
+    monkeypatch.setattr(view, "_next_version", _next_version)
+    monkeypatch.setattr(view, "_save_to_redis", _noop)
+    monkeypatch.setattr(view, "_publish_delta", _noop)
+    return view, loaded, pending
+
+
+def test_device_change_rebuilds_every_car(monkeypatch):
+    sources, *_ = _sources()
+    fingerprint = {"event_id": "evt-1", **{name: "1" for name in ("vehicles", "devices", "modules",
+                                                                 "recommendation", "assignments", "quest_status")}}
+    view, loaded, pending = _view(monkeypatch, sources, fingerprint)
+
+    async def run():
+        first = await view.refresh(None, "evt-1")
+        pending["devices"] = sources.devices + [_device("生命探测仪", device_type="detector")]
+        fingerprint["devices"] = "2"
+        second = await view.refresh(None, "evt-1", sources={"devices"})
+        return first, second
+
+    first, second = asyncio.run(run())
+    count = lambda snap: [len(car["itemDataList"]) for car in snap.data["carItemDataList"]]
+    assert count(first) == [2, 2]
+    # 设备变化重建上下文后，每辆车都要重新生成，不能沿用旧车辆
+    assert count(second) == [3, 3]
+    assert loaded[-1] == {"devices"}
+
+
+def test_refresh_also_reloads_sources_changed_out_of_band(monkeypatch):
+    sources, *_ = _sources()
+    fingerprint = {"event_id": "evt-1", **{name: "1" for name in ("vehicles", "devices", "modules",
+                                                                 "recommendation", "assignments", "quest_status")}}
+    view, loaded, pending = _view(monkeypatch, sources, fingerprint)
+
+    async def run():
+        await view.refresh(None, "evt-1")
+        # 其他实例改了任务状态，本次调用方只报告了分配变化
+        pending["quest_status"] = "dispatched"
+        fingerprint["quest_status"] = "2"
+        return await view.refresh(None, "evt-1", sources={"assignments"})
+
+    snapshot = asyncio.run(run())
+    assert loaded[-1] == {"assignments", "quest_status"}
+    assert snapshot.data["carQuestStatus"] == "dispatched"
@@ -0,0 +1,134 @@
+"""共享HTTP客户端与响应缓存测试：长连接复用、请求合并、网格缓存（本地桩服务）"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.infra.clients.amap import geocode, route_planning
+from src.infra.clients.http_pool import ResponseCache
+from src.infra.clients.openmeteo import WeatherClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.requests.append((url.path, query))
+        self.server.peers.add(self.client_address)
+        if url.path == "/weather":
+            body = {"current": {"time": "2026-01-01T08:00", "temperature_2m": 12.5, "wind_speed_10m": 36}}
+        elif url.path == "/v3/geocode/geo":
+            body = {"status": "1", "geocodes": [{"location": "104.065735,30.659462"}]}
+        else:
+            threading.Event().wait(0.05)
+            body = {"status": "1", "route": {"paths": [{"distance": "1200", "duration": "300", "steps": []}]}}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    server.peers = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_weather_grid_cache_and_keepalive(stub_server) -> None:
+    server, base = stub_server
+    client = WeatherClient(base_url=f"{base}/weather", cache_ttl_s=60, grid_deg=0.05)
+
+    async def _run():
+        first = await client.get_current_weather(104.061, 30.651)
+        # 同一网格内的另一点命中缓存
+        second = await client.get_current_weather(104.062, 30.652)
+        # 不同网格重新请求，复用同一长连接
+        await client.get_current_weather(104.2, 30.7)
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    assert first.temperature_c == second.temperature_c == 12.5
+    assert first.wind_speed_ms == pytest.approx(10.0)
+    assert len(server.requests) == 2 and len(server.peers) == 1
+    assert server.requests[0][1]["latitude"] == "30.675" and server.requests[0][1]["longitude"] == "104.075"
+    assert client.cache_stats["hits"] == 1
+
+
+def test_route_requests_coalesce_and_geocode_normalizes(stub_server, monkeypatch) -> None:
+    server, base = stub_server
+    settings = SimpleNamespace(amap_api_key="test-key")
+    monkeypatch.setattr(route_planning, "_settings", settings)
+    monkeypatch.setattr(route_planning, "AMAP_API_BASE_URL", f"{base}/v5/direction/driving")
+    monkeypatch.setattr(geocode, "load_settings", lambda: settings)
+    monkeypatch.setattr(geocode, "AMAP_GEOCODE_URL", f"{base}/v3/geocode/geo")
+    route_planning.get_route_cache().clear()
+    geocode.get_geocode_cache().clear()
+
+    async def _run():
+        avoid = [[(104.0, 30.0), (104.1, 30.0), (104.1, 30.1)]]
+        routes = await asyncio.gather(*[
+            route_planning.amap_route_planning_with_avoidance_async(104.0, 30.5, 104.2, 30.7, avoid)
+            for _ in range(5)
+        ])
+        other = await route_planning.amap_route_planning_with_avoidance_async(
+            104.0, 30.5, 104.2, 30.7, avoid, strategy=33
+        )
+        a = await geocode.amap_geocode_async("四川省 成都市 武侯区")
+        b = await geocode.amap_geocode_async("四川省成都市武侯区")
+        return routes, other, a, b
+
+    routes, other, a, b = asyncio.run(_run())
+
+    route_paths = [p for p, _ in server.requests if p.startswith("/v5")]
+    assert len(route_paths) == 2
+    assert all(r["paths"][0]["distance"] == 1200 for r in routes + [other])
+    assert a == b == {"longitude": 104.065735, "latitude": 30.659462}
+    assert sum(1 for p, _ in server.requests if p.startswith("/v3")) == 1
+    assert route_planning.get_route_cache().stats["coalesced"] == 4
+
+
+def test_response_cache_skips_failures_and_expires(monkeypatch) -> None:
+    cache = ResponseCache("t", ttl_s=10)
+    calls = []
+
+    async def _fail():
+        calls.append("fail")
+        raise RuntimeError("boom")
+
+    async def _ok():
+        calls.append("ok")
+        return {"v": 1}
+
+    async def _run():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", _fail)
+        await cache.get_or_fetch("k", _ok)
+        await cache.get_or_fetch("k", _ok)
+
+    asyncio.run(_run())
+    assert calls == ["fail", "ok"]
+
+    now = time.monotonic() + 11
+    monkeypatch.setattr("src.infra.clients.http_pool.time.monotonic", lambda: now)
+    assert cache.get("k") is None
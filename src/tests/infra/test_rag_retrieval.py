@@ -0,0 +1,182 @@
+"""RAG 异步批量检索测试（Qdrant 内存模式）：批量 embedding 与检索、向量缓存、payload 过滤、BM25 融合命中应急编码、异步案例检索"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+qdrant_client = pytest.importorskip("qdrant_client")
+pytest.importorskip("langchain_openai")
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models  # noqa: E402
+
+from src.infra.rag.lexical import BM25Index, rrf_fuse, tokenize  # noqa: E402
+from src.infra.rag.llama_index_client import LlamaIndexRag  # noqa: E402
+
+DIM = 64
+DOCS = [
+    "地震发生后立即启动IV级应急响应，组织人员疏散",
+    "危险化学品泄漏时划定警戒区，疏散下风向群众",
+    "依据GB/T29639-2020编制生产安全事故应急预案",
+    "洪水来临前转移低洼地区群众，开放安置点",
+    "山体滑坡区域禁止车辆通行，设置临时绕行路线",
+]
+
+
+def _vector(text: str) -> List[float]:
+    """字符哈希向量：共享汉字越多越相似，对编码本身不敏感"""
+    vec = [0.0] * DIM
+    for ch in text:
+        if "一" <= ch <= "鿿":
+            vec[int(hashlib.md5(ch.encode()).hexdigest()[:4], 16) % DIM] += 1.0
+    return vec
+
+
+class _Embeddings:
+    def __init__(self) -> None:
+        self.batches: List[List[str]] = []
+
+    def embed_query(self, text: str) -> List[float]:
+        self.batches.append([text])
+        return _vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        return [_vector(t) for t in texts]
+
+
+def _settings() -> SimpleNamespace:
+    return SimpleNamespace(
+        embedding_base_url="http://embed", embedding_model="fake", embedding_api_key="k",
+        qdrant_url="http://qdrant", qdrant_api_key=None, qdrant_collection="rules", rag_top_k=2,
+    )
+
+
+async def _client() -> AsyncQdrantClient:
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        "rules", vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE),
+    )
+    await client.upsert("rules", points=[
+        models.PointStruct(id=i, vector=_vector(text), payload={"text": text, "seq": i})
+        for i, text in enumerate(DOCS)
+    ])
+    return client
+
+
+def test_batched_search_embeds_once_and_caches_by_content() -> None:
+    async def run() -> tuple:
+        embeddings = _Embeddings()
+        rag = LlamaIndexRag(_settings(), embeddings=embeddings, client=QdrantClient(location=":memory:"),
+                            aclient=await _client(), lexical=False)
+        queries = ["地震后怎么疏散", "化学品泄漏怎么办", "地震后怎么疏散"]
+        first = await rag.asimilarity_search_many(queries)
+        second = await rag.asimilarity_search_many(["地震后怎么疏散 ", "洪水转移群众"])
+        await rag.aclose()
+        return embeddings.batches, first, second
+
+    batches, first, second = asyncio.run(run())
+    # 第一批去重后一次请求；第二批只编码未命中的那条（空白差异命中缓存）
+    assert batches == [["地震后怎么疏散", "化学品泄漏怎么办"], ["洪水转移群众"]]
+    assert [len(r) for r in first] == [2, 2, 2]
+    seqs = [[hit[2]["seq"] for hit in hits] for hits in first + second]
+    assert seqs[0][0] == 0 and seqs[1][0] == 1
+    assert seqs[0] == seqs[2] == seqs[3]
+    assert second[1][0][0] == DOCS[3]
+
+
+def test_query_and_document_vectors_are_cached_separately() -> None:
+    async def run() -> tuple:
+        embeddings = _Embeddings()
+        rag = LlamaIndexRag(_settings(), embeddings=embeddings, client=QdrantClient(location=":memory:"),
+                            aclient=await _client(), lexical=False)
+        await rag.asimilarity_search("地震后怎么疏散")
+        await rag.asimilarity_search("地震后怎么疏散")
+        with pytest.raises(ValueError):
+            rag.similarity_search("地震后怎么疏散")  # 同步客户端没有集合，只关心 embedding 调用
+        await rag.aclose()
+        return embeddings.batches
+
+    # 批量路径（aembed_documents）命中自身缓存；同步 embed_query 不复用文档向量
+    assert asyncio.run(run()) == [["地震后怎么疏散"], ["地震后怎么疏散"]]
+
+
+def test_payload_filter_and_allow_empty() -> None:
+    async def run() -> tuple:
+        rag = LlamaIndexRag(_settings(), embeddings=_Embeddings(), client=QdrantClient(location=":memory:"),
+                            aclient=await _client(), lexical=True)
+        only_flood = models.Filter(must=[models.FieldCondition(key="seq", match=models.MatchValue(value=3))])
+        filtered = await rag.asimilarity_search_many(["地震后怎么疏散"], query_filter=only_flood)
+        nothing = models.Filter(must=[models.FieldCondition(key="seq", match=models.MatchValue(value=99))])
+        empty = await rag.asimilarity_search_many(["地震后怎么疏散"], query_filter=nothing, allow_empty=True)
+        with pytest.raises(RuntimeError):
+            await rag.asimilarity_search_many(["地震后怎么疏散"], query_filter=nothing)
+        await rag.aclose()
+        return filtered, empty, rag._lexical
+
+    filtered, empty, lexical = asyncio.run(run())
+    assert [hit[2]["seq"] for hit in filtered[0]] == [3]
+    assert empty == [[]]
+    # 带过滤条件时不做词法融合，也不触发词法索引构建
+    assert lexical is None
+
+
+def test_similar_cases_search_uses_shared_async_rag(monkeypatch) -> None:
+    from src.agents.emergency_ai.tools import rag_tools
+
+    async def run() -> list:
+        aclient = AsyncQdrantClient(location=":memory:")
+        await aclient.create_collection(
+            "emergency_cases", vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE),
+        )
+        await aclient.upsert("emergency_cases", points=[
+            models.PointStruct(id=i, vector=_vector(text), payload={
+                "case_id": f"case-{i}", "title": text, "disaster_type": kind, "description": text,
+            })
+            for i, (text, kind) in enumerate([("地震后人员疏散", "earthquake"), ("洪水后人员疏散", "flood")])
+        ] + [
+            # 缺少 case_id 的旧数据回退为点 ID，与同步工具一致
+            models.PointStruct(id=7, vector=_vector("洪水转移群众"), payload={"title": "洪水转移群众", "disaster_type": "flood"}),
+        ])
+        settings = _settings()
+        settings.qdrant_collection = "emergency_cases"
+        rag = LlamaIndexRag(settings, embeddings=_Embeddings(), client=QdrantClient(location=":memory:"),
+                            aclient=aclient, lexical=False)
+        monkeypatch.setattr(rag_tools, "get_rag", lambda collection=None: rag)
+        monkeypatch.setattr(rag_tools, "_cases_collection", None)
+        cases = await rag_tools.search_similar_cases_async("人员疏散", disaster_type="flood", top_k=5)
+        await rag.aclose()
+        return cases
+
+    cases = asyncio.run(run())
+    assert [c["case_id"] for c in cases] == ["case-1", "7"]
+    assert cases[0]["disaster_type"] == "flood" and cases[0]["similarity_score"] > 0
+
+
+def test_lexical_fusion_surfaces_exact_emergency_code() -> None:
+    async def run() -> tuple:
+        rag = LlamaIndexRag(_settings(), embeddings=_Embeddings(), client=QdrantClient(location=":memory:"),
+                            aclient=await _client(), lexical=True)
+        vector_only = LlamaIndexRag(_settings(), embeddings=_Embeddings(), client=QdrantClient(location=":memory:"),
+                                    aclient=rag._aclient, lexical=False)
+        query = "GB/T29639-2020 的要求"
+        fused = await rag.asimilarity_search(query)
+        plain = await vector_only.asimilarity_search(query)
+        await rag.aclose()
+        return fused, plain
+
+    fused, plain = asyncio.run(run())
+    # 向量只看到"的要求"，编码条文排不到第一；BM25 精确命中编码后融合排名第一
+    assert plain[0][2]["seq"] != 2
+    assert fused[0][2]["seq"] == 2
+
+
+def test_bm25_keeps_codes_whole_and_rrf_rewards_agreement() -> None:
+    assert "gb/t29639-2020" in tokenize("依据GB/T29639-2020编制")
+    index = BM25Index.build((str(i), text, {"seq": i}) for i, text in enumerate(DOCS))
+    assert index.search("IV级响应", 1)[0][0] == "0"
+    assert index.document("3") == (DOCS[3], {"seq": 3})
+    assert [d for d, _ in rrf_fuse([["a", "b", "c"], ["b", "d"]])][:2] == ["b", "a"]
@@ -0,0 +1,79 @@
+"""能力匹配测试：稀疏模型无解时退回贪心部分分配、增量重解的 hint 与固定分配"""
+from src.planning.algorithms.base import AlgorithmStatus
+from src.planning.algorithms.matching import CapabilityMatcher
+
+
+def _need(i, cap, lat, importance="required", min_level=0.5):
+    return {"id": f"N{i}", "task_id": f"T{i}", "capability_id": cap, "min_level": min_level,
+            "importance": importance, "location": {"lat": lat, "lng": 103.0}}
+
+
+def _res(j, caps, lat, cap=1):
+    return {"id": f"R{j}", "name": f"队伍{j}", "capabilities": caps,
+            "location": {"lat": lat, "lng": 103.0}, "status": "available", "max_assignments": cap}
+
+
+def _problem():
+    return {
+        "capability_needs": [
+            _need(0, "search", 30.0),
+            _need(1, "search", 30.2),
+            _need(2, "medical", 30.5),
+            _need(3, "medical", 30.5, min_level=0.95),  # 熟练度不达标，无候选
+        ],
+        "resources": [
+            _res(0, {"search": 0.9}, 30.1),
+            _res(1, {"search": 0.8, "medical": 0.7}, 30.3),
+            _res(2, {"medical": 0.9}, 33.0),  # 超出距离限制
+        ],
+        "constraints": {"max_distance_km": 100},
+    }
+
+
+def test_infeasible_required_needs_fall_back_to_partial():
+    matcher = CapabilityMatcher()
+    result = matcher.run(_problem())
+    assert result.trace["feasible_pairs"] == 5
+    assigned = {a["need_id"]: a["resource_id"] for a in result.solution}
+    # 三个必须需求只有两个容量为1的资源，CP-SAT 无解，退回贪心部分分配
+    assert result.status == AlgorithmStatus.PARTIAL
+    assert len(assigned) == 2 and sorted(assigned.values()) == ["R0", "R1"]
+    assert "N3" not in assigned
+
+
+def test_resolve_with_hint_and_fixed_assignments():
+    problem = _problem()
+    problem["resources"][0]["max_assignments"] = 2
+    problem["capability_needs"].pop()
+    matcher = CapabilityMatcher()
+    first = matcher.run(problem)
+    assert first.status == AlgorithmStatus.SUCCESS
+    before = {a["need_id"]: a["resource_id"] for a in first.solution}
+    assert before == {"N0": "R0", "N1": "R0", "N2": "R1"}
+
+    # N1 移到 R1 附近并新增 N4；固定未变化需求时 N2 仍占用 R1，N1 只能继续用 R0
+    moved = _need(1, "search", 30.3)
+    added = _need(4, "search", 30.0, importance="optional")
+    fixed = matcher.resolve([moved, added], fix_unchanged=True)
+    after = {a["need_id"]: a["resource_id"] for a in fixed.solution}
+    assert after == {"N0": "R0", "N1": "R0", "N2": "R1"}
+    assert fixed.trace["changed_needs"] == 2
+
+    again = matcher.resolve(removed_need_ids=["N2"])
+    assert {a["need_id"] for a in again.solution} == {"N0", "N1"}
+
+
+def test_infeasible_resolve_keeps_fixed_assignments_in_greedy_fallback():
+    problem = {
+        "capability_needs": [_need(0, "search", 30.0, importance="preferred")],
+        "resources": [_res(0, {"search": 0.9}, 30.1)],
+        "constraints": {"max_distance_km": 100},
+    }
+    matcher = CapabilityMatcher({"optimization_mode": "max_quality"})
+    first = matcher.run(problem)
+    assert {a["need_id"]: a["resource_id"] for a in first.solution} == {"N0": "R0"}
+
+    # 新增的必须需求只能用已被固定的 R0，CP-SAT 无解；贪心兜底不能把 R0 从 N0 挪走
+    result = matcher.resolve([_need(1, "search", 30.0)], fix_unchanged=True)
+    assert {a["need_id"]: a["resource_id"] for a in result.solution} == {"N0": "R0"}
+    assert result.status == AlgorithmStatus.PARTIAL
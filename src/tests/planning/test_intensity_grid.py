@@ -0,0 +1,93 @@
+"""栅格烈度与损失估算测试：逐格脆弱性与标量模型一致、均匀栅格面积与缓存、暴露栅格跳过空白格"""
+import math
+
+import numpy as np
+
+from src.planning.algorithms.assessment.disaster_assessment import DisasterAssessment
+from src.planning.algorithms.assessment.intensity_grid import (
+    ExposureGrid,
+    IntensityGridEngine,
+    load_exposure_grid,
+)
+from src.planning.algorithms.assessment.loss_estimation import LossEstimator
+
+
+def test_cell_damage_matches_scalar_loss_model():
+    # 单格暴露栅格：该格损毁分布应与 LossEstimator 在同一烈度下的标量结果一致
+    inventory = [
+        {"type": "masonry", "count": 100_000, "avg_value_million": 0.5},
+        {"type": "rc_frame", "count": 100_000, "avg_value_million": 2.0},
+    ]
+    exposure = ExposureGrid(
+        lat0=31.3, lng0=103.4, cell_deg=0.01,
+        population=np.array([[1000.0]], dtype=np.float32),
+        buildings=np.array([[[b["count"]]] for b in inventory], dtype=np.float32),
+        building_classes=("masonry", "rc_frame"),
+        building_values=np.array([b["avg_value_million"] for b in inventory]),
+        source="single-cell",
+    )
+    grid = IntensityGridEngine().estimate(5.0, 10, (31.0, 103.4), radius_km=50, exposure=exposure)
+    intensity = round(float(grid.intensity[0, 0]), 2)
+    assert 6.0 < intensity < 10.0
+
+    scalar = LossEstimator().run(
+        {"disaster_type": "earthquake", "intensity": intensity, "building_inventory": inventory}
+    )
+    expected = scalar.solution["building_damage"]
+    for state, count in grid.aggregates["damage_distribution"].items():
+        assert abs(count - expected.damage_distribution[state]) <= 5
+    assert abs(grid.aggregates["economic_loss_million"] - expected.economic_loss_million) / expected.economic_loss_million < 1e-3
+
+
+def test_default_radius_keeps_legacy_affected_area():
+    # 原距离剖面覆盖 0-100km，M7 时整个剖面烈度>=VI，影响面积为 π·100²、人口为 面积×密度
+    result = DisasterAssessment().run({
+        "disaster_type": "earthquake",
+        "params": {"magnitude": 7.0, "depth_km": 10, "epicenter": {"lat": 31.0, "lng": 103.4},
+                   "population_density": 500},
+    })
+    legacy_area = math.pi * 100 ** 2
+    assert abs(result.metrics["affected_area_km2"] - legacy_area) / legacy_area < 0.01
+    assert abs(result.metrics["affected_population"] - legacy_area * 500) / (legacy_area * 500) < 0.01
+
+    grid = DisasterAssessment({"casualty_model": "grid"}).run({
+        "disaster_type": "earthquake",
+        "params": {"magnitude": 7.0, "depth_km": 10, "epicenter": {"lat": 31.0, "lng": 103.4},
+                   "population_density": 500},
+    })
+    assert grid.solution.estimated_casualties["deaths"] > 0
+    assert grid.solution.risk_zones[0]["zone"] == "extreme"
+
+
+def test_uniform_grid_area_and_cache():
+    engine = IntensityGridEngine(max_entries=2)
+    result = engine.estimate(7.0, 10, (31.0, 103.4), radius_km=40, population_density=500, event_id="eq-1")
+    assert abs(result.aggregates["affected_area_km2"] - math.pi * 40 ** 2) / (math.pi * 40 ** 2) < 0.03
+    assert result.aggregates["max_intensity"] > 9
+    assert result.zones[0]["zone"] == "extreme"
+    # 震中附近损毁最重
+    center = np.unravel_index(np.nanargmax(result.intensity), result.shape)
+    assert result.damage[4][center] == result.damage[4].max()
+
+    again = engine.estimate(7.0, 10, (31.0, 103.4), radius_km=40, population_density=500, event_id="eq-1")
+    assert again is result and engine.stats["hits"] == 1
+    engine.estimate(7.0, 10, (31.0, 103.4), radius_km=40, population_density=500, event_id="eq-2")
+    engine.estimate(7.2, 10, (31.0, 103.4), radius_km=40, population_density=500, event_id="eq-2")
+    assert engine.stats["entries"] == 2
+
+
+def test_exposure_file_skips_empty_cells(tmp_path):
+    population = np.zeros((200, 200), dtype=np.float32)
+    population[90:110, 90:110] = 1000
+    buildings = np.stack([population / 8, population / 16])
+    path = tmp_path / "exposure.npz"
+    np.savez(path, population=population, buildings=buildings, building_classes=np.array(["masonry", "steel"]),
+             lat0=30.0, lng0=103.0, cell_deg=0.01)
+
+    exposure = load_exposure_grid(str(path))
+    assert isinstance(exposure, ExposureGrid) and exposure.shape == (200, 200)
+    result = IntensityGridEngine().estimate(6.5, 10, (31.0, 104.0), radius_km=50, exposure=exposure)
+    assert result.aggregates["occupied_cells"] == 400
+    assert abs(result.aggregates["exposed_population"] - 400_000) < 1
+    assert result.aggregates["deaths"] > 0
+    assert np.all(result.deaths[result.population == 0] == 0)
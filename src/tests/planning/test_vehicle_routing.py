@@ -0,0 +1,58 @@
+"""车辆路径规划测试：矩阵求解与自适应时限、使用外部路网矩阵、车辆退出与任务新增后的热启动重规划"""
+import numpy as np
+
+from src.planning.algorithms.base import AlgorithmStatus
+from src.planning.algorithms.routing import VehicleRoutingPlanner
+
+
+def _problem(n_tasks=12):
+    rng = np.random.default_rng(1)
+    return {
+        "depots": [{"id": "D1", "location": {"lat": 31.0, "lng": 103.5}}],
+        "tasks": [{"id": f"T{i}", "location": {"lat": float(31 + rng.uniform(-0.2, 0.2)),
+                                               "lng": float(103.5 + rng.uniform(-0.2, 0.2))},
+                   "demand": 1, "service_time_min": 10} for i in range(n_tasks)],
+        "vehicles": [{"id": f"V{i}", "name": f"车{i}", "depot_id": "D1", "capacity": 5} for i in range(3)],
+        "constraints": {"use_time_windows": True},
+    }
+
+
+def test_matrix_solve_with_adaptive_budget():
+    result = VehicleRoutingPlanner().run(_problem())
+    assert result.status == AlgorithmStatus.SUCCESS
+    assert result.trace["matrix_source"] == "haversine"
+    assert result.trace["time_limit_sec"] < 5
+    assert all(r["total_load"] <= 5 for r in result.solution)
+    # 有时间窗时每站都有到达时间且单调不减
+    for route in result.solution:
+        arrivals = [s["arrival_time_min"] for s in route["stops"]]
+        assert arrivals == sorted(arrivals)
+
+
+def test_provided_road_matrix_is_used():
+    problem = _problem(4)
+    n = 5
+    road = np.full((n, n), 10.0)
+    np.fill_diagonal(road, 0)
+    problem["distance_matrix_km"] = road.tolist()
+    problem["travel_time_matrix_min"] = (road * 3).tolist()
+    result = VehicleRoutingPlanner().run(problem)
+    assert result.trace["matrix_source"] == "provided"
+    # 每条路线: 出发 + 站间 + 返回，每段10km
+    for route in result.solution:
+        if route["stops"]:
+            assert route["total_distance_km"] == 10.0 * (len(route["stops"]) + 1)
+            assert route["total_time_min"] == 30 * (len(route["stops"]) + 1)
+
+
+def test_warm_start_after_vehicle_drops_out_and_task_added():
+    planner = VehicleRoutingPlanner()
+    first = planner.run(_problem())
+    replan = _problem(13)
+    replan["vehicles"] = replan["vehicles"][:-1]
+    replan["vehicles"][0]["capacity"] = replan["vehicles"][1]["capacity"] = 7
+    replan["initial_routes"] = first.solution
+    result = planner.run(replan)
+    assert result.trace["warm_start"] is True
+    assert result.metrics["served_tasks"] == 13
+    assert {r["vehicle_id"] for r in result.solution} == {"V0", "V1"}
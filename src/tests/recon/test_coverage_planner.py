@@ -0,0 +1,60 @@
+"""覆盖航线规划测试：多边形裁剪、扫描方向搜索、凹多边形分解与多机分区"""
+from __future__ import annotations
+
+import math
+
+from src.agents.recon_scheduler.algorithms.coverage import (
+    generate_multi_uav_zigzag_waypoints,
+    generate_zigzag_waypoints,
+)
+from src.agents.recon_scheduler.algorithms.coverage.boustrophedon import (
+    LocalFrame,
+    decompose_cells,
+    sweep_intervals,
+)
+
+FRAME = LocalFrame(31.69, 103.86)
+
+
+def _polygon(xy_m, rotate_deg: float = 0.0):
+    c, s = math.cos(math.radians(rotate_deg)), math.sin(math.radians(rotate_deg))
+    return [FRAME.to_latlng(x * c - y * s, x * s + y * c) for x, y in xy_m]
+
+
+def test_rotated_rectangle_sweeps_along_long_axis_inside_area() -> None:
+    polygon = _polygon([(-1500, -400), (1500, -400), (1500, 400), (-1500, 400)], rotate_deg=30)
+
+    bbox, bbox_stats = generate_zigzag_waypoints(polygon, 100, 10, clip_to_polygon=False)
+    clipped, stats = generate_zigzag_waypoints(polygon, 100, 10)
+
+    assert stats["total_distance_m"] < 0.6 * bbox_stats["total_distance_m"]
+    scan = [w for w in clipped if w["action"] in ("scan", "start_scan")]
+    # 长轴方向航向 60° 或 240°
+    assert {round(w["heading_deg"]) % 180 for w in scan} == {60}
+    # 扫描端点都在区域边界上（允许1米误差）
+    for w in scan:
+        x, y = FRAME.to_xy([(w["lat"], w["lng"])])[0]
+        u = x * math.cos(math.radians(30)) + y * math.sin(math.radians(30))
+        assert abs(u) <= 1501
+    assert abs(stats["coverage_area_m2"] - 3000 * 800) < 1e3
+
+
+def test_concave_polygon_decomposes_into_cells() -> None:
+    ring = FRAME.to_xy(_polygon([(0, 0), (1000, 0), (1000, 1000), (600, 1000), (600, 300), (400, 300), (400, 1000), (0, 1000)]))
+    ys, intervals = sweep_intervals([ring], theta=0.0, spacing_m=100)
+
+    assert len(ys) == 10
+    assert max(len(row) for row in intervals) == 2
+    assert len(decompose_cells(ys, intervals)) == 3
+
+
+def test_multi_uav_split_balances_flight_time() -> None:
+    polygon = _polygon([(-1200, -1200), (1200, -1200), (1200, -400), (-400, -400), (-400, 1200), (-1200, 1200)], 20)
+
+    single = generate_zigzag_waypoints(polygon, 100, 10)[1]
+    results = generate_multi_uav_zigzag_waypoints(polygon, 100, [10, 10, 10])
+    durations = [stats["total_duration_min"] for _, stats in results]
+
+    assert all(waypoints for waypoints, _ in results)
+    assert max(durations) < 0.5 * single["total_duration_min"]
+    assert max(durations) - min(durations) < 0.25 * max(durations)
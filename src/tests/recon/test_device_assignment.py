@@ -0,0 +1,53 @@
+"""目标-设备分配测试：全局最优优于贪心、环境约束、多目标出动"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from src.agents.shared.device_assignment import (
+    greedy_assignment,
+    order_sorties,
+    solve_assignment,
+    utility_matrix,
+)
+
+NAN = math.nan
+
+
+def test_optimal_covers_targets_greedy_misses() -> None:
+    # 目标0 两台设备都能做（无人机更合适），目标1 只有无人机能做
+    benefit = [0.9, 0.8]
+    preference = np.array([[1.0, 0.85], [1.0, NAN]])
+
+    greedy = greedy_assignment(benefit, preference)
+    optimal = solve_assignment(utility_matrix(benefit, preference))
+
+    assert {(p.target_index, p.device_index) for p in greedy} == {(0, 0)}
+    assert {(p.target_index, p.device_index) for p in optimal} == {(0, 1), (1, 0)}
+
+
+def test_infeasible_pairs_never_assigned_and_distance_matters() -> None:
+    benefit = [1.0, 1.0, 1.0]
+    preference = np.array([[1.0, 1.0], [NAN, NAN], [1.0, 1.0]])
+    distance = np.array([[50.0, 1.0], [1.0, 1.0], [1.0, 50.0]])
+
+    pairs = solve_assignment(utility_matrix(benefit, preference, distance, distance_scale_km=10))
+
+    assert all(not np.isnan(preference[p.target_index, p.device_index]) for p in pairs)
+    assert {(p.target_index, p.device_index) for p in pairs} == {(0, 1), (2, 0)}
+
+
+def test_multi_target_sorties_are_ordered_by_proximity() -> None:
+    # 一台设备、三个目标，允许单次出动侦察三个
+    benefit = [1.0, 0.9, 0.8]
+    preference = np.ones((3, 1))
+    target_lonlat = np.array([[104.30, 31.0], [104.10, 31.0], [104.20, 31.0]])
+    device_lonlat = np.array([[104.0, 31.0]])
+
+    single = solve_assignment(utility_matrix(benefit, preference), max_targets_per_device=1)
+    pairs = solve_assignment(utility_matrix(benefit, preference), max_targets_per_device=3)
+    order_sorties(pairs, target_lonlat, device_lonlat)
+
+    assert len(single) == 1 and single[0].target_index == 0
+    assert sorted((p.sortie_order, p.target_index) for p in pairs) == [(0, 1), (1, 2), (2, 0)]
@@ -0,0 +1,171 @@
+"""ASR管理器测试：延迟直方图、对冲请求、延迟感知选择与流式识别"""
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from src.infra.clients.asr import (
+    ASRManager,
+    ASRProvider,
+    ASRResult,
+    ASRStream,
+    LatencyHistogram,
+)
+
+
+class _FakeProvider(ASRProvider):
+    def __init__(self, name: str, delay: float, priority: int = 0, fail: bool = False) -> None:
+        self._name = name
+        self._priority = priority
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def priority(self) -> int:
+        return self._priority
+
+    async def recognize(self, audio_data: bytes, config=None) -> ASRResult:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self._name} down")
+        return ASRResult(text=f"{self._name}:{len(audio_data)}", provider=self._name)
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class _FakeStream(ASRStream):
+    def __init__(self, on_partial, fail_on_feed: bool = False) -> None:
+        self._on_partial = on_partial
+        self._fail_on_feed = fail_on_feed
+        self._text = ""
+
+    async def feed(self, chunk: bytes) -> None:
+        if self._fail_on_feed:
+            raise RuntimeError("stream broken")
+        self._text += chunk.decode()
+        self._on_partial(ASRResult(text=self._text, is_final=False, provider="stream"))
+
+    async def finish(self) -> ASRResult:
+        return ASRResult(text=self._text, provider="stream")
+
+    async def abort(self) -> None:
+        pass
+
+
+class _StreamingProvider(_FakeProvider):
+    def __init__(self, *args, fail_on_feed: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.fail_on_feed = fail_on_feed
+
+    @property
+    def supports_streaming(self) -> bool:
+        return True
+
+    async def open_stream(self, config=None, on_partial=None) -> ASRStream:
+        return _FakeStream(on_partial, fail_on_feed=self.fail_on_feed)
+
+
+def _manager(primary: ASRProvider, fallback: ASRProvider, hedge: bool) -> ASRManager:
+    return ASRManager(
+        providers=[primary, fallback],
+        primary_provider=primary.name,
+        fallback_provider=fallback.name,
+        hedge_enabled=hedge,
+    )
+
+
+def test_histogram_percentiles_and_decay() -> None:
+    histogram = LatencyHistogram(decay_every=100)
+    assert histogram.percentile(50) is None
+    for _ in range(90):
+        histogram.record(120)
+    for _ in range(9):
+        histogram.record(900)
+
+    assert histogram.percentile(50) == 150
+    assert histogram.percentile(95) == 1000
+
+    histogram.record(900)
+    assert histogram.count == 50 and histogram.samples == 100
+
+
+def test_hedged_request_returns_fallback_when_primary_slow() -> None:
+    async def _run():
+        primary = _FakeProvider("primary", delay=0.5, priority=200)
+        fallback = _FakeProvider("fallback", delay=0.02, priority=100)
+        manager = _manager(primary, fallback, hedge=True)
+        manager._hedge_default_delay_ms = 50
+        result = await manager.recognize(b"\x00" * 10)
+        return primary, manager, result
+
+    primary, manager, result = asyncio.run(_run())
+
+    assert result.provider == "fallback"
+    assert primary.cancelled == 1
+    assert manager.latency_stats["hedged"] == 1 and manager.latency_stats["hedge_wins"] == 1
+    # 被取消的主Provider按已耗时计入直方图
+    assert manager.latency_stats["providers"]["primary"]["recognize"]["samples"] == 1
+
+
+def test_without_hedging_fallback_only_after_failure() -> None:
+    async def _run():
+        primary = _FakeProvider("primary", delay=0.05, priority=200, fail=True)
+        fallback = _FakeProvider("fallback", delay=0.01, priority=100)
+        manager = _manager(primary, fallback, hedge=False)
+        result = await manager.recognize(b"\x00")
+        return primary, fallback, result
+
+    primary, fallback, result = asyncio.run(_run())
+
+    assert result.provider == "fallback"
+    assert primary.calls == 1 and fallback.calls == 1
+
+
+def test_select_provider_prefers_much_faster_fallback() -> None:
+    primary = _FakeProvider("primary", delay=0, priority=200)
+    fallback = _FakeProvider("fallback", delay=0, priority=100)
+    manager = _manager(primary, fallback, hedge=False)
+    assert manager._select_provider() is primary
+
+    for _ in range(30):
+        manager._mark_success("primary", 2500)
+        manager._mark_success("fallback", 400)
+
+    assert manager._select_provider() is fallback
+
+
+def test_stream_forwards_partials_and_falls_back_on_stream_failure() -> None:
+    async def _run(fail_on_feed: bool):
+        primary = _StreamingProvider("primary", delay=0.01, priority=200, fail_on_feed=fail_on_feed)
+        fallback = _FakeProvider("fallback", delay=0.01, priority=100)
+        manager = _manager(primary, fallback, hedge=False)
+        partials: List[str] = []
+
+        async def on_partial(result: ASRResult) -> None:
+            partials.append(result.text)
+
+        stream = await manager.open_stream(on_partial=on_partial)
+        for piece in ["救援", "一队", "出发"]:
+            await stream.feed(piece.encode())
+        return await stream.finish(), partials
+
+    result, partials = asyncio.run(_run(fail_on_feed=False))
+    assert result.text == "救援一队出发"
+    assert partials == ["救援", "救援一队", "救援一队出发"]
+
+    result, partials = asyncio.run(_run(fail_on_feed=True))
+    # 流式中途失败：用缓存的整段音频重新识别
+    assert result.text == f"primary:{len('救援一队出发'.encode())}"
+    assert partials == []
@@ -0,0 +1,47 @@
+"""语音音频工具测试：NumPy能量VAD与PCMRingBuffer"""
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+
+from src.domains.voice.audio import PCMRingBuffer, frame_energies, frame_rms
+
+
+def _legacy_rms(audio_data: bytes) -> float:
+    num_samples = len(audio_data) // 2
+    samples = struct.unpack(f"<{num_samples}h", audio_data)
+    return (sum(s * s for s in samples) / num_samples) ** 0.5
+
+
+def test_energy_matches_struct_implementation() -> None:
+    rng = np.random.default_rng(0)
+    frames = rng.integers(-32768, 32767, size=(4, 320), dtype=np.int16)
+    audio = frames.astype("<i2").tobytes()
+
+    energies = frame_energies(audio, 640)
+
+    expected = [_legacy_rms(audio[i * 640:(i + 1) * 640]) for i in range(4)]
+    assert np.allclose(energies, expected)
+    assert np.isclose(frame_rms(audio[:640]), expected[0])
+    assert frame_rms(b"\x01") == 0.0
+
+
+def test_ring_buffer_keeps_latest_audio() -> None:
+    buffer = PCMRingBuffer(10)
+    buffer.extend(b"abcdef")
+    assert buffer.getvalue() == b"abcdef"
+    assert not buffer.is_full
+
+    buffer.extend(b"ghijkl")
+    assert buffer.is_full
+    assert buffer.getvalue() == b"cdefghijkl"
+    assert buffer.dropped_bytes == 2
+
+    buffer.extend(b"0123456789AB")
+    assert buffer.getvalue() == b"23456789AB"
+
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.extend(b"xy")
+    assert buffer.getvalue() == b"xy"
@@ -0,0 +1,114 @@
+"""语音意图本地分类测试：关键词自动机、路由向量索引持久化与打分、查询向量LRU"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+from src.agents.voice_commander.intent_index import (
+    KeywordAutomaton,
+    UtteranceIndex,
+    routes_fingerprint,
+)
+from src.core.embedding_cache import EmbeddingLRU
+
+
+def _legacy_keyword_classify(text: str, rules: dict) -> Optional[str]:
+    """旧实现（嵌套子串循环）"""
+    if "执行什么任务" in text:
+        return "resource_status" if "队" in text else "task_status"
+    for route, keywords in rules.items():
+        for kw in keywords:
+            if kw in text:
+                return route
+    return None
+
+
+def test_automaton_finds_same_keywords_as_substring_search() -> None:
+    rng = random.Random(7)
+    alphabet = "在哪任务队最近的多远附近有执行什么"
+    for _ in range(2000):
+        patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 10))]
+        text = "".join(rng.choice(alphabet + "，。x") for _ in range(rng.randint(0, 30)))
+        assert KeywordAutomaton(patterns).find(text) == {p for p in patterns if p in text}
+
+
+def test_index_scoring_thresholds_and_disk_roundtrip(tmp_path) -> None:
+    routes = ["spatial_query", "spatial_query", "task_status", "task_status", "chitchat"]
+    vectors = np.array([[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0], [0.1, 0.9, 0], [0, 0, 1]], dtype=np.float32)
+    fingerprint = routes_fingerprint("enc", list(zip(routes, "abcde")))
+    index = UtteranceIndex(routes, vectors, fingerprint)
+    thresholds = {"spatial_query": 0.75, "task_status": 0.75, "chitchat": 0.75}
+
+    assert index.classify([2, 0.1, 0], thresholds, top_k=3)[0] == "spatial_query"
+    route, score = index.classify([1, 1, 1.2], thresholds, top_k=3)
+    assert route is None and score < 0.75
+
+    path = str(tmp_path / "sub" / "routes.npz")
+    index.save(path)
+    loaded = UtteranceIndex.load(path, fingerprint)
+    assert loaded is not None and loaded.routes == routes
+    assert np.allclose(loaded.vectors, index.vectors)
+    # 样本句或编码器变化 -> 指纹不一致，需重新编码
+    assert UtteranceIndex.load(path, routes_fingerprint("other-encoder", list(zip(routes, "abcde")))) is None
+    assert UtteranceIndex.load(str(tmp_path / "missing.npz"), fingerprint) is None
+
+
+def test_query_cache_is_lru_and_normalizes_whitespace() -> None:
+    cache = EmbeddingLRU(max_entries=2)
+    cache.put("消防队 在哪", [1.0])
+    cache.put("任务进度", [2.0])
+    assert cache.get("消防队  在哪 ") == [1.0]
+    cache.put("你好", [3.0])
+    assert cache.get("任务进度") is None
+    assert cache.get("你好") == [3.0]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_router_does_not_block_loop_and_reuses_persisted_vectors(tmp_path) -> None:
+    semantic_router = pytest.importorskip("semantic_router")
+    from src.agents.voice_commander import semantic_router as voice_router
+
+    for text in ["消防队在哪里", "二号队在执行什么任务", "正在执行什么任务", "可调度的队伍", "你好"]:
+        assert voice_router.keyword_classify(text) == _legacy_keyword_classify(text, voice_router.KEYWORD_RULES)
+
+    class _Encoder:
+        name = "fake"
+        score_threshold = 0.5
+
+        def __init__(self) -> None:
+            self.calls: List[int] = []
+            self.threads: set = set()
+
+        def __call__(self, docs: List[str]) -> List[List[float]]:
+            self.calls.append(len(docs))
+            self.threads.add(threading.get_ident())
+            return [[1.0 if "哪" in d else 0.0, 1.0 if "任务" in d else 0.0, 0.1] for d in docs]
+
+    routes = [
+        semantic_router.Route(name="spatial_query", utterances=["在哪", "哪里"], score_threshold=0.75),
+        semantic_router.Route(name="task_status", utterances=["任务", "任务进度"], score_threshold=0.75),
+    ]
+    path = str(tmp_path / "routes.npz")
+
+    async def run(encoder: _Encoder) -> tuple:
+        router = voice_router.VoiceSemanticRouter(routes=routes, encoder=encoder, embeddings_path=path)
+        # 相同文本的并发未命中只请求一次
+        first, *_ = await asyncio.gather(*(router._semantic_classify("仓库在哪") for _ in range(3)))
+        second = await router._semantic_classify("仓库在哪")
+        return first, second
+
+    encoder = _Encoder()
+    first, second = asyncio.run(run(encoder))
+    assert first == second and first[0] == "spatial_query"
+    assert encoder.calls == [4, 1]
+    assert threading.get_ident() not in encoder.threads
+
+    # 重启后路由向量直接从磁盘加载，只编码查询
+    restarted = _Encoder()
+    asyncio.run(run(restarted))
+    assert restarted.calls == [1]
@@ -0,0 +1,90 @@
+"""句级流水线TTS测试：分句、顺序转发、首音延迟与打断取消"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import AsyncIterator, List, Tuple
+
+from src.domains.voice.speech_pipeline import SentenceSegmenter, SpeechPipeline
+from src.infra.clients.tts import TTSAudioChunk
+
+
+class _FakeTTS:
+    """每段产出3个音频块，每块耗时 chunk_delay 秒"""
+
+    def __init__(self, chunk_delay: float = 0.05) -> None:
+        self.chunk_delay = chunk_delay
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+
+    async def synthesize_stream(self, text: str, config=None) -> AsyncIterator[TTSAudioChunk]:
+        self.started.append(text)
+        try:
+            for i in range(3):
+                await asyncio.sleep(self.chunk_delay)
+                yield TTSAudioChunk(audio_data=f"{text}#{i}".encode(), sample_rate=24000, index=i)
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+
+
+def test_segmenter_splits_on_sentence_and_clause_boundaries() -> None:
+    segmenter = SentenceSegmenter(first_clause_chars=4, clause_chars=10)
+    segments = []
+    for piece in ["收到指令，", "救援一队立即", "出发。预计二十分钟", "后到达现场，请保持", "通信畅通"]:
+        segments += segmenter.feed(piece)
+    segments += segmenter.flush()
+
+    assert segments == ["收到指令，", "救援一队立即出发。", "预计二十分钟后到达现场，", "请保持通信畅通"]
+
+
+def test_audio_forwarded_in_order_before_all_segments_finish() -> None:
+    async def _run() -> Tuple[List[Tuple[int, bytes]], float, object]:
+        tts = _FakeTTS()
+        received: List[Tuple[int, bytes]] = []
+        first_audio_at: List[float] = []
+
+        async def sink(segment: int, pcm: bytes, sample_rate: int) -> None:
+            if not first_audio_at:
+                first_audio_at.append(time.time())
+            received.append((segment, pcm))
+
+        started = time.time()
+        pipeline = SpeechPipeline(tts, None, sink, max_concurrency=2, started_at=started)
+        for piece in ["第一句话。", "第二句话。", "第三句话。"]:
+            pipeline.feed(piece)
+            await asyncio.sleep(0.02)
+        stats = await pipeline.finish()
+        return received, first_audio_at[0] - started, stats
+
+    received, first_audio_delay, stats = asyncio.run(_run())
+
+    assert [segment for segment, _ in received] == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+    assert received[0][1] == "第一句话。#0".encode()
+    # 首个音频块在第一个合成块产出后即送出，而非等待整段/全部合成完成
+    assert first_audio_delay < 0.15
+    assert stats.ttfa_ms is not None and stats.ttfa_ms < 150
+    assert stats.segments == 3 and stats.audio_chunks == 9
+
+
+def test_cancel_stops_pending_synthesis() -> None:
+    async def _run():
+        tts = _FakeTTS(chunk_delay=0.1)
+        received: List[int] = []
+
+        async def sink(segment: int, pcm: bytes, sample_rate: int) -> None:
+            received.append(segment)
+
+        pipeline = SpeechPipeline(tts, None, sink, max_concurrency=2)
+        pipeline.feed("第一句话。第二句话。第三句话。")
+        await asyncio.sleep(0.15)
+        stats = await pipeline.cancel()
+        await asyncio.sleep(0.3)
+        return tts, received, stats
+
+    tts, received, stats = asyncio.run(_run())
+
+    assert stats.cancelled
+    assert tts.cancelled == ["第一句话。", "第二句话。"]
+    assert "第三句话。" not in tts.started
+    assert received == [0]
@@ -0,0 +1,110 @@
+"""TTS短语级音频缓存测试：命中、磁盘层、请求合并与片段拼接"""
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, List
+
+from src.infra.clients.tts import (
+    TTSAudioCache,
+    TTSAudioChunk,
+    TTSResult,
+    TTSService,
+    pcm_to_wav,
+    split_phrases,
+    wav_to_pcm,
+)
+
+
+class _FakeProvider:
+    """每个字合成为2个采样点的PCM，记录合成调用"""
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: List[str] = []
+
+    @staticmethod
+    def _pcm(text: str) -> bytes:
+        return b"".join(ch.encode("utf-8")[:2].ljust(2, b"\x00") * 2 for ch in text)
+
+    async def synthesize(self, text: str, config=None) -> TTSResult:
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        return TTSResult(
+            audio_data=pcm_to_wav(self._pcm(text), 16000),
+            format="wav",
+            sample_rate=16000,
+            duration_ms=0,
+            provider=self.name,
+            latency_ms=0,
+        )
+
+    async def synthesize_stream(self, text: str, config=None) -> AsyncIterator[TTSAudioChunk]:
+        self.calls.append(text)
+        pcm = self._pcm(text)
+        for i in range(0, len(pcm), 4):
+            yield TTSAudioChunk(audio_data=pcm[i:i + 4], sample_rate=16000, index=i // 4)
+
+
+def test_split_phrases_marks_numeric_phrases_uncacheable() -> None:
+    segments = split_phrases("当前位置距火灾区域350米，预计12分钟后可能接触危险区域，请及时处置")
+
+    assert [seg.text for seg in segments] == [
+        "当前位置距火灾区域350米，", "预计12分钟后可能接触危险区域，", "请及时处置",
+    ]
+    assert [seg.cacheable for seg in segments] == [False, False, True]
+
+
+def test_repeated_synthesis_hits_cache_and_coalesces() -> None:
+    async def _run():
+        provider = _FakeProvider(delay=0.05)
+        tts = TTSService(provider=provider, cache=TTSAudioCache())
+        first, second = await asyncio.gather(tts.synthesize("收到"), tts.synthesize("收到"))
+        third = await tts.synthesize(" 收到 ")
+        return provider, tts, first, second, third
+
+    provider, tts, first, second, third = asyncio.run(_run())
+
+    assert provider.calls == ["收到"]
+    assert first.audio_data == second.audio_data == third.audio_data
+    assert first.metadata["cache_hit"] is False and third.metadata["cache_hit"] is True
+    stats = tts.cache_stats
+    assert stats["misses"] == 1 and stats["coalesced"] == 1 and stats["memory_hits"] == 1
+
+
+def test_disk_tier_survives_new_cache_instance(tmp_path) -> None:
+    async def _run():
+        provider = _FakeProvider()
+        await TTSService(provider=provider, cache=TTSAudioCache(disk_dir=str(tmp_path))).synthesize("请保持通信畅通")
+        tts = TTSService(provider=provider, cache=TTSAudioCache(disk_dir=str(tmp_path)))
+        result = await tts.synthesize("请保持通信畅通")
+        return provider, tts, result
+
+    provider, tts, result = asyncio.run(_run())
+
+    assert provider.calls == ["请保持通信畅通"]
+    assert result.metadata["cache_hit"] is True
+    assert tts.cache_stats["disk_hits"] == 1
+
+
+def test_phrases_reuse_fixed_parts_and_concatenate() -> None:
+    async def _run():
+        provider = _FakeProvider()
+        tts = TTSService(provider=provider, cache=TTSAudioCache())
+        await tts.synthesize_phrases("距离350米，请及时处置", gap_ms=0)
+        result = await tts.synthesize_phrases("距离120米，请及时处置", gap_ms=0)
+        streamed = [chunk async for chunk in tts.synthesize_stream("请及时处置")]
+        return provider, result, streamed
+
+    provider, result, streamed = asyncio.run(_run())
+
+    assert provider.calls == ["距离350米，", "请及时处置", "距离120米，"]
+    assert wav_to_pcm(result.audio_data) == _FakeProvider._pcm("距离120米，") + _FakeProvider._pcm("请及时处置")
+    assert result.metadata == {"segments": 2, "segment_cache_hits": 1}
+    assert len(streamed) == 1 and streamed[0].audio_data == _FakeProvider._pcm("请及时处置")
+
+
+def test_cache_disabled_by_env(monkeypatch) -> None:
+    monkeypatch.setenv("TTS_CACHE_ENABLED", "false")
+    assert TTSService(provider=_FakeProvider()).cache_stats is None
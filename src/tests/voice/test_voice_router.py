@@ -0,0 +1,48 @@
+"""语音对话路由测试：发言达到最大时长时，未检测到语音的缓冲丢弃而不送ASR"""
+from __future__ import annotations
+
+import asyncio
+
+from src.domains.voice import router as voice_router
+from src.domains.voice.audio import PCMRingBuffer
+
+SILENCE = bytes(voice_router.VAD_FRAME_BYTES)
+
+
+def _session(config: dict) -> voice_router.VoiceSession:
+    session = voice_router.VoiceSession(session_id="s1", websocket=None, is_recording=True, config=config)
+    session.audio_buffer = PCMRingBuffer(voice_router.VAD_FRAME_BYTES * 5)
+    return session
+
+
+def _feed(session: voice_router.VoiceSession, frames: int) -> list:
+    manager = voice_router.VoiceChatManager()
+    finalized = []
+
+    async def _finalize(s) -> None:
+        finalized.append(len(s.audio_buffer))
+        s.audio_buffer.clear()
+
+    manager._finalize_utterance = _finalize
+
+    async def run() -> None:
+        for _ in range(frames):
+            await manager._handle_audio(session, SILENCE)
+
+    asyncio.run(run())
+    return finalized
+
+
+def test_full_buffer_of_silence_is_dropped_when_vad_enabled() -> None:
+    session = _session({"enable_vad": True})
+    assert _feed(session, 12) == []
+    # 每次写满即清空，不会在之后的真实发言开头立刻触发识别
+    assert len(session.audio_buffer) == 2 * voice_router.VAD_FRAME_BYTES
+
+
+def test_full_buffer_is_finalized_without_vad_or_after_speech() -> None:
+    assert _feed(_session({"enable_vad": False}), 5) == [5 * voice_router.VAD_FRAME_BYTES]
+
+    speaking = _session({"enable_vad": True})
+    speaking.vad_speech_started = True
+    assert _feed(speaking, 5) == [5 * voice_router.VAD_FRAME_BYTES]